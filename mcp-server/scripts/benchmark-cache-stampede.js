@@ -0,0 +1,79 @@
+// 緩存過期時的併發查詢測試
+// 模擬熱門查詢在 TTL 到期的瞬間湧入大量並行請求，比較：
+//   - 舊行為：過期即未命中，每個請求各自查詢資料庫
+//   - cacheStaleTTL：寬限期內先返回舊值，背景只更新一次
+// 並統計實際執行的「資料庫查詢」次數與請求延遲
+//
+// 使用方式：
+//   node scripts/benchmark-cache-stampede.js
+//   BENCH_CONCURRENCY=500 BENCH_QUERY_MS=50 node scripts/benchmark-cache-stampede.js
+import { BaseTool } from "../src/tools/base-tool.js";
+import { globalToolCache } from "../src/tools/tool-cache.js";
+import { globalToolTelemetry } from "../src/tools/telemetry.js";
+
+const CONCURRENCY = parseInt(process.env.BENCH_CONCURRENCY) || 200;
+const QUERY_MS = parseInt(process.env.BENCH_QUERY_MS) || 20;
+
+class SlowQueryTool extends BaseTool {
+  constructor(name, options) {
+    super(
+      name,
+      "模擬資料庫查詢的工具",
+      { type: "object", properties: { status: { type: "string" } } },
+      { cacheTTL: 1000, ...options },
+    );
+    this.queries = 0;
+  }
+
+  async _execute(params) {
+    this.queries++;
+    await new Promise(resolve => setTimeout(resolve, QUERY_MS));
+    return { status: params.status, rows: 100 };
+  }
+}
+
+// 舊版 BaseTool：過期即未命中、沒有 single-flight
+class LegacyCacheTool extends SlowQueryTool {
+  async execute(params) {
+    const key = globalToolCache.generateKey(this.name, params);
+    const cached = globalToolCache.get(key);
+    if (cached !== null) return { success: true, result: cached };
+    const result = await this._execute(params);
+    globalToolCache.set(key, result, this.cacheTTL, { tool: this.name });
+    return { success: true, result };
+  }
+}
+
+async function burst(tool) {
+  const params = { status: "OnGoing" };
+  await tool.execute(params);
+  const key = globalToolCache.generateKey(tool.name, params);
+  globalToolCache.cache.get(key).createdAt -= 1500; // 讓項目剛好過期
+
+  tool.queries = 0;
+  const latencies = [];
+  await Promise.all(
+    Array.from({ length: CONCURRENCY }, async () => {
+      const start = process.hrtime.bigint();
+      await tool.execute(params);
+      latencies.push(Number(process.hrtime.bigint() - start) / 1e6);
+    }),
+  );
+  await globalToolCache.inflight.get(key);
+  await globalToolTelemetry.flush();
+
+  latencies.sort((a, b) => a - b);
+  const p50 = latencies[Math.floor(latencies.length * 0.5)];
+  const p99 = latencies[Math.floor(latencies.length * 0.99)];
+  console.log(
+    `${tool.name.padEnd(24)} 查詢 ${String(tool.queries).padStart(4)} 次  ` +
+      `p50 ${p50.toFixed(2).padStart(7)} ms  p99 ${p99.toFixed(2).padStart(7)} ms`,
+  );
+}
+
+await globalToolTelemetry.setStrict(false);
+console.log(`${CONCURRENCY} 個並行請求，查詢耗時 ${QUERY_MS} ms`);
+await burst(new LegacyCacheTool("expire_on_ttl"));
+await burst(new SlowQueryTool("stale_while_revalidate", { cacheStaleTTL: 60000 }));
+globalToolCache.destroy();
+process.exit(0);
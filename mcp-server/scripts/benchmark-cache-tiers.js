@@ -0,0 +1,94 @@
+// 兩層緩存測試
+// 模擬多個 worker 各自持有 L1，請求平均分配到各 worker，比較：
+//   - 只有 L1：每個 worker 各自查詢一次同樣的資料
+//   - L1 + SQLite L2：任一 worker 查詢後，其他 worker 由 L2 取得
+// 並統計實際執行的「資料庫查詢」次數、L2 讀取延遲與壓縮比
+//
+// 使用方式：
+//   node scripts/benchmark-cache-tiers.js
+//   BENCH_WORKERS=8 BENCH_KEYS=500 BENCH_REQUESTS=20000 node scripts/benchmark-cache-tiers.js
+import fs from "fs";
+import os from "os";
+import path from "path";
+import { ToolCache } from "../src/tools/tool-cache.js";
+import {
+  SqliteCacheStore,
+  openCacheDatabase,
+} from "../src/tools/cache-store.js";
+
+const WORKERS = parseInt(process.env.BENCH_WORKERS) || 4;
+const KEYS = parseInt(process.env.BENCH_KEYS) || 200;
+const REQUESTS = parseInt(process.env.BENCH_REQUESTS) || 5000;
+
+// 類似 MIL 清單的結果（約 20KB JSON）
+function loadRows(key) {
+  return Array.from({ length: 100 }, (_, i) => ({
+    SerialNumber: `${key}-${i}`,
+    Status: "OnGoing",
+    Proposer_Name: "王小明",
+    ProposalFactory: "KH",
+    DelayDay: i % 30,
+  }));
+}
+
+// 偏斜的存取分佈：少數熱門鍵佔大部分請求
+function pickKey(i) {
+  const rank = Math.floor(KEYS * Math.pow(((i * 7919) % 1000) / 1000, 3));
+  return `query-${rank}`;
+}
+
+async function run(label, withL2) {
+  const dir = fs.mkdtempSync(path.join(os.tmpdir(), "bench-cache-tiers-"));
+  const filePath = path.join(dir, "cache.db");
+  const workers = [];
+  for (let i = 0; i < WORKERS; i++) {
+    const cache = new ToolCache();
+    if (withL2) {
+      const db = await openCacheDatabase(filePath);
+      await cache.attachL2(new SqliteCacheStore(db), { pollInterval: 0 });
+    }
+    workers.push(cache);
+  }
+
+  let queries = 0;
+  const l2Latencies = [];
+  const start = process.hrtime.bigint();
+  for (let i = 0; i < REQUESTS; i++) {
+    const cache = workers[i % WORKERS];
+    const key = pickKey(i);
+    if (cache.lookup(key)) continue;
+
+    if (cache.l2) {
+      const l2Start = process.hrtime.bigint();
+      const item = await cache.lookupL2(key);
+      l2Latencies.push(Number(process.hrtime.bigint() - l2Start) / 1e6);
+      if (item) continue;
+    }
+    queries++;
+    cache.set(key, loadRows(key), 60000, { tool: "get-mil-list" });
+    if (cache.l2) await cache.flushL2();
+  }
+  const elapsed = Number(process.hrtime.bigint() - start) / 1e6;
+
+  l2Latencies.sort((a, b) => a - b);
+  const p50 = l2Latencies[Math.floor(l2Latencies.length * 0.5)] ?? 0;
+  const stats = workers[0].getStats().tiers;
+  console.log(
+    `${label.padEnd(12)} 查詢 ${String(queries).padStart(5)} 次  ` +
+      `總耗時 ${elapsed.toFixed(0).padStart(6)} ms  ` +
+      `L2 讀取 p50 ${p50.toFixed(3)} ms  ` +
+      `壓縮比 ${stats.l2?.compressionRatio ?? "-"}`,
+  );
+
+  for (const cache of workers) {
+    const store = await cache.detachL2();
+    cache.destroy();
+    await store?.close();
+  }
+  fs.rmSync(dir, { recursive: true, force: true });
+}
+
+console.log(`${WORKERS} 個 worker，${KEYS} 個查詢鍵，${REQUESTS} 個請求`);
+await run("只有 L1", false);
+await run("L1 + L2", true);
+process.exit(0);
@@ -0,0 +1,201 @@
+// 單一行程與 cluster 模式的負載測試
+// 分別以 `node src/server.js` 與 `node src/cluster.js`（CLUSTER_WORKERS 個 worker）啟動伺服器，
+// 以固定並行數送出 HR / MIL 混合請求，比較吞吐量與延遲分位數。
+// 需要可連線的 MIL / HR 資料庫；兩種模式使用相同的 .env 設定。
+//
+// 使用方式：
+//   node scripts/benchmark-cluster.js
+//   BENCH_WORKERS=4 BENCH_CONCURRENCY=64 BENCH_DURATION=30 node scripts/benchmark-cluster.js
+//   BENCH_OUTPUT=bench-cluster.json node scripts/benchmark-cluster.js  # 另存結果
+// 結束時輸出 markdown 表格，可直接貼到 docs/deployment.md 的量測紀錄
+import { spawn } from "child_process";
+import fs from "fs";
+import os from "os";
+import path from "path";
+import { fileURLToPath } from "url";
+
+const __dirname = path.dirname(fileURLToPath(import.meta.url));
+const ROOT = path.join(__dirname, "..");
+
+const WORKERS = parseInt(process.env.BENCH_WORKERS) || 4;
+const CONCURRENCY = parseInt(process.env.BENCH_CONCURRENCY) || 32;
+const DURATION = (parseInt(process.env.BENCH_DURATION) || 20) * 1000;
+const PORT = parseInt(process.env.BENCH_PORT) || 18080;
+const OUTPUT = process.env.BENCH_OUTPUT;
+
+// 混合負載：MIL 大型清單（JSON 序列化為主）、單筆查詢與 HR 搜尋，權重為出現次數
+const WORKLOAD = [
+  { path: "/api/mil/get-mil-list", body: { limit: 100 }, weight: 3 },
+  { path: "/api/mil/get-mil-list", body: { status: "OnGoing" }, weight: 2 },
+  {
+    path: "/api/mil/get-count-by",
+    body: { columnName: "Status" },
+    weight: 1,
+  },
+  { path: "/api/mil/get-mil-type-list", body: {}, weight: 1 },
+  { path: "/api/hr/search_employees", body: { name: "王" }, weight: 2 },
+  { path: "/api/hr/get_employee_count", body: {}, weight: 1 },
+];
+const REQUESTS = WORKLOAD.flatMap(request =>
+  Array.from({ length: request.weight }, () => request),
+);
+
+async function waitForServer(baseUrl, timeoutMs = 60000) {
+  const deadline = Date.now() + timeoutMs;
+  while (Date.now() < deadline) {
+    try {
+      const response = await fetch(`${baseUrl}/health`);
+      if (response.ok) return;
+    } catch {
+      // 尚未啟動
+    }
+    await new Promise(resolve => setTimeout(resolve, 500));
+  }
+  throw new Error(`伺服器未在 ${timeoutMs} ms 內啟動`);
+}
+
+async function runLoad(baseUrl) {
+  const latencies = [];
+  let errors = 0;
+  let counter = 0;
+  const deadline = Date.now() + DURATION;
+
+  await Promise.all(
+    Array.from({ length: CONCURRENCY }, async () => {
+      while (Date.now() < deadline) {
+        const request = REQUESTS[counter++ % REQUESTS.length];
+        const start = process.hrtime.bigint();
+        try {
+          const response = await fetch(`${baseUrl}${request.path}`, {
+            method: "POST",
+            headers: { "Content-Type": "application/json" },
+            body: JSON.stringify(request.body),
+          });
+          await response.arrayBuffer();
+          if (!response.ok) errors++;
+        } catch {
+          errors++;
+        }
+        latencies.push(Number(process.hrtime.bigint() - start) / 1e6);
+      }
+    }),
+  );
+
+  latencies.sort((a, b) => a - b);
+  const at = q => latencies[Math.floor(latencies.length * q)] ?? 0;
+  return {
+    requests: latencies.length,
+    errors,
+    rps: latencies.length / (DURATION / 1000),
+    p50: at(0.5),
+    p99: at(0.99),
+  };
+}
+
+async function benchmark(label, script, env) {
+  const baseUrl = `http://127.0.0.1:${PORT}`;
+  const child = spawn(process.execPath, [path.join(ROOT, script)], {
+    cwd: ROOT,
+    env: {
+      ...process.env,
+      MCP_PORT: String(PORT),
+      LOG_LEVEL: "warn",
+      ...env,
+    },
+    stdio: ["ignore", "ignore", "inherit"],
+  });
+  const exited = new Promise(resolve => child.once("exit", resolve));
+
+  try {
+    // 伺服器啟動失敗（缺少套件、埠號被占用等）時不必等到逾時
+    await Promise.race([
+      waitForServer(baseUrl),
+      exited.then(code => {
+        throw new Error(`${script} 啟動後立即結束 (exit ${code})`);
+      }),
+    ]);
+    // 暖機：建立資料庫連線池與工具緩存；資料庫無法連線時全部請求都會失敗，量測沒有意義
+    const warmup = await fetch(`${baseUrl}/api/mil/get-mil-type-list`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: "{}",
+    });
+    if (!warmup.ok) {
+      throw new Error(
+        `暖機請求失敗 (HTTP ${warmup.status})，請確認 MIL / HR 資料庫可連線`,
+      );
+    }
+
+    const result = await runLoad(baseUrl);
+    const stats = await (await fetch(`${baseUrl}/api/tools/stats`)).json();
+    result.label = label;
+    result.totalCalls = stats.usage.allTime.totalCalls;
+    console.log(
+      `${label.padEnd(16)} ${result.rps.toFixed(1).padStart(8)} req/s  ` +
+        `p50 ${result.p50.toFixed(1).padStart(7)} ms  ` +
+        `p99 ${result.p99.toFixed(1).padStart(7)} ms  ` +
+        `錯誤 ${result.errors}/${result.requests}  ` +
+        `統計調用數 ${result.totalCalls}`,
+    );
+    return result;
+  } finally {
+    if (child.exitCode === null && child.signalCode === null) {
+      child.kill("SIGTERM");
+    }
+    await exited;
+  }
+}
+
+const cpus = os.availableParallelism?.() ?? os.cpus().length;
+console.log(
+  `並行 ${CONCURRENCY}，每種模式 ${DURATION / 1000} 秒，` +
+    `${REQUESTS.length} 種請求輪替，CPU ${cpus} 核`,
+);
+if (WORKERS > cpus) {
+  // 壓測工具本身也在同一台機器上，worker 多於核心數時比較結果會偏低
+  console.warn(`⚠️ BENCH_WORKERS=${WORKERS} 超過 CPU 核心數 ${cpus}`);
+}
+
+try {
+  const results = [
+    await benchmark("single process", "src/server.js", {}),
+    await benchmark(`cluster x${WORKERS}`, "src/cluster.js", {
+      CLUSTER_WORKERS: String(WORKERS),
+    }),
+  ];
+
+  const [single, clustered] = results;
+  console.log(
+    `\n| 模式 | req/s | p50 (ms) | p99 (ms) | 錯誤 |\n| --- | --- | --- | --- | --- |`,
+  );
+  for (const result of results) {
+    console.log(
+      `| ${result.label} | ${result.rps.toFixed(1)} | ${result.p50.toFixed(1)} | ` +
+        `${result.p99.toFixed(1)} | ${result.errors}/${result.requests} |`,
+    );
+  }
+  console.log(`\n吞吐量倍數: ${(clustered.rps / single.rps).toFixed(2)}x`);
+
+  if (OUTPUT) {
+    fs.writeFileSync(
+      OUTPUT,
+      JSON.stringify(
+        {
+          date: new Date().toISOString(),
+          cpus,
+          workers: WORKERS,
+          concurrency: CONCURRENCY,
+          durationSeconds: DURATION / 1000,
+          results,
+        },
+        null,
+        2,
+      ),
+    );
+    console.log(`結果已寫入 ${OUTPUT}`);
+  }
+  process.exit(0);
+} catch (error) {
+  console.error(`負載測試中止: ${error.message}`);
+  process.exit(1);
+}
@@ -0,0 +1,128 @@
+// CSV 匯入的時間與記憶體
+// 產生含引號欄位的 CSV（預設 100 萬列），分別以舊版解析（整份讀入、split 換行與逗號、
+// 建立逐列物件後再取出數值欄）與串流欄式解析（fs.createReadStream → CSVColumnParser）處理，
+// 各自在獨立的子行程中執行，回報：
+//   - 解析時間
+//   - 峰值 RSS（process.resourceUsage().maxRSS）
+//   - 解析完成後、結果仍在使用時的 heapUsed 與 arrayBuffers
+//
+// 使用方式：
+//   node scripts/benchmark-csv-ingest.js
+//   BENCH_ROWS=200000 node scripts/benchmark-csv-ingest.js
+import fs from "fs";
+import os from "os";
+import path from "path";
+import { execFileSync } from "child_process";
+import { fileURLToPath } from "url";
+import { getColumn, parseCSVStream } from "../src/services/stat/csv-parser.js";
+
+const ROWS = parseInt(process.env.BENCH_ROWS) || 1000000;
+const DEPARTMENTS = ["研發部", "業務部", "製造部", "品保部", "人資部"];
+
+// 舊版 ParseCSVTTestTool.parseCSV 的做法
+function legacyParse(csvData) {
+  const lines = csvData.trim().split("\n");
+  const headers = lines[0].split(",").map(header => header.trim());
+  const rows = lines.slice(1).map(line => {
+    const values = line.split(",");
+    const row = {};
+    headers.forEach((header, index) => {
+      row[header] = values[index] ? values[index].trim() : "";
+    });
+    return row;
+  });
+  const columns = {};
+  for (const header of headers) {
+    columns[header] = rows
+      .map(row => parseFloat(row[header]))
+      .filter(value => !isNaN(value));
+  }
+  return { headers, rows, columns };
+}
+
+async function runMode(mode, file) {
+  const start = process.hrtime.bigint();
+  let result;
+  if (mode === "legacy") {
+    result = legacyParse(fs.readFileSync(file, "utf8"));
+  } else {
+    const source = fs.createReadStream(file, { highWaterMark: 256 * 1024 });
+    result = await parseCSVStream(source);
+  }
+  const elapsed = Number(process.hrtime.bigint() - start) / 1e6;
+
+  global.gc?.();
+  const memory = process.memoryUsage();
+  const before =
+    mode === "legacy"
+      ? result.columns.before.length
+      : getColumn(result, "before").values.length;
+  process.stdout.write(
+    JSON.stringify({
+      elapsed,
+      maxRSS: process.resourceUsage().maxRSS * 1024,
+      heapUsed: memory.heapUsed,
+      arrayBuffers: memory.arrayBuffers,
+      rows: before,
+    }),
+  );
+}
+
+function generateCSV(file, rows) {
+  const out = fs.openSync(file, "w");
+  let batch = ["employee_id,name,department,before,after,note"];
+  for (let i = 0; i < rows; i++) {
+    const before = 120 + ((i * 37) % 40);
+    // 每 7 列有一個含逗號的引號欄位：舊版解析會因此錯位
+    const note = i % 7 === 0 ? `"late, ${i % 3} times"` : "ok";
+    batch.push(
+      `E${i},"Emp ${i}",${DEPARTMENTS[i % 5]},${before},` +
+        `${before - (i % 15)},${note}`,
+    );
+    if (batch.length >= 10000) {
+      fs.writeSync(out, batch.join("\n") + "\n");
+      batch = [];
+    }
+  }
+  fs.writeSync(out, batch.join("\n"));
+  fs.closeSync(out);
+}
+
+const [mode, file] = process.argv.slice(2);
+if (mode) {
+  await runMode(mode, file);
+  process.exit(0);
+}
+
+const csvFile = path.join(os.tmpdir(), `bench-csv-${process.pid}.csv`);
+generateCSV(csvFile, ROWS);
+const size = fs.statSync(csvFile).size;
+console.log(`${ROWS} 列 CSV（${(size / 1e6).toFixed(1)} MB）`);
+
+const mb = bytes => `${(bytes / 1024 / 1024).toFixed(0).padStart(5)} MB`;
+try {
+  for (const [label, name] of [
+    ["舊版 split + 逐列物件", "legacy"],
+    ["串流欄式解析", "stream"],
+  ]) {
+    const output = execFileSync(
+      process.execPath,
+      [
+        "--expose-gc",
+        "--max-old-space-size=8192",
+        fileURLToPath(import.meta.url),
+        name,
+        csvFile,
+      ],
+      { encoding: "utf8" },
+    );
+    const stats = JSON.parse(output);
+    console.log(
+      `${label.padEnd(16)} ${String(Math.round(stats.elapsed)).padStart(6)} ms` +
+        `  峰值 RSS ${mb(stats.maxRSS)}  heapUsed ${mb(stats.heapUsed)}` +
+        `  arrayBuffers ${mb(stats.arrayBuffers)}  before 欄 ${stats.rows} 筆`,
+    );
+  }
+} finally {
+  fs.unlinkSync(csvFile);
+}
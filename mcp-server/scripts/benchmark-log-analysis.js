@@ -0,0 +1,110 @@
+// 日誌查詢與分析效能測試
+// 以 LogStore 寫入大量日誌（預設 200 萬筆，分布在 10 天），比較：
+//   - 直接掃描 logs 檢視表做 GROUP BY 與讀取每小時彙總表
+//   - 深層 OFFSET 分頁與游標分頁
+//
+// 使用方式：
+//   node scripts/benchmark-log-analysis.js
+//   BENCH_ROWS=20000000 node scripts/benchmark-log-analysis.js
+import fs from "fs";
+import os from "os";
+import path from "path";
+import sqlite3 from "sqlite3";
+import { LogStore, LOG_COLUMNS } from "../src/config/log-store.js";
+
+const ROWS = parseInt(process.env.BENCH_ROWS) || 2_000_000;
+const DAYS = 10;
+const BATCH = 5000;
+const BASE_TIME = Date.parse("2025-06-01T00:00:00.000Z");
+const TOOLS = ["get-mil-list", "get-employee-info", "perform-ttest", "get-count-by"];
+
+function all(db, sql, params = []) {
+  return new Promise((resolve, reject) => {
+    db.all(sql, params, (err, rows) => (err ? reject(err) : resolve(rows)));
+  });
+}
+
+function makeRow(i) {
+  const entry = {
+    timestamp: new Date(BASE_TIME + (i * DAYS * 86400000) / ROWS).toISOString(),
+    level: i % 97 === 0 ? "ERROR" : "INFO",
+    service: "mcp-server",
+    environment: "production",
+    message: i % 97 === 0 ? "連線逾時" : "工具調用",
+    category: i % 3 === 0 ? "api-access" : "tool-call",
+    tool_name: TOOLS[i % TOOLS.length],
+    duration: i % 800,
+    success: i % 10 === 0 ? 0 : 1,
+    method: "GET",
+    url: `/api/hr/employees?page=${i % 50}`,
+    status_code: i % 50 === 0 ? 500 : 200,
+    meta: "{}",
+  };
+  return LOG_COLUMNS.map(column => entry[column] ?? null);
+}
+
+async function time(label, fn) {
+  const start = process.hrtime.bigint();
+  const detail = await fn();
+  const ms = Number(process.hrtime.bigint() - start) / 1e6;
+  console.log(`${label.padEnd(36)} ${ms.toFixed(1).padStart(10)} ms  ${detail ?? ""}`);
+}
+
+const dir = fs.mkdtempSync(path.join(os.tmpdir(), "log-analysis-bench-"));
+const db = new sqlite3.Database(path.join(dir, "logs.db"));
+const store = new LogStore(db);
+await store.init();
+
+await time(`寫入 ${ROWS} 筆（${DAYS} 個分區）`, async () => {
+  for (let i = 0; i < ROWS; i += BATCH) {
+    const rows = [];
+    for (let j = i; j < Math.min(i + BATCH, ROWS); j++) rows.push(makeRow(j));
+    await store.writeBatch(rows);
+  }
+});
+
+const startTime = new Date(BASE_TIME).toISOString();
+
+await time("掃描原始日誌 GROUP BY", async () => {
+  const rows = await all(
+    db,
+    `SELECT tool_name, COUNT(*) AS count, AVG(duration) AS avgDuration
+       FROM logs WHERE category = 'tool-call' AND timestamp >= ?
+      GROUP BY tool_name`,
+    [startTime],
+  );
+  return `${rows.length} 組`;
+});
+
+await time("讀取每小時彙總表", async () => {
+  const rows = await store.getRollups(startTime);
+  return `${rows.length} 組`;
+});
+
+const depth = Math.floor(ROWS / 2);
+await time(`OFFSET 分頁（第 ${depth} 筆起）`, async () => {
+  const rows = await all(
+    db,
+    "SELECT * FROM logs ORDER BY timestamp DESC, id DESC LIMIT 100 OFFSET ?",
+    [depth],
+  );
+  return `${rows.length} 筆`;
+});
+
+// 先以時間取得相同深度的游標，再量測下一頁
+const [anchor] = await all(
+  db,
+  "SELECT timestamp, id FROM logs ORDER BY timestamp DESC, id DESC LIMIT 1 OFFSET ?",
+  [depth],
+);
+const { nextCursor } = await store.queryLogPage({
+  endTime: anchor.timestamp,
+  limit: 1,
+});
+await time("游標分頁（相同深度）", async () => {
+  const { logs } = await store.queryLogPage({ limit: 100, cursor: nextCursor });
+  return `${logs.length} 筆`;
+});
+
+await new Promise(resolve => db.close(resolve));
+fs.rmSync(dir, { recursive: true, force: true });
@@ -0,0 +1,126 @@
+// 日誌檔案 tail / 搜尋效能測試
+// 產生指定大小的 JSON 日誌檔（預設 1 GB），比較原本的整檔讀取與反向讀取、時間索引搜尋的耗時
+//
+// 使用方式：
+//   node scripts/benchmark-log-search.js
+//   BENCH_SIZE_MB=256 node scripts/benchmark-log-search.js
+//   BENCH_LOG_FILE=/var/log/mcp/combined.log node scripts/benchmark-log-search.js   # 使用現有檔案
+import fs from "fs";
+import os from "os";
+import path from "path";
+import {
+  searchLogs,
+  tailLines,
+  updateLogIndex,
+  indexPathFor,
+} from "../src/config/log-reader.js";
+
+const SIZE_MB = parseInt(process.env.BENCH_SIZE_MB) || 1024;
+const BASE_TIME = Date.parse("2025-06-01T00:00:00.000Z");
+const TOOLS = ["get-mil-list", "get-employee-info", "perform-ttest", "get-count-by"];
+
+function generateLogFile(filePath, bytes) {
+  const fd = fs.openSync(filePath, "w");
+  let written = 0;
+  let i = 0;
+  while (written < bytes) {
+    const lines = [];
+    for (let j = 0; j < 10000; j++, i++) {
+      lines.push(
+        JSON.stringify({
+          timestamp: new Date(BASE_TIME + i * 50).toISOString(),
+          level: i % 97 === 0 ? "ERROR" : "INFO",
+          service: "mcp-server",
+          environment: "production",
+          message: `工具調用: ${TOOLS[i % TOOLS.length]} (success)`,
+          pid: 4242,
+          category: "tool-call",
+          toolName: TOOLS[i % TOOLS.length],
+          duration: i % 800,
+          meta: { requestId: `req-${i}` },
+        }),
+      );
+    }
+    const chunk = lines.join("\n") + "\n";
+    fs.writeSync(fd, chunk);
+    written += Buffer.byteLength(chunk);
+  }
+  fs.closeSync(fd);
+  return i;
+}
+
+async function time(label, fn) {
+  const start = process.hrtime.bigint();
+  try {
+    const detail = await fn();
+    const ms = Number(process.hrtime.bigint() - start) / 1e6;
+    console.log(`${label.padEnd(36)} ${ms.toFixed(1).padStart(10)} ms  ${detail ?? ""}`);
+  } catch (error) {
+    console.log(`${label.padEnd(36)} ${"失敗".padStart(10)}     ${error.message}`);
+  }
+}
+
+// 原本的實作：讀入整個檔案再切行
+function legacyTail(filePath, lines) {
+  const content = fs.readFileSync(filePath, "utf8");
+  return content.trim().split("\n").slice(-lines);
+}
+
+function legacySearch(filePath, query, lines) {
+  return legacyTail(filePath, lines).filter(line => line.includes(query));
+}
+
+let filePath = process.env.BENCH_LOG_FILE;
+let tempDir = null;
+let totalLines = null;
+
+if (!filePath) {
+  tempDir = fs.mkdtempSync(path.join(os.tmpdir(), "log-search-bench-"));
+  filePath = path.join(tempDir, "combined.log");
+  console.log(`產生 ${SIZE_MB} MB 測試日誌...`);
+  totalLines = generateLogFile(filePath, SIZE_MB * 1024 * 1024);
+}
+
+const size = fs.statSync(filePath).size;
+console.log(
+  `日誌檔案: ${filePath} (${(size / 1024 / 1024).toFixed(0)} MB${totalLines ? `，${totalLines} 行` : ""})\n`,
+);
+
+// 取檔案中段約一分鐘的時間範圍
+const middle = totalLines ? new Date(BASE_TIME + (totalLines / 2) * 50) : null;
+
+await time("原本 tail 100 行（整檔讀取）", () => `${legacyTail(filePath, 100).length} 行`);
+await time("原本 search 最近 1000 行", () => `${legacySearch(filePath, "ERROR", 1000).length} 筆`);
+
+await time("反向 tail 100 行", async () => `${(await tailLines(filePath, 100)).length} 行`);
+await time("反向 search 最近 1000 行", async () => {
+  const result = await searchLogs(filePath, { query: "ERROR", maxLines: 1000 });
+  return `${result.matches.length} 筆`;
+});
+
+fs.rmSync(indexPathFor(filePath), { force: true });
+await time("建立時間索引", async () => {
+  const index = await updateLogIndex(filePath);
+  return `${index.entries.length} 個檢查點`;
+});
+await time("更新時間索引（檔案未變動）", async () => {
+  const index = await updateLogIndex(filePath);
+  return `${index.entries.length} 個檢查點`;
+});
+
+if (middle) {
+  const startTime = middle.toISOString();
+  const endTime = new Date(middle.getTime() + 60 * 1000).toISOString();
+  await time("索引搜尋 中段 1 分鐘 ERROR", async () => {
+    const result = await searchLogs(filePath, { query: "ERROR", startTime, endTime, limit: 1000 });
+    return `${result.matches.length} 筆，掃描 ${(result.scannedBytes / 1024).toFixed(0)} KB`;
+  });
+  await time("索引搜尋 中段起 limit 100", async () => {
+    const result = await searchLogs(filePath, { query: "perform-ttest", startTime, limit: 100 });
+    return `${result.matches.length} 筆，掃描 ${(result.scannedBytes / 1024).toFixed(0)} KB`;
+  });
+}
+
+if (tempDir) {
+  fs.rmSync(tempDir, { recursive: true, force: true });
+}
@@ -0,0 +1,95 @@
+// 日誌寫入吞吐量效能測試
+// 比較逐筆同步寫入（appendFileSync + 單筆 INSERT）與緩衝批次寫入的每秒日誌行數，
+// 緩衝模式的時間包含最後 flush，確保所有日誌都已寫入檔案與 SQLite
+//
+// 使用方式：
+//   node scripts/benchmark-logger.js
+//   BENCH_LINES=200000 BENCH_DATABASE=false node scripts/benchmark-logger.js
+import fs from "fs";
+import os from "os";
+import path from "path";
+import { Logger } from "../src/config/logger.js";
+
+const LINES = parseInt(process.env.BENCH_LINES) || 50000;
+const USE_DATABASE = process.env.BENCH_DATABASE !== "false";
+
+async function run(buffered) {
+  const logDir = fs.mkdtempSync(path.join(os.tmpdir(), "logger-bench-"));
+  const logger = new Logger({
+    logDir,
+    buffered,
+    useDatabase: USE_DATABASE,
+    environment: "benchmark",
+    // 迴圈同步產生日誌，期間 I/O 無法推進，放大佇列上限以免測試中丟棄
+    maxQueue: LINES * 2,
+  });
+  await logger.init();
+
+  const start = process.hrtime.bigint();
+  let maxCallMs = 0;
+  for (let i = 0; i < LINES; i++) {
+    const callStart = process.hrtime.bigint();
+    logger.info("工具調用: get-mil-list (success)", {
+      category: "tool-call",
+      toolName: "get-mil-list",
+      duration: i % 500,
+      success: true,
+      meta: { requestId: i },
+    });
+    const callMs = Number(process.hrtime.bigint() - callStart) / 1e6;
+    if (callMs > maxCallMs) maxCallMs = callMs;
+  }
+  const enqueueMs = Number(process.hrtime.bigint() - start) / 1e6;
+
+  // 逐筆模式的 INSERT 為非同步，等待佇列中的語句完成
+  if (buffered) {
+    await logger.flush();
+  } else if (logger.db) {
+    await new Promise(resolve => logger.db.get("SELECT 1", resolve));
+  }
+  const totalMs = Number(process.hrtime.bigint() - start) / 1e6;
+
+  const fileLines = fs
+    .readFileSync(path.join(logDir, "combined.log"), "utf8")
+    .split("\n").length - 1;
+  let dbRows = 0;
+  if (logger.db) {
+    dbRows = await new Promise(resolve =>
+      logger.db.get("SELECT COUNT(*) AS count FROM logs", (err, row) =>
+        resolve(err ? 0 : row.count),
+      ),
+    );
+  }
+
+  await logger.close();
+  fs.rmSync(logDir, { recursive: true, force: true });
+
+  return {
+    mode: buffered ? "緩衝批次" : "逐筆同步",
+    linesPerSec: Math.round(LINES / (totalMs / 1000)),
+    enqueueMs: enqueueMs.toFixed(1),
+    totalMs: totalMs.toFixed(1),
+    maxCallMs: maxCallMs.toFixed(3),
+    fileLines,
+    dbRows,
+  };
+}
+
+console.log(`日誌行數: ${LINES}，SQLite: ${USE_DATABASE ? "啟用" : "停用"}\n`);
+
+const results = [];
+for (const buffered of [false, true]) {
+  results.push(await run(buffered));
+}
+
+console.log(
+  ["模式", "lines/s", "呼叫耗時(ms)", "總耗時(ms)", "單次最長(ms)", "檔案行數", "資料庫列數"].join("\t"),
+);
+for (const r of results) {
+  console.log(
+    [r.mode, r.linesPerSec, r.enqueueMs, r.totalMs, r.maxCallMs, r.fileLines, r.dbRows].join("\t"),
+  );
+}
+console.log(
+  `\n吞吐量提升: ${(results[1].linesPerSec / results[0].linesPerSec).toFixed(1)}x`,
+);
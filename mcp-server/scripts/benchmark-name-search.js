@@ -0,0 +1,113 @@
+// 員工姓名模糊搜尋索引效能測試
+// 以合成員工資料（10k / 100k）建立索引，量測完全符合、部分符合、錯字與帳號查詢的延遲
+//
+// 使用方式：
+//   node scripts/benchmark-name-search.js
+//   BENCH_SIZES=10000,100000,200000 BENCH_QUERIES=2000 node scripts/benchmark-name-search.js
+import { NameSearchIndex } from "../src/services/hr/name-search-index.js";
+
+const SIZES = (process.env.BENCH_SIZES || "10000,100000")
+  .split(",")
+  .map(Number);
+const QUERY_COUNT = parseInt(process.env.BENCH_QUERIES) || 1000;
+
+const SURNAMES = "王李張劉陳楊黃趙吳周徐孫馬朱胡郭何高林羅鄭梁謝宋唐許韓馮鄧曹彭曾蕭田董潘袁蔡蔣余杜葉程蘇魏呂丁任沈姚盧姜崔鍾譚陸汪范金石廖賈夏韋傅方白鄒孟熊秦邱江尹薛閻段雷侯龍史陶黎賀顧毛郝龔邵萬錢嚴覃武戴莫孔向湯";
+const GIVEN = "小明華建國志偉俊傑家豪雅婷淑芬美玲怡君佳蓉宗翰冠宇承恩子涵詩涵宜蓁柏宏睿哲思妤欣怡育誠嘉宏秀英麗娟文雄正雄國榮金龍世昌";
+const DEPARTMENTS = ["資訊部", "人力資源部", "品保處", "製造一部", "製造二部", "研發中心", "財務部", "採購部", "業務部", "總經理室"];
+const LATIN = "abcdefghijklmnopqrstuvwxyz";
+
+// 固定亂數種子，方便重現
+let seed = 42;
+const random = () => {
+  seed = (seed * 1103515245 + 12345) % 2147483648;
+  return seed / 2147483648;
+};
+const pick = list => list[Math.floor(random() * list.length)];
+
+function createEmployees(count) {
+  const givenChars = [...GIVEN];
+  const employees = [];
+  for (let i = 0; i < count; i++) {
+    const name =
+      pick([...SURNAMES]) +
+      pick(givenChars) +
+      (random() < 0.8 ? pick(givenChars) : "");
+    const nickname = Array.from({ length: 4 + Math.floor(random() * 4) }, () =>
+      pick([...LATIN]),
+    ).join("");
+    employees.push({
+      id: `A${String(i).padStart(6, "0")}`,
+      name,
+      nickname,
+      account: `${nickname}.${i}`,
+      department: pick(DEPARTMENTS),
+    });
+  }
+  return employees;
+}
+
+// 產生錯字：替換姓名中的一個字
+function withTypo(name) {
+  const chars = [...name];
+  const position = 1 + Math.floor(random() * (chars.length - 1));
+  chars[position] = pick([...GIVEN]);
+  return chars.join("");
+}
+
+function measure(index, queries) {
+  const samples = [];
+  let hits = 0;
+  for (const query of queries) {
+    const started = process.hrtime.bigint();
+    const results = index.search(query, { limit: 10 });
+    samples.push(Number(process.hrtime.bigint() - started) / 1e6);
+    if (results.length > 0) hits++;
+  }
+  samples.sort((a, b) => a - b);
+  const at = q => samples[Math.min(samples.length - 1, Math.floor(samples.length * q))];
+  return {
+    p50: at(0.5).toFixed(3),
+    p99: at(0.99).toFixed(3),
+    hitRate: `${((hits / queries.length) * 100).toFixed(1)}%`,
+  };
+}
+
+for (const size of SIZES) {
+  const employees = createEmployees(size);
+  const index = new NameSearchIndex();
+
+  const buildStarted = process.hrtime.bigint();
+  for (const employee of employees) {
+    index.upsert(employee.id, employee);
+  }
+  const buildMs = Number(process.hrtime.bigint() - buildStarted) / 1e6;
+
+  const sample = () => employees[Math.floor(random() * employees.length)];
+  const scenarios = {
+    完全符合: () => sample().name,
+    姓名片段: () => [...sample().name].slice(1).join(""),
+    錯字: () => withTypo(sample().name),
+    別名: () => sample().nickname,
+    部門: () => pick(DEPARTMENTS),
+  };
+
+  // 暖機
+  measure(index, Array.from({ length: 100 }, scenarios.完全符合));
+
+  const updateStarted = process.hrtime.bigint();
+  for (let i = 0; i < 1000; i++) {
+    const employee = sample();
+    index.upsert(employee.id, { ...employee, name: withTypo(employee.name) });
+  }
+  const updateMs = Number(process.hrtime.bigint() - updateStarted) / 1e6 / 1000;
+
+  console.log(`\n=== ${size.toLocaleString()} 位員工 ===`);
+  console.log(
+    `建立索引 ${buildMs.toFixed(0)} ms，${index.getStats().grams} 個 n-gram，單筆增量更新 ${updateMs.toFixed(3)} ms`,
+  );
+  console.log("情境\t\tp50(ms)\tp99(ms)\t命中率");
+  for (const [name, generate] of Object.entries(scenarios)) {
+    const result = measure(index, Array.from({ length: QUERY_COUNT }, generate));
+    console.log(`${name}\t\t${result.p50}\t${result.p99}\t${result.hitRate}`);
+  }
+}
@@ -0,0 +1,159 @@
+// MIL 列表分頁效能比較：LIMIT/OFFSET 與 keyset 游標
+// 在本機 MySQL 建立測試表並灌入資料，量測 offset 0 / 10k / 100k 時單頁查詢延遲
+//
+// 使用方式：
+//   BENCH_DB_NAME=mil_bench node scripts/benchmark-pagination.js
+//   BENCH_ROWS=200000 BENCH_PAGE_SIZE=50 node scripts/benchmark-pagination.js
+import mysql from "mysql2/promise";
+import {
+  encodeCursor,
+  decodeCursor,
+  buildKeysetCondition,
+} from "../src/services/cursor.js";
+
+const dbConfig = {
+  host: process.env.BENCH_DB_HOST || "localhost",
+  port: parseInt(process.env.BENCH_DB_PORT) || 3306,
+  user: process.env.BENCH_DB_USER || "root",
+  password: process.env.BENCH_DB_PASSWORD || "MyPwd@1234",
+  database: process.env.BENCH_DB_NAME || "mil_bench",
+  charset: "utf8mb4",
+};
+
+const TOTAL_ROWS = parseInt(process.env.BENCH_ROWS) || 120000;
+const PAGE_SIZE = parseInt(process.env.BENCH_PAGE_SIZE) || 100;
+const REPEAT = parseInt(process.env.BENCH_REPEAT) || 5;
+const OFFSETS = [0, 10000, 100000];
+const TABLE = "bench_mil_kd";
+const SCOPE = "mil:list";
+const KEYSET_COLUMNS = ["RecordDate", "SerialNumber"];
+
+async function seed(connection) {
+  await connection.query(`DROP TABLE IF EXISTS ${TABLE}`);
+  await connection.query(`
+    CREATE TABLE ${TABLE} (
+      SerialNumber VARCHAR(20) NOT NULL PRIMARY KEY,
+      RecordDate DATETIME NOT NULL,
+      Status VARCHAR(20) NOT NULL,
+      DRI_EmpName VARCHAR(50),
+      IssueDiscription TEXT,
+      KEY idx_status_record (Status, RecordDate, SerialNumber)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+  `);
+
+  const start = Date.UTC(2020, 0, 1);
+  const batchSize = 5000;
+  for (let i = 0; i < TOTAL_ROWS; i += batchSize) {
+    const values = [];
+    for (let j = i; j < Math.min(i + batchSize, TOTAL_ROWS); j++) {
+      // 每 3 筆共用同一時間，驗證次要排序鍵的穩定性
+      const recordDate = new Date(start + Math.floor(j / 3) * 60000);
+      values.push([
+        `G${String(j).padStart(10, "0")}`,
+        recordDate,
+        "OnGoing",
+        `DRI-${j % 500}`,
+        `測試問題描述 ${j}`,
+      ]);
+    }
+    await connection.query(
+      `INSERT INTO ${TABLE} (SerialNumber, RecordDate, Status, DRI_EmpName, IssueDiscription) VALUES ?`,
+      [values],
+    );
+  }
+  console.log(`已建立 ${TOTAL_ROWS} 筆測試資料`);
+}
+
+async function timeQuery(connection, sql, params) {
+  const samples = [];
+  let rows;
+  for (let i = 0; i < REPEAT; i++) {
+    const started = process.hrtime.bigint();
+    [rows] = await connection.execute(sql, params);
+    samples.push(Number(process.hrtime.bigint() - started) / 1e6);
+  }
+  samples.sort((a, b) => a - b);
+  return { median: samples[Math.floor(samples.length / 2)], rows };
+}
+
+async function offsetPage(connection, offset) {
+  return timeQuery(
+    connection,
+    `SELECT SerialNumber, RecordDate, DRI_EmpName FROM ${TABLE}
+     WHERE Status = ?
+     ORDER BY RecordDate DESC, SerialNumber DESC
+     LIMIT ${PAGE_SIZE} OFFSET ${offset}`,
+    ["OnGoing"],
+  );
+}
+
+async function keysetPage(connection, cursor) {
+  const conditions = ["Status = ?"];
+  const params = ["OnGoing"];
+  if (cursor) {
+    const keyset = buildKeysetCondition(
+      KEYSET_COLUMNS,
+      decodeCursor(cursor, SCOPE, KEYSET_COLUMNS.length),
+    );
+    conditions.push(keyset.clause);
+    params.push(...keyset.params);
+  }
+  return timeQuery(
+    connection,
+    `SELECT SerialNumber, DATE_FORMAT(RecordDate, '%Y-%m-%d %H:%i:%s.%f') AS RecordDateText, DRI_EmpName
+     FROM ${TABLE}
+     WHERE ${conditions.join(" AND ")}
+     ORDER BY RecordDate DESC, SerialNumber DESC
+     LIMIT ${PAGE_SIZE}`,
+    params,
+  );
+}
+
+async function main() {
+  const connection = await mysql.createConnection(dbConfig);
+  try {
+    if (process.env.BENCH_SKIP_SEED !== "1") {
+      await seed(connection);
+    }
+
+    console.log(`\n每頁 ${PAGE_SIZE} 筆，每項重複 ${REPEAT} 次取中位數\n`);
+    console.log("offset\tOFFSET(ms)\tkeyset(ms)\t結果一致");
+
+    for (const offset of OFFSETS) {
+      if (offset >= TOTAL_ROWS) continue;
+
+      // 先以 OFFSET 取得前一頁最後一筆，組出等價的游標
+      let cursor = null;
+      if (offset > 0) {
+        const [prev] = await connection.execute(
+          `SELECT DATE_FORMAT(RecordDate, '%Y-%m-%d %H:%i:%s.%f') AS RecordDateText, SerialNumber
+           FROM ${TABLE} WHERE Status = ?
+           ORDER BY RecordDate DESC, SerialNumber DESC
+           LIMIT 1 OFFSET ${offset - 1}`,
+          ["OnGoing"],
+        );
+        cursor = encodeCursor(SCOPE, [
+          prev[0].RecordDateText,
+          prev[0].SerialNumber,
+        ]);
+      }
+
+      const byOffset = await offsetPage(connection, offset);
+      const byKeyset = await keysetPage(connection, cursor);
+      const same =
+        byOffset.rows.map(r => r.SerialNumber).join() ===
+        byKeyset.rows.map(r => r.SerialNumber).join();
+
+      console.log(
+        `${offset}\t${byOffset.median.toFixed(2)}\t\t${byKeyset.median.toFixed(2)}\t\t${same ? "是" : "否"}`,
+      );
+    }
+  } finally {
+    await connection.end();
+  }
+}
+
+main().catch(error => {
+  console.error("分頁效能測試失敗:", error.message);
+  process.exit(1);
+});
@@ -0,0 +1,66 @@
+// 工具緩存寫入效能測試
+// 緩存已滿時持續寫入新項目，比較原本逐一掃描找最舊項目的驅逐方式與 O(1) LRU
+//
+// 使用方式：
+//   node scripts/benchmark-tool-cache.js
+//   BENCH_CACHE_SIZE=50000 node scripts/benchmark-tool-cache.js
+import { ToolCache } from "../src/tools/tool-cache.js";
+import logger from "../src/config/logger.js";
+
+const CACHE_SIZE = parseInt(process.env.BENCH_CACHE_SIZE) || 10000;
+const OPERATIONS = parseInt(process.env.BENCH_OPERATIONS) || 20000;
+
+// 原本的驅逐方式：每次寫入都掃描整個 Map
+function legacyEvictOldest(cache) {
+  let oldestKey = null;
+  let oldestTime = Date.now();
+  for (const [key, item] of cache) {
+    if (item.createdAt <= oldestTime) {
+      oldestTime = item.createdAt;
+      oldestKey = key;
+    }
+  }
+  if (oldestKey) cache.delete(oldestKey);
+}
+
+function benchLegacy() {
+  const cache = new Map();
+  for (let i = 0; i < CACHE_SIZE; i++) {
+    cache.set(`k${i}`, { value: { id: i }, createdAt: Date.now() });
+  }
+  const start = process.hrtime.bigint();
+  for (let i = 0; i < OPERATIONS; i++) {
+    if (cache.size >= CACHE_SIZE) legacyEvictOldest(cache);
+    cache.set(`n${i}`, { value: { id: i }, createdAt: Date.now() });
+  }
+  return Number(process.hrtime.bigint() - start) / 1e6;
+}
+
+function benchLRU() {
+  const cache = new ToolCache({ maxSize: CACHE_SIZE });
+  for (let i = 0; i < CACHE_SIZE; i++) {
+    cache.set(`k${i}`, { id: i }, undefined, { tool: "t" });
+  }
+  const start = process.hrtime.bigint();
+  for (let i = 0; i < OPERATIONS; i++) {
+    cache.set(`n${i}`, { id: i }, undefined, { tool: "t" });
+  }
+  const ms = Number(process.hrtime.bigint() - start) / 1e6;
+  cache.destroy();
+  return ms;
+}
+
+// 只量測緩存本身，不輸出 debug 日誌
+logger.setLogLevel("error");
+
+console.log(`緩存容量 ${CACHE_SIZE}，寫入 ${OPERATIONS} 個新項目\n`);
+for (const [label, run] of [
+  ["原本（掃描驅逐）", benchLegacy],
+  ["LRU（雙向串列）", benchLRU],
+]) {
+  const ms = run();
+  console.log(
+    `${label.padEnd(20)} ${ms.toFixed(1).padStart(10)} ms  ${((ms * 1000) / OPERATIONS).toFixed(2)} µs/次`,
+  );
+}
+process.exit(0);
@@ -0,0 +1,66 @@
+// BaseTool.execute 額外開銷測試
+// 以不做任何事的工具連續執行，量測每次呼叫在日誌、統計與執行歷史上的固定成本
+//
+// 使用方式：
+//   node scripts/benchmark-tool-overhead.js
+//   BENCH_CALLS=100000 node scripts/benchmark-tool-overhead.js
+import { BaseTool } from "../src/tools/base-tool.js";
+import logger from "../src/config/logger.js";
+
+// 遙測佇列不存在時（舊版）只量測同步寫入
+const { globalToolTelemetry } = await import("../src/tools/telemetry.js").catch(
+  () => ({}),
+);
+
+const CALLS = parseInt(process.env.BENCH_CALLS) || 20000;
+const WARMUP = 1000;
+
+class NoopTool extends BaseTool {
+  constructor(options) {
+    super(
+      "benchmark_noop",
+      "效能測試用的空工具",
+      {
+        type: "object",
+        properties: { value: { type: "string" } },
+      },
+      { cacheable: false, ...options },
+    );
+  }
+
+  async _execute() {
+    return { ok: true };
+  }
+}
+
+// 每 100 次呼叫讓出一次事件迴圈，模擬實際請求之間的 I/O 間隔，讓背景工作有機會執行
+async function run(tool, calls) {
+  let criticalPath = 0n;
+  const start = process.hrtime.bigint();
+  for (let i = 0; i < calls; i++) {
+    const callStart = process.hrtime.bigint();
+    await tool.execute({ value: "x" }, { sessionId: "bench", userId: "bench" });
+    criticalPath += process.hrtime.bigint() - callStart;
+    if (i % 100 === 99) await new Promise(resolve => setImmediate(resolve));
+  }
+  // 包含背景寫入的總成本
+  await globalToolTelemetry?.flush();
+  await logger.flush();
+  return {
+    latency: Number(criticalPath) / 1e3 / calls,
+    total: Number(process.hrtime.bigint() - start) / 1e3 / calls,
+  };
+}
+
+const tool = new NoopTool();
+await run(tool, WARMUP);
+const { latency, total } = await run(tool, CALLS);
+console.log(`no-op 工具 ${CALLS} 次`);
+console.log(`  execute 延遲      每次 ${latency.toFixed(2)} µs`);
+console.log(`  含背景寫入總成本  每次 ${total.toFixed(2)} µs`);
+if (globalToolTelemetry) {
+  console.log(`  遙測佇列: ${JSON.stringify(globalToolTelemetry.getStats())}`);
+}
+
+await logger.close();
+process.exit(0);
@@ -0,0 +1,32 @@
+// 工具參數驗證效能測試
+// 以實際工具的 inputSchema 重複呼叫 BaseTool.prototype.validateInput，量測每次驗證的成本
+//
+// 使用方式：
+//   node scripts/benchmark-validation.js
+//   BENCH_CALLS=1000000 node scripts/benchmark-validation.js
+import { BaseTool } from "../src/tools/base-tool.js";
+import { GetMILListTool } from "../src/tools/mil/get-mil-list.js";
+import { SearchEmployeesTool } from "../src/tools/hr/search-employees.js";
+
+const CALLS = parseInt(process.env.BENCH_CALLS) || 200000;
+
+const cases = [
+  [
+    new GetMILListTool(),
+    { status: "OnGoing", importance: "H", delayDayMin: 5, page: 1, limit: 20 },
+  ],
+  [new SearchEmployeesTool(), { name: "王", department: "IT", limit: 10 }],
+];
+
+for (const [tool, params] of cases) {
+  // 只量測 BaseTool 的 schema 驗證，略過子類別額外的業務規則
+  const validate = () => BaseTool.prototype.validateInput.call(tool, params);
+  validate();
+
+  for (let i = 0; i < 10000; i++) validate();
+  const start = process.hrtime.bigint();
+  for (let i = 0; i < CALLS; i++) validate();
+  const ns = Number(process.hrtime.bigint() - start) / CALLS;
+  console.log(`${tool.name.padEnd(24)} ${ns.toFixed(0).padStart(8)} ns/次`);
+}
+process.exit(0);
@@ -0,0 +1,89 @@
+// 統計計算對事件迴圈的影響
+// 同時送出多個 parse_csv_ttest 類型的計算（CSV 解析 + 描述性統計），期間每 5ms 模擬一次
+// HR 快照查詢（記憶體查表），比較在主執行緒執行（WORKER_POOL_SIZE=0）與交給 worker 池時：
+//   - 查詢的延遲分位數（事件迴圈被阻塞的時間）
+//   - 全部計算完成的時間
+//
+// 使用方式：
+//   node scripts/benchmark-worker-pool.js
+//   BENCH_ROWS=500000 BENCH_JOBS=8 BENCH_POOL_SIZE=4 node scripts/benchmark-worker-pool.js
+import { WorkerPool } from "../src/tools/worker-pool.js";
+import { getColumn } from "../src/services/stat/csv-parser.js";
+
+const ROWS = parseInt(process.env.BENCH_ROWS) || 200000;
+const JOBS = parseInt(process.env.BENCH_JOBS) || 8;
+const POOL_SIZE = parseInt(process.env.BENCH_POOL_SIZE) || 4;
+const PROBE_INTERVAL = 5;
+
+function generateCSV(rows) {
+  const lines = ["patient_id,before,after,group"];
+  for (let i = 0; i < rows; i++) {
+    const before = 120 + ((i * 37) % 40);
+    lines.push(`P${i},${before},${before - (i % 15)},${i % 3}`);
+  }
+  return lines.join("\n");
+}
+
+// 模擬 HR 快照查詢：以員工編號查 Map
+const directory = new Map(
+  Array.from({ length: 5000 }, (_, i) => [`E${i}`, { id: `E${i}` }]),
+);
+
+async function runScenario(label, pool, csvData) {
+  // 每次查詢的延遲 = 與上次查詢的間隔超出 PROBE_INTERVAL 的部分
+  const lags = [];
+  let lookups = 0;
+  let last = Date.now();
+  const recordLag = () => {
+    const now = Date.now();
+    lags.push(Math.max(0, now - last - PROBE_INTERVAL));
+    last = now;
+  };
+  const probe = setInterval(() => {
+    recordLag();
+    directory.get(`E${lookups++ % 5000}`);
+  }, PROBE_INTERVAL);
+
+  const startTime = Date.now();
+  await Promise.all(
+    Array.from({ length: JOBS }, async () => {
+      // 與 parse_csv_ttest 相同：解析後提取兩欄，再計算描述性統計
+      const parsed = await pool.run("parseCSV", { csvData });
+      const groups = ["before", "after"].map(
+        name => getColumn(parsed, name).values,
+      );
+      await pool.run(
+        "describeGroups",
+        { groups },
+        { transfer: groups.map(group => group.buffer) },
+      );
+    }),
+  );
+  const elapsed = Date.now() - startTime;
+  clearInterval(probe);
+  recordLag();
+
+  lags.sort((a, b) => a - b);
+  const at = q => lags[Math.floor((lags.length - 1) * q)] ?? 0;
+  console.log(
+    `${label.padEnd(20)} 完成 ${String(elapsed).padStart(6)} ms  ` +
+      `HR 查詢 ${String(lags.length).padStart(5)} 次  ` +
+      `延遲 p50 ${String(at(0.5)).padStart(4)} ms  ` +
+      `p99 ${String(at(0.99)).padStart(5)} ms  ` +
+      `max ${String(at(1)).padStart(5)} ms`,
+  );
+}
+
+const csvData = generateCSV(ROWS);
+console.log(
+  `${JOBS} 個計算，各 ${ROWS} 筆 CSV（${(csvData.length / 1e6).toFixed(1)} MB）`,
+);
+
+const inline = new WorkerPool({ size: 0 });
+await runScenario("主執行緒", inline, csvData);
+
+const pool = new WorkerPool({ size: POOL_SIZE, maxQueue: JOBS * 2 });
+await pool.run("describeGroups", { groups: [] }); // 暖機：啟動第一個 worker
+await runScenario(`worker 池 x${POOL_SIZE}`, pool, csvData);
+console.log("池狀態", pool.getStats());
+await pool.destroy();
@@ -0,0 +1,74 @@
+-- MIL 全文檢索索引（ngram）
+--
+-- v_mil_kd 為檢視表，無法直接建立 FULLTEXT 索引，
+-- 因此建立 mil_text_search 作為文字欄位的搜尋副本，以 ngram parser 支援中文子字串搜尋。
+-- MILService 會檢查 information_schema 中是否存在 FULLTEXT 索引，不存在時自動退回 LIKE 查詢。
+--
+-- 副本由下方排程每 5 分鐘同步一次（新增、修改，並刪除來源已不存在的列），
+-- 因此全文檢索的結果最多落後一個同步週期：期間新增或修改的 MIL 可能查不到或以舊內容比對。
+-- 查詢結果一律再 JOIN v_mil_kd，回傳的欄位與狀態篩選仍是即時資料。
+-- 列表篩選（get_mil_list）預設使用 LIKE（MIL_LIST_TEXT_SEARCH_MODE=like），不受副本落後影響；
+-- 關鍵字搜尋（search_mil）預設 MIL_TEXT_SEARCH_MODE=auto。
+--
+-- 需求：MySQL 5.7.6+（內建 ngram parser），建議 ngram_token_size = 2（預設值）
+-- 執行：mysql -h <host> -u <user> -p <mil_db> < scripts/migrations/001-mil-text-search-ngram.sql
+
+CREATE TABLE IF NOT EXISTS mil_text_search (
+  SerialNumber VARCHAR(50) NOT NULL PRIMARY KEY,
+  Proposer_Name VARCHAR(100) NULL,
+  DRI_EmpName VARCHAR(100) NULL,
+  Location VARCHAR(200) NULL,
+  IssueDiscription TEXT NULL,
+  Solution TEXT NULL,
+  Remark TEXT NULL,
+  synced_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  FULLTEXT KEY ft_serial (SerialNumber) WITH PARSER ngram,
+  FULLTEXT KEY ft_proposer (Proposer_Name) WITH PARSER ngram,
+  FULLTEXT KEY ft_dri (DRI_EmpName) WITH PARSER ngram,
+  FULLTEXT KEY ft_location (Location) WITH PARSER ngram,
+  FULLTEXT KEY ft_description (IssueDiscription, Solution, Remark) WITH PARSER ngram,
+  FULLTEXT KEY ft_all (SerialNumber, Proposer_Name, DRI_EmpName, Location, IssueDiscription, Solution, Remark) WITH PARSER ngram
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- 初次載入 / 重新同步
+INSERT INTO mil_text_search
+  (SerialNumber, Proposer_Name, DRI_EmpName, Location, IssueDiscription, Solution, Remark)
+SELECT SerialNumber, Proposer_Name, DRI_EmpName, Location, IssueDiscription, Solution, Remark
+FROM v_mil_kd
+ON DUPLICATE KEY UPDATE
+  Proposer_Name = VALUES(Proposer_Name),
+  DRI_EmpName = VALUES(DRI_EmpName),
+  Location = VALUES(Location),
+  IssueDiscription = VALUES(IssueDiscription),
+  Solution = VALUES(Solution),
+  Remark = VALUES(Remark);
+
+DELETE s FROM mil_text_search s
+LEFT JOIN v_mil_kd v ON v.SerialNumber = s.SerialNumber
+WHERE v.SerialNumber IS NULL;
+
+-- 定期同步（需啟用 event_scheduler；未啟用時可改由排程執行上方 INSERT 與 DELETE）
+DROP EVENT IF EXISTS ev_mil_text_search_sync;
+DELIMITER $$
+CREATE EVENT ev_mil_text_search_sync
+  ON SCHEDULE EVERY 5 MINUTE
+  DO
+  BEGIN
+    INSERT INTO mil_text_search
+      (SerialNumber, Proposer_Name, DRI_EmpName, Location, IssueDiscription, Solution, Remark)
+    SELECT SerialNumber, Proposer_Name, DRI_EmpName, Location, IssueDiscription, Solution, Remark
+    FROM v_mil_kd
+    ON DUPLICATE KEY UPDATE
+      Proposer_Name = VALUES(Proposer_Name),
+      DRI_EmpName = VALUES(DRI_EmpName),
+      Location = VALUES(Location),
+      IssueDiscription = VALUES(IssueDiscription),
+      Solution = VALUES(Solution),
+      Remark = VALUES(Remark);
+
+    -- 來源已刪除的 MIL 也從副本移除
+    DELETE s FROM mil_text_search s
+    LEFT JOIN v_mil_kd v ON v.SerialNumber = s.SerialNumber
+    WHERE v.SerialNumber IS NULL;
+  END$$
+DELIMITER ;
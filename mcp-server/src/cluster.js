@@ -0,0 +1,112 @@
+/**
+ * Cluster 模式啟動器
+ *
+ * 以 node:cluster 啟動多個 worker 執行 server.js，共用同一個端口，
+ * 讓大型 MIL 清單的 JSON 序列化、統計工具的報告組字與日誌寫入分散到多個核心。
+ * primary 不處理請求，只負責：
+ * - 轉送 worker 之間的訊息（clusterBus：SSE 事件轉送、/api/tools/stats 合併）
+ * - worker 異常結束時重新啟動
+ * - 協調共用日誌檔的輪轉（見 config/log-rotation.js）
+ * - 收到 SIGTERM / SIGINT 時通知所有 worker 優雅關閉，逾時仍未結束則強制終止
+ *
+ * 使用方式：
+ *   npm run start:cluster
+ *   CLUSTER_WORKERS=4 node src/cluster.js
+ * 建議同時設定 TOOL_CACHE_L2=sqlite，讓各 worker 共用工具緩存。
+ */
+
+import cluster from "cluster";
+import os from "os";
+import path from "path";
+import { fileURLToPath } from "url";
+import config from "./config/config.js";
+import logger from "./config/logger.js";
+import { CLUSTER_WORKER_ENV } from "./config/log-rotation.js";
+import {
+  attachClusterPrimary,
+  requestWorkerShutdown,
+} from "./services/cluster-bus.js";
+
+const __dirname = path.dirname(fileURLToPath(import.meta.url));
+
+// 短時間內連續異常結束時延後重啟，避免啟動失敗的 worker 不斷重啟
+const RESTART_DELAY = 1000;
+const CRASH_LOOP_WINDOW = 10000;
+
+const workerCount =
+  config.clusterWorkers ||
+  (os.availableParallelism ? os.availableParallelism() : os.cpus().length);
+
+let shuttingDown = false;
+const startedAt = new Map(); // worker id -> 啟動時間
+
+function log(message) {
+  console.log(`[cluster ${process.pid}] ${message}`);
+}
+
+function fork() {
+  const worker = cluster.fork({ [CLUSTER_WORKER_ENV]: "1" });
+  startedAt.set(worker.id, Date.now());
+  return worker;
+}
+
+cluster.setupPrimary({ exec: path.join(__dirname, "server.js") });
+attachClusterPrimary(cluster);
+logger.attachClusterPrimary(cluster);
+
+cluster.on("online", worker => {
+  log(`worker ${worker.id} (pid ${worker.process.pid}) 已啟動`);
+});
+
+cluster.on("exit", (worker, code, signal) => {
+  const uptime = Date.now() - startedAt.get(worker.id);
+  startedAt.delete(worker.id);
+
+  if (shuttingDown) {
+    log(`worker ${worker.id} 已結束`);
+    if (Object.keys(cluster.workers).length === 0) {
+      log("所有 worker 已結束");
+      process.exit(0);
+    }
+    return;
+  }
+
+  const delay = uptime < CRASH_LOOP_WINDOW ? RESTART_DELAY * 5 : RESTART_DELAY;
+  log(
+    `worker ${worker.id} 異常結束（code ${code}, signal ${signal}），` +
+      `${delay} ms 後重新啟動`,
+  );
+  setTimeout(() => {
+    if (!shuttingDown) fork();
+  }, delay);
+});
+
+function shutdown(signal) {
+  if (shuttingDown) return;
+  shuttingDown = true;
+  const workers = Object.values(cluster.workers);
+  log(`收到 ${signal}，通知 ${workers.length} 個 worker 關閉`);
+
+  if (workers.length === 0) process.exit(0);
+  workers.forEach(requestWorkerShutdown);
+
+  // worker 自己的關閉流程最多等待 shutdownTimeout，這裡多留時間寫出日誌
+  setTimeout(() => {
+    for (const worker of Object.values(cluster.workers)) {
+      log(`worker ${worker.id} 未在時限內結束，強制終止`);
+      worker.process.kill("SIGKILL");
+    }
+    process.exit(1);
+  }, config.shutdownTimeout + 5000).unref();
+}
+
+process.on("SIGTERM", () => shutdown("SIGTERM"));
+process.on("SIGINT", () => shutdown("SIGINT"));
+
+log(`啟動 ${workerCount} 個 worker，端口 ${config.port}`);
+if (!config.toolCacheL2) {
+  log("未設定 TOOL_CACHE_L2，各 worker 的工具緩存不共用");
+}
+for (let i = 0; i < workerCount; i++) {
+  fork();
+}
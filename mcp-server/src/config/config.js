@@ -3,11 +3,25 @@ import dbConfig from "./db-config.js";
 // 載入環境變數
 dotenv.config();
 
+/**
+ * 讀取整數環境變數；未設定、空字串、非數字或小於 min 時使用預設值
+ * （避免 parseInt("") 的 NaN 讓池大小、間隔等比較永遠不成立）
+ */
+export function intEnv(name, defaultValue, { min = -Infinity } = {}) {
+  const value = Number.parseInt(process.env[name], 10);
+  return Number.isFinite(value) && value >= min ? value : defaultValue;
+}
+
 const config = {
   // 服務器配置
   port: process.env.MCP_PORT || 8080,
   nodeEnv: process.env.NODE_ENV || "development",
 
+  // Cluster 模式（npm run start:cluster）：worker 數量，0 為 CPU 核心數
+  clusterWorkers: intEnv("CLUSTER_WORKERS", 0, { min: 0 }),
+  // 優雅關閉時等待進行中請求完成的上限（毫秒），超過後強制關閉連線
+  shutdownTimeout: intEnv("SHUTDOWN_TIMEOUT", 10000, { min: 1 }),
+
   // API 配置 (TODO: 待確認是否需要)
   mainSystemUrl:
     process.env.MAIN_SYSTEM_URL || "http://10.8.38.110:3000/api/mcp",
@@ -16,10 +30,90 @@ const config = {
   // 日誌配置
   logLevel: process.env.LOG_LEVEL || "info",
   loggingEnabled: process.env.LOGGING_ENABLED === "true",
+  // 檔案與 SQLite 日誌的批次寫出：間隔 0 為下一輪事件迴圈即寫出
+  logFlushInterval: intEnv("LOG_FLUSH_INTERVAL", 200, { min: 0 }),
+  logBatchSize: intEnv("LOG_BATCH_SIZE", 256, { min: 1 }),
+  logMaxQueue: intEnv("LOG_MAX_QUEUE", 10000, { min: 1 }),
+  // 日誌資料庫保留天數：0 為只保留當日分區 / 當前小時的彙總
+  logRetentionDays: intEnv("LOG_RETENTION_DAYS", 30, { min: 0 }),
+  logRollupRetentionDays: intEnv("LOG_ROLLUP_RETENTION_DAYS", 180, { min: 0 }),
 
   // 開發配置
   debug: process.env.DEBUG === "true",
 
+  // MIL 文字篩選模式：auto（有 FULLTEXT 索引時使用）、fulltext、like
+  // 全文檢索查的是 mil_text_search 副本，同步週期內的新增與修改查不到
+  // 關鍵字搜尋（search_mil）預設 auto；列表篩選（get_mil_list）需與資料表一致，預設 like
+  milTextSearchMode: process.env.MIL_TEXT_SEARCH_MODE || "auto",
+  milListTextSearchMode: process.env.MIL_LIST_TEXT_SEARCH_MODE || "like",
+
+  // MIL 彙總快取：預設可接受的陳舊秒數與背景檢查水位間隔（毫秒，0 為停用）
+  milAggregateMaxStaleness: intEnv("MIL_AGGREGATE_MAX_STALENESS", 60, {
+    min: 1,
+  }),
+  milAggregateRefreshInterval: intEnv("MIL_AGGREGATE_REFRESH_INTERVAL", 60000, {
+    min: 0,
+  }),
+  // v_mil_kd 的異動時間欄位：存在時水位只查 COUNT(*) 與 MAX(欄位)，否則以 CRC32 指紋比對
+  milUpdatedAtColumn: process.env.MIL_UPDATED_AT_COLUMN || "updated_at",
+
+  // HR 查詢路徑：snapshot（記憶體快照，未就緒時自動使用 SQL）或 sql
+  hrQueryPath: process.env.HR_QUERY_PATH || "snapshot",
+  hrDirectoryRefreshInterval: intEnv(
+    "HR_DIRECTORY_REFRESH_INTERVAL",
+    5 * 60 * 1000,
+    { min: 0 },
+  ),
+
+  // 工具使用統計：是否保留原始事件供明細查詢（彙總統計不受影響）
+  toolStatsRawEvents: process.env.TOOL_STATS_RAW_EVENTS !== "false",
+
+  // 工具結果緩存：項目數上限、估算位元組上限（支援 kb/mb 單位）與各工具配額
+  // TOOL_CACHE_TOOL_QUOTAS 格式為 "get-mil-list=16mb,get-mil-details=4mb"
+  toolCacheMaxEntries: intEnv("TOOL_CACHE_MAX_ENTRIES", 1000, { min: 1 }),
+  toolCacheMaxBytes: process.env.TOOL_CACHE_MAX_BYTES || "64mb",
+  toolCacheToolQuotas: process.env.TOOL_CACHE_TOOL_QUOTAS || "",
+  // 資料異動輪詢間隔（毫秒，0 為停用）：偵測到 MIL 資料變更時清除 "mil:*" 標籤的緩存
+  toolCacheInvalidationInterval: intEnv(
+    "TOOL_CACHE_INVALIDATION_INTERVAL",
+    30000,
+    { min: 0 },
+  ),
+  // 共用 L2 緩存（多個 worker / 副本共用）：TOOL_CACHE_L2=sqlite 啟用
+  // 檔案預設與日誌資料庫同目錄的 tool-cache.db；超過壓縮門檻的值以 gzip 儲存
+  toolCacheL2: process.env.TOOL_CACHE_L2 || "",
+  toolCacheL2Path: process.env.TOOL_CACHE_L2_PATH || "",
+  toolCacheL2CompressThreshold:
+    process.env.TOOL_CACHE_L2_COMPRESS_THRESHOLD || "4kb",
+  // 讀取其他行程失效記錄的間隔（毫秒）
+  toolCacheL2PollInterval: intEnv("TOOL_CACHE_L2_POLL_INTERVAL", 2000, {
+    min: 0,
+  }),
+
+  // CPU 密集工具計算（統計描述、CSV 解析）的 worker thread 池
+  // 大小 -1 為依 CPU 核心數決定（最多 4），0 為在主執行緒執行；佇列滿時新任務立即失敗
+  workerPoolSize: intEnv("WORKER_POOL_SIZE", -1, { min: -1 }),
+  workerPoolMaxQueue: intEnv("WORKER_POOL_MAX_QUEUE", 64, { min: 1 }),
+  workerPoolTaskTimeout: intEnv("WORKER_POOL_TASK_TIMEOUT", 60000, { min: 1 }),
+
+  // 統計計算服務（sfda_stat /api/v1，本機可用 python -m stat_backend 啟動）
+  statApiUrl: process.env.STAT_API_URL || "http://localhost:8000/api/v1",
+
+  // 統計資料上傳（POST /api/stat/datasets）：單次上傳大小上限、解析後資料集的暫存上限與閒置保留時間（毫秒）
+  statUploadMaxBytes: process.env.STAT_UPLOAD_MAX_BYTES || "200mb",
+  statDatasetMaxBytes: process.env.STAT_DATASET_MAX_BYTES || "512mb",
+  statDatasetTTL: intEnv("STAT_DATASET_TTL", 30 * 60 * 1000, { min: 1 }),
+
+  // 工具遙測：strict 時 execute 會等待日誌與統計寫入完成（測試環境預設啟用）
+  toolTelemetryStrict:
+    process.env.TOOL_TELEMETRY_STRICT === "true" ||
+    (process.env.NODE_ENV === "test" &&
+      process.env.TOOL_TELEMETRY_STRICT !== "false"),
+
+  // 請求追蹤：啟用後 span 以 JSONL 寫入 traceFile（預設 src/logs/traces.jsonl）
+  tracingEnabled: process.env.TRACING_ENABLED === "true",
+  traceFile: process.env.TRACE_FILE || null,
+
   // 資料庫配置
   dbConfig: dbConfig,
 
@@ -0,0 +1,443 @@
+/**
+ * 日誌檔案讀取與時間索引
+ *
+ * - tailLines：從檔案尾端往前分塊讀取，只讀到需要的行數
+ * - 時間索引：每個日誌檔旁有一個 <檔名>.idx，每隔 interval 位元組記錄一次
+ *   「該位置之後第一行的起始位移與時間戳」。建立索引只需在檢查點位置讀取一小段，
+ *   不必掃描整個檔案；檔案成長後只補上新的檢查點
+ * - searchLogs：以索引跳到時間範圍的起點，逐行比對並在達到上限時停止，
+ *   時間範圍可跨越已輪轉的日誌檔
+ *
+ * 日誌行為 JSON，timestamp 為 toISOString() 的 UTC 時間，可直接以字串比較先後。
+ */
+
+import fs from "fs";
+import path from "path";
+
+const NEWLINE = 0x0a;
+const TIMESTAMP_KEY = Buffer.from('"timestamp":"');
+const TIMESTAMP_LENGTH = 24; // 2025-01-01T00:00:00.000Z
+const DEFAULT_CHUNK_SIZE = 64 * 1024;
+const DEFAULT_INDEX_INTERVAL = 1024 * 1024;
+const PROBE_SIZE = 16 * 1024;
+const INDEX_VERSION = 1;
+
+/**
+ * 取得日誌檔的索引檔路徑
+ */
+export function indexPathFor(filePath) {
+  return `${filePath}.idx`;
+}
+
+/**
+ * 解析 JSON 日誌行（無法解析時保留原始內容）
+ */
+export function parseLogLine(line) {
+  try {
+    return JSON.parse(line);
+  } catch {
+    return { raw: line, timestamp: new Date().toISOString() };
+  }
+}
+
+/**
+ * 取得一行的 timestamp 字串（找不到時返回 null）
+ */
+function readTimestamp(buffer, start, end) {
+  const keyPos = buffer.subarray(start, end).indexOf(TIMESTAMP_KEY);
+  if (keyPos === -1) return null;
+  const tsStart = start + keyPos + TIMESTAMP_KEY.length;
+  if (tsStart + TIMESTAMP_LENGTH > end) return null;
+  return buffer.toString("latin1", tsStart, tsStart + TIMESTAMP_LENGTH);
+}
+
+function toISOTime(value) {
+  if (!value) return null;
+  const time = new Date(value);
+  if (isNaN(time.getTime())) {
+    throw new Error(`無效的時間: ${value}`);
+  }
+  return time.toISOString();
+}
+
+/**
+ * 從檔案尾端往前逐行讀取
+ * @param {Function} onLine - (buffer, start, end) => boolean，返回 false 時停止
+ */
+async function scanBackward(filePath, onLine, { chunkSize = DEFAULT_CHUNK_SIZE } = {}) {
+  const handle = await fs.promises.open(filePath, "r");
+  try {
+    const { size } = await handle.stat();
+    let position = size;
+    let remainder = null;
+
+    while (position > 0) {
+      const length = Math.min(chunkSize, position);
+      position -= length;
+      const chunk = Buffer.allocUnsafe(length);
+      await handle.read(chunk, 0, length, position);
+
+      const buffer = remainder ? Buffer.concat([chunk, remainder]) : chunk;
+      let end = buffer.length;
+      let index;
+      while (end > 0 && (index = buffer.lastIndexOf(NEWLINE, end - 1)) !== -1) {
+        if (end - index > 1 && onLine(buffer, index + 1, end) === false) return;
+        end = index;
+      }
+      // 尚未遇到換行的部分屬於更前面的行
+      remainder = end > 0 ? buffer.subarray(0, end) : null;
+    }
+
+    if (remainder) onLine(remainder, 0, remainder.length);
+  } finally {
+    await handle.close();
+  }
+}
+
+/**
+ * 從指定位移往後逐行讀取（不含檔案結尾未寫完的行）
+ * @param {Function} onLine - (buffer, start, end, offset) => boolean，返回 false 時停止
+ */
+async function scanForward(
+  filePath,
+  onLine,
+  { start = 0, end = Infinity, chunkSize = DEFAULT_CHUNK_SIZE } = {},
+) {
+  const handle = await fs.promises.open(filePath, "r");
+  let scanned = 0;
+  try {
+    const { size } = await handle.stat();
+    const limit = Math.min(end, size);
+    let position = start;
+    let remainder = null;
+
+    while (position < limit) {
+      const length = Math.min(chunkSize, limit - position);
+      const chunk = Buffer.allocUnsafe(length);
+      const { bytesRead } = await handle.read(chunk, 0, length, position);
+      if (bytesRead === 0) break;
+
+      const data = chunk.subarray(0, bytesRead);
+      const buffer = remainder ? Buffer.concat([remainder, data]) : data;
+      const bufferOffset = position - (remainder ? remainder.length : 0);
+      position += bytesRead;
+      scanned += bytesRead;
+
+      let lineStart = 0;
+      let index;
+      while ((index = buffer.indexOf(NEWLINE, lineStart)) !== -1) {
+        if (
+          index > lineStart &&
+          onLine(buffer, lineStart, index, bufferOffset + lineStart) === false
+        ) {
+          return scanned;
+        }
+        lineStart = index + 1;
+      }
+      remainder = lineStart < buffer.length ? buffer.subarray(lineStart) : null;
+    }
+    return scanned;
+  } finally {
+    await handle.close();
+  }
+}
+
+/**
+ * 讀取檔案最後 count 行
+ * @returns {Promise<string[]>} 依時間先後排列
+ */
+export async function tailLines(filePath, count, options = {}) {
+  const lines = [];
+  if (count <= 0) return lines;
+
+  await scanBackward(
+    filePath,
+    (buffer, start, end) => {
+      const line = buffer.toString("utf8", start, end);
+      if (line.trim()) lines.push(line);
+      return lines.length < count;
+    },
+    options,
+  );
+  return lines.reverse();
+}
+
+/**
+ * 在 offset 附近找到下一行的起始位置與時間戳
+ * @returns {Promise<[number, string]|null>}
+ */
+async function probeCheckpoint(handle, offset, size) {
+  const buffer = Buffer.allocUnsafe(PROBE_SIZE);
+  let position = offset;
+  // offset 為 0 時本身就是行首，否則先跳到下一個換行之後
+  let atLineStart = offset === 0;
+
+  while (position < size) {
+    const { bytesRead } = await handle.read(buffer, 0, PROBE_SIZE, position);
+    if (bytesRead === 0) return null;
+    const data = buffer.subarray(0, bytesRead);
+
+    let lineStart = 0;
+    if (!atLineStart) {
+      const newline = data.indexOf(NEWLINE);
+      if (newline === -1) {
+        position += bytesRead;
+        continue;
+      }
+      lineStart = newline + 1;
+      atLineStart = true;
+    }
+
+    let lineEnd;
+    while ((lineEnd = data.indexOf(NEWLINE, lineStart)) !== -1) {
+      const timestamp = readTimestamp(data, lineStart, lineEnd);
+      if (timestamp) return [position + lineStart, timestamp];
+      lineStart = lineEnd + 1;
+    }
+
+    if (lineStart === 0) {
+      // 單行超過探測大小，跳過此行
+      atLineStart = false;
+      position += bytesRead;
+    } else {
+      // 從未讀完整的行起點重新讀取
+      position += lineStart;
+    }
+  }
+  return null;
+}
+
+/**
+ * 讀取索引檔（不存在或格式不符時返回 null）
+ */
+function loadIndex(filePath) {
+  try {
+    const index = JSON.parse(fs.readFileSync(indexPathFor(filePath), "utf8"));
+    return index.version === INDEX_VERSION ? index : null;
+  } catch {
+    return null;
+  }
+}
+
+/**
+ * 建立或更新日誌檔的時間索引
+ * 檔案成長時只補上新的檢查點；檔案被截斷或換成新檔時重新建立
+ * @returns {Promise<Object>} { version, interval, size, entries: [[offset, timestamp]], lastTime }
+ */
+export async function updateLogIndex(filePath, { interval = DEFAULT_INDEX_INTERVAL } = {}) {
+  const handle = await fs.promises.open(filePath, "r");
+  try {
+    const { size } = await handle.stat();
+    let index = loadIndex(filePath);
+
+    if (index && (index.size > size || index.interval !== interval)) {
+      index = null;
+    }
+    if (index && index.entries.length > 0) {
+      const first = await probeCheckpoint(handle, 0, size);
+      if (!first || first[1] !== index.entries[0][1]) index = null;
+    }
+    if (index && index.size === size) return index;
+
+    if (!index) {
+      index = { version: INDEX_VERSION, interval, size: 0, entries: [], lastTime: null };
+    }
+
+    const entries = index.entries;
+    let next = entries.length > 0 ? entries[entries.length - 1][0] + interval : 0;
+    while (next < size) {
+      const checkpoint = await probeCheckpoint(handle, next, size);
+      if (!checkpoint) break;
+      if (entries.length === 0 || checkpoint[0] > entries[entries.length - 1][0]) {
+        entries.push(checkpoint);
+      }
+      next = Math.max(checkpoint[0], next) + interval;
+    }
+
+    index.size = size;
+    index.lastTime = null;
+    await scanBackward(filePath, (buffer, start, end) => {
+      index.lastTime = readTimestamp(buffer, start, end);
+      return index.lastTime === null;
+    });
+
+    try {
+      await fs.promises.writeFile(indexPathFor(filePath), JSON.stringify(index));
+    } catch (error) {
+      console.error(`寫入日誌索引失敗 (${filePath}):`, error.message);
+    }
+    return index;
+  } finally {
+    await handle.close();
+  }
+}
+
+/**
+ * 以索引換算時間範圍對應的檔案位移範圍
+ * @returns {{start: number, end: number}}
+ */
+export function resolveOffsets(index, startTime, endTime) {
+  const { entries } = index;
+  let start = 0;
+  let end = index.size;
+
+  if (startTime) {
+    // 最後一個時間早於 startTime 的檢查點
+    let low = 0;
+    let high = entries.length - 1;
+    while (low <= high) {
+      const mid = (low + high) >> 1;
+      if (entries[mid][1] < startTime) {
+        start = entries[mid][0];
+        low = mid + 1;
+      } else {
+        high = mid - 1;
+      }
+    }
+  }
+
+  if (endTime) {
+    // 第一個時間晚於 endTime 的檢查點
+    let low = 0;
+    let high = entries.length - 1;
+    while (low <= high) {
+      const mid = (low + high) >> 1;
+      if (entries[mid][1] > endTime) {
+        end = entries[mid][0];
+        high = mid - 1;
+      } else {
+        low = mid + 1;
+      }
+    }
+  }
+
+  return { start, end: Math.max(start, end) };
+}
+
+/**
+ * 列出日誌檔及其已輪轉的檔案（依時間先後排列，目前的檔案在最後）
+ */
+export function listLogSegments(filePath) {
+  const dir = path.dirname(filePath);
+  const baseName = path.basename(filePath, ".log");
+
+  let rotated = [];
+  try {
+    rotated = fs
+      .readdirSync(dir)
+      .filter(
+        file =>
+          file.startsWith(`${baseName}.`) &&
+          file.endsWith(".log") &&
+          file !== path.basename(filePath),
+      )
+      .sort()
+      .map(file => path.join(dir, file));
+  } catch {
+    return [];
+  }
+
+  return fs.existsSync(filePath) ? [...rotated, filePath] : rotated;
+}
+
+/**
+ * 搜尋日誌
+ *
+ * 指定時間範圍時以索引定位並由舊到新比對（可跨輪轉檔）；
+ * 否則只從目前檔案尾端往前比對最近 maxLines 行，結果仍依時間先後排列。
+ *
+ * @param {string} filePath - 目前的日誌檔
+ * @param {Object} options
+ * @param {string} options.query - 子字串
+ * @param {string} options.startTime / options.endTime - 時間範圍（可省略其一）
+ * @param {number} options.limit - 最多返回筆數
+ * @param {number} options.maxLines - 未指定時間範圍時往前搜尋的行數
+ * @param {Function} options.onMatch - 每筆符合的日誌（字串）立即呼叫，返回 false 時停止
+ * @returns {Promise<Object>} { matches, truncated, searchedLines, scannedBytes, segments }
+ */
+export async function searchLogs(filePath, options = {}) {
+  const { query = "", limit = 100, maxLines = 1000, onMatch = null } = options;
+  const startTime = toISOTime(options.startTime);
+  const endTime = toISOTime(options.endTime);
+  const needle = Buffer.from(query);
+
+  const result = {
+    matches: [],
+    truncated: false,
+    searchedLines: 0,
+    scannedBytes: 0,
+    segments: 0,
+  };
+
+  // 輸出一筆符合的日誌，返回 false 表示應停止搜尋
+  let count = 0;
+  const emit = line => {
+    count++;
+    if (onMatch) {
+      if (onMatch(line) === false) return false;
+    } else {
+      result.matches.push(line);
+    }
+    if (count >= limit) {
+      result.truncated = true;
+      return false;
+    }
+    return true;
+  };
+
+  if (!startTime && !endTime) {
+    if (!fs.existsSync(filePath)) return result;
+    const found = [];
+    result.segments = 1;
+    await scanBackward(filePath, (buffer, start, end) => {
+      result.searchedLines++;
+      result.scannedBytes += end - start + 1;
+      if (needle.length === 0 || buffer.subarray(start, end).indexOf(needle) !== -1) {
+        found.push(buffer.toString("utf8", start, end));
+        if (found.length >= limit) return false;
+      }
+      return result.searchedLines < maxLines;
+    });
+    for (let i = found.length - 1; i >= 0; i--) {
+      if (!emit(found[i])) break;
+    }
+    return result;
+  }
+
+  let stopped = false;
+  for (const segment of listLogSegments(filePath)) {
+    if (stopped) break;
+
+    let index;
+    try {
+      index = await updateLogIndex(segment);
+    } catch {
+      continue;
+    }
+    if (index.entries.length === 0) continue;
+    if (endTime && index.entries[0][1] > endTime) break;
+    if (startTime && index.lastTime && index.lastTime < startTime) continue;
+
+    const { start, end } = resolveOffsets(index, startTime, endTime);
+    result.segments++;
+    result.scannedBytes += await scanForward(
+      segment,
+      (buffer, lineStart, lineEnd) => {
+        result.searchedLines++;
+        if (needle.length > 0 && buffer.subarray(lineStart, lineEnd).indexOf(needle) === -1) {
+          return true;
+        }
+        const timestamp = readTimestamp(buffer, lineStart, lineEnd);
+        if (timestamp) {
+          if (startTime && timestamp < startTime) return true;
+          if (endTime && timestamp > endTime) return true;
+        }
+        stopped = !emit(buffer.toString("utf8", lineStart, lineEnd));
+        return !stopped;
+      },
+      { start, end },
+    );
+  }
+
+  return result;
+}
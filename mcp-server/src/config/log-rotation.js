@@ -0,0 +1,182 @@
+/**
+ * Cluster 模式的日誌輪轉協調
+ *
+ * 所有 worker 都附加寫入同一組日誌檔（combined.log 等）。若各 worker 依自己記錄的大小各自更名，
+ * 其他 worker 仍透過已開啟的 stream 寫入被更名的檔案，輪轉檔會破碎且時間交錯，
+ * listLogSegments 與 .idx 時間索引所依賴的「前一個檔案結束後才開始下一個檔案」就不成立。
+ *
+ * 因此只有 primary 執行輪轉：
+ * 1. worker 的檔案超過上限時送出 request（primary 也會定期檢查實際檔案大小）
+ * 2. primary 通知所有 worker pause：寫完進行中的批次並關閉該檔 stream，之後的日誌暫存在記憶體
+ * 3. 全部回覆 paused（或逾時）後，primary 更名檔案與索引並清理舊檔
+ * 4. primary 通知 resume：worker 開啟新檔，先寫出暫存的日誌
+ */
+
+import fs from "fs";
+
+export const LOG_ROTATION_CHANNEL = "mcp-log-rotation";
+// src/cluster.js 啟動 worker 時設定，表示 primary 會回應輪轉請求
+export const CLUSTER_WORKER_ENV = "MCP_CLUSTER_WORKER";
+
+/**
+ * worker 端：提出輪轉請求，並依 primary 的通知暫停或恢復寫檔
+ */
+export class LogRotationClient {
+  /**
+   * @param {Object} options
+   * @param {Object} options.channel - 與 primary 通訊的行程物件（預設為 process）
+   * @param {Object} options.sink - BufferedFileSink；未緩衝寫入時為 null（逐筆 append 不需暫停）
+   */
+  constructor(options = {}) {
+    this.channel = options.channel || process;
+    this.sink = options.sink || null;
+    this.requested = new Set();
+    this._onMessage = message => this.onMessage(message);
+    this.channel.on("message", this._onMessage);
+  }
+
+  /**
+   * 請求輪轉；同一個檔案在 primary 回覆 resume 前只送一次
+   */
+  request(file, size) {
+    if (this.requested.has(file)) return;
+    this.requested.add(file);
+    this.channel.send({
+      channel: LOG_ROTATION_CHANNEL,
+      op: "request",
+      file,
+      size,
+    });
+  }
+
+  async onMessage(message) {
+    if (message?.channel !== LOG_ROTATION_CHANNEL) return;
+
+    if (message.op === "pause") {
+      await this.sink?.pauseFile(message.file);
+      this.channel.send({
+        channel: LOG_ROTATION_CHANNEL,
+        op: "paused",
+        id: message.id,
+      });
+    } else if (message.op === "resume") {
+      this.requested.delete(message.file);
+      this.sink?.resumeFile(message.file);
+    }
+  }
+
+  detach() {
+    this.channel.off("message", this._onMessage);
+  }
+}
+
+/**
+ * primary 端：協調所有 worker 後執行輪轉
+ * @param {Object} clusterModule - node:cluster
+ * @param {Object} options
+ * @param {Function} options.rotate - (file, size) => void，所有 worker 暫停寫入該檔時更名
+ * @param {number} options.maxFileSize - 實際檔案大小達到此值才輪轉
+ * @param {Array<string>} options.files - 定期檢查的日誌檔
+ * @param {number} options.checkInterval - 定期檢查間隔（毫秒，0 為停用）
+ * @param {number} options.pauseTimeout - 等待 worker 回覆 paused 的上限（毫秒）
+ * @returns {{rotate: Function, detach: Function}}
+ */
+export function attachLogRotationPrimary(clusterModule, options) {
+  const { rotate, maxFileSize, files = [] } = options;
+  const checkInterval = options.checkInterval ?? 10000;
+  const pauseTimeout = options.pauseTimeout ?? 2000;
+  const rotating = new Set();
+  const acks = new Map(); // pause id -> (workerId) => void
+  let counter = 0;
+
+  const connected = () =>
+    Object.values(clusterModule.workers).filter(worker =>
+      worker.isConnected(),
+    );
+  const broadcast = message => {
+    for (const worker of connected()) {
+      worker.send({ channel: LOG_ROTATION_CHANNEL, ...message });
+    }
+  };
+
+  const fileSize = file => {
+    try {
+      return fs.statSync(file).size;
+    } catch {
+      return 0;
+    }
+  };
+
+  const pauseWorkers = file =>
+    new Promise(resolve => {
+      const id = ++counter;
+      const waiting = new Set(connected().map(worker => worker.id));
+      const done = () => {
+        clearTimeout(timer);
+        acks.delete(id);
+        resolve();
+      };
+      const timer = setTimeout(done, pauseTimeout);
+      acks.set(id, workerId => {
+        if (waiting.delete(workerId) && waiting.size === 0) done();
+      });
+      if (waiting.size === 0) done();
+      else broadcast({ op: "pause", id, file });
+    });
+
+  async function coordinate(file) {
+    if (rotating.has(file)) return;
+    rotating.add(file);
+    try {
+      // 以實際檔案大小為準：worker 只知道自己寫入的量，也可能已被其他請求輪轉
+      const size = fileSize(file);
+      if (size >= maxFileSize) {
+        await pauseWorkers(file);
+        await rotate(file, fileSize(file));
+      }
+    } catch (error) {
+      console.error("日誌輪轉失敗:", error);
+    } finally {
+      rotating.delete(file);
+      // 未輪轉時也要送出，讓 worker 清除已請求的標記
+      broadcast({ op: "resume", file });
+    }
+  }
+
+  const onMessage = (worker, message) => {
+    if (message?.channel !== LOG_ROTATION_CHANNEL) return;
+    if (message.op === "request") {
+      coordinate(message.file);
+    } else if (message.op === "paused") {
+      acks.get(message.id)?.(worker.id);
+    }
+  };
+
+  // worker 結束時不再等待它的回覆
+  const onExit = worker => {
+    for (const ack of [...acks.values()]) ack(worker.id);
+  };
+
+  clusterModule.on("message", onMessage);
+  clusterModule.on("exit", onExit);
+
+  // 各 worker 只計算自己寫入的量，多個 worker 共用檔案時以 primary 的檢查補足
+  const timer =
+    checkInterval > 0
+      ? setInterval(() => {
+          for (const file of files) {
+            if (fileSize(file) >= maxFileSize) coordinate(file);
+          }
+        }, checkInterval)
+      : null;
+  timer?.unref?.();
+
+  return {
+    rotate: coordinate,
+    detach() {
+      if (timer) clearInterval(timer);
+      clusterModule.off("message", onMessage);
+      clusterModule.off("exit", onExit);
+    },
+  };
+}
@@ -0,0 +1,336 @@
+/**
+ * 緩衝式日誌輸出
+ *
+ * 日誌先放入記憶體佇列，達到批次大小或定時器到期時才一次寫出：
+ * - BufferedFileSink：每個日誌檔維持一個 WriteStream，以記憶體中的大小判斷是否輪轉；
+ *   cluster 模式下輪轉由 primary 協調（見 log-rotation.js），期間暫停的檔案日誌留在記憶體
+ * - BatchedDatabaseSink：整批交給 LogStore，以多列 INSERT 包在同一個交易中寫入 SQLite
+ *
+ * 寫出速度跟不上時（stream 回報 backpressure、資料庫忙碌），佇列會持續累積，
+ * 超過 maxQueue 後依 dropPolicy 丟棄日誌；ERROR 等級的日誌永遠不丟棄。
+ */
+
+import fs from "fs";
+import path from "path";
+
+export const DROP_POLICIES = ["drop-newest", "drop-oldest"];
+
+/**
+ * 緩衝輸出基底類別
+ * 子類別實作 _writeBatch(items)（非同步，可返回實際寫入筆數）與選擇性的 _writeSync(items)
+ */
+export class BufferedSink {
+  constructor(options = {}) {
+    this.name = options.name || "sink";
+    this.flushInterval = options.flushInterval ?? 200;
+    this.batchSize = options.batchSize ?? 256;
+    this.maxQueue = options.maxQueue ?? 10000;
+    this.dropPolicy = DROP_POLICIES.includes(options.dropPolicy)
+      ? options.dropPolicy
+      : "drop-newest";
+
+    this.queue = [];
+    this.timer = null;
+    this.flushing = null;
+    this.closed = false;
+
+    this.stats = {
+      enqueued: 0,
+      written: 0,
+      dropped: 0,
+      flushes: 0,
+      errors: 0,
+      maxQueueLength: 0,
+    };
+  }
+
+  /**
+   * 加入一筆日誌
+   * @param {Object} item - 待寫出的項目，item.critical 為 true 時不會被丟棄
+   * @returns {boolean} 是否被接受
+   */
+  push(item) {
+    if (this.closed) {
+      // 關閉後的零星日誌直接同步寫出
+      this._writeSync([item]);
+      return true;
+    }
+
+    if (this.queue.length >= this.maxQueue && !item.critical) {
+      if (this.dropPolicy === "drop-newest") {
+        this.stats.dropped++;
+        return false;
+      }
+
+      const index = this.queue.findIndex(queued => !queued.critical);
+      if (index === -1) {
+        this.stats.dropped++;
+        return false;
+      }
+      this.queue.splice(index, 1);
+      this.stats.dropped++;
+    }
+
+    this.queue.push(item);
+    this.stats.enqueued++;
+    if (this.queue.length > this.stats.maxQueueLength) {
+      this.stats.maxQueueLength = this.queue.length;
+    }
+
+    if (this.queue.length >= this.batchSize) {
+      if (!this.flushing) this.flush();
+    } else if (!this.timer && !this.flushing) {
+      this.timer = setTimeout(() => this.flush(), this.flushInterval);
+      this.timer.unref?.();
+    }
+    return true;
+  }
+
+  /**
+   * 寫出佇列中所有日誌；寫出期間新加入的日誌也會一併寫出
+   * @returns {Promise<void>}
+   */
+  flush() {
+    if (this.timer) {
+      clearTimeout(this.timer);
+      this.timer = null;
+    }
+    if (!this.flushing) {
+      this.flushing = this._drain().finally(() => {
+        this.flushing = null;
+      });
+    }
+    return this.flushing;
+  }
+
+  async _drain() {
+    while (this.queue.length > 0) {
+      const batch = this.queue;
+      this.queue = [];
+      this.stats.flushes++;
+      try {
+        const written = await this._writeBatch(batch);
+        this.stats.written += written ?? batch.length;
+      } catch (error) {
+        this.stats.errors++;
+        this.stats.dropped += batch.length;
+        console.error(`日誌批次寫入失敗 (${this.name}):`, error.message);
+      }
+    }
+  }
+
+  /**
+   * 行程結束前的同步寫出（只寫出尚未交給非同步寫入的日誌）
+   */
+  flushSync() {
+    if (this.timer) {
+      clearTimeout(this.timer);
+      this.timer = null;
+    }
+    if (this.queue.length === 0) return;
+    const batch = this.queue;
+    this.queue = [];
+    this._writeSync(batch);
+  }
+
+  /**
+   * 寫出剩餘日誌並停止接受非同步寫入
+   */
+  async close() {
+    await this.flush();
+    this.closed = true;
+  }
+
+  getStats() {
+    return {
+      ...this.stats,
+      queueLength: this.queue.length,
+      maxQueue: this.maxQueue,
+      dropPolicy: this.dropPolicy,
+    };
+  }
+
+  async _writeBatch() {
+    throw new Error("子類別必須實作 _writeBatch");
+  }
+
+  _writeSync(items) {
+    this.stats.dropped += items.length;
+  }
+}
+
+/**
+ * 檔案日誌輸出：項目格式為 { file, line, critical }
+ */
+export class BufferedFileSink extends BufferedSink {
+  /**
+   * @param {Object} options
+   * @param {number} options.maxFileSize - 超過此大小時輪轉
+   * @param {Function} options.onRotate - (file, size) => void，負責更名與清理舊檔，
+   *   或在 cluster worker 中只提出輪轉請求
+   */
+  constructor(options = {}) {
+    super({ name: "file", ...options });
+    this.maxFileSize = options.maxFileSize ?? 50 * 1024 * 1024;
+    this.onRotate = options.onRotate || null;
+    this.streams = new Map();
+    this.paused = new Map(); // 檔案 -> 暫停期間的日誌行
+  }
+
+  _getStream(file) {
+    let entry = this.streams.get(file);
+    if (entry) return entry;
+
+    let size = 0;
+    try {
+      size = fs.statSync(file).size;
+    } catch {
+      fs.mkdirSync(path.dirname(file), { recursive: true });
+    }
+
+    const stream = fs.createWriteStream(file, { flags: "a" });
+    stream.on("error", error => {
+      console.error(`日誌檔案寫入失敗 (${file}):`, error.message);
+      this.streams.delete(file);
+    });
+    entry = { stream, size };
+    this.streams.set(file, entry);
+    return entry;
+  }
+
+  /**
+   * 關閉指定檔案的 stream（輪轉前呼叫，已送出的內容會寫入原檔案）
+   */
+  closeStream(file) {
+    const entry = this.streams.get(file);
+    if (!entry) return;
+    this.streams.delete(file);
+    entry.stream.end();
+  }
+
+  /**
+   * 暫停寫入指定檔案：先寫出佇列中的日誌並關閉 stream，之後的日誌暫存到 resumeFile
+   */
+  async pauseFile(file) {
+    // 暫停前已記錄的日誌仍屬於舊檔，避免輪轉後新檔開頭出現較早的時間
+    await this.flush();
+    if (!this.paused.has(file)) this.paused.set(file, []);
+    const entry = this.streams.get(file);
+    if (!entry) return;
+    this.streams.delete(file);
+    await new Promise(resolve => entry.stream.end(resolve));
+  }
+
+  /**
+   * 恢復寫入：重新開啟檔案（輪轉後為新檔），先寫出暫停期間的日誌
+   */
+  resumeFile(file) {
+    const held = this.paused.get(file) || [];
+    this.paused.delete(file);
+    // 未暫停的 stream 也可能指向已更名的檔案（例如輪轉期間才啟動的 worker）
+    this.closeStream(file);
+    if (held.length === 0) return;
+
+    const chunk = held.join("");
+    const entry = this._getStream(file);
+    entry.size += Buffer.byteLength(chunk);
+    entry.stream.write(chunk);
+  }
+
+  async _writeBatch(items) {
+    const waits = [];
+
+    for (const [file, lines] of groupLines(items)) {
+      const held = this.paused.get(file);
+      if (held) {
+        held.push(...lines);
+        continue;
+      }
+
+      const chunk = lines.join("");
+      const bytes = Buffer.byteLength(chunk);
+      let entry = this._getStream(file);
+
+      if (this.onRotate && entry.size > 0 && entry.size + bytes > this.maxFileSize) {
+        // cluster worker 的 onRotate 只提出請求，重新開啟的仍是同一個檔案
+        const size = entry.size;
+        this.closeStream(file);
+        this.onRotate(file, size);
+        entry = this._getStream(file);
+      }
+
+      entry.size += bytes;
+      // 等待寫入完成才處理下一批（backpressure），期間的日誌留在佇列中
+      waits.push(new Promise(resolve => entry.stream.write(chunk, () => resolve())));
+    }
+
+    await Promise.all(waits);
+  }
+
+  _writeSync(items) {
+    for (const [file, lines] of groupLines(items)) {
+      try {
+        const entry = this.streams.get(file);
+        // 行程結束時不再等待輪轉，暫停中的日誌一併寫出
+        const held = this.paused.get(file);
+        if (held) this.paused.set(file, []);
+        const chunk = (held || []).join("") + lines.join("");
+        if (entry) entry.size += Buffer.byteLength(chunk);
+        fs.appendFileSync(file, chunk);
+        this.stats.written += lines.length;
+      } catch (error) {
+        this.stats.errors++;
+        this.stats.dropped += lines.length;
+        console.error(`日誌檔案寫入失敗 (${file}):`, error.message);
+      }
+    }
+  }
+
+  async close() {
+    await super.close();
+    for (const [file, held] of this.paused) {
+      if (held.length > 0) fs.appendFileSync(file, held.join(""));
+    }
+    this.paused.clear();
+    await Promise.all(
+      [...this.streams.values()].map(
+        ({ stream }) => new Promise(resolve => stream.end(resolve)),
+      ),
+    );
+    this.streams.clear();
+  }
+}
+
+/**
+ * SQLite 日誌輸出：項目格式為 { params, critical }
+ * 實際寫入由 options.write 負責（見 LogStore.writeBatch），未寫入的筆數計為丟棄
+ */
+export class BatchedDatabaseSink extends BufferedSink {
+  /**
+   * @param {Object} options
+   * @param {Function} options.write - (rows) => Promise<number>，返回實際寫入筆數
+   */
+  constructor(options = {}) {
+    super({ name: "database", ...options });
+    this.write = options.write;
+  }
+
+  async _writeBatch(items) {
+    const written = await this.write(items.map(item => item.params));
+    this.stats.dropped += items.length - written;
+    return written;
+  }
+}
+
+function groupLines(items) {
+  const groups = new Map();
+  for (const item of items) {
+    let lines = groups.get(item.file);
+    if (!lines) {
+      lines = [];
+      groups.set(item.file, lines);
+    }
+    lines.push(item.line);
+  }
+  return groups;
+}
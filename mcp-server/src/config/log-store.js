@@ -0,0 +1,566 @@
+/**
+ * SQLite 日誌儲存（每日分區 + 每小時彙總）
+ *
+ * - 日誌依 UTC 日期寫入 logs_pYYYYMMDD 分區表，每個分區都有
+ *   (timestamp)、(level, timestamp)、(category, timestamp)、(tool_name, timestamp)、
+ *   (client_id, timestamp) 複合索引；logs 為合併所有分區的檢視表，維持舊查詢相容
+ * - 保留期限到期時直接 DROP 整個分區，不必逐列 DELETE
+ * - 寫入時在同一交易中累加 log_rollup_hourly，分析報表只讀彙總表
+ * - queryLogPage 依時間由新到舊逐分區查詢，以 (timestamp, id) 游標分頁
+ *
+ * 分區化之前的 logs 資料表會更名為 logs_legacy 並視為最舊的分區。
+ */
+
+import {
+  encodeCursor,
+  decodeCursor,
+  buildKeysetCondition,
+} from "../services/cursor.js";
+
+export const LOG_COLUMNS = [
+  "timestamp",
+  "level",
+  "service",
+  "environment",
+  "message",
+  "category",
+  "tool_name",
+  "duration",
+  "success",
+  "client_id",
+  "method",
+  "url",
+  "status_code",
+  "ip",
+  "user_agent",
+  "meta",
+];
+
+const LEGACY_TABLE = "logs_legacy";
+const PARTITION_PREFIX = "logs_p";
+const ROLLUP_TABLE = "log_rollup_hourly";
+const ROLLUP_COLUMNS = [
+  "hour",
+  "kind",
+  "key",
+  "count",
+  "success_count",
+  "duration_sum",
+  "duration_count",
+];
+const LOG_CURSOR_SCOPE = "logs:query";
+const MAX_ROLLUP_KEY_LENGTH = 200;
+const LEGACY_DELETE_BATCH = 5000;
+// SQLite 預設單一語句最多 999 個參數
+const SQLITE_MAX_VARIABLES = 999;
+
+// 欄位在 LOG_COLUMNS 中的位置
+const COL = Object.fromEntries(LOG_COLUMNS.map((name, index) => [name, index]));
+
+const TABLE_DEFINITION = `
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  timestamp TEXT NOT NULL,
+  level TEXT NOT NULL,
+  service TEXT NOT NULL,
+  environment TEXT NOT NULL,
+  message TEXT NOT NULL,
+  category TEXT,
+  tool_name TEXT,
+  duration INTEGER,
+  success INTEGER,
+  client_id TEXT,
+  method TEXT,
+  url TEXT,
+  status_code INTEGER,
+  ip TEXT,
+  user_agent TEXT,
+  meta TEXT,
+  created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+`;
+
+const INDEXED_COLUMNS = ["level", "category", "tool_name", "client_id"];
+
+/**
+ * 取得時間戳所屬的分區日期（YYYYMMDD，UTC）
+ */
+export function partitionDay(timestamp) {
+  return `${timestamp.slice(0, 4)}${timestamp.slice(5, 7)}${timestamp.slice(8, 10)}`;
+}
+
+function toISOTime(value) {
+  const time = value ? new Date(value) : null;
+  return time && !isNaN(time.getTime()) ? time.toISOString() : null;
+}
+
+function stripQuery(url) {
+  const index = url.indexOf("?");
+  return index === -1 ? url : url.slice(0, index);
+}
+
+/**
+ * 將一批日誌累加為每小時彙總
+ * @param {Array<Array>} rows - 依 LOG_COLUMNS 排列的資料列
+ * @returns {Map<string, Array>} key -> [hour, kind, key, count, success, durationSum, durationCount]
+ */
+export function aggregateRollups(rows) {
+  const rollups = new Map();
+  const add = (hour, kind, key, success, duration) => {
+    const id = `${hour}\u0000${kind}\u0000${key}`;
+    let entry = rollups.get(id);
+    if (!entry) {
+      entry = [hour, kind, key, 0, 0, 0, 0];
+      rollups.set(id, entry);
+    }
+    entry[3]++;
+    if (success === 1) entry[4]++;
+    if (duration != null) {
+      entry[5] += duration;
+      entry[6]++;
+    }
+  };
+
+  for (const row of rows) {
+    const hour = row[COL.timestamp].slice(0, 13);
+    const duration = row[COL.duration];
+
+    if (row[COL.level] === "ERROR") {
+      add(hour, "error", String(row[COL.message]).slice(0, MAX_ROLLUP_KEY_LENGTH), null, null);
+    }
+    if (row[COL.category] === "tool-call") {
+      add(hour, "tool", row[COL.tool_name] || "", row[COL.success], duration);
+    } else if (row[COL.category] === "api-access") {
+      const endpoint = `${row[COL.method]} ${stripQuery(String(row[COL.url]))}`;
+      add(hour, "api", endpoint.slice(0, MAX_ROLLUP_KEY_LENGTH), null, duration);
+      if (row[COL.status_code]) {
+        add(hour, "status", String(row[COL.status_code]), null, null);
+      }
+    }
+  }
+  return rollups;
+}
+
+export class LogStore {
+  /**
+   * @param {sqlite3.Database} db
+   * @param {Object} options
+   * @param {number} options.retentionDays - 日誌保留天數
+   * @param {number} options.rollupRetentionDays - 彙總保留天數
+   */
+  constructor(db, options = {}) {
+    this.db = db;
+    this.retentionDays = options.retentionDays ?? 30;
+    this.rollupRetentionDays = options.rollupRetentionDays ?? 180;
+    this.partitions = new Set();
+    this.hasLegacy = false;
+    this.insertStatements = new Map();
+    this.retentionTimer = null;
+    // 批次依序寫入：交易的 COMMIT / ROLLBACK 在回呼中才決定，不能讓下一批的 BEGIN 插隊
+    this.writeChain = Promise.resolve();
+  }
+
+  run(sql, params = []) {
+    return new Promise((resolve, reject) => {
+      this.db.run(sql, params, function (err) {
+        if (err) reject(err);
+        else resolve(this);
+      });
+    });
+  }
+
+  all(sql, params = []) {
+    return new Promise((resolve, reject) => {
+      this.db.all(sql, params, (err, rows) => {
+        if (err) reject(err);
+        else resolve(rows);
+      });
+    });
+  }
+
+  exec(sql) {
+    return new Promise((resolve, reject) => {
+      this.db.exec(sql, err => {
+        if (err) reject(err);
+        else resolve();
+      });
+    });
+  }
+
+  /**
+   * 建立彙總表、將舊 logs 資料表轉為 logs_legacy，並載入既有分區
+   */
+  async init() {
+    await this.exec(`
+      CREATE TABLE IF NOT EXISTS ${ROLLUP_TABLE} (
+        hour TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        key TEXT NOT NULL,
+        count INTEGER NOT NULL DEFAULT 0,
+        success_count INTEGER NOT NULL DEFAULT 0,
+        duration_sum REAL NOT NULL DEFAULT 0,
+        duration_count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (hour, kind, key)
+      ) WITHOUT ROWID;
+    `);
+
+    const tables = await this.all(
+      "SELECT name, type FROM sqlite_master WHERE type IN ('table', 'view') AND (name = 'logs' OR name = ? OR name LIKE ?)",
+      [LEGACY_TABLE, `${PARTITION_PREFIX}%`],
+    );
+
+    if (tables.some(table => table.name === "logs" && table.type === "table")) {
+      await this.migrateLegacyTable();
+      this.hasLegacy = true;
+    } else {
+      this.hasLegacy = tables.some(table => table.name === LEGACY_TABLE);
+    }
+
+    for (const { name } of tables) {
+      if (/^logs_p\d{8}$/.test(name)) this.partitions.add(name.slice(PARTITION_PREFIX.length));
+    }
+
+    if (this.partitions.size === 0) {
+      await this.exec(this.partitionDDL(partitionDay(new Date().toISOString())));
+    }
+    await this.exec(this.viewDDL());
+  }
+
+  /**
+   * 將分區化之前的 logs 資料表更名並回填彙總
+   */
+  async migrateLegacyTable() {
+    await this.exec(`ALTER TABLE logs RENAME TO ${LEGACY_TABLE}`);
+
+    const hour = "substr(timestamp, 1, 13)";
+    const endpoint = `substr(method || ' ' || CASE WHEN instr(url, '?') > 0 THEN substr(url, 1, instr(url, '?') - 1) ELSE url END, 1, ${MAX_ROLLUP_KEY_LENGTH})`;
+    const upsert = this.rollupUpsertSuffix();
+    const backfills = [
+      `SELECT ${hour}, 'error', substr(message, 1, ${MAX_ROLLUP_KEY_LENGTH}), COUNT(*), 0, 0, 0
+         FROM ${LEGACY_TABLE} WHERE level = 'ERROR' GROUP BY 1, 3`,
+      `SELECT ${hour}, 'tool', COALESCE(tool_name, ''), COUNT(*), SUM(success = 1),
+              COALESCE(SUM(duration), 0), COUNT(duration)
+         FROM ${LEGACY_TABLE} WHERE category = 'tool-call' GROUP BY 1, 3`,
+      `SELECT ${hour}, 'api', ${endpoint}, COUNT(*), 0, COALESCE(SUM(duration), 0), COUNT(duration)
+         FROM ${LEGACY_TABLE} WHERE category = 'api-access' GROUP BY 1, 3`,
+      `SELECT ${hour}, 'status', CAST(status_code AS TEXT), COUNT(*), 0, 0, 0
+         FROM ${LEGACY_TABLE} WHERE category = 'api-access' AND status_code IS NOT NULL GROUP BY 1, 3`,
+    ];
+
+    for (const select of backfills) {
+      // WHERE true 讓 SQLite 正確解析 INSERT ... SELECT ... ON CONFLICT
+      await this.run(
+        `INSERT INTO ${ROLLUP_TABLE} (${ROLLUP_COLUMNS.join(", ")})
+         SELECT * FROM (${select}) WHERE true ${upsert}`,
+      );
+    }
+  }
+
+  partitionDDL(day) {
+    const table = `${PARTITION_PREFIX}${day}`;
+    this.partitions.add(day);
+    const indexes = INDEXED_COLUMNS.map(
+      column =>
+        `CREATE INDEX IF NOT EXISTS idx_${table}_${column} ON ${table}(${column}, timestamp);`,
+    ).join("\n");
+    return `
+      CREATE TABLE IF NOT EXISTS ${table} (${TABLE_DEFINITION});
+      CREATE INDEX IF NOT EXISTS idx_${table}_timestamp ON ${table}(timestamp);
+      ${indexes}
+    `;
+  }
+
+  /**
+   * 重建合併所有分區的 logs 檢視表
+   */
+  viewDDL() {
+    const tables = this.tablesNewestFirst();
+    const union = tables.map(table => `SELECT * FROM ${table}`).join(" UNION ALL ");
+    return `DROP VIEW IF EXISTS logs; CREATE VIEW logs AS ${union};`;
+  }
+
+  /**
+   * 依時間由新到舊排列的分區表（logs_legacy 最後）
+   */
+  tablesNewestFirst(startTime = null, endTime = null) {
+    const fromDay = startTime ? partitionDay(startTime) : null;
+    const toDay = endTime ? partitionDay(endTime) : null;
+    const tables = [...this.partitions]
+      .filter(day => (!fromDay || day >= fromDay) && (!toDay || day <= toDay))
+      .sort()
+      .reverse()
+      .map(day => `${PARTITION_PREFIX}${day}`);
+    if (this.hasLegacy) tables.push(LEGACY_TABLE);
+    return tables;
+  }
+
+  rollupUpsertSuffix() {
+    return `ON CONFLICT(hour, kind, key) DO UPDATE SET
+      count = count + excluded.count,
+      success_count = success_count + excluded.success_count,
+      duration_sum = duration_sum + excluded.duration_sum,
+      duration_count = duration_count + excluded.duration_count`;
+  }
+
+  insertSQL(table, columns, rowCount, suffix = "") {
+    const cacheKey = `${table}:${rowCount}`;
+    let sql = this.insertStatements.get(cacheKey);
+    if (!sql) {
+      const row = `(${columns.map(() => "?").join(", ")})`;
+      sql = `INSERT INTO ${table} (${columns.join(", ")}) VALUES ${Array(rowCount).fill(row).join(", ")} ${suffix}`;
+      this.insertStatements.set(cacheKey, sql);
+    }
+    return sql;
+  }
+
+  /**
+   * 在同一交易中寫入一批日誌與其彙總
+   * 需要的分區會先建立；任一筆寫入失敗時整批回滾，資料庫忙碌時放棄此批次
+   * @param {Array<Array>} rows - 依 LOG_COLUMNS 排列的資料列
+   * @returns {Promise<number>} 寫入筆數
+   */
+  writeBatch(rows) {
+    const write = this.writeChain.then(() => this.writeTransaction(rows));
+    this.writeChain = write.catch(() => {});
+    return write;
+  }
+
+  writeTransaction(rows) {
+    const db = this.db;
+    const byTable = new Map();
+    const newDays = [];
+
+    for (const row of rows) {
+      const day = partitionDay(row[COL.timestamp]);
+      if (!this.partitions.has(day) && !newDays.includes(day)) newDays.push(day);
+      const table = `${PARTITION_PREFIX}${day}`;
+      let tableRows = byTable.get(table);
+      if (!tableRows) {
+        tableRows = [];
+        byTable.set(table, tableRows);
+      }
+      tableRows.push(row);
+    }
+    const rollups = [...aggregateRollups(rows).values()];
+
+    return new Promise((resolve, reject) => {
+      let failure = null;
+      const onError = err => {
+        if (err && !failure) failure = err;
+      };
+
+      db.serialize(() => {
+        if (newDays.length > 0) {
+          db.exec(newDays.map(day => this.partitionDDL(day)).join("\n") + this.viewDDL(), onError);
+        }
+
+        db.run("BEGIN", onError);
+        const logRows = Math.floor(SQLITE_MAX_VARIABLES / LOG_COLUMNS.length);
+        for (const [table, tableRows] of byTable) {
+          for (let i = 0; i < tableRows.length; i += logRows) {
+            const chunk = tableRows.slice(i, i + logRows);
+            db.run(this.insertSQL(table, LOG_COLUMNS, chunk.length), chunk.flat(), onError);
+          }
+        }
+
+        const rollupRows = Math.floor(SQLITE_MAX_VARIABLES / ROLLUP_COLUMNS.length);
+        for (let i = 0; i < rollups.length; i += rollupRows) {
+          const chunk = rollups.slice(i, i + rollupRows);
+          db.run(
+            this.insertSQL(ROLLUP_TABLE, ROLLUP_COLUMNS, chunk.length, this.rollupUpsertSuffix()),
+            chunk.flat(),
+            onError,
+          );
+        }
+
+        // serialize 模式下回呼依序觸發：此查詢返回時前面所有 INSERT 的結果都已記錄
+        db.get("SELECT 1", () => {
+          if (failure) {
+            db.run("ROLLBACK", () => settle(failure));
+            return;
+          }
+          db.run("COMMIT", err => {
+            if (!err) return resolve(rows.length);
+            db.run("ROLLBACK", () => settle(err));
+          });
+        });
+      });
+
+      function settle(error) {
+        if (error.code === "SQLITE_BUSY" || error.code === "SQLITE_LOCKED") {
+          console.warn("⚠️ 資料庫暫時忙碌，跳過此批次寫入");
+          return resolve(0);
+        }
+        reject(error);
+      }
+    });
+  }
+
+  /**
+   * 查詢日誌（keyset 分頁）
+   * @param {Object} options - level, category, toolName, clientId, startTime, endTime, limit, offset, cursor
+   * @returns {Promise<{logs: Array, nextCursor: string|null}>}
+   */
+  async queryLogPage(options = {}) {
+    const {
+      level,
+      category,
+      toolName,
+      clientId,
+      startTime,
+      endTime,
+      limit = 100,
+      offset = 0,
+      cursor = null,
+    } = options;
+
+    const conditions = [];
+    const params = [];
+    if (level) {
+      conditions.push("level = ?");
+      params.push(level.toUpperCase());
+    }
+    if (category) {
+      conditions.push("category = ?");
+      params.push(category);
+    }
+    if (toolName) {
+      conditions.push("tool_name = ?");
+      params.push(toolName);
+    }
+    if (clientId) {
+      conditions.push("client_id = ?");
+      params.push(clientId);
+    }
+    if (startTime) {
+      conditions.push("timestamp >= ?");
+      params.push(startTime);
+    }
+    if (endTime) {
+      conditions.push("timestamp <= ?");
+      params.push(endTime);
+    }
+    if (cursor) {
+      const keyset = buildKeysetCondition(
+        ["timestamp", "id"],
+        decodeCursor(cursor, LOG_CURSOR_SCOPE, 2),
+      );
+      conditions.push(keyset.clause);
+      params.push(...keyset.params);
+    }
+
+    // 使用游標時忽略 offset
+    const skip = cursor ? 0 : offset;
+    const wanted = skip + limit;
+    const where = conditions.length > 0 ? `WHERE ${conditions.join(" AND ")}` : "";
+    const rows = [];
+
+    const tables = this.tablesNewestFirst(toISOTime(startTime), toISOTime(endTime));
+    for (const table of tables) {
+      if (rows.length >= wanted) break;
+      const tableRows = await this.all(
+        `SELECT * FROM ${table} ${where} ORDER BY timestamp DESC, id DESC LIMIT ?`,
+        [...params, wanted - rows.length],
+      );
+      rows.push(...tableRows);
+    }
+
+    const logs = rows.slice(skip, wanted);
+    const last = logs[logs.length - 1];
+    return {
+      logs,
+      nextCursor:
+        logs.length === limit && last
+          ? encodeCursor(LOG_CURSOR_SCOPE, [last.timestamp, last.id])
+          : null,
+    };
+  }
+
+  /**
+   * 讀取彙總表產生分析資料
+   * @param {string} startTime - ISO 時間，以所在整點為起點
+   */
+  async getRollups(startTime) {
+    return this.all(
+      `SELECT kind, key, SUM(count) AS count, SUM(success_count) AS successCount,
+              SUM(duration_sum) AS durationSum, SUM(duration_count) AS durationCount
+         FROM ${ROLLUP_TABLE}
+        WHERE hour >= ?
+        GROUP BY kind, key`,
+      [startTime.slice(0, 13)],
+    );
+  }
+
+  /**
+   * 刪除超過保留期限的分區與彙總
+   * @returns {Promise<{droppedPartitions: string[], legacyDeleted: number, rollupsDeleted: number}>}
+   */
+  async applyRetention(now = new Date()) {
+    const cutoff = new Date(now.getTime() - this.retentionDays * 86400000).toISOString();
+    const cutoffDay = partitionDay(cutoff);
+    const result = { droppedPartitions: [], legacyDeleted: 0, rollupsDeleted: 0 };
+
+    const expired = [...this.partitions].filter(day => day < cutoffDay);
+    // 至少保留一個分區，讓 logs 檢視表維持有效
+    if (expired.length === this.partitions.size) expired.sort().pop();
+
+    if (expired.length > 0) {
+      for (const day of expired) this.partitions.delete(day);
+      await this.exec(
+        this.viewDDL() +
+          expired.map(day => `DROP TABLE IF EXISTS ${PARTITION_PREFIX}${day};`).join("\n"),
+      );
+      result.droppedPartitions = expired.map(day => `${PARTITION_PREFIX}${day}`);
+    }
+
+    if (this.hasLegacy) {
+      // 舊資料表分批刪除，避免長時間鎖定
+      let deleted;
+      do {
+        const statement = await this.run(
+          `DELETE FROM ${LEGACY_TABLE} WHERE id IN (SELECT id FROM ${LEGACY_TABLE} WHERE timestamp < ? LIMIT ${LEGACY_DELETE_BATCH})`,
+          [cutoff],
+        );
+        deleted = statement.changes || 0;
+        result.legacyDeleted += deleted;
+      } while (deleted === LEGACY_DELETE_BATCH);
+
+      const [{ remaining }] = await this.all(
+        `SELECT COUNT(*) AS remaining FROM (SELECT 1 FROM ${LEGACY_TABLE} LIMIT 1)`,
+      );
+      if (remaining === 0) {
+        this.hasLegacy = false;
+        await this.exec(this.viewDDL() + `DROP TABLE IF EXISTS ${LEGACY_TABLE};`);
+      }
+    }
+
+    const rollupCutoff = new Date(
+      now.getTime() - this.rollupRetentionDays * 86400000,
+    ).toISOString();
+    const statement = await this.run(`DELETE FROM ${ROLLUP_TABLE} WHERE hour < ?`, [
+      rollupCutoff.slice(0, 13),
+    ]);
+    result.rollupsDeleted = statement.changes || 0;
+
+    return result;
+  }
+
+  /**
+   * 啟動背景保留期限清理
+   */
+  startRetention(interval = 60 * 60 * 1000) {
+    this.stopRetention();
+    const run = () =>
+      this.applyRetention().catch(error => {
+        console.error("日誌保留期限清理失敗:", error.message);
+      });
+    run();
+    this.retentionTimer = setInterval(run, interval);
+    this.retentionTimer.unref?.();
+  }
+
+  stopRetention() {
+    if (this.retentionTimer) {
+      clearInterval(this.retentionTimer);
+      this.retentionTimer = null;
+    }
+  }
+}
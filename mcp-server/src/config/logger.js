@@ -4,10 +4,20 @@
  * 符合監控與可觀測性需求
  */
 
+import cluster from "cluster";
 import fs from "fs";
 import path from "path";
 import sqlite3 from "sqlite3";
 import { fileURLToPath } from "url";
+import config from "./config.js";
+import { BufferedFileSink, BatchedDatabaseSink } from "./log-sink.js";
+import { indexPathFor, updateLogIndex } from "./log-reader.js";
+import { LogStore } from "./log-store.js";
+import {
+  CLUSTER_WORKER_ENV,
+  LogRotationClient,
+  attachLogRotationPrimary,
+} from "./log-rotation.js";
 
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = path.dirname(__filename);
@@ -44,9 +54,60 @@ class Logger {
     this.ensureLogDirectory();
     this.initLogFiles();
 
+    // 緩衝寫入（LOG_BUFFERED=false 時恢復逐筆同步寫檔與逐筆 INSERT）
+    this.buffered = options.buffered ?? process.env.LOG_BUFFERED !== "false";
+    if (this.buffered) {
+      const bufferOptions = {
+        flushInterval: options.flushInterval ?? config.logFlushInterval,
+        batchSize: options.batchSize ?? config.logBatchSize,
+        maxQueue: options.maxQueue ?? config.logMaxQueue,
+        dropPolicy: options.dropPolicy || process.env.LOG_DROP_POLICY,
+      };
+
+      this.fileSink = new BufferedFileSink({
+        ...bufferOptions,
+        maxFileSize: this.maxFileSize,
+        onRotate: (fileName, size) => this.requestRotation(fileName, size),
+      });
+      this.dbSink = new BatchedDatabaseSink({
+        ...bufferOptions,
+        write: rows =>
+          this.logStore ? this.logStore.writeBatch(rows) : Promise.resolve(0),
+      });
+
+      // 未經 close() 的結束（process.exit）仍同步寫出佇列中的檔案日誌
+      this._exitHandler = () => this.fileSink.flushSync();
+      process.once("exit", this._exitHandler);
+    }
+
+    // src/cluster.js 的 worker 共用日誌檔，輪轉交由 primary 協調（見 log-rotation.js）；
+    // 其他 cluster 管理程式（例如 PM2）不會回應輪轉請求，仍由各行程自行輪轉
+    this.rotationClient =
+      options.rotationClient ??
+      (cluster.isWorker && process.env[CLUSTER_WORKER_ENV] === "1"
+        ? new LogRotationClient({ sink: this.fileSink || null })
+        : null);
+    this.rotationPrimary = null;
+
     // 資料庫初始化將在 init() 方法中進行，避免重複初始化
   }
 
+  /**
+   * primary 端：由 src/cluster.js 呼叫，之後所有輪轉都先暫停各 worker 的寫入再更名
+   * @param {Object} clusterModule - node:cluster
+   */
+  attachClusterPrimary(clusterModule = cluster) {
+    this.rotationPrimary = attachLogRotationPrimary(clusterModule, {
+      rotate: (fileName, size) => this.rotateLogFile(fileName, size),
+      maxFileSize: this.maxFileSize,
+      files: Object.values(this.logFiles),
+    });
+    return () => {
+      this.rotationPrimary.detach();
+      this.rotationPrimary = null;
+    };
+  }
+
   parseLogLevel(level) {
     if (!level) return "info";
 
@@ -99,7 +160,13 @@ class Logger {
         },
       );
 
-      await this.createTables();
+      // 每日分區、彙總表與背景保留期限清理
+      this.logStore = new LogStore(this.db, {
+        retentionDays: config.logRetentionDays,
+        rollupRetentionDays: config.logRollupRetentionDays,
+      });
+      await this.logStore.init();
+      this.logStore.startRetention();
       console.log("✅ SQLite 日誌資料庫已初始化");
     } catch (error) {
       console.error("❌ SQLite 初始化失敗:", error);
@@ -107,44 +174,6 @@ class Logger {
     }
   }
 
-  async createTables() {
-    const createTableSQL = `
-      CREATE TABLE IF NOT EXISTS logs (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        timestamp TEXT NOT NULL,
-        level TEXT NOT NULL,
-        service TEXT NOT NULL,
-        environment TEXT NOT NULL,
-        message TEXT NOT NULL,
-        category TEXT,
-        tool_name TEXT,
-        duration INTEGER,
-        success INTEGER,
-        client_id TEXT,
-        method TEXT,
-        url TEXT,
-        status_code INTEGER,
-        ip TEXT,
-        user_agent TEXT,
-        meta TEXT,
-        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-      );
-
-      CREATE INDEX IF NOT EXISTS idx_logs_timestamp ON logs(timestamp);
-      CREATE INDEX IF NOT EXISTS idx_logs_level ON logs(level);
-      CREATE INDEX IF NOT EXISTS idx_logs_category ON logs(category);
-      CREATE INDEX IF NOT EXISTS idx_logs_tool_name ON logs(tool_name);
-      CREATE INDEX IF NOT EXISTS idx_logs_created_at ON logs(created_at);
-    `;
-
-    return new Promise((resolve, reject) => {
-      this.db.exec(createTableSQL, err => {
-        if (err) reject(err);
-        else resolve();
-      });
-    });
-  }
-
   /**
    * 初始化方法，用於在系統啟動時非同步初始化日誌系統
    * 這個方法可以在 server.js 中被 await 調用
@@ -207,6 +236,23 @@ class Logger {
       return;
     }
 
+    if (this.buffered) {
+      // 放入佇列後立即返回，由 sink 批次寫出；ERROR 不會因佇列滿而被丟棄
+      const critical = logEntry.level === "ERROR";
+      this.fileSink.push({
+        file: this.logFiles[logType] || this.logFiles.combined,
+        line: JSON.stringify(logEntry) + "\n",
+        critical,
+      });
+      if (this.environment === "development") {
+        this.consoleOutput(logEntry);
+      }
+      if (this.useDatabase) {
+        this.dbSink.push({ params: this.toDatabaseParams(logEntry), critical });
+      }
+      return;
+    }
+
     // 1. 寫入檔案 (同步，確保即時性)
     this.writeToFile(logEntry, logType);
 
@@ -238,20 +284,10 @@ class Logger {
   }
 
   /**
-   * 寫入資料庫
+   * 轉換為 logs 資料表的欄位值（順序同 log-store.js 的 LOG_COLUMNS）
    */
-  async writeToDatabase(logEntry) {
-    if (!this.db) return;
-
-    const sql = `
-      INSERT INTO logs (
-        timestamp, level, service, environment, message, category,
-        tool_name, duration, success, client_id, method, url,
-        status_code, ip, user_agent, meta
-      ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    `;
-
-    const params = [
+  toDatabaseParams(logEntry) {
+    return [
       logEntry.timestamp,
       logEntry.level,
       logEntry.service,
@@ -269,25 +305,14 @@ class Logger {
       logEntry.userAgent || null,
       JSON.stringify(logEntry.meta || {}),
     ];
+  }
 
-    return new Promise((resolve, reject) => {
-      // 使用序列化來避免併發寫入問題
-      this.db.serialize(() => {
-        this.db.run(sql, params, function (err) {
-          if (err) {
-            // 如果是資料庫忙碌錯誤，暫時禁用資料庫記錄
-            if (err.code === "SQLITE_BUSY" || err.code === "SQLITE_LOCKED") {
-              console.warn("⚠️ 資料庫暫時忙碌，跳過此次寫入");
-              resolve(null);
-            } else {
-              reject(err);
-            }
-          } else {
-            resolve(this.lastID);
-          }
-        });
-      });
-    });
+  /**
+   * 寫入資料庫（逐筆，未啟用緩衝寫入時使用）
+   */
+  async writeToDatabase(logEntry) {
+    if (!this.logStore) return;
+    return this.logStore.writeBatch([this.toDatabaseParams(logEntry)]);
   }
 
   /**
@@ -319,18 +344,49 @@ class Logger {
     const stats = fs.statSync(fileName);
     if (stats.size < this.maxFileSize) return;
 
+    this.requestRotation(fileName, stats.size);
+  }
+
+  /**
+   * 輪轉日誌檔：cluster worker 只向 primary 提出請求，其餘情況直接更名
+   */
+  requestRotation(fileName, fileSize) {
+    if (this.rotationClient) {
+      this.rotationClient.request(fileName, fileSize);
+    } else if (this.rotationPrimary) {
+      this.rotationPrimary.rotate(fileName);
+    } else {
+      this.rotateLogFile(fileName, fileSize);
+    }
+  }
+
+  /**
+   * 將日誌檔案更名為帶時間戳的備份，並清理超過數量的舊檔
+   */
+  rotateLogFile(fileName, fileSize) {
+    // 先關閉寫入中的 stream，之後的日誌會寫到新檔案
+    this.fileSink?.closeStream(fileName);
+
     const baseFileName = fileName.replace(".log", "");
     const timestamp = new Date().toISOString().replace(/[:.]/g, "-");
     const rotatedFileName = `${baseFileName}.${timestamp}.log`;
 
     try {
       fs.renameSync(fileName, rotatedFileName);
+      if (fs.existsSync(indexPathFor(fileName))) {
+        fs.renameSync(indexPathFor(fileName), indexPathFor(rotatedFileName));
+      }
       this.cleanupOldLogs(baseFileName);
 
+      // 補齊輪轉檔的時間索引，之後依時間搜尋可直接定位
+      updateLogIndex(rotatedFileName).catch(error => {
+        console.error("建立日誌索引失敗:", error.message);
+      });
+
       this.info("日誌檔案已輪轉", {
         originalFile: fileName,
         rotatedFile: rotatedFileName,
-        fileSize: stats.size,
+        fileSize,
       });
     } catch (error) {
       console.error("日誌輪轉失敗:", error);
@@ -347,7 +403,7 @@ class Logger {
     try {
       const files = fs
         .readdirSync(logDir)
-        .filter(file => file.startsWith(baseName) && file.includes(".log"))
+        .filter(file => file.startsWith(baseName) && file.endsWith(".log"))
         .map(file => ({
           name: file,
           path: path.join(logDir, file),
@@ -359,6 +415,7 @@ class Logger {
         const filesToDelete = files.slice(this.maxFiles);
         filesToDelete.forEach(file => {
           fs.unlinkSync(file.path);
+          fs.rmSync(indexPathFor(file.path), { force: true });
         });
       }
     } catch (error) {
@@ -384,11 +441,13 @@ class Logger {
   }
 
   async debug(message, meta = {}) {
+    if (!this.shouldLog("debug")) return;
     const logEntry = this.createLogEntry("debug", message, meta);
     await this.writeLog(logEntry, "combined");
   }
 
   async trace(message, meta = {}) {
+    if (!this.shouldLog("trace")) return;
     const logEntry = this.createLogEntry("trace", message, meta);
     await this.writeLog(logEntry, "combined");
   }
@@ -499,57 +558,78 @@ class Logger {
    * SQL 查詢介面
    */
   async queryLogs(options = {}) {
-    if (!this.useDatabase || !this.db) {
-      throw new Error("資料庫查詢不可用");
-    }
-
-    const {
-      level,
-      category,
-      toolName,
-      startTime,
-      endTime,
-      limit = 100,
-      offset = 0,
-    } = options;
-
-    let sql = "SELECT * FROM logs WHERE 1=1";
-    const params = [];
-
-    if (level) {
-      sql += " AND level = ?";
-      params.push(level.toUpperCase());
-    }
+    return (await this.queryLogPage(options)).logs;
+  }
 
-    if (category) {
-      sql += " AND category = ?";
-      params.push(category);
+  /**
+   * 分頁查詢日誌，返回 { logs, nextCursor }
+   * 傳入上一頁的 nextCursor 取得下一頁（keyset 分頁，不受 offset 深度影響）
+   */
+  async queryLogPage(options = {}) {
+    if (!this.useDatabase || !this.logStore) {
+      throw new Error("資料庫查詢不可用");
     }
+    return this.logStore.queryLogPage(options);
+  }
 
-    if (toolName) {
-      sql += " AND tool_name = ?";
-      params.push(toolName);
+  /**
+   * 日誌分析（讀取每小時彙總表，不掃描原始日誌）
+   * @param {string} startTime - ISO 時間，從所在整點開始統計
+   */
+  async analyzeLogs(startTime) {
+    if (!this.useDatabase || !this.logStore) {
+      throw new Error("資料庫查詢不可用");
     }
 
-    if (startTime) {
-      sql += " AND timestamp >= ?";
-      params.push(startTime);
-    }
+    const rows = await this.logStore.getRollups(startTime);
+    const byKind = { error: [], tool: [], api: [], status: [] };
+    for (const row of rows) byKind[row.kind]?.push(row);
 
-    if (endTime) {
-      sql += " AND timestamp <= ?";
-      params.push(endTime);
-    }
+    const sum = (items, field) => items.reduce((total, item) => total + item[field], 0);
+    const byCount = (a, b) => b.count - a.count;
+    const average = (items, field = "durationSum", countField = "durationCount") => {
+      const count = sum(items, countField);
+      return count > 0 ? (sum(items, field) / count).toFixed(2) : 0;
+    };
 
-    sql += " ORDER BY timestamp DESC LIMIT ? OFFSET ?";
-    params.push(limit, offset);
+    const toolTotal = sum(byKind.tool, "count");
+    const statusCodes = {};
+    for (const row of byKind.status) statusCodes[row.key] = row.count;
 
-    return new Promise((resolve, reject) => {
-      this.db.all(sql, params, (err, rows) => {
-        if (err) reject(err);
-        else resolve(rows);
-      });
-    });
+    return {
+      errorAnalysis: {
+        total: sum(byKind.error, "count"),
+        topErrors: byKind.error
+          .sort(byCount)
+          .slice(0, 10)
+          .map(row => ({ error: row.key, count: row.count })),
+      },
+      toolAnalysis: {
+        total: toolTotal,
+        successRate:
+          toolTotal > 0
+            ? ((sum(byKind.tool, "successCount") / toolTotal) * 100).toFixed(2)
+            : 0,
+        avgDuration: average(byKind.tool),
+        topTools: byKind.tool
+          .sort(byCount)
+          .slice(0, 10)
+          .map(row => ({
+            tool: row.key,
+            count: row.count,
+            avgDuration: average([row]),
+          })),
+      },
+      apiAnalysis: {
+        total: sum(byKind.api, "count"),
+        topEndpoints: byKind.api
+          .sort(byCount)
+          .slice(0, 10)
+          .map(row => ({ endpoint: row.key, count: row.count })),
+        avgResponseTime: average(byKind.api),
+        statusCodes,
+      },
+    };
   }
 
   /**
@@ -558,6 +638,13 @@ class Logger {
   async getStats() {
     const fileStats = this.getFileStats();
 
+    if (this.buffered) {
+      fileStats.buffer = {
+        file: this.fileSink.getStats(),
+        database: this.dbSink.getStats(),
+      };
+    }
+
     if (this.useDatabase && this.db) {
       const dbStats = await this.getDatabaseStats();
       return { ...fileStats, database: dbStats };
@@ -652,12 +739,31 @@ class Logger {
   }
 
   /**
-   * 關閉日誌系統
+   * 立即寫出緩衝中的日誌（檔案與資料庫）
+   */
+  async flush() {
+    if (!this.buffered) return;
+    await Promise.all([this.fileSink.flush(), this.dbSink.flush()]);
+  }
+
+  /**
+   * 關閉日誌系統：先寫出所有緩衝中的日誌，再關閉檔案與資料庫
+   * 之後的日誌會直接同步寫入檔案
    */
   async close() {
+    this.logStore?.stopRetention();
+    this.rotationClient?.detach();
+    if (this.buffered) {
+      await Promise.all([this.fileSink.close(), this.dbSink.close()]);
+      process.removeListener("exit", this._exitHandler);
+    }
+
     if (this.db) {
+      const db = this.db;
+      this.db = null;
+      this.logStore = null;
       return new Promise(resolve => {
-        this.db.close(err => {
+        db.close(err => {
           if (err) {
             console.error("關閉資料庫失敗:", err);
           } else {
@@ -682,4 +788,5 @@ const logger = new Logger({
 logger.verbose = logger.trace;
 
 // 導出日誌實例
+export { Logger };
 export default logger;
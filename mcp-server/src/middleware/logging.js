@@ -1,4 +1,5 @@
 import logger from "../config/logger.js";
+import { parseTraceparent, runWithSpan, startSpan } from "../services/tracing.js";
 
 /**
  * API 存取日誌中介層
@@ -7,6 +8,16 @@ import logger from "../config/logger.js";
 export const loggingMiddleware = logger => (req, res, next) => {
   const startTime = Date.now();
 
+  // 延續上游（Python Agent）傳來的追蹤，沒有時建立新的追蹤
+  const span = startSpan(`HTTP ${req.method} ${req.path}`, {
+    attributes: { method: req.method, url: req.originalUrl || req.url },
+    parent: parseTraceparent(req.headers.traceparent),
+    root: true,
+  });
+  if (span) {
+    res.setHeader("traceparent", span.toTraceparent());
+  }
+
   // 記錄請求開始
   logger.debug("API 請求開始", {
     method: req.method,
@@ -33,11 +44,16 @@ export const loggingMiddleware = logger => (req, res, next) => {
       duration,
     );
 
+    if (span) {
+      span.setAttribute("statusCode", res.statusCode);
+      span.end(res.statusCode >= 500 ? "error" : "ok");
+    }
+
     // 呼叫原始的 end 方法
     originalEnd.apply(this, args);
   };
 
-  next();
+  runWithSpan(span, next);
 };
 
 /**
@@ -7,6 +7,8 @@
 import hrRoutes from "./hr-routes.js";
 import milRoutes from "./mil-routes.js";
 import statRoutes from "./stat-routes.js";
+import metricsRoutes from "./metrics-routes.js";
+import qualityRoutes from "./quality-routes.js";
 import logger from "../config/logger.js";
 
 /**
@@ -29,5 +31,13 @@ export function registerAllRoutes(app, toolManager) {
   app.use("/api/stat", statRoutes);
   logger.info("STAT module routes registered at /api/stat");
 
+  // 註冊 Prometheus 指標路由
+  app.use("/metrics", metricsRoutes);
+  logger.info("Prometheus metrics registered at /metrics");
+
+  // 註冊工具品質與緩存管理路由
+  app.use("/api/quality", qualityRoutes);
+  logger.info("Quality routes registered at /api/quality");
+
   logger.info("All module routes registered successfully");
 }
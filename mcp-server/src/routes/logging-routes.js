@@ -1,5 +1,6 @@
 import express from "express";
 import fs from "fs";
+import { parseLogLine, searchLogs, tailLines } from "../config/log-reader.js";
 
 /**
  * 日誌分析輔助函數
@@ -191,20 +192,25 @@ function loggingRoutes(logger) {
         level,
         category,
         toolName,
+        clientId,
         startTime,
         endTime,
         limit = 100,
         offset = 0,
+        cursor,
       } = req.query;
 
-      const logs = await logger.queryLogs({
+      // 傳入上一頁的 nextCursor 取得下一頁；offset 僅在未使用游標時生效
+      const { logs, nextCursor } = await logger.queryLogPage({
         level,
         category,
         toolName,
+        clientId,
         startTime,
         endTime,
         limit: parseInt(limit),
         offset: parseInt(offset),
+        cursor,
       });
 
       res.json({
@@ -214,6 +220,7 @@ function loggingRoutes(logger) {
           count: logs.length,
           limit: parseInt(limit),
           offset: parseInt(offset),
+          nextCursor,
         },
       });
     } catch (error) {
@@ -310,48 +317,14 @@ function loggingRoutes(logger) {
         Date.now() - hours * 60 * 60 * 1000,
       ).toISOString();
 
-      // 獲取各種統計資料
-      const errorLogs = await logger.queryLogs({
-        level: "error",
-        startTime,
-        limit: 1000,
-      });
-
-      const toolLogs = await logger.queryLogs({
-        category: "tool-call",
-        startTime,
-        limit: 1000,
-      });
-
-      const apiLogs = await logger.queryLogs({
-        category: "api-access",
-        startTime,
-        limit: 1000,
-      });
-
-      // 分析數據
+      // 分析資料來自每小時彙總表，不受原始日誌筆數影響
       const analysis = {
         timeRange: {
           hours: parseInt(hours),
           startTime,
           endTime: new Date().toISOString(),
         },
-        errorAnalysis: {
-          total: errorLogs.length,
-          topErrors: analyzeErrors(errorLogs),
-        },
-        toolAnalysis: {
-          total: toolLogs.length,
-          successRate: calculateSuccessRate(toolLogs),
-          avgDuration: calculateAvgDuration(toolLogs),
-          topTools: analyzeToolUsage(toolLogs),
-        },
-        apiAnalysis: {
-          total: apiLogs.length,
-          topEndpoints: analyzeApiUsage(apiLogs),
-          avgResponseTime: calculateAvgDuration(apiLogs),
-          statusCodes: analyzeStatusCodes(apiLogs),
-        },
+        ...(await logger.analyzeLogs(startTime)),
       };
 
       res.json({
@@ -371,87 +344,6 @@ function loggingRoutes(logger) {
     }
   });
 
-  // 輔助分析方法
-  router.analyzeErrors = logs => {
-    const errorMap = new Map();
-    logs.forEach(log => {
-      const key = log.message;
-      errorMap.set(key, (errorMap.get(key) || 0) + 1);
-    });
-    return Array.from(errorMap.entries())
-      .sort((a, b) => b[1] - a[1])
-      .slice(0, 10)
-      .map(([error, count]) => ({ error, count }));
-  };
-
-  router.calculateSuccessRate = logs => {
-    if (logs.length === 0) return 0;
-    const successCount = logs.filter(log => log.success === 1).length;
-    return ((successCount / logs.length) * 100).toFixed(2);
-  };
-
-  router.calculateAvgDuration = logs => {
-    if (logs.length === 0) return 0;
-    const validDurations = logs.filter(log => log.duration != null);
-    if (validDurations.length === 0) return 0;
-
-    const totalDuration = validDurations.reduce(
-      (sum, log) => sum + log.duration,
-      0,
-    );
-    return (totalDuration / validDurations.length).toFixed(2);
-  };
-
-  router.analyzeToolUsage = logs => {
-    const toolMap = new Map();
-    logs.forEach(log => {
-      if (log.tool_name) {
-        const key = log.tool_name;
-        const current = toolMap.get(key) || { count: 0, totalDuration: 0 };
-        current.count++;
-        if (log.duration) current.totalDuration += log.duration;
-        toolMap.set(key, current);
-      }
-    });
-
-    return Array.from(toolMap.entries())
-      .sort((a, b) => b[1].count - a[1].count)
-      .slice(0, 10)
-      .map(([tool, stats]) => ({
-        tool,
-        count: stats.count,
-        avgDuration:
-          stats.count > 0 ? (stats.totalDuration / stats.count).toFixed(2) : 0,
-      }));
-  };
-
-  router.analyzeApiUsage = logs => {
-    const endpointMap = new Map();
-    logs.forEach(log => {
-      if (log.url) {
-        const key = `${log.method} ${log.url}`;
-        endpointMap.set(key, (endpointMap.get(key) || 0) + 1);
-      }
-    });
-
-    return Array.from(endpointMap.entries())
-      .sort((a, b) => b[1] - a[1])
-      .slice(0, 10)
-      .map(([endpoint, count]) => ({ endpoint, count }));
-  };
-
-  router.analyzeStatusCodes = logs => {
-    const statusMap = new Map();
-    logs.forEach(log => {
-      if (log.status_code) {
-        const key = log.status_code.toString();
-        statusMap.set(key, (statusMap.get(key) || 0) + 1);
-      }
-    });
-
-    return Object.fromEntries(statusMap);
-  };
-
   /**
    * 獲取系統指標趨勢
    * GET /api/logs/metrics/:metricName
@@ -631,7 +523,7 @@ function loggingRoutes(logger) {
    * 查看檔案日誌 (最近 N 行)
    * GET /api/logs/files/:logType/tail
    */
-  router.get("/files/:logType/tail", (req, res) => {
+  router.get("/files/:logType/tail", async (req, res) => {
     try {
       const { logType } = req.params;
       const lines = parseInt(req.query.lines) || 100;
@@ -653,19 +545,10 @@ function loggingRoutes(logger) {
         });
       }
 
-      const fileContent = fs.readFileSync(filePath, "utf8");
-      const logLines = fileContent.trim().split("\n").slice(-lines);
-
-      // 解析 JSON 日誌行
-      const parsedLogs = logLines
-        .filter(line => line.trim())
-        .map(line => {
-          try {
-            return JSON.parse(line);
-          } catch {
-            return { raw: line, timestamp: new Date().toISOString() };
-          }
-        });
+      // 從檔案尾端往前讀取，只讀到需要的行數
+      await logger.flush?.();
+      const logLines = await tailLines(filePath, lines);
+      const parsedLogs = logLines.map(parseLogLine);
 
       res.json({
         success: true,
@@ -689,10 +572,21 @@ function loggingRoutes(logger) {
   /**
    * 日誌搜尋 (檔案)
    * GET /api/logs/search
+   *
+   * 查詢參數：
+   * - q: 子字串（必填）
+   * - logType: 日誌類型，預設 combined
+   * - startTime / endTime: 時間範圍；指定時以時間索引定位，並包含已輪轉的日誌檔
+   * - lines: 未指定時間範圍時，搜尋目前檔案最近的行數（預設 1000）
+   * - limit: 最多返回筆數（預設 100）
+   * - format=ndjson: 找到即逐行輸出（application/x-ndjson），最後一行為搜尋摘要
    */
-  router.get("/search", (req, res) => {
+  router.get("/search", async (req, res) => {
     try {
-      const { q: query, logType = "combined", lines = 1000 } = req.query;
+      const { q: query, logType = "combined", startTime, endTime } = req.query;
+      const lines = parseInt(req.query.lines) || 1000;
+      const limit = Math.min(parseInt(req.query.limit) || 100, 10000);
+      const streaming = req.query.format === "ndjson";
 
       if (!query) {
         return res.status(400).json({
@@ -708,9 +602,18 @@ function loggingRoutes(logger) {
         });
       }
 
+      for (const value of [startTime, endTime]) {
+        if (value && isNaN(new Date(value).getTime())) {
+          return res.status(400).json({
+            success: false,
+            error: `無效的時間: ${value}`,
+          });
+        }
+      }
+
       const filePath = logger.logFiles[logType];
 
-      if (!fs.existsSync(filePath)) {
+      if (!startTime && !endTime && !fs.existsSync(filePath)) {
         return res.json({
           success: true,
           data: [],
@@ -718,19 +621,41 @@ function loggingRoutes(logger) {
         });
       }
 
-      const fileContent = fs.readFileSync(filePath, "utf8");
-      const logLines = fileContent.trim().split("\n").slice(-parseInt(lines));
-
-      // 搜尋包含查詢關鍵字的日誌行
-      const matchedLogs = logLines
-        .filter(line => line.includes(query))
-        .map(line => {
-          try {
-            return JSON.parse(line);
-          } catch {
-            return { raw: line, timestamp: new Date().toISOString() };
-          }
+      // 寫出緩衝中的日誌，讓搜尋包含最新內容
+      await logger.flush?.();
+
+      if (streaming) {
+        let closed = false;
+        req.on("close", () => {
+          closed = true;
         });
+        res.setHeader("Content-Type", "application/x-ndjson; charset=utf-8");
+
+        const summary = await searchLogs(filePath, {
+          query,
+          startTime,
+          endTime,
+          limit,
+          maxLines: lines,
+          onMatch: line => {
+            if (closed) return false;
+            res.write(line + "\n");
+            return true;
+          },
+        });
+        const { matches, ...stats } = summary;
+        res.end(JSON.stringify({ summary: true, query, logType, ...stats }) + "\n");
+        return;
+      }
+
+      const result = await searchLogs(filePath, {
+        query,
+        startTime,
+        endTime,
+        limit,
+        maxLines: lines,
+      });
+      const matchedLogs = result.matches.map(parseLogLine);
 
       res.json({
         success: true,
@@ -738,10 +663,16 @@ function loggingRoutes(logger) {
         query,
         logType,
         matches: matchedLogs.length,
-        searchedLines: logLines.length,
+        searchedLines: result.searchedLines,
+        truncated: result.truncated,
+        segments: result.segments,
       });
     } catch (error) {
       logger.error("搜尋日誌失敗", { error: error.message });
+      if (res.headersSent) {
+        res.end();
+        return;
+      }
       res.status(500).json({
         success: false,
         error: "搜尋日誌失敗",
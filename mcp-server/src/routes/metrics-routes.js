@@ -0,0 +1,158 @@
+/**
+ * Prometheus 指標路由
+ *
+ * GET /metrics - 以 Prometheus 文字格式輸出工具延遲、快取、資料庫連接池與 SSE 指標
+ */
+
+import express from "express";
+import logger from "../config/logger.js";
+import databaseService from "../services/database.js";
+import { sseManager } from "../services/sse-manager.js";
+import {
+  metricsRegistry,
+  METRICS_CONTENT_TYPE,
+} from "../services/metrics.js";
+import { globalToolCache } from "../tools/tool-cache.js";
+import { globalStatsManager } from "../tools/stats-manager.js";
+
+const router = express.Router();
+
+// 快取
+const cacheRequests = metricsRegistry.counter(
+  "mcp_tool_cache_requests_total",
+  "工具快取查詢次數",
+  ["tool", "result"],
+);
+const cacheHitRatio = metricsRegistry.gauge(
+  "mcp_tool_cache_hit_ratio",
+  "工具快取命中率（0-1）",
+);
+const cacheEntries = metricsRegistry.gauge(
+  "mcp_tool_cache_entries",
+  "工具快取目前項目數",
+);
+const cacheBytes = metricsRegistry.gauge(
+  "mcp_tool_cache_bytes",
+  "工具快取估算佔用位元組",
+  ["tool"],
+);
+const cacheEvictions = metricsRegistry.counter(
+  "mcp_tool_cache_evictions_total",
+  "工具快取淘汰次數",
+);
+
+// 資料庫連接池
+const dbPoolConnections = metricsRegistry.gauge(
+  "mcp_db_pool_connections",
+  "資料庫連接池連線數",
+  ["database", "state"],
+);
+const dbPoolMax = metricsRegistry.gauge(
+  "mcp_db_pool_max_connections",
+  "資料庫連接池連線上限",
+  ["database"],
+);
+const dbPoolPending = metricsRegistry.gauge(
+  "mcp_db_pool_pending_requests",
+  "等待資料庫連線的請求數",
+  ["database"],
+);
+const dbPoolUtilization = metricsRegistry.gauge(
+  "mcp_db_pool_utilization_ratio",
+  "資料庫連接池使用率（使用中 / 上限）",
+  ["database"],
+);
+
+// SSE
+const sseActive = metricsRegistry.gauge(
+  "mcp_sse_active_connections",
+  "目前的 SSE 連接數",
+);
+const sseTotal = metricsRegistry.counter(
+  "mcp_sse_connections_total",
+  "累計建立的 SSE 連接數",
+);
+
+// 日誌緩衝
+const logQueueLength = metricsRegistry.gauge(
+  "mcp_log_queue_length",
+  "等待寫出的日誌筆數",
+  ["sink"],
+);
+const logDropped = metricsRegistry.counter(
+  "mcp_log_dropped_total",
+  "因佇列已滿或寫入失敗而丟棄的日誌筆數",
+  ["sink"],
+);
+
+// 行程
+const processUptime = metricsRegistry.gauge(
+  "mcp_process_uptime_seconds",
+  "伺服器行程執行時間（秒）",
+);
+const processMemory = metricsRegistry.gauge(
+  "mcp_process_memory_bytes",
+  "伺服器行程記憶體用量",
+  ["type"],
+);
+
+metricsRegistry.addCollector(() => {
+  const cacheStats = globalToolCache.stats;
+  const lookups = cacheStats.hits + cacheStats.misses;
+  cacheHitRatio.set({}, lookups > 0 ? cacheStats.hits / lookups : 0);
+  cacheEntries.set({}, globalToolCache.cache.size);
+  cacheEvictions.set({}, cacheStats.evictions || 0);
+  cacheBytes.reset();
+  for (const { tool, bytes } of globalToolCache.getToolUsage()) {
+    cacheBytes.set({ tool: tool || "" }, bytes);
+  }
+
+  for (const [toolName, toolStats] of globalStatsManager.realtimeStats.tools) {
+    const { cacheHits, cacheMisses } = toolStats.counters;
+    if (cacheHits + cacheMisses === 0) continue;
+    cacheRequests.set({ tool: toolName, result: "hit" }, cacheHits);
+    cacheRequests.set({ tool: toolName, result: "miss" }, cacheMisses);
+  }
+
+  for (const [database, pool] of Object.entries(databaseService.getPoolStats())) {
+    dbPoolConnections.set({ database, state: "idle" }, pool.idle);
+    dbPoolConnections.set({ database, state: "in_use" }, pool.inUse);
+    dbPoolMax.set({ database }, pool.max);
+    dbPoolPending.set({ database }, pool.pending);
+    dbPoolUtilization.set({ database }, pool.max > 0 ? pool.inUse / pool.max : 0);
+  }
+
+  sseActive.set({}, sseManager.connections.size);
+  sseTotal.set({}, sseManager.connectionCounter);
+
+  if (logger.buffered) {
+    for (const [sink, stats] of [
+      ["file", logger.fileSink.getStats()],
+      ["database", logger.dbSink.getStats()],
+    ]) {
+      logQueueLength.set({ sink }, stats.queueLength);
+      logDropped.set({ sink }, stats.dropped);
+    }
+  }
+
+  const memory = process.memoryUsage();
+  processUptime.set({}, Math.round(process.uptime()));
+  processMemory.set({ type: "rss" }, memory.rss);
+  processMemory.set({ type: "heap_used" }, memory.heapUsed);
+  processMemory.set({ type: "heap_total" }, memory.heapTotal);
+});
+
+/**
+ * GET /metrics
+ */
+router.get("/", (req, res) => {
+  try {
+    res.set("Content-Type", METRICS_CONTENT_TYPE);
+    res.send(metricsRegistry.render());
+  } catch (error) {
+    logger.error("輸出 Prometheus 指標失敗", { error: error.message });
+    res.status(500).send(`# 指標輸出失敗: ${error.message}\n`);
+  }
+});
+
+export default router;
@@ -118,7 +118,8 @@ function getToolDisplayName(toolName) {
     'get-mil-details': 'MIL 詳細資訊',
     'get-status-report': 'MIL 狀態報告',
     'get-mil-type-list': 'MIL 類型列表',
-    'get-count-by': 'MIL 統計分析'
+    'get-count-by': 'MIL 統計分析',
+    'search-mil': 'MIL 關鍵字搜尋'
   };
   
   return displayNames[toolName] || toolName;
@@ -140,6 +141,7 @@ router.get("/tools", (req, res) => {
       "get-status-report",
       "get-mil-type-list",
       "get-count-by",
+      "search-mil",
     ],
     timestamp: new Date().toISOString(),
   });
@@ -161,6 +163,7 @@ router.post("/:toolName", async (req, res) => {
       "get-status-report",
       "get-mil-type-list",
       "get-count-by",
+      "search-mil",
     ];
 
     if (!validTools.includes(toolName)) {
@@ -360,6 +363,17 @@ router.get("/docs", (req, res) => {
           },
         },
       },
+      {
+        name: "search-mil",
+        description: "以關鍵字搜尋 MIL，結果依相關度排序",
+        endpoint: "/api/mil/search-mil",
+        method: "POST",
+        parameters: {
+          query: "必填，搜尋關鍵字",
+          status: "選填，MIL 處理狀態",
+          limit: "選填，返回結果數量上限，預設 20",
+        },
+      },
     ],
     timestamp: new Date().toISOString(),
   });
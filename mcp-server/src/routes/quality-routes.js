@@ -8,6 +8,8 @@ import express from "express";
 import { globalToolCache } from "../tools/tool-cache.js";
 import { globalVersionManager } from "../tools/version-manager.js";
 import { globalStatsManager } from "../tools/stats-manager.js";
+import { globalToolTelemetry } from "../tools/telemetry.js";
+import { globalChangeWatcher } from "../tools/cache-invalidation.js";
 import logger from "../config/logger.js";
 
 const router = express.Router();
@@ -23,6 +25,8 @@ router.get("/overview", (req, res) => {
       cache: globalToolCache.getStats(),
       versions: globalVersionManager.getVersionStats(),
       usage: globalStatsManager.getGlobalStats(),
+      telemetry: globalToolTelemetry.getStats(),
+      cacheInvalidation: globalChangeWatcher.getStats(),
       systemHealth: {
         cacheEnabled: true,
         versionManagementEnabled: true,
@@ -58,6 +62,7 @@ router.get("/cache", (req, res) => {
       success: true,
       data: {
         stats: cacheStats,
+        byTool: globalToolCache.getToolUsage(),
         items: cacheItems,
         timestamp: new Date(),
       },
@@ -95,6 +100,43 @@ router.delete("/cache", (req, res) => {
   }
 });
 
+/**
+ * 依資料相依標籤清除緩存
+ * POST /api/quality/cache/invalidate
+ * body: { tags: ["mil:*", "hr:employee:A001"] }
+ */
+router.post("/cache/invalidate", (req, res) => {
+  try {
+    const { tags } = req.body || {};
+
+    if (
+      !Array.isArray(tags) ||
+      tags.length === 0 ||
+      !tags.every(tag => typeof tag === "string" && tag.length > 0)
+    ) {
+      return res.status(400).json({
+        success: false,
+        error: "tags must be a non-empty array of strings",
+      });
+    }
+
+    const invalidated = globalToolCache.invalidateTags(tags);
+    logger.info("Cache invalidated manually", { tags, invalidated });
+
+    res.json({
+      success: true,
+      message: `Invalidated ${invalidated} cache items`,
+      invalidated,
+    });
+  } catch (error) {
+    logger.error("Failed to invalidate cache", { error: error.message });
+    res.status(500).json({
+      success: false,
+      error: "Failed to invalidate cache",
+    });
+  }
+});
+
 /**
  * 刪除特定緩存項目
  * DELETE /api/quality/cache/:key
@@ -102,7 +144,7 @@ router.delete("/cache", (req, res) => {
 router.delete("/cache/:key", (req, res) => {
   try {
     const { key } = req.params;
-    const deleted = globalToolCache.deleteItem(key);
+    const deleted = globalToolCache.delete(key);
 
     if (deleted) {
       logger.info("Cache item deleted manually", { key });
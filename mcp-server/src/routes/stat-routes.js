@@ -5,8 +5,22 @@
  */
 
 import express from "express";
+import config from "../config/config.js";
 import logger from "../config/logger.js";
 import { statTools } from "../tools/stat/index.js";
+import { parseByteSize } from "../tools/tool-cache.js";
+import { globalWorkerPool } from "../tools/worker-pool.js";
+import {
+  CSVColumnParser,
+  CSVParseError,
+  parseCSVStream,
+} from "../services/stat/csv-parser.js";
+import {
+  MultipartError,
+  getBoundary,
+  readMultipart,
+} from "../services/stat/multipart.js";
+import datasetStore from "../services/stat/dataset-store.js";
 
 const router = express.Router();
 
@@ -77,6 +91,222 @@ statTools.forEach(tool => {
   });
 });
 
+/**
+ * 依工具的 inputSchema 轉換查詢字串或表單欄位的型別（數值、布林、JSON 物件）
+ * @throws {Error} 數值或 JSON 格式錯誤時，訊息包含參數名稱
+ */
+function coerceParams(schema, params) {
+  const properties = schema?.properties || {};
+  const coerced = {};
+  for (const [key, value] of Object.entries(params)) {
+    const type = properties[key]?.type;
+    if (typeof value !== "string") {
+      coerced[key] = value;
+    } else if (type === "number" || type === "integer") {
+      coerced[key] = Number(value);
+      if (value.trim() === "" || Number.isNaN(coerced[key])) {
+        throw new Error(`參數 ${key} 不是有效的數值: ${value}`);
+      }
+    } else if (type === "boolean") {
+      coerced[key] = value === "true";
+    } else if (type === "object" || type === "array") {
+      try {
+        coerced[key] = JSON.parse(value);
+      } catch (error) {
+        throw new Error(`參數 ${key} 不是有效的 JSON: ${error.message}`);
+      }
+    } else {
+      coerced[key] = value;
+    }
+  }
+  return coerced;
+}
+
+/**
+ * 以串流方式接收 CSV：依 Content-Type 分為
+ * - multipart/form-data：第一個檔案欄位為 CSV，文字欄位併入參數
+ * - application/json：{ csvData }，在 worker thread 解析
+ * - 其他（text/csv、application/octet-stream）：請求內容即為 CSV
+ * 查詢字串中的參數（tool、name、delimiter 與工具參數）都會併入參數。
+ */
+async function receiveDataset(req) {
+  const params = { ...req.query };
+  const contentType = req.headers["content-type"] || "";
+  const options = {
+    maxBytes: parseByteSize(config.statUploadMaxBytes),
+    delimiter: req.query.delimiter,
+  };
+
+  if (contentType.startsWith("multipart/form-data")) {
+    const boundary = getBoundary(contentType);
+    if (!boundary) {
+      throw new MultipartError("multipart 請求缺少 boundary");
+    }
+    let parser = null;
+    await readMultipart(req, boundary, {
+      // 每個檔案（包含略過的）都套用與 CSV 相同的上限，避免以多餘的檔案灌入資料
+      maxFileBytes: options.maxBytes,
+      onField: (name, value) => {
+        params[name] = value;
+      },
+      onFile: part => {
+        if (parser) return null; // 只讀取第一個檔案
+        params.name = params.name || part.filename;
+        parser = new CSVColumnParser(options);
+        return parser;
+      },
+    });
+    if (!parser) {
+      throw new MultipartError("multipart 請求中沒有 CSV 檔案");
+    }
+    return { table: parser.end(), params };
+  }
+
+  if (contentType.startsWith("application/json")) {
+    const { csvData, ...rest } = req.body || {};
+    if (typeof csvData !== "string") {
+      throw new CSVParseError("JSON 請求需要 csvData 字串", "NO_DATA");
+    }
+    const table = await globalWorkerPool.run("parseCSV", {
+      csvData,
+      options,
+    });
+    return { table, params: { ...params, ...rest } };
+  }
+
+  return { table: await parseCSVStream(req, options), params };
+}
+
+/**
+ * 上傳 CSV 資料集
+ * 帶 tool 參數時，存放後直接以 datasetId 執行該統計工具（cluster 模式下請使用此方式，
+ * 資料集只存在於收到上傳的 worker）
+ */
+router.post("/datasets", async (req, res) => {
+  const startTime = Date.now();
+  let received;
+
+  try {
+    received = await receiveDataset(req);
+  } catch (error) {
+    const status =
+      error.code === "TOO_LARGE"
+        ? 413
+        : error instanceof CSVParseError || error instanceof MultipartError
+          ? 400
+          : 500;
+    logger.warn("資料集上傳失敗", { error: error.message, status });
+    return res.status(status).json({
+      success: false,
+      module: "stat",
+      error: error.message,
+      timestamp: new Date().toISOString(),
+    });
+  }
+
+  const { table, params } = received;
+  const { tool: toolName, name, delimiter, ...toolParams } = params;
+  let datasetId;
+  try {
+    datasetId = datasetStore.put(table, { name });
+  } catch (error) {
+    return res.status(413).json({
+      success: false,
+      module: "stat",
+      error: error.message,
+      timestamp: new Date().toISOString(),
+    });
+  }
+  const dataset = datasetStore.describe(datasetId);
+  logger.info("資料集上傳完成", {
+    datasetId,
+    rowCount: table.rowCount,
+    columnCount: table.headers.length,
+    bytes: dataset.bytes,
+    parseTime: `${Date.now() - startTime}ms`,
+  });
+
+  if (!toolName) {
+    return res.json({
+      success: true,
+      module: "stat",
+      dataset,
+      executionTime: Date.now() - startTime,
+      timestamp: new Date().toISOString(),
+    });
+  }
+
+  const tool = statTools.find(statTool => statTool.name === toolName);
+  if (!tool) {
+    return res.status(404).json({
+      success: false,
+      module: "stat",
+      dataset,
+      error: `統計工具 '${toolName}' 不存在`,
+      timestamp: new Date().toISOString(),
+    });
+  }
+
+  let toolArgs;
+  try {
+    toolArgs = coerceParams(tool.inputSchema, toolParams);
+  } catch (error) {
+    return res.status(400).json({
+      success: false,
+      module: "stat",
+      tool: tool.name,
+      dataset,
+      error: error.message,
+      timestamp: new Date().toISOString(),
+    });
+  }
+
+  try {
+    const result = await tool.execute({ ...toolArgs, datasetId });
+    res.json({
+      success: true,
+      module: "stat",
+      tool: tool.name,
+      dataset,
+      result,
+      executionTime: Date.now() - startTime,
+      timestamp: new Date().toISOString(),
+    });
+  } catch (error) {
+    logger.error(`統計工具執行失敗: ${tool.name}`, {
+      error: error.message,
+      datasetId,
+    });
+    res.status(500).json({
+      success: false,
+      module: "stat",
+      tool: tool.name,
+      dataset,
+      error: error.message,
+      executionTime: Date.now() - startTime,
+      timestamp: new Date().toISOString(),
+    });
+  }
+});
+
+// 資料集摘要（欄位類型、相異值數量、前幾列）
+router.get("/datasets/:datasetId", (req, res) => {
+  const dataset = datasetStore.describe(req.params.datasetId);
+  if (!dataset) {
+    return res.status(404).json({
+      success: false,
+      module: "stat",
+      error: `找不到資料集 ${req.params.datasetId}`,
+    });
+  }
+  res.json({ success: true, module: "stat", dataset });
+});
+
+router.delete("/datasets/:datasetId", (req, res) => {
+  const deleted = datasetStore.delete(req.params.datasetId);
+  res.status(deleted ? 200 : 404).json({ success: deleted, module: "stat" });
+});
+
 // 統計模組資訊端點
 router.get("/info", (req, res) => {
   res.json({
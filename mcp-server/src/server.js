@@ -7,7 +7,8 @@ import {
   errorLoggingMiddleware,
 } from "./middleware/logging.js";
 import { MCPProtocolHandler } from "./services/mcp-protocol.js";
-import { sseManager } from "./services/sse-manager.js";
+import { sseManager, mergeSSEStats } from "./services/sse-manager.js";
+import { clusterBus } from "./services/cluster-bus.js";
 import {
   registerAllTools,
   getToolManager,
@@ -17,6 +18,24 @@ import {
 } from "./tools/index.js";
 import { registerAllRoutes } from "./routes/index.js";
 import databaseService from "./services/database.js";
+import hrDirectory from "./services/hr/hr-directory.js";
+import {
+  startCacheInvalidation,
+  stopCacheInvalidation,
+} from "./tools/cache-invalidation.js";
+import {
+  initSharedToolCache,
+  closeSharedToolCache,
+} from "./tools/cache-store.js";
+import {
+  globalStatsManager,
+  mergeStatsSnapshots,
+  formatGlobalStats,
+} from "./tools/stats-manager.js";
+import { mergeLatencyStats } from "./tools/latency-sketch.js";
+import { globalToolTelemetry } from "./tools/telemetry.js";
+import { globalWorkerPool } from "./tools/worker-pool.js";
+import { flushSpans } from "./services/tracing.js";
 
 // 建立 MCP 協議處理器實例
 const mcpHandler = new MCPProtocolHandler();
@@ -44,6 +63,23 @@ try {
   databaseInitResults = { error: error.message };
 }
 
+// 載入 HR 目錄快照（失敗時 HR 工具自動使用 SQL 查詢）
+if (config.hrQueryPath !== "sql") {
+  try {
+    await hrDirectory.initialize({
+      refreshInterval: config.hrDirectoryRefreshInterval,
+    });
+  } catch (error) {
+    logger.error("HR 目錄快照載入失敗，HR 工具將使用 SQL 查詢:", error);
+  }
+}
+
+// 多個 worker / 副本共用的 L2 工具緩存（TOOL_CACHE_L2=sqlite）
+await initSharedToolCache();
+
+// 資料異動時清除相關工具緩存
+startCacheInvalidation();
+
 // 註冊所有工具
 try {
   registerAllTools();
@@ -153,6 +189,7 @@ app.get("/health", async (req, res) => {
       initResults: databaseInitResults,
     },
     tools: toolsStatus,
+    workerPool: globalWorkerPool.getStats(),
   });
 });
 
@@ -551,9 +588,18 @@ app.get("/sse", (req, res) => {
   });
 });
 
-// SSE 狀態查詢端點
-app.get("/sse/stats", (req, res) => {
-  res.json(sseManager.getStats());
+// SSE 狀態查詢端點（cluster 模式下合併所有 worker 的連接）
+app.get("/sse/stats", async (req, res) => {
+  if (!clusterBus.enabled) {
+    return res.json(sseManager.getStats());
+  }
+
+  try {
+    res.json(mergeSSEStats(await clusterBus.collect("sse:stats")));
+  } catch (error) {
+    logger.error("SSE stats collection failed:", error);
+    res.status(500).json({ success: false, error: error.message });
+  }
 });
 
 // 工具健康檢查端點 (新增)
@@ -636,8 +682,42 @@ app.get("/api/tools/health", async (req, res) => {
   });
 });
 
+// cluster 模式下其他 worker 查詢本行程的使用統計與延遲草圖
+clusterBus.on("tools:stats", ({ window }) => ({
+  usage: globalStatsManager.getSnapshot(),
+  latency: toolManager.getLatencyStats(window, { includeSketches: true }),
+  percentiles: toolManager.getLatencyStats("5m", { includeSketches: true }),
+}));
+
+/**
+ * 取得使用統計與延遲分位數；cluster 模式下合併所有 worker 的計數與延遲草圖
+ */
+async function collectToolStats(window, includeSketches) {
+  if (!clusterBus.enabled) {
+    return {
+      usage: globalStatsManager.getGlobalStats(),
+      latency: toolManager.getLatencyStats(window, { includeSketches }),
+    };
+  }
+
+  const results = await clusterBus.collect("tools:stats", { window });
+  const parts = results.map(({ result }) => result);
+  const recent = mergeLatencyStats(parts.map(part => part.percentiles));
+  return {
+    usage: formatGlobalStats(
+      mergeStatsSnapshots(parts.map(part => part.usage)),
+      { percentiles: toolName => recent.tools[toolName] ?? null },
+    ),
+    latency: mergeLatencyStats(
+      parts.map(part => part.latency),
+      { includeSketches },
+    ),
+    workers: results.map(({ workerId }) => workerId),
+  };
+}
+
 // 工具統計端點 (新增)
-app.get("/api/tools/stats", (req, res) => {
+app.get("/api/tools/stats", async (req, res) => {
   const tools = getRegisteredTools();
   const moduleMetadata = getAllModuleMetadata();
 
@@ -657,11 +737,23 @@ app.get("/api/tools/stats", (req, res) => {
     };
   });
 
+  let stats;
+  try {
+    stats = await collectToolStats(
+      req.query.window || "5m",
+      req.query.includeSketches === "true",
+    );
+  } catch (error) {
+    logger.error("Tool stats collection failed:", error);
+    return res.status(500).json({ success: false, error: error.message });
+  }
+
   res.json({
     success: true,
     totalTools: tools.length,
     totalModules: Object.keys(moduleMetadata).length,
     statsByModule: statsByModule,
+    ...stats,
     timestamp: new Date().toISOString(),
   });
 });
@@ -788,38 +880,34 @@ try {
     });
   });
 
-  // 優雅關閉
-  process.on("SIGTERM", async () => {
-    logger.info("SIGTERM received, shutting down gracefully");
+  // 優雅關閉：停止接受新連線並等待進行中的請求完成（上限 shutdownTimeout），
+  // 再關閉資料庫、寫出遙測與日誌。cluster 模式下由 primary 以 "shutdown" 訊息觸發
+  let shuttingDown = false;
+  const shutdown = async signal => {
+    if (shuttingDown) return;
+    shuttingDown = true;
+    logger.info(`${signal} received, shutting down gracefully`);
 
-    // 關閉 SSE 連接
-    sseManager.closeAllConnections();
-
-    // 關閉資料庫連接
-    try {
-      await databaseService.close();
-      logger.info("Database connections closed");
-    } catch (error) {
-      logger.error("Error closing database connections:", error);
-    }
+    const closed = new Promise(resolve => server.close(resolve));
+    server.closeIdleConnections?.();
 
-    server.close(() => {
-      logger.info("Process terminated");
-      process.exit(0);
-    });
-  });
-
-  process.on("SIGINT", async () => {
-    logger.info("SIGINT received, shutting down gracefully");
-
-    // 清理定時器
-    if (keepAliveTimer) {
-      clearInterval(keepAliveTimer);
-      logger.info("Keep-alive timer cleared");
-    }
-
-    // 關閉 SSE 連接
+    // SSE 為長連線，需主動關閉 server.close 才會完成
     sseManager.closeAllConnections();
+    hrDirectory.stop();
+    stopCacheInvalidation();
+
+    let timer;
+    const timedOut = await Promise.race([
+      closed.then(() => false),
+      new Promise(resolve => {
+        timer = setTimeout(() => resolve(true), config.shutdownTimeout);
+      }),
+    ]);
+    clearTimeout(timer);
+    if (timedOut) {
+      logger.warn("Shutdown timeout reached, closing remaining connections");
+      server.closeAllConnections?.();
+    }
 
     // 關閉資料庫連接
     try {
@@ -829,11 +917,20 @@ try {
       logger.error("Error closing database connections:", error);
     }
 
-    server.close(() => {
-      logger.info("Process terminated");
-      process.exit(0);
-    });
-  });
+    logger.info("Process terminated");
+    // 處理完遙測佇列並寫出緩衝中的追蹤與日誌後再結束
+    // （span 在請求結束時才送出，需等連線關閉後再寫出）
+    await globalToolTelemetry.flush();
+    await flushSpans();
+    await globalWorkerPool.destroy();
+    await closeSharedToolCache();
+    await logger.close();
+    process.exit(0);
+  };
+
+  process.on("SIGTERM", () => shutdown("SIGTERM"));
+  process.on("SIGINT", () => shutdown("SIGINT"));
+  clusterBus.on("shutdown", () => shutdown("Cluster shutdown"));
 } catch (error) {
   console.error("啟動服務器失敗:", error);
   logger.error("啟動服務器失敗:", error);
@@ -0,0 +1,270 @@
+/**
+ * Cluster 模式的行程間通訊
+ *
+ * src/cluster.js 以 node:cluster 啟動多個 worker 共用同一個端口，
+ * primary 不處理 HTTP 請求，只轉送 worker 之間的訊息：
+ * - collect(type, payload)：向所有 worker（包含自己）收集回應，例如合併 /api/tools/stats
+ * - send(workerId, type, payload)：送到指定 worker，例如把 SSE 事件轉給持有連接的 worker
+ * - publish(type, payload)：送到其他所有 worker，例如廣播 SSE 事件
+ * 直接執行 server.js（非 cluster 模式）時，collect 只呼叫本行程的處理函數，send 與 publish 不做事。
+ */
+
+import cluster from "cluster";
+import logger from "../config/logger.js";
+
+// 所有 bus 訊息都帶此欄位，與其他 IPC 訊息區分
+const CHANNEL = "mcp-cluster-bus";
+
+export class ClusterBus {
+  /**
+   * @param {Object} options
+   * @param {number} options.timeout - collect 等待回應的上限（毫秒）
+   * @param {Object} options.channel - 與 primary 通訊的行程物件（預設為 process）
+   * @param {number} options.workerId - worker 編號（預設為 cluster.worker.id）
+   */
+  constructor(options = {}) {
+    this.channel = options.channel || process;
+    this.enabled =
+      options.enabled ??
+      (cluster.isWorker && typeof this.channel.send === "function");
+    this.workerId = options.workerId ?? (this.enabled ? cluster.worker.id : 0);
+    this.timeout = options.timeout || 5000;
+    this.handlers = new Map();
+    this.pending = new Map();
+    this.requestCounter = 0;
+
+    if (this.enabled) {
+      this.channel.on("message", message => this._onMessage(message));
+    }
+  }
+
+  /**
+   * 註冊訊息處理函數（可返回 Promise）
+   */
+  on(type, handler) {
+    this.handlers.set(type, handler);
+  }
+
+  /**
+   * 向所有 worker 收集 type 的處理結果；逾時未回應的 worker 不列入
+   * @returns {Promise<Array<{workerId: number, result: *}>>}
+   */
+  async collect(type, payload = null) {
+    if (!this.enabled) {
+      return [{ workerId: 0, result: await this._handle(type, payload) }];
+    }
+
+    const id = `${this.workerId}:${++this.requestCounter}`;
+    return new Promise((resolve, reject) => {
+      // primary 在 timeout 時會返回已收到的部分結果，這裡多留一點時間
+      const timer = setTimeout(() => {
+        this.pending.delete(id);
+        reject(new Error(`Cluster collect timed out: ${type}`));
+      }, this.timeout * 2);
+      this.pending.set(id, { resolve, timer });
+      this.channel.send({
+        channel: CHANNEL,
+        op: "collect",
+        id,
+        type,
+        payload,
+        timeout: this.timeout,
+      });
+    });
+  }
+
+  /**
+   * 送到指定 worker；目標是自己時直接處理
+   */
+  send(workerId, type, payload = null) {
+    if (!this.enabled || workerId === this.workerId) {
+      this._dispatch(type, payload);
+      return;
+    }
+    this.channel.send({
+      channel: CHANNEL,
+      op: "send",
+      to: workerId,
+      type,
+      payload,
+    });
+  }
+
+  /**
+   * 送到其他所有 worker（不包含自己）
+   */
+  publish(type, payload = null) {
+    if (!this.enabled) return;
+    this.channel.send({ channel: CHANNEL, op: "publish", type, payload });
+  }
+
+  async _handle(type, payload) {
+    const handler = this.handlers.get(type);
+    if (!handler) {
+      throw new Error(`No cluster bus handler for ${type}`);
+    }
+    return handler(payload);
+  }
+
+  _dispatch(type, payload) {
+    Promise.resolve()
+      .then(() => this._handle(type, payload))
+      .catch(error => {
+        logger.warn("Cluster bus message failed", {
+          type,
+          error: error.message,
+        });
+      });
+  }
+
+  async _onMessage(message) {
+    if (message?.channel !== CHANNEL) return;
+
+    switch (message.op) {
+      case "message":
+        this._dispatch(message.type, message.payload);
+        break;
+      case "handle": {
+        // primary 轉來的 collect：回覆結果或錯誤訊息
+        const reply = { channel: CHANNEL, op: "reply", id: message.id };
+        try {
+          reply.result = await this._handle(message.type, message.payload);
+        } catch (error) {
+          reply.error = error.message;
+        }
+        this.channel.send(reply);
+        break;
+      }
+      case "collected": {
+        const pending = this.pending.get(message.id);
+        if (!pending) return;
+        clearTimeout(pending.timer);
+        this.pending.delete(message.id);
+        pending.resolve(message.results);
+        break;
+      }
+      default:
+        break;
+    }
+  }
+}
+
+/**
+ * primary 端：轉送 worker 之間的 bus 訊息
+ * @param {Object} clusterModule - node:cluster
+ */
+export function attachClusterPrimary(clusterModule = cluster) {
+  const collecting = new Map(); // 請求 id -> { requester, results, waiting, timer }
+
+  const finish = id => {
+    const request = collecting.get(id);
+    if (!request) return;
+    clearTimeout(request.timer);
+    collecting.delete(id);
+    if (request.requester.isConnected()) {
+      request.requester.send({
+        channel: CHANNEL,
+        op: "collected",
+        id,
+        results: request.results,
+      });
+    }
+  };
+
+  const onMessage = (worker, message) => {
+    if (message?.channel !== CHANNEL) return;
+    const workers = Object.values(clusterModule.workers).filter(target =>
+      target.isConnected(),
+    );
+
+    switch (message.op) {
+      case "collect": {
+        const request = {
+          requester: worker,
+          results: [],
+          waiting: new Set(workers.map(target => target.id)),
+          timer: setTimeout(() => finish(message.id), message.timeout),
+        };
+        collecting.set(message.id, request);
+        for (const target of workers) {
+          target.send({
+            channel: CHANNEL,
+            op: "handle",
+            id: message.id,
+            type: message.type,
+            payload: message.payload,
+          });
+        }
+        if (request.waiting.size === 0) finish(message.id);
+        break;
+      }
+      case "reply": {
+        const request = collecting.get(message.id);
+        if (!request || !request.waiting.delete(worker.id)) return;
+        if (message.error === undefined) {
+          request.results.push({
+            workerId: worker.id,
+            result: message.result,
+          });
+        }
+        if (request.waiting.size === 0) finish(message.id);
+        break;
+      }
+      case "send": {
+        const target = clusterModule.workers[message.to];
+        if (target?.isConnected()) {
+          target.send({
+            channel: CHANNEL,
+            op: "message",
+            type: message.type,
+            payload: message.payload,
+          });
+        }
+        break;
+      }
+      case "publish":
+        for (const target of workers) {
+          if (target.id === worker.id) continue;
+          target.send({
+            channel: CHANNEL,
+            op: "message",
+            type: message.type,
+            payload: message.payload,
+          });
+        }
+        break;
+      default:
+        break;
+    }
+  };
+
+  // worker 結束時不再等待它的回應
+  const onExit = worker => {
+    for (const [id, request] of collecting) {
+      if (request.waiting.delete(worker.id) && request.waiting.size === 0) {
+        finish(id);
+      }
+    }
+  };
+
+  clusterModule.on("message", onMessage);
+  clusterModule.on("exit", onExit);
+  return () => {
+    clusterModule.off("message", onMessage);
+    clusterModule.off("exit", onExit);
+  };
+}
+
+/**
+ * 通知 worker 開始優雅關閉（由 server.js 註冊 "shutdown" 處理函數）
+ */
+export function requestWorkerShutdown(worker) {
+  if (worker.isConnected()) {
+    worker.send({ channel: CHANNEL, op: "message", type: "shutdown" });
+  }
+}
+
+// 全域 bus 實例
+export const clusterBus = new ClusterBus();
+
+export default clusterBus;
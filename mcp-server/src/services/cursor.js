@@ -0,0 +1,78 @@
+/**
+ * 分頁游標工具
+ *
+ * 提供 keyset（游標）分頁使用的不透明游標編碼與解碼。
+ * 游標內容為排序鍵的值，以 base64url 編碼後交給呼叫端，
+ * 下一頁查詢時以「排序鍵小於上一頁最後一筆」取代 OFFSET，
+ * 深頁查詢不需再掃描並丟棄前面的資料列。
+ */
+
+const CURSOR_VERSION = 1;
+
+/**
+ * 編碼游標
+ * @param {string} scope - 游標適用範圍（例如 "mil:list"），避免不同查詢混用
+ * @param {Array} keys - 最後一筆資料的排序鍵值
+ * @returns {string} 不透明游標字串
+ */
+export function encodeCursor(scope, keys) {
+  const payload = JSON.stringify({ v: CURSOR_VERSION, s: scope, k: keys });
+  return Buffer.from(payload, "utf8").toString("base64url");
+}
+
+/**
+ * 解碼游標
+ * @param {string} cursor - 游標字串
+ * @param {string} scope - 預期的適用範圍
+ * @param {number} keyCount - 預期的排序鍵數量
+ * @returns {Array} 排序鍵值
+ */
+export function decodeCursor(cursor, scope, keyCount) {
+  let payload;
+  try {
+    payload = JSON.parse(Buffer.from(String(cursor), "base64url").toString("utf8"));
+  } catch (error) {
+    throw new Error("無效的分頁游標");
+  }
+
+  if (
+    !payload ||
+    payload.v !== CURSOR_VERSION ||
+    payload.s !== scope ||
+    !Array.isArray(payload.k) ||
+    payload.k.length !== keyCount
+  ) {
+    throw new Error("無效的分頁游標");
+  }
+
+  return payload.k;
+}
+
+/**
+ * 建構降冪 keyset 條件
+ *
+ * 產生 (a < ?) OR (a = ? AND b < ?) ... 形式的條件，
+ * 搭配 ORDER BY a DESC, b DESC 使用。
+ * @param {Array<string>} columns - 排序欄位（依序）
+ * @param {Array} values - 游標中的排序鍵值
+ * @param {string} direction - "DESC" 或 "ASC"
+ * @returns {{clause: string, params: Array}}
+ */
+export function buildKeysetCondition(columns, values, direction = "DESC") {
+  const operator = direction.toUpperCase() === "ASC" ? ">" : "<";
+  const branches = [];
+  const params = [];
+
+  columns.forEach((column, index) => {
+    const parts = [];
+    for (let i = 0; i < index; i++) {
+      parts.push(`${columns[i]} = ?`);
+      params.push(values[i]);
+    }
+    parts.push(`${column} ${operator} ?`);
+    params.push(values[index]);
+    branches.push(`(${parts.join(" AND ")})`);
+  });
+
+  return { clause: `(${branches.join(" OR ")})`, params };
+}
@@ -9,6 +9,7 @@ import mysql from "mysql2/promise";
 // import sql from "mssql"; // 已停用，MIL 現在使用 MySQL
 import config from "../config/config.js";
 import logger from "../config/logger.js";
+import { withSpan } from "./tracing.js";
 
 class DatabaseService {
   constructor() {
@@ -229,6 +230,31 @@ class DatabaseService {
     return pool;
   }
 
+  /**
+   * 取得各連接池的使用狀況（供監控指標使用）
+   * @returns {Object} dbName -> { max, total, idle, inUse, pending }
+   */
+  getPoolStats() {
+    const stats = {};
+
+    for (const [dbName, pool] of this.pools) {
+      // mysql2/promise 的連接池包裝了底層 Pool，連線清單為內部欄位
+      const core = pool.pool || pool;
+      const total = core._allConnections?.length ?? 0;
+      const idle = core._freeConnections?.length ?? 0;
+
+      stats[dbName] = {
+        max: core.config?.connectionLimit ?? 0,
+        total,
+        idle,
+        inUse: total - idle,
+        pending: core._connectionQueue?.length ?? 0,
+      };
+    }
+
+    return stats;
+  }
+
   /**
    * 執行 SQL 查詢
    */
@@ -237,7 +263,15 @@ class DatabaseService {
       const pool = this.getPool(dbName);
 
       // 所有資料庫現在都使用 MySQL 查詢
-      const [rows, fields] = await pool.execute(sql, params);
+      const [rows, fields] = await withSpan(
+        "db.query",
+        { database: dbName, statement: sql.replace(/\s+/g, " ").trim().substring(0, 200) },
+        async span => {
+          const result = await pool.execute(sql, params);
+          span?.setAttribute("rows", Array.isArray(result[0]) ? result[0].length : 0);
+          return result;
+        },
+      );
 
       logger.debug("MySQL 查詢執行成功", {
         database: dbName,
@@ -36,8 +36,28 @@
 
 import databaseService from "../database.js";
 import logger from "../../config/logger.js";
+import config from "../../config/config.js";
+import hrDirectory, { compareEmployees } from "./hr-directory.js";
+import employeeSearchIndex from "./name-search-index.js";
+import {
+  encodeCursor,
+  decodeCursor,
+  buildKeysetCondition,
+} from "../cursor.js";
+
+// keyset 分頁的排序鍵與游標範圍
+const EMPLOYEE_CURSOR_SCOPE = "hr:employee-list";
+const EMPLOYEE_KEYSET_COLUMNS = ["name", "employee_no"];
 
 class EmployeeService {
+  /**
+   * 是否由 HR 目錄快照回應查詢（HR_QUERY_PATH=sql 或快照未就緒時使用 SQL）
+   * @private
+   */
+  _useSnapshot() {
+    return config.hrQueryPath !== "sql" && hrDirectory.isReady();
+  }
+
   /**
    * 根據員工ID獲取員工資料
    * @param {string} employeeNo - 員工編號
@@ -59,6 +79,19 @@ class EmployeeService {
         fields,
       });
 
+      if (this._useSnapshot()) {
+        const employee = hrDirectory.getEmployee(employeeNo);
+        if (!employee) {
+          logger.warn(`Employee not found in directory snapshot: ${employeeNo}`, {
+            service: "EmployeeService",
+            method: "getEmployeeById",
+            employeeNo,
+          });
+          return null;
+        }
+        return this._formatEmployeeData(employee, includeDetails, fields);
+      }
+
       // 確保資料庫服務已初始化
       if (!databaseService.isInitialized) {
         await databaseService.initialize();
@@ -106,7 +139,7 @@ class EmployeeService {
       logger.error(`Error fetching employee data: ${error.message}`, {
         service: "EmployeeService",
         method: "getEmployeeById",
-        employeeId,
+        employeeNo,
         error: error.stack,
       });
       throw error;
@@ -225,6 +258,7 @@ class EmployeeService {
    * @param {number} page - 頁碼
    * @param {number} limit - 每頁筆數
    * @param {boolean} includeDetails - 是否包含詳細資訊
+   * @param {string} cursor - 上一頁回傳的 nextCursor（選填，提供時以 keyset 分頁取代 page）
    * @returns {Object} 員工列表資料
    */
   async getEmployeeList(
@@ -232,6 +266,7 @@ class EmployeeService {
     page = 1,
     limit = 20,
     includeDetails = false,
+    cursor = null,
   ) {
     try {
       logger.debug("Fetching employee list from database", {
@@ -242,6 +277,16 @@ class EmployeeService {
         limit,
       });
 
+      if (this._useSnapshot()) {
+        return this._getEmployeeListFromSnapshot(
+          filters,
+          page,
+          limit,
+          includeDetails,
+          cursor,
+        );
+      }
+
       // 確保資料庫服務已初始化
       if (!databaseService.isInitialized) {
         await databaseService.initialize();
@@ -262,6 +307,11 @@ class EmployeeService {
       const params = [];
 
       // 根據過濾條件增加 WHERE 條件
+      if (filters.name) {
+        query += " AND name LIKE ?";
+        params.push(`%${filters.name}%`);
+      }
+
       if (filters.department) {
         // 支援同時查詢部門代碼或名稱
         query += " AND (group_code = ? OR group_name LIKE ?)";
@@ -298,35 +348,43 @@ class EmployeeService {
       );
       const total = countResults[0]?.total || 0;
 
-      // 添加分頁 - 使用直接的數字而不是參數
-      const offset = (page - 1) * limit;
-      query += ` ORDER BY name LIMIT ${limit} OFFSET ${offset}`;
+      // 游標分頁：從上一頁最後一筆 (name, employee_no) 之後開始
+      const pageParams = [...params];
+      if (cursor) {
+        const keyset = buildKeysetCondition(
+          EMPLOYEE_KEYSET_COLUMNS,
+          decodeCursor(
+            cursor,
+            EMPLOYEE_CURSOR_SCOPE,
+            EMPLOYEE_KEYSET_COLUMNS.length,
+          ),
+          "ASC",
+        );
+        query += ` AND ${keyset.clause}`;
+        pageParams.push(...keyset.params);
+      }
+
+      // 添加分頁 - 使用直接的數字而不是參數，多取一筆判斷是否有下一頁
+      const offset = cursor ? 0 : (page - 1) * limit;
+      query += ` ORDER BY name, employee_no LIMIT ${Number(limit) + 1} OFFSET ${offset}`;
 
       // 執行查詢
-      const results = await databaseService.query("qms", query, params);
+      const rows = await databaseService.query("qms", query, pageParams);
+      const hasMore = rows.length > limit;
+      const results = hasMore ? rows.slice(0, limit) : rows;
+      const lastRow = results[results.length - 1];
+      const nextCursor =
+        hasMore && lastRow
+          ? encodeCursor(EMPLOYEE_CURSOR_SCOPE, [
+              lastRow.name,
+              lastRow.employee_no,
+            ])
+          : null;
 
       // 格式化結果
-      const employees = results.map(employee => {
-        const formattedEmployee = {
-          employeeNo: employee.employee_no,
-          name: employee.name,
-          groupName: employee.group_name,
-          groupCode: employee.group_code,
-          titleName: employee.title_name,
-          isActive: !employee.is_suspended,
-        };
-
-        // 如果需要詳細資訊，增加更多欄位
-        if (includeDetails) {
-          formattedEmployee.details = {
-            email: employee.email,
-            nickName: employee.nickname,
-            userType: employee.user_type,
-          };
-        }
-
-        return formattedEmployee;
-      });
+      const employees = results.map(employee =>
+        this._formatListEmployee(employee, includeDetails),
+      );
 
       logger.info(
         `Employee list retrieved successfully: ${employees.length} employees`,
@@ -341,10 +399,12 @@ class EmployeeService {
       return {
         employees,
         pagination: {
-          page,
+          page: cursor ? null : page,
           limit,
           total,
           totalPages: Math.ceil(total / limit),
+          hasMore,
+          nextCursor,
         },
       };
     } catch (error) {
@@ -358,6 +418,117 @@ class EmployeeService {
     }
   }
 
+  /**
+   * 格式化列表中的單筆員工資料
+   * @private
+   */
+  _formatListEmployee(employee, includeDetails) {
+    const formattedEmployee = {
+      employeeNo: employee.employee_no,
+      name: employee.name,
+      groupName: employee.group_name,
+      groupCode: employee.group_code,
+      titleName: employee.title_name,
+      isActive: !employee.is_suspended,
+    };
+
+    // 如果需要詳細資訊，增加更多欄位
+    if (includeDetails) {
+      formattedEmployee.details = {
+        email: employee.email,
+        nickName: employee.nickname,
+        userType: employee.user_type,
+      };
+    }
+
+    return formattedEmployee;
+  }
+
+  /**
+   * 由 HR 目錄快照取得員工列表（分頁與游標規則與 SQL 版本一致）
+   * @private
+   */
+  _getEmployeeListFromSnapshot(filters, page, limit, includeDetails, cursor) {
+    const matched = hrDirectory.findEmployees(filters);
+    const pageSize = Number(limit);
+
+    let start = (page - 1) * pageSize;
+    if (cursor) {
+      const [name, employeeNo] = decodeCursor(
+        cursor,
+        EMPLOYEE_CURSOR_SCOPE,
+        EMPLOYEE_KEYSET_COLUMNS.length,
+      );
+      const position = matched.findIndex(
+        row => compareEmployees(row, { name, employee_no: employeeNo }) > 0,
+      );
+      start = position === -1 ? matched.length : position;
+    }
+
+    const results = matched.slice(start, start + pageSize);
+    const hasMore = start + pageSize < matched.length;
+    const lastRow = results[results.length - 1];
+
+    return {
+      employees: results.map(employee =>
+        this._formatListEmployee(employee, includeDetails),
+      ),
+      pagination: {
+        page: cursor ? null : page,
+        limit,
+        total: matched.length,
+        totalPages: Math.ceil(matched.length / pageSize),
+        hasMore,
+        nextCursor:
+          hasMore && lastRow
+            ? encodeCursor(EMPLOYEE_CURSOR_SCOPE, [
+                lastRow.name,
+                lastRow.employee_no,
+              ])
+            : null,
+      },
+      source: "snapshot",
+    };
+  }
+
+  /**
+   * 以模糊搜尋索引查詢員工（容錯、依相關度排序）
+   *
+   * 有姓名關鍵字時比對姓名、別名、帳號、拼音與部門名稱並依分數排序；
+   * 只有部門或狀態條件時依姓名排序返回。
+   * @param {Object} filters - 過濾條件 (name, department, titleName, status)
+   * @param {number} limit - 最多返回幾筆結果
+   * @returns {Object} 查詢結果
+   */
+  searchEmployeesFuzzy(filters = {}, limit = 5) {
+    const { name, ...otherFilters } = filters;
+
+    if (!name) {
+      const employees = hrDirectory
+        .findEmployees(otherFilters)
+        .slice(0, limit)
+        .map(employee => this._formatListEmployee(employee, false));
+      return { employees, count: employees.length };
+    }
+
+    const predicate = hrDirectory.createFilter(otherFilters);
+    const matches = employeeSearchIndex.search(name, {
+      limit,
+      filter: employeeNo => {
+        const employee = hrDirectory.employees.get(employeeNo);
+        return Boolean(employee) && predicate(employee);
+      },
+    });
+
+    const employees = matches.map(match => ({
+      ...this._formatListEmployee(hrDirectory.employees.get(match.id), false),
+      matchScore: match.score,
+      matchedField: match.field,
+    }));
+
+    return { employees, count: employees.length };
+  }
+
   /**
    * 透過姓名或部門查詢員工
    * @param {Object} filters - 過濾條件 (name, department, status)
@@ -373,6 +544,10 @@ class EmployeeService {
         limit,
       });
 
+      if (this._useSnapshot()) {
+        return this.searchEmployeesFuzzy(filters, limit);
+      }
+
       // 確保資料庫服務已初始化
       if (!databaseService.isInitialized) {
         await databaseService.initialize();
@@ -462,6 +637,25 @@ class EmployeeService {
         status,
       });
 
+      if (this._useSnapshot()) {
+        const counts = hrDirectory.getCounts();
+        if (status === "all") {
+          return {
+            total: counts.all.total,
+            activeCount: counts.active.total,
+            inactiveCount: counts.inactive.total,
+            maleCount: counts.all.male,
+            femaleCount: counts.all.female,
+          };
+        }
+        const bucket = counts[status] || counts.all;
+        return {
+          total: bucket.total,
+          maleCount: bucket.male,
+          femaleCount: bucket.female,
+        };
+      }
+
       // 確保資料庫服務已初始化
       if (!databaseService.isInitialized) {
         await databaseService.initialize();
@@ -0,0 +1,465 @@
+/**
+ * HR 目錄快照服務
+ *
+ * 啟動時將 org_employee 載入記憶體，並建立索引：
+ * - employee_no → 員工資料
+ * - group_code、部門名稱（小寫）→ 員工編號集合（部門篩選只檢查相符部門的員工）
+ * - 依 (name, employee_no) 排序的員工陣列
+ * 姓名的模糊與拼音查詢由 name-search-index.js 的搜尋索引負責。
+ *
+ * 之後定期以 updated_at 增量更新，並比對資料表指紋（筆數 + CRC32）：
+ * 快照保存每筆員工的 CRC32，套用增量後以快照重算指紋與資料表比對，
+ * 不一致（刪除、未更新 updated_at 的異動）時改為完整重新載入。
+ */
+
+import databaseService from "../database.js";
+import logger from "../../config/logger.js";
+
+// 快照保存的員工欄位（涵蓋 EmployeeService 所有查詢需要的欄位）
+const EMPLOYEE_COLUMNS = [
+  "name",
+  "nickname",
+  "email",
+  "is_suspended",
+  "last_suspended_date",
+  "user_type",
+  "employee_no",
+  "domain",
+  "account",
+  "lang",
+  "address",
+  "arrive_date",
+  "leave_date",
+  "birthday",
+  "sex",
+  "telphone",
+  "ext_num",
+  "mobile",
+  "title_name",
+  "title_rank",
+  "group_name",
+  "group_code",
+  "updated_at",
+];
+
+// 單筆員工的 CRC32，資料表指紋為所有列的 BIT_XOR
+const ROW_CHECKSUM = `CRC32(CONCAT_WS('|', ${EMPLOYEE_COLUMNS.join(", ")}))`;
+// 快照只保存有員工編號的資料，載入與指紋都只計算這些列，兩邊的筆數才會一致
+const HAS_EMPLOYEE_NO = "employee_no IS NOT NULL AND employee_no <> ''";
+
+/**
+ * 將 MySQL BIT(1) 欄位（mysql2 回傳 Buffer）轉為 0/1
+ */
+function toBit(value) {
+  if (value === null || value === undefined) return null;
+  if (Buffer.isBuffer(value)) return value[0] ? 1 : 0;
+  return value ? 1 : 0;
+}
+
+/**
+ * 部門名稱索引的鍵（比對時不分大小寫）
+ */
+function groupNameKey(row) {
+  return (row.group_name || "").toLowerCase();
+}
+
+function addToIndex(index, key, employeeNo) {
+  if (!index.has(key)) index.set(key, new Set());
+  index.get(key).add(employeeNo);
+}
+
+function removeFromIndex(index, key, employeeNo) {
+  const employeeNos = index.get(key);
+  if (!employeeNos) return;
+  employeeNos.delete(employeeNo);
+  if (employeeNos.size === 0) index.delete(key);
+}
+
+/**
+ * 以與 SQL 相同的規則比較姓名（排序鍵：name, employee_no）
+ */
+export function compareEmployees(a, b) {
+  if (a.name !== b.name) return a.name < b.name ? -1 : 1;
+  if (a.employee_no === b.employee_no) return 0;
+  return a.employee_no < b.employee_no ? -1 : 1;
+}
+
+class HRDirectoryService {
+  constructor() {
+    this.dbName = "qms";
+    this.employees = new Map();
+    this.rowChecksums = new Map();
+    this.byGroupCode = new Map();
+    this.byGroupName = new Map();
+    this.sortedEmployees = [];
+    this.counts = null;
+
+    this.ready = false;
+    this.loading = null;
+    this.watermark = null;
+    this.checksum = null;
+    this.refreshTimer = null;
+    this.listeners = new Set();
+    this.stats = {
+      fullLoads: 0,
+      deltaRefreshes: 0,
+      deltaRows: 0,
+      lastLoadedAt: null,
+      lastRefreshAt: null,
+      lastLoadMs: 0,
+    };
+  }
+
+  /**
+   * 初始化：完整載入並啟動定期增量更新
+   * @param {Object} options
+   * @param {number} options.refreshInterval - 增量更新間隔（毫秒），0 表示不啟用
+   */
+  async initialize({ refreshInterval = 0 } = {}) {
+    if (!databaseService.isDatabaseAvailable(this.dbName)) {
+      logger.warn("QMS 資料庫不可用，HR 目錄快照未載入，將使用 SQL 查詢");
+      return false;
+    }
+
+    await this.reload();
+
+    if (refreshInterval > 0 && !this.refreshTimer) {
+      this.refreshTimer = setInterval(() => {
+        this.refresh().catch(error => {
+          logger.warn("HR 目錄快照增量更新失敗", { error: error.message });
+        });
+      }, refreshInterval);
+      if (this.refreshTimer.unref) {
+        this.refreshTimer.unref();
+      }
+    }
+
+    return true;
+  }
+
+  /**
+   * 快照是否可用
+   */
+  isReady() {
+    return this.ready;
+  }
+
+  /**
+   * 完整重新載入員工與部門
+   */
+  async reload() {
+    if (this.loading) return this.loading;
+
+    this.loading = (async () => {
+      const started = Date.now();
+      try {
+        const [employeeRows, checksum] = await Promise.all([
+          databaseService.query(
+            this.dbName,
+            `SELECT ${EMPLOYEE_COLUMNS.join(", ")}, ${ROW_CHECKSUM} as __crc FROM org_employee WHERE ${HAS_EMPLOYEE_NO}`,
+            [],
+          ),
+          this._fetchChecksum(),
+        ]);
+
+        this.employees = new Map();
+        this.rowChecksums = new Map();
+        this.byGroupCode = new Map();
+        this.byGroupName = new Map();
+        this.watermark = null;
+        for (const row of employeeRows) {
+          this._upsertEmployee(row);
+        }
+        this._rebuildSortedIndex();
+
+        this.checksum = checksum;
+        this.ready = true;
+        this.stats.fullLoads++;
+        this.stats.lastLoadedAt = new Date().toISOString();
+        this.stats.lastLoadMs = Date.now() - started;
+
+        logger.info("HR 目錄快照載入完成", {
+          employees: this.employees.size,
+          durationMs: this.stats.lastLoadMs,
+        });
+
+        this._notify({ type: "reload" });
+      } finally {
+        this.loading = null;
+      }
+    })();
+
+    return this.loading;
+  }
+
+  /**
+   * 增量更新：以 updated_at 水位取得異動資料，套用後快照指紋與資料表不符時完整重新載入
+   */
+  async refresh() {
+    if (!this.ready) return this.reload();
+
+    const checksum = await this._fetchChecksum();
+    if (checksum === this.checksum) {
+      this.stats.lastRefreshAt = new Date().toISOString();
+      return { changed: false };
+    }
+
+    const changedRows = this.watermark
+      ? await databaseService.query(
+          this.dbName,
+          `SELECT ${EMPLOYEE_COLUMNS.join(", ")}, ${ROW_CHECKSUM} as __crc FROM org_employee WHERE ${HAS_EMPLOYEE_NO} AND updated_at >= ?`,
+          [this.watermark],
+        )
+      : [];
+
+    for (const row of changedRows) {
+      this._upsertEmployee(row);
+    }
+
+    // 有刪除或異動未更新 updated_at 時，增量無法補齊，快照重算的指紋會與資料表不同；
+    // 查詢期間又有新異動時也會不同，一律改為完整載入
+    const current = await this._fetchChecksum();
+    if (this._snapshotChecksum() !== current) {
+      await this.reload();
+      return { changed: true, fullReload: true };
+    }
+
+    this._rebuildSortedIndex();
+    this.checksum = current;
+    this.stats.deltaRefreshes++;
+    this.stats.deltaRows += changedRows.length;
+    this.stats.lastRefreshAt = new Date().toISOString();
+
+    this._notify({
+      type: "delta",
+      employeeNos: changedRows.map(row => row.employee_no).filter(Boolean),
+    });
+
+    return { changed: true, fullReload: false, rows: changedRows.length };
+  }
+
+  /**
+   * 註冊快照異動監聽器（例如搜尋索引需同步更新）
+   * @param {Function} listener - 接收 {type, employeeNos} 的函數
+   * @returns {Function} 取消註冊的函數
+   */
+  onChange(listener) {
+    this.listeners.add(listener);
+    return () => this.listeners.delete(listener);
+  }
+
+  /**
+   * 停止定期更新
+   */
+  stop() {
+    if (this.refreshTimer) {
+      clearInterval(this.refreshTimer);
+      this.refreshTimer = null;
+    }
+  }
+
+  /**
+   * 依員工編號取得員工原始資料
+   * @param {string} employeeNo - 員工編號
+   */
+  getEmployee(employeeNo) {
+    const row = this.employees.get(employeeNo);
+    return row && this.isVisible(row) ? row : null;
+  }
+
+  /**
+   * 依條件篩選員工，規則與 EmployeeService 的 SQL 查詢一致
+   * 有部門條件時只檢查部門索引中相符的員工，不逐一掃描全部員工
+   * @param {Object} filters - name, department, titleName/jobTitle, status
+   * @returns {Array} 依 (name, employee_no) 排序的員工原始資料
+   */
+  findEmployees(filters = {}) {
+    const predicate = this.createFilter(filters);
+    if (!filters.department) {
+      return this.sortedEmployees.filter(predicate);
+    }
+
+    return [...this.findDepartmentMembers(filters.department)]
+      .map(employeeNo => this.employees.get(employeeNo))
+      .filter(row => row && predicate(row))
+      .sort(compareEmployees);
+  }
+
+  /**
+   * 部門代碼相符（不分大小寫）或部門名稱包含關鍵字的員工編號
+   * @param {string} department - 部門代碼或名稱關鍵字
+   * @returns {Set<string>}
+   */
+  findDepartmentMembers(department) {
+    const term = String(department).toLowerCase();
+    const members = new Set();
+    for (const [groupCode, employeeNos] of this.byGroupCode) {
+      if ((groupCode || "").toLowerCase() === term) {
+        employeeNos.forEach(employeeNo => members.add(employeeNo));
+      }
+    }
+    for (const [groupName, employeeNos] of this.byGroupName) {
+      if (groupName.includes(term)) {
+        employeeNos.forEach(employeeNo => members.add(employeeNo));
+      }
+    }
+    return members;
+  }
+
+  /**
+   * 建立員工篩選函數（name 為包含比對，department 比對代碼或名稱）
+   * @param {Object} filters - name, department, titleName/jobTitle, status
+   * @returns {Function} (row) => boolean
+   */
+  createFilter(filters = {}) {
+    const department = filters.department
+      ? String(filters.department).toLowerCase()
+      : null;
+    const title = filters.titleName || filters.jobTitle;
+    const titleFilter = title ? String(title).toLowerCase() : null;
+    const nameFilter = filters.name ? String(filters.name).toLowerCase() : null;
+
+    return row => {
+      if (!this.isVisible(row)) {
+        return false;
+      }
+      if (nameFilter && !row.name.toLowerCase().includes(nameFilter)) {
+        return false;
+      }
+      if (
+        department &&
+        (row.group_code || "").toLowerCase() !== department &&
+        !(row.group_name || "").toLowerCase().includes(department)
+      ) {
+        return false;
+      }
+      if (
+        titleFilter &&
+        !(row.title_name || "").toLowerCase().includes(titleFilter)
+      ) {
+        return false;
+      }
+      return this._matchesStatus(row, filters.status);
+    };
+  }
+
+  /**
+   * 員工統計（快照變更時重新計算一次）
+   */
+  getCounts() {
+    if (!this.counts) {
+      const counts = {
+        all: { total: 0, male: 0, female: 0 },
+        active: { total: 0, male: 0, female: 0 },
+        inactive: { total: 0, male: 0, female: 0 },
+      };
+      for (const row of this.sortedEmployees) {
+        const bucket = row.is_suspended === 1 ? counts.inactive : counts.active;
+        for (const target of [counts.all, bucket]) {
+          target.total++;
+          if (row.sex === "M") target.male++;
+          if (row.sex === "F") target.female++;
+        }
+      }
+      this.counts = counts;
+    }
+    return this.counts;
+  }
+
+  /**
+   * 是否為查詢可見的員工（與 SQL 的 name NOT LIKE '%test%' 一致）
+   */
+  isVisible(row) {
+    return (
+      typeof row.name === "string" && !row.name.toLowerCase().includes("test")
+    );
+  }
+
+  /**
+   * 取得快照統計
+   */
+  getStats() {
+    return {
+      ready: this.ready,
+      employees: this.employees.size,
+      watermark: this.watermark,
+      ...this.stats,
+    };
+  }
+
+  _matchesStatus(row, status) {
+    if (!status || status === "all") return true;
+    if (status === "active") return row.is_suspended !== 1;
+    if (status === "inactive") return row.is_suspended === 1;
+    return true;
+  }
+
+  _upsertEmployee(rawRow) {
+    if (!rawRow.employee_no) return;
+
+    const { __crc, ...fields } = rawRow;
+    const row = { ...fields, is_suspended: toBit(fields.is_suspended) };
+    this.rowChecksums.set(row.employee_no, Number(__crc));
+    const previous = this.employees.get(row.employee_no);
+    if (previous) {
+      removeFromIndex(this.byGroupCode, previous.group_code, row.employee_no);
+      removeFromIndex(
+        this.byGroupName,
+        groupNameKey(previous),
+        row.employee_no,
+      );
+    }
+
+    this.employees.set(row.employee_no, row);
+    addToIndex(this.byGroupCode, row.group_code, row.employee_no);
+    addToIndex(this.byGroupName, groupNameKey(row), row.employee_no);
+
+    if (row.updated_at && (!this.watermark || row.updated_at > this.watermark)) {
+      this.watermark = row.updated_at;
+    }
+  }
+
+  _rebuildSortedIndex() {
+    this.sortedEmployees = [...this.employees.values()]
+      .filter(row => this.isVisible(row))
+      .sort(compareEmployees);
+    this.counts = null;
+  }
+
+  async _fetchChecksum() {
+    const result = await databaseService.query(
+      this.dbName,
+      `SELECT COUNT(*) as total,
+        BIT_XOR(${ROW_CHECKSUM}) as checksum
+       FROM org_employee WHERE ${HAS_EMPLOYEE_NO}`,
+      [],
+    );
+    const row = result[0] || {};
+    return `${Number(row.total)}:${Number(row.checksum)}`;
+  }
+
+  /**
+   * 以快照保存的每筆 CRC32 重算指紋，格式與 _fetchChecksum 相同
+   */
+  _snapshotChecksum() {
+    let checksum = 0;
+    for (const crc of this.rowChecksums.values()) {
+      checksum = (checksum ^ crc) >>> 0;
+    }
+    return `${this.rowChecksums.size}:${checksum}`;
+  }
+
+  _notify(event) {
+    for (const listener of this.listeners) {
+      try {
+        listener(event);
+      } catch (error) {
+        logger.warn("HR 目錄快照監聽器執行失敗", { error: error.message });
+      }
+    }
+  }
+}
+
+// 導出單例實例
+const hrDirectory = new HRDirectoryService();
+export default hrDirectory;
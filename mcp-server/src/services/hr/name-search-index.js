@@ -0,0 +1,404 @@
+/**
+ * 員工姓名模糊搜尋索引
+ *
+ * 以字元 n-gram 建立倒排索引，涵蓋姓名、別名、帳號與部門名稱：
+ * - 中日韓文字使用單字與雙字 n-gram，可容忍一個錯字（例如「張曉明」找到「張小明」）
+ * - 英數字使用三字 n-gram（前後補空白），可容忍拼字錯誤
+ * - 可選的拼音鍵：安裝 pinyin-pro（optionalDependencies）時自動加入漢語拼音全拼與首字母
+ *   （例如 zhangxiaoming、zxm）；目前只支援漢語拼音，不建立注音符號鍵
+ *
+ * 結果依 n-gram 重疊度（Dice 係數）、欄位權重與完全 / 前綴符合加分排序，
+ * 並支援單筆 upsert / remove，可隨 HR 目錄快照增量更新。
+ */
+
+import logger from "../../config/logger.js";
+import hrDirectory from "./hr-directory.js";
+
+// 各欄位的權重
+const FIELD_WEIGHTS = {
+  name: 1.0,
+  nickname: 0.8,
+  account: 0.7,
+  phonetic: 0.6,
+  department: 0.4,
+};
+
+// 個人欄位（每位員工各自建立 n-gram）；部門名稱重複度高，改以部門為單位建立索引
+const PERSONAL_FIELDS = ["name", "nickname", "account", "phonetic"];
+
+// 低於此分數的結果不返回
+const MIN_SCORE = 0.2;
+
+// 命中文件數超過此比例（且超過下限）的 n-gram 只用於計分，不用於產生候選
+const COMMON_GRAM_RATIO = 0.02;
+const COMMON_GRAM_MIN = 1000;
+
+const CJK_PATTERN = /[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af]/;
+
+/**
+ * 正規化文字：全形轉半形、轉小寫、移除空白與標點
+ * @param {string} text
+ */
+export function normalizeText(text) {
+  if (text === null || text === undefined) return "";
+  return String(text)
+    .normalize("NFKC")
+    .toLowerCase()
+    .replace(/[\s\p{P}\p{S}]+/gu, "");
+}
+
+/**
+ * 產生文字的 n-gram 集合
+ * @param {string} text - 已正規化文字
+ * @returns {Set<string>}
+ */
+export function generateGrams(text) {
+  const grams = new Set();
+  if (!text) return grams;
+
+  const chars = [...text];
+  if (CJK_PATTERN.test(text)) {
+    for (let i = 0; i < chars.length; i++) {
+      grams.add(chars[i]);
+      if (i + 1 < chars.length) grams.add(chars[i] + chars[i + 1]);
+    }
+    return grams;
+  }
+
+  const padded = [" ", ...chars, " "];
+  for (let i = 0; i + 3 <= padded.length; i++) {
+    grams.add(padded.slice(i, i + 3).join(""));
+  }
+  if (chars.length <= 2) grams.add(text);
+  return grams;
+}
+
+/**
+ * 計算單一欄位的分數：Dice 係數加上完全 / 前綴 / 包含符合加分，再乘上欄位權重
+ */
+function scoreField(field, shared, queryGramCount, valueGramCount, value, query) {
+  const dice = (2 * shared) / (queryGramCount + valueGramCount);
+  let bonus = 0;
+  if (value === query) bonus = 0.5;
+  else if (value.startsWith(query)) bonus = 0.25;
+  else if (value.includes(query)) bonus = 0.1;
+  return (dice + bonus) * FIELD_WEIGHTS[field];
+}
+
+export class NameSearchIndex {
+  /**
+   * @param {Object} options
+   * @param {Function} options.phoneticKeys - 由文字產生拼音鍵的函數（選填）
+   */
+  constructor(options = {}) {
+    this.phoneticKeys = options.phoneticKeys || null;
+    this.documents = new Map();
+    // n-gram → Map<文件 id, 欄位索引陣列>
+    this.postings = new Map();
+    // 部門名稱 → { grams, members }；n-gram → Set<部門名稱>
+    this.departments = new Map();
+    this.departmentPostings = new Map();
+  }
+
+  /**
+   * 設定拼音鍵產生函數（之後新增或更新的文件才會套用）
+   * @param {Function} fn - (text) => string[]
+   */
+  setPhoneticProvider(fn) {
+    this.phoneticKeys = fn;
+  }
+
+  /**
+   * 新增或更新文件
+   * @param {string} id - 文件識別碼（員工編號）
+   * @param {Object} fields - { name, nickname, account, department }
+   */
+  upsert(id, fields) {
+    if (this.documents.has(id)) this.remove(id);
+
+    const values = {
+      name: normalizeText(fields.name),
+      nickname: normalizeText(fields.nickname),
+      account: normalizeText(fields.account),
+      phonetic: this.phoneticKeys
+        ? this.phoneticKeys(fields.name || "")
+            .map(normalizeText)
+            .filter(Boolean)
+            .join(" ")
+        : "",
+    };
+
+    const gramFields = new Map();
+    const gramCounts = [];
+    PERSONAL_FIELDS.forEach((field, fieldIndex) => {
+      const value = values[field];
+      const grams = !value
+        ? new Set()
+        : field === "phonetic"
+          ? new Set(value.split(" ").flatMap(key => [...generateGrams(key)]))
+          : generateGrams(value);
+      gramCounts[fieldIndex] = grams.size;
+      for (const gram of grams) {
+        if (!gramFields.has(gram)) gramFields.set(gram, []);
+        gramFields.get(gram).push(fieldIndex);
+      }
+    });
+
+    for (const [gram, fieldIndexes] of gramFields) {
+      if (!this.postings.has(gram)) this.postings.set(gram, new Map());
+      this.postings.get(gram).set(id, fieldIndexes);
+    }
+
+    const department = normalizeText(fields.department);
+    if (department) this._addDepartmentMember(department, id);
+
+    this.documents.set(id, {
+      id,
+      values,
+      department,
+      grams: [...gramFields.keys()],
+      gramCounts,
+    });
+  }
+
+  /**
+   * 移除文件
+   * @param {string} id - 文件識別碼
+   */
+  remove(id) {
+    const document = this.documents.get(id);
+    if (!document) return;
+
+    for (const gram of document.grams) {
+      const posting = this.postings.get(gram);
+      if (!posting) continue;
+      posting.delete(id);
+      if (posting.size === 0) this.postings.delete(gram);
+    }
+    if (document.department) {
+      this._removeDepartmentMember(document.department, id);
+    }
+    this.documents.delete(id);
+  }
+
+  /**
+   * 清空索引
+   */
+  clear() {
+    this.documents.clear();
+    this.postings.clear();
+    this.departments.clear();
+    this.departmentPostings.clear();
+  }
+
+  /**
+   * 搜尋
+   * @param {string} query - 查詢文字
+   * @param {Object} options
+   * @param {number} options.limit - 最多返回筆數
+   * @param {Function} options.filter - (id) => boolean，排除不符條件的文件
+   * @returns {Array<{id: string, score: number, field: string}>}
+   */
+  search(query, { limit = 20, filter = null } = {}) {
+    const normalizedQuery = normalizeText(query);
+    const queryGrams = generateGrams(normalizedQuery);
+    if (queryGrams.size === 0) return [];
+
+    const departmentScores = this._scoreDepartments(normalizedQuery, queryGrams);
+    const scored = new Map();
+
+    // 個人欄位：以較少見的 n-gram 產生候選，再以全部 n-gram 計分
+    const gramPostings = [...queryGrams]
+      .map(gram => this.postings.get(gram))
+      .filter(Boolean)
+      .sort((a, b) => a.size - b.size);
+    const commonLimit = Math.max(
+      COMMON_GRAM_MIN,
+      this.documents.size * COMMON_GRAM_RATIO,
+    );
+    const selective = gramPostings.filter(posting => posting.size <= commonLimit);
+    const candidateSources = selective.length > 0 ? selective : gramPostings.slice(0, 1);
+
+    const candidates = new Set();
+    for (const posting of candidateSources) {
+      for (const id of posting.keys()) candidates.add(id);
+    }
+
+    for (const id of candidates) {
+      if (filter && !filter(id)) continue;
+
+      const document = this.documents.get(id);
+      const shared = [0, 0, 0, 0];
+      for (const posting of gramPostings) {
+        const fieldIndexes = posting.get(id);
+        if (!fieldIndexes) continue;
+        for (const fieldIndex of fieldIndexes) shared[fieldIndex]++;
+      }
+
+      let best = { score: departmentScores.get(document.department) || 0, field: "department" };
+      PERSONAL_FIELDS.forEach((field, fieldIndex) => {
+        if (!shared[fieldIndex]) return;
+        const score = scoreField(
+          field,
+          shared[fieldIndex],
+          queryGrams.size,
+          document.gramCounts[fieldIndex],
+          document.values[field],
+          normalizedQuery,
+        );
+        if (score > best.score) best = { score, field };
+      });
+
+      if (best.score >= MIN_SCORE) scored.set(id, best);
+    }
+
+    // 部門：同部門成員分數相同，依部門分數由高到低補足 limit 筆
+    const rankedDepartments = [...departmentScores.entries()]
+      .filter(([, score]) => score >= MIN_SCORE)
+      .sort((a, b) => b[1] - a[1]);
+    for (const [department, score] of rankedDepartments) {
+      let added = 0;
+      for (const id of this.departments.get(department).members) {
+        if (added >= limit) break;
+        if (scored.has(id) || (filter && !filter(id))) continue;
+        scored.set(id, { score, field: "department" });
+        added++;
+      }
+    }
+
+    return [...scored.entries()]
+      .map(([id, best]) => ({
+        id,
+        score: Math.round(best.score * 1000) / 1000,
+        field: best.field,
+      }))
+      .sort((a, b) => b.score - a.score || (a.id < b.id ? -1 : 1))
+      .slice(0, limit);
+  }
+
+  /**
+   * 取得索引統計
+   */
+  getStats() {
+    return {
+      documents: this.documents.size,
+      grams: this.postings.size,
+      departments: this.departments.size,
+      phonetic: Boolean(this.phoneticKeys),
+    };
+  }
+
+  // 計算所有命中部門的分數
+  _scoreDepartments(normalizedQuery, queryGrams) {
+    const shared = new Map();
+    for (const gram of queryGrams) {
+      const names = this.departmentPostings.get(gram);
+      if (!names) continue;
+      for (const name of names) shared.set(name, (shared.get(name) || 0) + 1);
+    }
+
+    const scores = new Map();
+    for (const [name, count] of shared) {
+      scores.set(
+        name,
+        scoreField(
+          "department",
+          count,
+          queryGrams.size,
+          this.departments.get(name).grams.size,
+          name,
+          normalizedQuery,
+        ),
+      );
+    }
+    return scores;
+  }
+
+  _addDepartmentMember(name, id) {
+    let department = this.departments.get(name);
+    if (!department) {
+      department = { grams: generateGrams(name), members: new Set() };
+      this.departments.set(name, department);
+      for (const gram of department.grams) {
+        if (!this.departmentPostings.has(gram)) {
+          this.departmentPostings.set(gram, new Set());
+        }
+        this.departmentPostings.get(gram).add(name);
+      }
+    }
+    department.members.add(id);
+  }
+
+  _removeDepartmentMember(name, id) {
+    const department = this.departments.get(name);
+    if (!department) return;
+    department.members.delete(id);
+    if (department.members.size > 0) return;
+
+    for (const gram of department.grams) {
+      const names = this.departmentPostings.get(gram);
+      names?.delete(name);
+      if (names?.size === 0) this.departmentPostings.delete(gram);
+    }
+    this.departments.delete(name);
+  }
+}
+
+/**
+ * 嘗試載入 pinyin-pro 作為拼音鍵來源（optionalDependencies，安裝失敗或未安裝時略過）
+ * @returns {Promise<Function|null>}
+ */
+export async function loadPinyinProvider() {
+  try {
+    const { pinyin } = await import("pinyin-pro");
+    return text => {
+      const syllables = pinyin(text, { toneType: "none", type: "array" });
+      return [syllables.join(""), syllables.map(s => s[0]).join("")];
+    };
+  } catch (error) {
+    logger.debug("未安裝 pinyin-pro，員工搜尋索引不建立拼音鍵");
+    return null;
+  }
+}
+
+// 員工搜尋索引單例，隨 HR 目錄快照同步
+export const employeeSearchIndex = new NameSearchIndex();
+
+const indexEmployee = employee => {
+  if (!hrDirectory.isVisible(employee)) {
+    employeeSearchIndex.remove(employee.employee_no);
+    return;
+  }
+  employeeSearchIndex.upsert(employee.employee_no, {
+    name: employee.name,
+    nickname: employee.nickname,
+    account: employee.account,
+    department: employee.group_name,
+  });
+};
+
+hrDirectory.onChange(event => {
+  if (event.type === "reload") {
+    employeeSearchIndex.clear();
+    for (const employee of hrDirectory.employees.values()) {
+      indexEmployee(employee);
+    }
+  } else if (event.type === "delta") {
+    for (const employeeNo of event.employeeNos) {
+      const employee = hrDirectory.employees.get(employeeNo);
+      if (employee) indexEmployee(employee);
+      else employeeSearchIndex.remove(employeeNo);
+    }
+  }
+});
+
+loadPinyinProvider().then(provider => {
+  if (!provider) return;
+  employeeSearchIndex.setPhoneticProvider(provider);
+  // 快照若已先載入，重建一次以補上拼音鍵
+  for (const employee of hrDirectory.employees.values()) {
+    indexEmployee(employee);
+  }
+});
+
+export default employeeSearchIndex;
@@ -0,0 +1,247 @@
+/**
+ * Prometheus 監控指標
+ *
+ * 以 Prometheus 文字格式（text/plain; version=0.0.4）輸出伺服器指標，供 GET /metrics 抓取。
+ * 事件型指標（工具延遲直方圖）在發生時累加；狀態型指標（快取、連接池、SSE）
+ * 在抓取時由 collector 從既有模組讀取，不額外增加請求路徑上的成本。
+ */
+
+// 工具延遲直方圖的桶上限（秒）
+export const DEFAULT_LATENCY_BUCKETS = [
+  0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30,
+];
+
+const METRIC_NAME_PATTERN = /^[a-zA-Z_:][a-zA-Z0-9_:]*$/;
+
+/**
+ * 跳脫標籤值（反斜線、雙引號、換行）
+ */
+function escapeLabelValue(value) {
+  return String(value)
+    .replace(/\\/g, "\\\\")
+    .replace(/"/g, '\\"')
+    .replace(/\n/g, "\\n");
+}
+
+/**
+ * 格式化數值（Prometheus 使用 +Inf / -Inf / NaN）
+ */
+function formatValue(value) {
+  if (Number.isNaN(value)) return "NaN";
+  if (value === Infinity) return "+Inf";
+  if (value === -Infinity) return "-Inf";
+  return String(value);
+}
+
+/**
+ * 格式化標籤集合
+ */
+function formatLabels(labels) {
+  const entries = Object.entries(labels).filter(
+    ([, value]) => value !== undefined && value !== null,
+  );
+  if (entries.length === 0) return "";
+  return `{${entries
+    .map(([key, value]) => `${key}="${escapeLabelValue(value)}"`)
+    .join(",")}}`;
+}
+
+/**
+ * 指標基底類別
+ */
+class Metric {
+  constructor(type, name, help, labelNames = []) {
+    if (!METRIC_NAME_PATTERN.test(name)) {
+      throw new Error(`無效的指標名稱: ${name}`);
+    }
+    this.type = type;
+    this.name = name;
+    this.help = help;
+    this.labelNames = labelNames;
+    this.series = new Map(); // 標籤鍵 -> { labels, ... }
+  }
+
+  _key(labels) {
+    return this.labelNames.map(name => labels[name] ?? "").join("\u0000");
+  }
+
+  _pick(labels) {
+    const picked = {};
+    for (const name of this.labelNames) picked[name] = labels[name] ?? "";
+    return picked;
+  }
+
+  reset() {
+    this.series.clear();
+  }
+
+  header() {
+    return [
+      `# HELP ${this.name} ${this.help.replace(/\\/g, "\\\\").replace(/\n/g, "\\n")}`,
+      `# TYPE ${this.name} ${this.type}`,
+    ];
+  }
+}
+
+/**
+ * 計數器（只增不減）
+ */
+export class Counter extends Metric {
+  constructor(name, help, labelNames = []) {
+    super("counter", name, help, labelNames);
+  }
+
+  inc(labels = {}, value = 1) {
+    const key = this._key(labels);
+    const entry = this.series.get(key) || { labels: this._pick(labels), value: 0 };
+    entry.value += value;
+    this.series.set(key, entry);
+  }
+
+  /**
+   * 同步由其他模組維護的累計值（於 collector 中使用）
+   */
+  set(labels = {}, value) {
+    this.series.set(this._key(labels), { labels: this._pick(labels), value });
+  }
+
+  render() {
+    const lines = this.header();
+    for (const { labels, value } of this.series.values()) {
+      lines.push(`${this.name}${formatLabels(labels)} ${formatValue(value)}`);
+    }
+    return lines;
+  }
+}
+
+/**
+ * 量測值（可增可減，可於抓取時設定）
+ */
+export class Gauge extends Metric {
+  constructor(name, help, labelNames = []) {
+    super("gauge", name, help, labelNames);
+  }
+
+  set(labels = {}, value) {
+    this.series.set(this._key(labels), { labels: this._pick(labels), value });
+  }
+
+  render() {
+    const lines = this.header();
+    for (const { labels, value } of this.series.values()) {
+      lines.push(`${this.name}${formatLabels(labels)} ${formatValue(value)}`);
+    }
+    return lines;
+  }
+}
+
+/**
+ * 直方圖（累積桶計數 + _sum + _count）
+ */
+export class Histogram extends Metric {
+  constructor(name, help, labelNames = [], buckets = DEFAULT_LATENCY_BUCKETS) {
+    super("histogram", name, help, labelNames);
+    this.buckets = [...buckets].sort((a, b) => a - b);
+  }
+
+  observe(labels = {}, value) {
+    const key = this._key(labels);
+    let entry = this.series.get(key);
+    if (!entry) {
+      entry = {
+        labels: this._pick(labels),
+        counts: new Array(this.buckets.length).fill(0),
+        sum: 0,
+        count: 0,
+      };
+      this.series.set(key, entry);
+    }
+
+    const position = this.buckets.findIndex(bound => value <= bound);
+    if (position >= 0) entry.counts[position]++;
+    entry.sum += value;
+    entry.count++;
+  }
+
+  render() {
+    const lines = this.header();
+    for (const { labels, counts, sum, count } of this.series.values()) {
+      let cumulative = 0;
+      this.buckets.forEach((bound, i) => {
+        cumulative += counts[i];
+        lines.push(
+          `${this.name}_bucket${formatLabels({ ...labels, le: formatValue(bound) })} ${cumulative}`,
+        );
+      });
+      lines.push(`${this.name}_bucket${formatLabels({ ...labels, le: "+Inf" })} ${count}`);
+      lines.push(`${this.name}_sum${formatLabels(labels)} ${formatValue(sum)}`);
+      lines.push(`${this.name}_count${formatLabels(labels)} ${count}`);
+    }
+    return lines;
+  }
+}
+
+/**
+ * 指標註冊表
+ */
+export class MetricsRegistry {
+  constructor() {
+    this.metrics = new Map();
+    this.collectors = [];
+  }
+
+  register(metric) {
+    if (this.metrics.has(metric.name)) {
+      throw new Error(`指標已註冊: ${metric.name}`);
+    }
+    this.metrics.set(metric.name, metric);
+    return metric;
+  }
+
+  counter(name, help, labelNames) {
+    return this.register(new Counter(name, help, labelNames));
+  }
+
+  gauge(name, help, labelNames) {
+    return this.register(new Gauge(name, help, labelNames));
+  }
+
+  histogram(name, help, labelNames, buckets) {
+    return this.register(new Histogram(name, help, labelNames, buckets));
+  }
+
+  /**
+   * 新增抓取時執行的收集函數（用於更新狀態型 Gauge）
+   */
+  addCollector(collector) {
+    this.collectors.push(collector);
+  }
+
+  /**
+   * 輸出 Prometheus 文字格式
+   */
+  render() {
+    for (const collector of this.collectors) {
+      collector();
+    }
+
+    const lines = [];
+    for (const metric of this.metrics.values()) {
+      lines.push(...metric.render());
+    }
+    return lines.join("\n") + "\n";
+  }
+}
+
+// 全域指標註冊表
+export const metricsRegistry = new MetricsRegistry();
+
+export const toolCallDuration = metricsRegistry.histogram(
+  "mcp_tool_call_duration_seconds",
+  "工具調用延遲（秒）",
+  ["tool", "module", "status"],
+);
+
+export const METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8";
+
+export default metricsRegistry;
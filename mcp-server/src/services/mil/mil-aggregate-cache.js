@@ -0,0 +1,218 @@
+/**
+ * MIL 彙總快取
+ *
+ * 將 GROUP BY 類型的彙總結果保存在記憶體中，以「變更水位」（watermark）判斷是否需要重算。
+ * 水位為一次輕量查詢得到的資料指紋，多個彙總共用同一次檢查；
+ * 在 maxStaleness 內的讀取直接由記憶體回應，不需存取資料庫。
+ */
+
+import logger from "../../config/logger.js";
+
+export class AggregateCache {
+  /**
+   * @param {Object} options
+   * @param {string} options.name - 快取名稱（用於日誌）
+   * @param {Function} options.fetchWatermark - 取得目前水位的函數，返回字串
+   * @param {number} options.defaultMaxStaleness - 預設可接受的最大陳舊時間（毫秒）
+   * @param {number} options.refreshInterval - 背景檢查水位的間隔（毫秒），0 表示不啟用
+   */
+  constructor(options = {}) {
+    this.name = options.name || "aggregate";
+    this.fetchWatermark = options.fetchWatermark;
+    this.defaultMaxStaleness = options.defaultMaxStaleness ?? 60 * 1000;
+    this.refreshInterval = options.refreshInterval || 0;
+
+    this.entries = new Map();
+    this.pending = new Map();
+    this.watermark = null;
+    this.watermarkCheckedAt = 0;
+    this.watermarkPending = null;
+    this.refreshTimer = null;
+    this.stats = { hits: 0, verified: 0, recomputed: 0, watermarkChecks: 0 };
+  }
+
+  /**
+   * 取得彙總結果
+   * @param {string} key - 彙總鍵值（例如 "count-by:Status"）
+   * @param {Function} compute - 重新計算彙總的函數
+   * @param {Object} options
+   * @param {number} options.maxStaleness - 本次可接受的最大陳舊時間（毫秒）
+   * @returns {Promise<{data: any, freshness: Object}>}
+   */
+  async get(key, compute, { maxStaleness } = {}) {
+    const staleness = maxStaleness ?? this.defaultMaxStaleness;
+    this._ensureAutoRefresh();
+
+    let entry = this.entries.get(key);
+    if (entry && Date.now() - entry.verifiedAt <= staleness) {
+      this.stats.hits++;
+      return this._toResult(entry, "memory", staleness);
+    }
+
+    const watermark = await this._checkWatermark(staleness);
+    entry = this.entries.get(key);
+    if (entry && entry.watermark === watermark) {
+      entry.verifiedAt = this.watermarkCheckedAt;
+      this.stats.verified++;
+      return this._toResult(entry, "memory-verified", staleness);
+    }
+
+    entry = await this._recompute(key, compute, watermark);
+    return this._toResult(entry, "database", staleness);
+  }
+
+  /**
+   * 清除指定（或全部）彙總
+   * @param {string} key - 彙總鍵值，省略時清除全部
+   */
+  invalidate(key = null) {
+    if (key) {
+      this.entries.delete(key);
+    } else {
+      this.entries.clear();
+      this.watermarkCheckedAt = 0;
+    }
+  }
+
+  /**
+   * 檢查水位，變更時重算所有已快取的彙總（供背景計時器使用）
+   */
+  async refresh() {
+    const watermark = await this._checkWatermark(0);
+    const outdated = [...this.entries.entries()].filter(
+      ([, entry]) => entry.watermark !== watermark,
+    );
+
+    for (const [key, entry] of outdated) {
+      await this._recompute(key, entry.compute, watermark);
+    }
+
+    for (const entry of this.entries.values()) {
+      entry.verifiedAt = Math.max(entry.verifiedAt, this.watermarkCheckedAt);
+    }
+
+    return { watermark, recomputed: outdated.length };
+  }
+
+  /**
+   * 取得目前水位，在 maxStaleness 內重用上次查詢結果（與彙總讀取共用同一次檢查）
+   * @param {number} maxStaleness - 可接受的最大陳舊時間（毫秒）
+   * @returns {Promise<string>}
+   */
+  getWatermark(maxStaleness = 0) {
+    return this._checkWatermark(maxStaleness);
+  }
+
+  /**
+   * 停止背景檢查
+   */
+  stop() {
+    if (this.refreshTimer) {
+      clearInterval(this.refreshTimer);
+      this.refreshTimer = null;
+    }
+  }
+
+  /**
+   * 取得快取統計
+   */
+  getStats() {
+    return {
+      name: this.name,
+      entries: this.entries.size,
+      watermark: this.watermark,
+      watermarkCheckedAt: this.watermarkCheckedAt
+        ? new Date(this.watermarkCheckedAt).toISOString()
+        : null,
+      ...this.stats,
+    };
+  }
+
+  // 取得水位；同一時間只發出一次查詢，且在 staleness 內重用上次結果
+  async _checkWatermark(staleness) {
+    if (
+      this.watermark !== null &&
+      Date.now() - this.watermarkCheckedAt <= staleness
+    ) {
+      return this.watermark;
+    }
+
+    if (!this.watermarkPending) {
+      this.watermarkPending = (async () => {
+        try {
+          this.stats.watermarkChecks++;
+          this.watermark = String(await this.fetchWatermark());
+          this.watermarkCheckedAt = Date.now();
+          return this.watermark;
+        } finally {
+          this.watermarkPending = null;
+        }
+      })();
+    }
+
+    return this.watermarkPending;
+  }
+
+  // 重算單一彙總；同一鍵值的並行請求共用同一次計算
+  async _recompute(key, compute, watermark) {
+    if (!this.pending.has(key)) {
+      this.pending.set(
+        key,
+        (async () => {
+          try {
+            const data = await compute();
+            const now = Date.now();
+            const entry = {
+              data,
+              compute,
+              watermark,
+              computedAt: now,
+              verifiedAt: now,
+            };
+            this.entries.set(key, entry);
+            this.stats.recomputed++;
+            return entry;
+          } finally {
+            this.pending.delete(key);
+          }
+        })(),
+      );
+    }
+
+    return this.pending.get(key);
+  }
+
+  _toResult(entry, source, staleness) {
+    const now = Date.now();
+    return {
+      data: entry.data,
+      computedAt: entry.computedAt,
+      freshness: {
+        source,
+        computedAt: new Date(entry.computedAt).toISOString(),
+        verifiedAt: new Date(entry.verifiedAt).toISOString(),
+        ageMs: now - entry.verifiedAt,
+        maxStalenessMs: staleness,
+        watermark: entry.watermark,
+      },
+    };
+  }
+
+  _ensureAutoRefresh() {
+    if (!this.refreshInterval || this.refreshTimer) return;
+
+    this.refreshTimer = setInterval(() => {
+      this.refresh().catch(error => {
+        logger.warn(`${this.name} 彙總快取背景更新失敗`, {
+          error: error.message,
+        });
+      });
+    }, this.refreshInterval);
+
+    if (this.refreshTimer.unref) {
+      this.refreshTimer.unref();
+    }
+  }
+}
+
+export default AggregateCache;
@@ -6,11 +6,206 @@
 
 import databaseService from "../database.js";
 import logger from "../../config/logger.js";
+import config from "../../config/config.js";
 import { GetMILListTool } from "../../tools/mil/get-mil-list.js";
+import { ALLOWED_COLUMNS as COUNT_BY_COLUMNS } from "../../tools/mil/get-count-by.js";
+import { AggregateCache } from "./mil-aggregate-cache.js";
+import {
+  encodeCursor,
+  decodeCursor,
+  buildKeysetCondition,
+} from "../cursor.js";
+
+// keyset 分頁的排序鍵與游標範圍
+const MIL_CURSOR_SCOPE = "mil:list";
+const MIL_KEYSET_COLUMNS = ["RecordDate", "SerialNumber"];
+
+// 全文檢索副本表（見 scripts/migrations/001-mil-text-search-ngram.sql）
+const MIL_TEXT_SEARCH_TABLE = "mil_text_search";
+// 各文字篩選欄位對應的 FULLTEXT 索引欄位
+const MIL_FULLTEXT_COLUMNS = {
+  SerialNumber: "SerialNumber",
+  Proposer_Name: "Proposer_Name",
+  DRI_EmpName: "DRI_EmpName",
+  Location: "Location",
+  description: "IssueDiscription, Solution, Remark",
+  all: "SerialNumber, Proposer_Name, DRI_EmpName, Location, IssueDiscription, Solution, Remark",
+};
+// ngram 預設 token 長度，短於此長度的關鍵字無法命中索引
+const NGRAM_TOKEN_SIZE = 2;
+// FULLTEXT 索引檢查結果的快取時間
+const FULLTEXT_CHECK_TTL = 5 * 60 * 1000;
+// 無異動時間欄位且讀不到 v_mil_kd 欄位清單時，CRC32 指紋涵蓋的欄位：
+// 統計欄位與 get_mil_list 可返回的所有欄位
+const MIL_WATERMARK_COLUMNS = [
+  ...new Set([
+    "SerialNumber",
+    "Status",
+    "TypeName",
+    ...COUNT_BY_COLUMNS,
+    "DelayDay",
+    "RecordDate",
+    "IssueDiscription",
+    "Remark",
+    "PlanFinishDate",
+    "ChangeFinishDate",
+    "ActualFinishDate",
+    "Solution",
+  ]),
+];
 
 class MILService {
   constructor() {
     this.dbName = "mil";
+    this.fullTextStatus = { available: false, checkedAt: 0 };
+    this.viewColumns = null;
+    this.aggregateCache = new AggregateCache({
+      name: "MIL",
+      fetchWatermark: () => this._fetchChangeWatermark(),
+      defaultMaxStaleness: config.milAggregateMaxStaleness * 1000,
+      refreshInterval: config.milAggregateRefreshInterval,
+    });
+  }
+
+  /**
+   * 取得 v_mil_kd 的欄位名稱（成功後快取，查詢失敗時返回空陣列且下次重試）
+   * @returns {Promise<Array<string>>}
+   */
+  async _getViewColumns() {
+    if (this.viewColumns) return this.viewColumns;
+    try {
+      const rows = await databaseService.query(
+        this.dbName,
+        `SELECT COLUMN_NAME as name FROM information_schema.COLUMNS
+         WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'v_mil_kd'
+         ORDER BY ORDINAL_POSITION`,
+        [],
+      );
+      this.viewColumns = rows.map(row => row.name);
+      return this.viewColumns;
+    } catch (error) {
+      logger.warn("讀取 v_mil_kd 欄位失敗，變更水位使用預設欄位", {
+        error: error.message,
+      });
+      return [];
+    }
+  }
+
+  /**
+   * 取得 MIL 資料的變更水位
+   *
+   * 有異動時間欄位（MIL_UPDATED_AT_COLUMN）時以筆數與最新異動時間組成，只需讀取該欄位；
+   * 否則以筆數、最新記錄日期與所有欄位的 CRC32 XOR 指紋組成（需掃描整個檢視表）。
+   * 新增、刪除或任何欄位（含文字欄位）變更都會改變水位，"mil:*" 標籤的工具緩存因此可以使用較長的 TTL。
+   * @returns {Promise<string>}
+   */
+  async _fetchChangeWatermark() {
+    const columns = await this._getViewColumns();
+    const updatedAt = config.milUpdatedAtColumn;
+
+    if (columns.includes(updatedAt)) {
+      const [row = {}] = await databaseService.query(
+        this.dbName,
+        `SELECT COUNT(*) as total, MAX(\`${updatedAt}\`) as latest FROM v_mil_kd`,
+        [],
+      );
+      const latest =
+        row.latest instanceof Date ? row.latest.toISOString() : row.latest;
+      return `${row.total}:${latest}`;
+    }
+
+    // CONCAT_WS 會略過 NULL，NULL 與相鄰欄位互換值時指紋不變，因此每個欄位先轉為空字串
+    const hashed = (columns.length > 0 ? columns : MIL_WATERMARK_COLUMNS).map(
+      column => `COALESCE(\`${column.replace(/`/g, "``")}\`, '')`,
+    );
+    const sql = `
+      SELECT
+        COUNT(*) as total,
+        MAX(RecordDate) as latest,
+        BIT_XOR(CRC32(CONCAT_WS('|', ${hashed.join(", ")}))) as checksum
+      FROM v_mil_kd
+    `;
+    const result = await databaseService.query(this.dbName, sql, []);
+    const row = result[0] || {};
+    const latest =
+      row.latest instanceof Date ? row.latest.toISOString() : row.latest;
+    return `${row.total}:${latest}:${row.checksum}`;
+  }
+
+  /**
+   * 檢查全文檢索副本表的 FULLTEXT 索引是否存在（結果快取數分鐘）
+   * @returns {Promise<boolean>}
+   */
+  async hasFullTextIndex() {
+    if (Date.now() - this.fullTextStatus.checkedAt < FULLTEXT_CHECK_TTL) {
+      return this.fullTextStatus.available;
+    }
+
+    let available = false;
+    try {
+      const rows = await databaseService.query(
+        this.dbName,
+        `SELECT COUNT(DISTINCT INDEX_NAME) as indexCount
+         FROM information_schema.STATISTICS
+         WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = ? AND INDEX_TYPE = 'FULLTEXT'`,
+        [MIL_TEXT_SEARCH_TABLE],
+      );
+      available = Number(rows[0]?.indexCount) > 0;
+    } catch (error) {
+      logger.warn("檢查 MIL 全文檢索索引失敗，改用 LIKE 查詢", {
+        error: error.message,
+      });
+    }
+
+    this.fullTextStatus = { available, checkedAt: Date.now() };
+    return available;
+  }
+
+  /**
+   * 決定本次查詢是否使用全文檢索
+   * @param {string} mode - like / fulltext / auto
+   * @returns {Promise<boolean>}
+   */
+  async _useFullText(mode = config.milTextSearchMode) {
+    if (mode === "like") return false;
+    const available = await this.hasFullTextIndex();
+    if (!available && mode === "fulltext") {
+      logger.warn("MIL 全文檢索索引不存在，退回 LIKE 查詢");
+    }
+    return available;
+  }
+
+  /**
+   * 轉換為 BOOLEAN MODE 的片語查詢，避免關鍵字中的運算子被解讀
+   * @param {string} term - 搜尋關鍵字
+   */
+  _toPhrase(term) {
+    return `"${String(term).replace(/["]/g, " ").trim()}"`;
+  }
+
+  /**
+   * 建構文字篩選條件：可用時走 ngram FULLTEXT，否則退回 LIKE
+   * @param {string} field - MIL_FULLTEXT_COLUMNS 的鍵
+   * @param {Array<string>} likeColumns - LIKE 查詢使用的欄位
+   * @param {string} term - 搜尋關鍵字
+   * @param {boolean} useFullText - 是否使用全文檢索
+   * @returns {{clause: string, params: Array}}
+   */
+  _buildTextCondition(field, likeColumns, term, useFullText) {
+    const value = String(term).trim();
+    if (useFullText && [...value].length >= NGRAM_TOKEN_SIZE) {
+      return {
+        clause: `SerialNumber IN (SELECT SerialNumber FROM ${MIL_TEXT_SEARCH_TABLE}
+          WHERE MATCH(${MIL_FULLTEXT_COLUMNS[field]}) AGAINST(? IN BOOLEAN MODE))`,
+        params: [this._toPhrase(value)],
+      };
+    }
+
+    const clause = likeColumns.map(column => `${column} LIKE ?`).join(" OR ");
+    return {
+      clause: likeColumns.length > 1 ? `(${clause})` : clause,
+      params: likeColumns.map(() => `%${value}%`),
+    };
   }
 
   /**
@@ -21,6 +216,7 @@ class MILService {
    * @param {string} sort - 排序欄位 (預設為 RecordDate)
    * @param {string} status - MIL 處理狀態 (預設為 "OnGoing"，可選值: "OnGoing", "Closed")
    * @param {Array} selectedFields - 要返回的欄位列表 (選填，預設返回核心欄位)
+   * @param {string} cursor - 上一頁回傳的 nextCursor (選填，提供時以 keyset 分頁取代 page)
    */
   async getMILList(
     filters = {},
@@ -29,12 +225,33 @@ class MILService {
     sort = "RecordDate",
     status = "OnGoing",
     selectedFields = null,
+    cursor = null,
   ) {
     try {
       console.log("getMILList", { status });
       // 構建 WHERE 條件和參數 (MySQL 語法)
       const whereConditions = [];
       const queryParams = [];
+      const useFullText =
+        filters.proposerName ||
+        filters.serialNumber ||
+        filters.driName ||
+        filters.location ||
+        filters.keyword
+          ? await this._useFullText(
+              filters.searchMode || config.milListTextSearchMode,
+            )
+          : false;
+      const addTextFilter = (field, likeColumns, term) => {
+        const condition = this._buildTextCondition(
+          field,
+          likeColumns,
+          term,
+          useFullText,
+        );
+        whereConditions.push(condition.clause);
+        queryParams.push(...condition.params);
+      };
 
       // 添加 status 參數處理
       if (status) {
@@ -61,14 +278,12 @@ class MILService {
 
       // 提出人姓名模糊查詢
       if (filters.proposerName) {
-        whereConditions.push("Proposer_Name LIKE ?");
-        queryParams.push(`%${filters.proposerName}%`);
+        addTextFilter("Proposer_Name", ["Proposer_Name"], filters.proposerName);
       }
 
       // MIL 編號模糊查詢
       if (filters.serialNumber) {
-        whereConditions.push("SerialNumber LIKE ?");
-        queryParams.push(`%${filters.serialNumber}%`);
+        addTextFilter("SerialNumber", ["SerialNumber"], filters.serialNumber);
       }
 
       // 重要度篩選
@@ -94,8 +309,7 @@ class MILService {
 
       // 負責人相關篩選
       if (filters.driName) {
-        whereConditions.push("DRI_EmpName LIKE ?");
-        queryParams.push(`%${filters.driName}%`);
+        addTextFilter("DRI_EmpName", ["DRI_EmpName"], filters.driName);
       }
       if (filters.driEmpNo) {
         whereConditions.push("DRI_EmpNo = ?");
@@ -108,8 +322,16 @@ class MILService {
 
       // 地點相關篩選
       if (filters.location) {
-        whereConditions.push("Location LIKE ?");
-        queryParams.push(`%${filters.location}%`);
+        addTextFilter("Location", ["Location"], filters.location);
+      }
+
+      // 問題描述 / 解決方案 / 備註關鍵字
+      if (filters.keyword) {
+        addTextFilter(
+          "description",
+          ["IssueDiscription", "Solution", "Remark"],
+          filters.keyword,
+        );
       }
 
       // 申請結案狀態篩選
@@ -191,13 +413,43 @@ class MILService {
       }
 
       // 建構主要查詢 SQL (含分頁) - MySQL 語法
-      const offset = (page - 1) * limit;
+      // 以 SerialNumber 作為次要排序鍵，確保同日資料的順序穩定
+      const useKeyset = sort === "RecordDate";
+      const mainConditions = [...whereConditions];
+      const mainParams = [...queryParams];
+
+      if (cursor) {
+        if (!useKeyset) {
+          throw new Error(`排序欄位 ${sort} 不支援游標分頁`);
+        }
+        const keyset = buildKeysetCondition(
+          MIL_KEYSET_COLUMNS,
+          decodeCursor(cursor, MIL_CURSOR_SCOPE, MIL_KEYSET_COLUMNS.length),
+        );
+        mainConditions.push(keyset.clause);
+        mainParams.push(...keyset.params);
+      }
+
+      const mainWhereClause =
+        mainConditions.length > 0
+          ? " WHERE " + mainConditions.join(" AND ")
+          : "";
+      // 選取欄位把 RecordDate 格式化成日期字串並沿用原名，ORDER BY 不加表名會依別名（只到日）排序，
+      // 與游標比較的完整時間不一致；以 v_mil_kd.RecordDate 指定實際欄位
+      const orderColumn = useKeyset ? "v_mil_kd.RecordDate" : sort;
+      const cursorFields = useKeyset
+        ? `, DATE_FORMAT(RecordDate, '%Y-%m-%d %H:%i:%s.%f') AS __cursorRecordDate,
+          SerialNumber AS __cursorSerialNumber`
+        : "";
+
+      // 多取一筆用來判斷是否還有下一頁；使用游標時不需要 OFFSET
+      const offset = cursor ? 0 : (page - 1) * limit;
       const mainQuery = `
-        SELECT ${selectFields}
+        SELECT ${selectFields}${cursorFields}
         FROM v_mil_kd
-        ${whereClause}
-        ORDER BY ${sort} DESC
-        LIMIT ${limit} OFFSET ${offset}
+        ${mainWhereClause}
+        ORDER BY ${orderColumn} DESC, v_mil_kd.SerialNumber DESC
+        LIMIT ${Number(limit) + 1} OFFSET ${offset}
       `;
 
       // 建構計數查詢 SQL
@@ -207,12 +459,29 @@ class MILService {
       console.log("queryParams", queryParams);
 
       // 執行主要查詢 - MySQL 方式（不包含 limit/offset 參數）
-      const result = await databaseService.query(
+      const rows = await databaseService.query(
         this.dbName,
         mainQuery,
-        queryParams,
+        mainParams,
       );
 
+      const hasMore = rows.length > limit;
+      const pageRows = hasMore ? rows.slice(0, limit) : rows;
+      const lastRow = pageRows[pageRows.length - 1];
+      const nextCursor =
+        useKeyset && hasMore && lastRow
+          ? encodeCursor(MIL_CURSOR_SCOPE, [
+              lastRow.__cursorRecordDate,
+              lastRow.__cursorSerialNumber,
+            ])
+          : null;
+
+      // 移除僅供游標使用的欄位
+      const result = pageRows.map(row => {
+        const { __cursorRecordDate, __cursorSerialNumber, ...rest } = row;
+        return rest;
+      });
+
       // 執行計數查詢 - MySQL 方式
       const countResult = await databaseService.query(
         this.dbName,
@@ -351,10 +620,13 @@ class MILService {
         success: true,
         count: result.length,
         totalRecords: totalRecords,
-        currentPage: page,
+        currentPage: cursor ? null : page,
         totalPages: totalPages,
         limit: limit,
+        hasMore: hasMore,
+        nextCursor: nextCursor,
         status: status,
+        textSearchMode: useFullText ? "fulltext" : "like",
         timestamp: new Date().toISOString(),
         filters: filters,
         data: result,
@@ -404,6 +676,110 @@ class MILService {
   }
   */
 
+  /**
+   * 將以秒為單位的 maxStaleness 轉為毫秒，未提供時使用預設值
+   * @param {number} maxStaleness - 秒數
+   */
+  _toStalenessMs(maxStaleness) {
+    if (maxStaleness === undefined || maxStaleness === null) return undefined;
+    return Math.max(0, Number(maxStaleness)) * 1000;
+  }
+
+  /**
+   * 計算從指定時間到現在經過的日曆天數
+   * @param {number} since - 起始時間戳記
+   */
+  _elapsedCalendarDays(since) {
+    const startOfDay = time => new Date(time).setHours(0, 0, 0, 0);
+    return Math.round((startOfDay(Date.now()) - startOfDay(since)) / 86400000);
+  }
+
+  /**
+   * 依關鍵字搜尋 MIL，結果依相關度排序
+   * @param {string} query - 搜尋關鍵字（可為中文片段、人名、序號或描述內容）
+   * @param {Object} options - 搜尋選項
+   * @param {number} options.limit - 返回筆數上限 (預設 20)
+   * @param {string} options.status - 限定處理狀態 (選填)
+   * @param {string} options.searchMode - like / fulltext / auto
+   */
+  async searchMIL(query, { limit = 20, status = null, searchMode } = {}) {
+    try {
+      const term = String(query || "").trim();
+      const useFullText =
+        [...term].length >= NGRAM_TOKEN_SIZE &&
+        (await this._useFullText(searchMode));
+      const selectFields = `v.SerialNumber, v.TypeName, v.Status, v.Importance,
+          v.Proposer_Name, v.DRI_EmpName, v.DRI_Dept, v.Location, v.DelayDay,
+          DATE_FORMAT(v.RecordDate, '%Y-%m-%d') as RecordDate,
+          v.IssueDiscription, v.Solution`;
+      const statusClause = status ? " AND v.Status = ?" : "";
+      const statusParams = status ? [status] : [];
+
+      let sql;
+      let params;
+      if (useFullText) {
+        // NATURAL LANGUAGE MODE 的 MATCH 值即為相關度分數
+        const matchColumns = MIL_FULLTEXT_COLUMNS.all
+          .split(", ")
+          .map(column => `s.${column}`)
+          .join(", ");
+        sql = `
+          SELECT ${selectFields},
+            MATCH(${matchColumns}) AGAINST(?) AS relevance
+          FROM ${MIL_TEXT_SEARCH_TABLE} s
+          JOIN v_mil_kd v ON v.SerialNumber = s.SerialNumber
+          WHERE MATCH(${matchColumns}) AGAINST(?)${statusClause}
+          ORDER BY relevance DESC, v.RecordDate DESC
+          LIMIT ${Number(limit)}
+        `;
+        params = [term, term, ...statusParams];
+      } else {
+        // 無索引時以欄位權重估算相關度：序號 > 人名 > 地點 > 描述
+        const like = `%${term}%`;
+        sql = `
+          SELECT ${selectFields},
+            (CASE WHEN v.SerialNumber LIKE ? THEN 5 ELSE 0 END
+             + CASE WHEN v.Proposer_Name LIKE ? OR v.DRI_EmpName LIKE ? THEN 3 ELSE 0 END
+             + CASE WHEN v.Location LIKE ? THEN 2 ELSE 0 END
+             + CASE WHEN v.IssueDiscription LIKE ? THEN 2 ELSE 0 END
+             + CASE WHEN v.Solution LIKE ? OR v.Remark LIKE ? THEN 1 ELSE 0 END) AS relevance
+          FROM v_mil_kd v
+          WHERE (v.SerialNumber LIKE ? OR v.Proposer_Name LIKE ? OR v.DRI_EmpName LIKE ?
+            OR v.Location LIKE ? OR v.IssueDiscription LIKE ? OR v.Solution LIKE ? OR v.Remark LIKE ?)${statusClause}
+          ORDER BY relevance DESC, v.RecordDate DESC
+          LIMIT ${Number(limit)}
+        `;
+        params = [...Array(14).fill(like), ...statusParams];
+      }
+
+      const result = await databaseService.query(this.dbName, sql, params);
+
+      logger.info("MIL 關鍵字搜尋成功", {
+        query: term,
+        searchMode: useFullText ? "fulltext" : "like",
+        count: result.length,
+      });
+
+      return {
+        timestamp: new Date().toISOString(),
+        query: term,
+        searchMode: useFullText ? "fulltext" : "like",
+        count: result.length,
+        data: result.map(row => ({
+          ...row,
+          relevance: Math.round(Number(row.relevance) * 1000) / 1000,
+        })),
+      };
+    } catch (error) {
+      logger.error("MIL 關鍵字搜尋失敗", {
+        query,
+        error: error.message,
+        stack: error.stack,
+      });
+      throw error;
+    }
+  }
+
   /**
    * 獲取特定 MIL 詳情
    * @param {string} serialNumber - MIL 編號
@@ -438,8 +814,10 @@ class MILService {
 
   /**
    * 取得 MIL 處理狀態統計報告
+   * @param {Object} options
+   * @param {number} options.maxStaleness - 可接受的最大陳舊秒數（選填，0 表示強制檢查水位）
    */
-  async getStatusReport() {
+  async getStatusReport({ maxStaleness } = {}) {
     try {
       const sql = `
         SELECT 
@@ -452,15 +830,29 @@ class MILService {
           Status
       `;
 
-      const result = await databaseService.query(this.dbName, sql, []);
+      const cached = await this.aggregateCache.get(
+        "status-report",
+        () => databaseService.query(this.dbName, sql, []),
+        { maxStaleness: this._toStalenessMs(maxStaleness) },
+      );
+
+      // AvgDays 相對於今天，快取跨日時依經過天數補正，不需重算
+      const elapsedDays = this._elapsedCalendarDays(cached.computedAt);
+      const result = cached.data.map(row => ({
+        ...row,
+        AvgDays:
+          row.AvgDays === null ? null : Number(row.AvgDays) + elapsedDays,
+      }));
 
       logger.info("MIL 狀態報告查詢成功", {
         reportCount: result.length,
+        source: cached.freshness.source,
       });
 
       return {
         timestamp: new Date().toISOString(),
         data: result, // 統一字段
+        freshness: cached.freshness,
       };
     } catch (error) {
       logger.error("MIL 狀態報告查詢失敗", {
@@ -508,21 +900,30 @@ class MILService {
    * @tool-name get-count-by
    * @tool-description 依指定欄位（如狀態、類型、廠別等）統計 MIL 記錄數量，用於數據分析和報表生成
    * @param {string} columnName - 要統計的欄位名稱（如 Status、TypeName、ProposalFactory 等）
+   * @param {Object} options
+   * @param {number} options.maxStaleness - 可接受的最大陳舊秒數（選填，0 表示強制檢查水位）
    * @returns {Object} 包含統計結果的物件
    */
-  async getCountBy(columnName) {
+  async getCountBy(columnName, { maxStaleness } = {}) {
     try {
       const sql = `SELECT ${columnName}, COUNT(*) as totalCount FROM v_mil_kd
                    GROUP BY ${columnName}`;
-      const result = await databaseService.query(this.dbName, sql, []);
+      const cached = await this.aggregateCache.get(
+        `count-by:${columnName}`,
+        () => databaseService.query(this.dbName, sql, []),
+        { maxStaleness: this._toStalenessMs(maxStaleness) },
+      );
+      const result = cached.data;
 
       logger.info("MIL 依特定欄位統計查詢成功", {
         columnCount: result.length,
+        source: cached.freshness.source,
       });
 
       return {
         timestamp: new Date().toISOString(),
         data: result, // 統一字段
+        freshness: cached.freshness,
       };
     } catch (error) {
       logger.error("MIL 依特定欄位統計查詢失敗", {
@@ -3,24 +3,56 @@
  *
  * 提供 MCP 協議的即時通訊功能，讓客戶端可以透過 SSE 與服務器進行雙向通訊。
  * 雖然 SSE 本身是單向的，但我們可以結合 POST 請求來實現雙向通訊。
+ *
+ * Cluster 模式下連接只存在於建立它的 worker：連接 ID 帶有 worker 編號（conn_<worker>_<序號>），
+ * 其他 worker 的 sendToConnection 會經由 clusterBus 轉給持有連接的 worker，
+ * broadcast 也會轉送到所有 worker。
  */
 
 import logger from "../config/logger.js";
+import { clusterBus } from "./cluster-bus.js";
+
+/**
+ * 由連接 ID 取得持有連接的 worker 編號（非 cluster 模式的 ID 返回 null）
+ */
+export function connectionOwner(connectionId) {
+  const match = /^conn_(\d+)_\d+$/.exec(connectionId);
+  return match ? Number(match[1]) : null;
+}
+
+/**
+ * 合併各 worker 的連接統計
+ * @param {Array<{workerId: number, result: Object}>} results - clusterBus.collect 的結果
+ */
+export function mergeSSEStats(results) {
+  const merged = { activeConnections: 0, totalConnections: 0, connections: [] };
+  for (const { workerId, result } of results) {
+    merged.activeConnections += result.activeConnections;
+    merged.totalConnections += result.totalConnections;
+    for (const connection of result.connections) {
+      merged.connections.push({ ...connection, workerId });
+    }
+  }
+  return merged;
+}
 
 /**
  * SSE 連接管理器
  */
 export class SSEConnectionManager {
-  constructor() {
+  constructor(options = {}) {
     this.connections = new Map();
     this.connectionCounter = 0;
+    this.bus = options.bus || null;
   }
 
   /**
    * 建立新的 SSE 連接
    */
   createConnection(req, res) {
-    const connectionId = `conn_${++this.connectionCounter}`;
+    const connectionId = this.bus?.enabled
+      ? `conn_${this.bus.workerId}_${++this.connectionCounter}`
+      : `conn_${++this.connectionCounter}`;
 
     // 設定 SSE 標頭
     res.writeHead(200, {
@@ -109,6 +141,12 @@ export class SSEConnectionManager {
   sendToConnection(connectionId, event, data = null, id = null) {
     const connection = this.connections.get(connectionId);
     if (!connection) {
+      // 連接屬於其他 worker 時轉送（無法得知對方是否送達）
+      const owner = connectionOwner(connectionId);
+      if (this.bus?.enabled && owner !== null && owner !== this.bus.workerId) {
+        this.bus.send(owner, "sse:send", { connectionId, event, data, id });
+        return true;
+      }
       return false;
     }
 
@@ -117,9 +155,18 @@ export class SSEConnectionManager {
   }
 
   /**
-   * 廣播事件到所有連接
+   * 廣播事件到所有連接（cluster 模式下包含其他 worker 的連接）
+   * @returns {number} 本行程送達的連接數
    */
   broadcast(event, data = null, id = null) {
+    this.bus?.publish("sse:broadcast", { event, data, id });
+    return this.broadcastLocal(event, data, id);
+  }
+
+  /**
+   * 廣播事件到本行程的連接
+   */
+  broadcastLocal(event, data = null, id = null) {
     let successCount = 0;
 
     for (const [connectionId, connection] of this.connections) {
@@ -194,7 +241,16 @@ export class SSEConnectionManager {
 }
 
 // 建立全域連接管理器實例
-export const sseManager = new SSEConnectionManager();
+export const sseManager = new SSEConnectionManager({ bus: clusterBus });
+
+// 其他 worker 轉來的事件與統計查詢
+clusterBus.on("sse:send", ({ connectionId, event, data, id }) =>
+  sseManager.sendToConnection(connectionId, event, data, id),
+);
+clusterBus.on("sse:broadcast", ({ event, data, id }) =>
+  sseManager.broadcastLocal(event, data, id),
+);
+clusterBus.on("sse:stats", () => sseManager.getStats());
 
 // 定期清理無效連接
 setInterval(() => {
@@ -0,0 +1,410 @@
+/**
+ * 串流 CSV 解析（RFC 4180）
+ *
+ * 逐段接收 CSV 文字或 Buffer，直接寫入欄式陣列，不建立逐列物件：
+ * - 支援引號欄位、欄位內的逗號與換行、"" 跳脫、CRLF / LF / CR 換行與 UTF-8 BOM
+ * - 單次掃描推斷欄位類型：超過 80% 非空值可轉為數值者為 numeric（Float64Array，非數值為 NaN），
+ *   其餘以字典編碼為 categorical（codes + dictionary）；相異值超過 dictionaryLimit 的文字欄位
+ *   只保留樣本值（type 為 text，uniqueCount 為 dictionaryLimit + 1，表示下限）
+ * - 欄位數與標題不同的資料列略過並計入 skippedRows
+ * 解析結果為純物件，可在 worker thread 產生後以 transfer 交回主執行緒。
+ *
+ * 此模組不引用 logger 或其他有狀態的模組，供 tools/workers/stat-tasks.js 在 worker 中使用。
+ */
+
+import { StringDecoder } from "string_decoder";
+
+const QUOTE = 34; // "
+const CR = 13;
+const LF = 10;
+
+// 與舊版解析相同：超過此比例的非空值為數值時視為數值欄位
+const NUMERIC_RATIO = 0.8;
+const SAMPLE_VALUES = 3;
+
+export class CSVParseError extends Error {
+  /**
+   * @param {string} message
+   * @param {string} code - TOO_LARGE、UNTERMINATED_QUOTE 或 NO_DATA
+   */
+  constructor(message, code) {
+    super(message);
+    this.name = "CSVParseError";
+    this.code = code;
+  }
+}
+
+/**
+ * 取得不引用原始大字串的複本
+ * V8 的 slice 可能只記錄在原字串中的位置，長期保存（字典鍵、樣本值）會讓整段輸入無法回收
+ */
+function detach(value) {
+  return value.length > 12 ? Buffer.from(value, "utf8").toString("utf8") : value;
+}
+
+/**
+ * 選擇能容納 size 個代碼的最小整數陣列
+ */
+function codeArrayFor(size) {
+  if (size <= 0x100) return Uint8Array;
+  if (size <= 0x10000) return Uint16Array;
+  return Uint32Array;
+}
+
+/**
+ * 單一欄位的累積器：同時記錄數值與字典代碼，結束時依類型保留其一
+ */
+class ColumnBuilder {
+  constructor(name, capacity, dictionaryLimit) {
+    this.name = name;
+    this.dictionaryLimit = dictionaryLimit;
+    this.values = new Float64Array(capacity);
+    this.codes = new Uint32Array(capacity);
+    this.dictionary = new Map();
+    this.uniqueCount = 0;
+    this.nonEmpty = 0;
+    this.numericCount = 0;
+    this.sampleValues = [];
+  }
+
+  grow(capacity) {
+    const values = new Float64Array(capacity);
+    values.set(this.values);
+    this.values = values;
+    if (this.codes) {
+      const codes = new Uint32Array(capacity);
+      codes.set(this.codes);
+      this.codes = codes;
+    }
+  }
+
+  push(row, field) {
+    if (this.sampleValues.length < SAMPLE_VALUES) {
+      this.sampleValues.push(detach(field));
+    }
+
+    if (field === "") {
+      this.values[row] = NaN;
+    } else {
+      this.nonEmpty++;
+      const value = Number(field);
+      if (value === value) this.numericCount++;
+      this.values[row] = value;
+    }
+
+    // 相異值超過上限後停止字典編碼
+    if (this.codes) {
+      let code = this.dictionary.get(field);
+      if (code === undefined) {
+        code = this.dictionary.size;
+        if (code >= this.dictionaryLimit) {
+          this.codes = null;
+          this.dictionary = null;
+          this.uniqueCount = code + 1; // 之後只知道下限
+          return;
+        }
+        this.dictionary.set(detach(field), code);
+        this.uniqueCount = code + 1;
+      }
+      this.codes[row] = code;
+    }
+  }
+
+  finish(rowCount) {
+    const column = {
+      name: this.name,
+      type: "text",
+      count: this.nonEmpty,
+      numericCount: this.numericCount,
+      uniqueCount: this.uniqueCount,
+      sampleValues: this.sampleValues,
+    };
+
+    const numericRatio =
+      this.nonEmpty > 0 ? this.numericCount / this.nonEmpty : 0;
+    if (numericRatio > NUMERIC_RATIO) {
+      column.type = "numeric";
+      column.values = this.values.slice(0, rowCount);
+    } else if (this.codes) {
+      column.type = "categorical";
+      column.dictionary = [...this.dictionary.keys()];
+      column.codes = codeArrayFor(column.dictionary.length).from(
+        this.codes.subarray(0, rowCount),
+      );
+    }
+
+    this.values = null;
+    this.codes = null;
+    this.dictionary = null;
+    return column;
+  }
+}
+
+export class CSVColumnParser {
+  /**
+   * @param {Object} options
+   * @param {string} options.delimiter - 欄位分隔字元（預設 ","）
+   * @param {number} options.dictionaryLimit - 分類欄位的相異值上限，超過視為文字欄位
+   * @param {number} options.previewRows - 保留原始字串的前幾列
+   * @param {number} options.maxBytes - 輸入大小上限（0 為不限制）
+   * @param {number} options.initialCapacity - 欄位陣列的初始容量（列數）
+   */
+  constructor(options = {}) {
+    this.delimiter = (options.delimiter || ",").charCodeAt(0);
+    this.dictionaryLimit = options.dictionaryLimit ?? 10000;
+    this.previewRows = options.previewRows ?? 3;
+    this.maxBytes = options.maxBytes || 0;
+    this.capacity = options.initialCapacity || 1024;
+
+    this.decoder = new StringDecoder("utf8");
+    this.leftover = "";
+    this.bytes = 0;
+    this.started = false;
+    this.fields = [];
+
+    this.headers = null;
+    this.builders = null;
+    this.rowCount = 0;
+    this.skippedRows = 0;
+    this.preview = [];
+  }
+
+  /**
+   * 寫入一段輸入
+   * @param {string|Buffer} chunk
+   */
+  write(chunk) {
+    if (typeof chunk === "string") {
+      this._count(Buffer.byteLength(chunk));
+      this._parse(chunk, false);
+    } else {
+      this._count(chunk.length);
+      this._parse(this.decoder.write(chunk), false);
+    }
+  }
+
+  /**
+   * 結束輸入並返回欄式資料
+   * @returns {{
+   *   headers: string[],
+   *   rowCount: number,
+   *   skippedRows: number,
+   *   preview: Object[],
+   *   columns: Object[]
+   * }}
+   */
+  end() {
+    this._parse(this.decoder.end(), true);
+    if (!this.headers) {
+      throw new CSVParseError("CSV 數據至少需要包含標題行", "NO_DATA");
+    }
+
+    return {
+      headers: this.headers,
+      rowCount: this.rowCount,
+      skippedRows: this.skippedRows,
+      preview: this.preview,
+      columns: this.builders.map(builder => builder.finish(this.rowCount)),
+    };
+  }
+
+  _count(bytes) {
+    this.bytes += bytes;
+    if (this.maxBytes && this.bytes > this.maxBytes) {
+      throw new CSVParseError(
+        `CSV 數據超過 ${this.maxBytes} bytes 上限`,
+        "TOO_LARGE",
+      );
+    }
+  }
+
+  /**
+   * 掃描完整的資料列；最後一列不完整時保留到下一段（從該列開頭重新掃描）
+   */
+  _parse(chunk, final) {
+    let text = this.leftover + chunk;
+    if (!this.started && text.length > 0) {
+      this.started = true;
+      if (text.charCodeAt(0) === 0xfeff) text = text.slice(1);
+    }
+
+    const delimiter = this.delimiter;
+    const fields = this.fields;
+    const length = text.length;
+    let pos = 0;
+    let recordStart = 0;
+    fields.length = 0;
+
+    while (pos < length) {
+      let field;
+      if (text.charCodeAt(pos) === QUOTE) {
+        // 引號欄位："" 為一個引號，結束引號後到分隔字元前的內容照原樣附加
+        field = "";
+        let start = pos + 1;
+        for (;;) {
+          const quote = text.indexOf('"', start);
+          if (quote === -1 || (quote + 1 >= length && !final)) {
+            if (!final) {
+              this.leftover = text.slice(recordStart);
+              return;
+            }
+            throw new CSVParseError(
+              `第 ${this.rowCount + this.skippedRows + 2} 列有未結束的引號`,
+              "UNTERMINATED_QUOTE",
+            );
+          }
+          if (text.charCodeAt(quote + 1) === QUOTE) {
+            field += text.slice(start, quote + 1);
+            start = quote + 2;
+            continue;
+          }
+          field += text.slice(start, quote);
+          pos = quote + 1;
+          break;
+        }
+        const end = this._fieldEnd(text, pos);
+        if (end > pos) field += text.slice(pos, end).trim();
+        pos = end;
+      } else {
+        const end = this._fieldEnd(text, pos);
+        field = text.slice(pos, end).trim();
+        pos = end;
+      }
+
+      if (pos >= length && !final) {
+        this.leftover = text.slice(recordStart);
+        return;
+      }
+      fields.push(field);
+
+      const code = pos < length ? text.charCodeAt(pos) : LF;
+      if (code === delimiter) {
+        pos++;
+        if (pos >= length) {
+          if (!final) {
+            this.leftover = text.slice(recordStart);
+            return;
+          }
+          fields.push(""); // 結尾的分隔字元之後是空欄位
+        } else {
+          continue;
+        }
+      } else if (code === CR) {
+        pos++;
+        if (pos < length && text.charCodeAt(pos) === LF) pos++;
+      } else {
+        pos++;
+      }
+
+      this._record(fields);
+      fields.length = 0;
+      recordStart = pos;
+    }
+
+    this.leftover = "";
+  }
+
+  _fieldEnd(text, pos) {
+    const delimiter = this.delimiter;
+    const length = text.length;
+    while (pos < length) {
+      const code = text.charCodeAt(pos);
+      if (code === delimiter || code === LF || code === CR) break;
+      pos++;
+    }
+    return pos;
+  }
+
+  _record(fields) {
+    // 空白行
+    if (fields.length === 1 && fields[0] === "") return;
+
+    if (!this.headers) {
+      this.headers = fields.map(
+        (name, i) => detach(name) || `column_${i + 1}`,
+      );
+      this.builders = this.headers.map(
+        name => new ColumnBuilder(name, this.capacity, this.dictionaryLimit),
+      );
+      return;
+    }
+
+    if (fields.length !== this.headers.length) {
+      this.skippedRows++;
+      return;
+    }
+
+    const row = this.rowCount;
+    if (row >= this.capacity) {
+      this.capacity *= 2;
+      for (const builder of this.builders) builder.grow(this.capacity);
+    }
+    for (let i = 0; i < fields.length; i++) {
+      this.builders[i].push(row, fields[i]);
+    }
+    if (this.preview.length < this.previewRows) {
+      const record = {};
+      this.headers.forEach((header, i) => {
+        record[header] = detach(fields[i]);
+      });
+      this.preview.push(record);
+    }
+    this.rowCount++;
+  }
+}
+
+/**
+ * 解析完整的 CSV 字串
+ * @param {string} text
+ * @param {Object} options - CSVColumnParser 選項
+ */
+export function parseCSVText(text, options = {}) {
+  const parser = new CSVColumnParser(options);
+  parser.write(text);
+  return parser.end();
+}
+
+/**
+ * 逐段讀取串流；中途拋出錯誤時不銷毀串流，讓 HTTP 請求仍能返回錯誤回應
+ * （未讀完的請求內容由 Node 在回應結束後丟棄）
+ */
+export function readChunks(source) {
+  return typeof source.iterator === "function"
+    ? source.iterator({ destroyOnReturn: false })
+    : source;
+}
+
+/**
+ * 從可讀串流（例如 HTTP 請求或檔案）解析 CSV
+ * @param {AsyncIterable<Buffer|string>} source
+ * @param {Object} options - CSVColumnParser 選項
+ */
+export async function parseCSVStream(source, options = {}) {
+  const parser = new CSVColumnParser(options);
+  for await (const chunk of readChunks(source)) {
+    parser.write(chunk);
+  }
+  return parser.end();
+}
+
+/**
+ * 依名稱取得欄位
+ */
+export function getColumn(table, name) {
+  return table.columns.find(column => column.name === name) || null;
+}
+
+/**
+ * 欄式資料佔用的記憶體估算（位元組）
+ */
+export function estimateTableBytes(table) {
+  let bytes = 0;
+  for (const column of table.columns) {
+    bytes += column.values?.byteLength || 0;
+    bytes += column.codes?.byteLength || 0;
+    for (const value of column.dictionary || []) {
+      bytes += value.length * 2 + 16;
+    }
+  }
+  return bytes;
+}
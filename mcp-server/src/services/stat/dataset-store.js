@@ -0,0 +1,139 @@
+/**
+ * 已上傳資料集的暫存
+ *
+ * POST /api/stat/datasets 以串流解析上傳的 CSV 後存放於此，統計工具以 datasetId 取用，
+ * 不必把整份 CSV 放進 JSON 參數。依最後使用時間淘汰：超過 ttl 或總大小超過 maxBytes 時
+ * 移除最久未使用的資料集。
+ * 資料集只存在於收到上傳的行程；cluster 模式下請在同一個請求中以 ?tool= 執行工具。
+ */
+
+import crypto from "crypto";
+import cluster from "cluster";
+import config from "../../config/config.js";
+import { estimateTableBytes } from "./csv-parser.js";
+import { parseByteSize } from "../../tools/tool-cache.js";
+
+export class DatasetStore {
+  /**
+   * @param {Object} options
+   * @param {number} options.ttl - 未使用多久後移除（毫秒）
+   * @param {number} options.maxBytes - 所有資料集的估算大小上限
+   */
+  constructor(options = {}) {
+    this.ttl = options.ttl ?? 30 * 60 * 1000;
+    this.maxBytes = options.maxBytes ?? 512 * 1024 * 1024;
+    this.datasets = new Map(); // id -> { table, bytes, name, createdAt, lastUsedAt }
+    this.totalBytes = 0;
+  }
+
+  /**
+   * 存放資料集
+   * @param {Object} table - csv-parser 的解析結果
+   * @param {Object} metadata - { name }
+   * @returns {string} datasetId
+   */
+  put(table, metadata = {}) {
+    this.purgeExpired();
+    const bytes = estimateTableBytes(table);
+    if (bytes > this.maxBytes) {
+      throw new Error(
+        `資料集大小 ${bytes} bytes 超過暫存上限 ${this.maxBytes} bytes`,
+      );
+    }
+
+    // 依最後使用時間淘汰（Map 依插入順序，get 時重新插入）
+    for (const [id, entry] of this.datasets) {
+      if (this.totalBytes + bytes <= this.maxBytes) break;
+      this._remove(id, entry);
+    }
+
+    const prefix = cluster.isWorker ? `ds_${cluster.worker.id}_` : "ds_";
+    const id = prefix + crypto.randomBytes(8).toString("hex");
+    const now = Date.now();
+    this.datasets.set(id, {
+      table,
+      bytes,
+      name: metadata.name || null,
+      createdAt: now,
+      lastUsedAt: now,
+    });
+    this.totalBytes += bytes;
+    return id;
+  }
+
+  /**
+   * 取得資料集；不存在或已過期時返回 null
+   */
+  get(id) {
+    const entry = this.datasets.get(id);
+    if (!entry) return null;
+    if (Date.now() - entry.lastUsedAt > this.ttl) {
+      this._remove(id, entry);
+      return null;
+    }
+
+    entry.lastUsedAt = Date.now();
+    this.datasets.delete(id);
+    this.datasets.set(id, entry);
+    return entry.table;
+  }
+
+  /**
+   * 資料集摘要（不含欄位資料）
+   */
+  describe(id) {
+    const table = this.get(id);
+    if (!table) return null;
+    const entry = this.datasets.get(id);
+    return {
+      datasetId: id,
+      name: entry.name,
+      bytes: entry.bytes,
+      createdAt: new Date(entry.createdAt).toISOString(),
+      rowCount: table.rowCount,
+      skippedRows: table.skippedRows,
+      columns: table.columns.map(column => ({
+        name: column.name,
+        type: column.type,
+        count: column.count,
+        uniqueCount: column.uniqueCount,
+        sampleValues: column.sampleValues,
+      })),
+      preview: table.preview,
+    };
+  }
+
+  delete(id) {
+    const entry = this.datasets.get(id);
+    if (!entry) return false;
+    this._remove(id, entry);
+    return true;
+  }
+
+  purgeExpired(now = Date.now()) {
+    for (const [id, entry] of this.datasets) {
+      if (now - entry.lastUsedAt > this.ttl) this._remove(id, entry);
+    }
+  }
+
+  _remove(id, entry) {
+    this.datasets.delete(id);
+    this.totalBytes -= entry.bytes;
+  }
+
+  getStats() {
+    return {
+      datasets: this.datasets.size,
+      totalBytes: this.totalBytes,
+      maxBytes: this.maxBytes,
+    };
+  }
+}
+
+// 全域資料集暫存
+export const datasetStore = new DatasetStore({
+  ttl: config.statDatasetTTL,
+  maxBytes: parseByteSize(config.statDatasetMaxBytes),
+});
+
+export default datasetStore;
@@ -0,0 +1,174 @@
+/**
+ * 串流讀取 multipart/form-data
+ *
+ * 上傳 CSV 時不先把整個請求放進記憶體：檔案部分一邊接收一邊交給 onFile 返回的接收端
+ * （例如 CSVColumnParser），文字欄位收集後交給 onField。
+ */
+
+import { readChunks } from "./csv-parser.js";
+
+const CRLF = Buffer.from("\r\n");
+const HEADER_END = Buffer.from("\r\n\r\n");
+
+export class MultipartError extends Error {
+  /**
+   * @param {string} message
+   * @param {string} code - INVALID 或 TOO_LARGE
+   */
+  constructor(message, code = "INVALID") {
+    super(message);
+    this.name = "MultipartError";
+    this.code = code;
+  }
+}
+
+/**
+ * 從 Content-Type 取得 boundary
+ * @returns {string|null}
+ */
+export function getBoundary(contentType = "") {
+  const match = /boundary=(?:"([^"]+)"|([^;]+))/i.exec(contentType);
+  return match ? (match[1] || match[2]).trim() : null;
+}
+
+function parsePartHeaders(text) {
+  const headers = {};
+  for (const line of text.split("\r\n")) {
+    const index = line.indexOf(":");
+    if (index > 0) {
+      headers[line.slice(0, index).trim().toLowerCase()] = line
+        .slice(index + 1)
+        .trim();
+    }
+  }
+  const disposition = headers["content-disposition"] || "";
+  const param = key =>
+    new RegExp(`(?:^|;)\\s*${key}="([^"]*)"`, "i").exec(disposition)?.[1] ??
+    null;
+  return {
+    name: param("name"),
+    filename: param("filename"),
+    contentType: headers["content-type"] || null,
+  };
+}
+
+/**
+ * 讀取 multipart 請求
+ * @param {AsyncIterable<Buffer>} source - 請求串流
+ * @param {string} boundary
+ * @param {Object} handlers
+ * @param {Function} handlers.onField - (name, value) 文字欄位
+ * @param {Function} handlers.onFile - (part) => 接收端 { write(chunk) } 或 null（略過此檔案）
+ * @param {number} handlers.maxFieldBytes - 單一文字欄位上限
+ * @param {number} handlers.maxFileBytes - 單一檔案上限（0 為不限制），略過的檔案也會計算
+ * @param {number} handlers.maxParts - 欄位與檔案的總數上限
+ */
+export async function readMultipart(source, boundary, handlers = {}) {
+  const { onField = () => {}, onFile = () => null } = handlers;
+  const maxFieldBytes = handlers.maxFieldBytes ?? 64 * 1024;
+  const maxFileBytes = handlers.maxFileBytes || 0;
+  const maxParts = handlers.maxParts ?? 100;
+  // 第一個分隔線前補上 CRLF，讓每個分隔線都是 "\r\n--boundary"
+  const delimiter = Buffer.from(`\r\n--${boundary}`);
+
+  let buffer = CRLF;
+  let state = "preamble";
+  let part = null;
+  let sink = null;
+  let fieldChunks = [];
+  let partBytes = 0;
+  let partCount = 0;
+
+  const emit = chunk => {
+    if (chunk.length === 0 || !part) return;
+    partBytes += chunk.length;
+    if (part.filename !== null) {
+      if (maxFileBytes && partBytes > maxFileBytes) {
+        throw new MultipartError(
+          `檔案 ${part.filename} 超過 ${maxFileBytes} bytes 上限`,
+          "TOO_LARGE",
+        );
+      }
+      sink?.write(chunk);
+      return;
+    }
+    if (partBytes > maxFieldBytes) {
+      throw new MultipartError(
+        `欄位 ${part.name} 超過 ${maxFieldBytes} bytes`,
+        "TOO_LARGE",
+      );
+    }
+    fieldChunks.push(chunk);
+  };
+
+  const closePart = () => {
+    if (part && part.filename === null) {
+      onField(part.name, Buffer.concat(fieldChunks).toString("utf8"));
+    }
+    part = null;
+    sink = null;
+    fieldChunks = [];
+    partBytes = 0;
+  };
+
+  const consume = () => {
+    for (;;) {
+      if (state === "preamble" || state === "body") {
+        const index = buffer.indexOf(delimiter);
+        if (index === -1) {
+          // 保留可能是分隔線開頭的結尾部分
+          const keep = Math.min(buffer.length, delimiter.length - 1);
+          if (state === "body") emit(buffer.subarray(0, buffer.length - keep));
+          buffer = buffer.subarray(buffer.length - keep);
+          return;
+        }
+        if (state === "body") emit(buffer.subarray(0, index));
+        closePart();
+        buffer = buffer.subarray(index + delimiter.length);
+        state = "boundary";
+      }
+
+      if (state === "boundary") {
+        if (buffer.length < 2) return;
+        if (buffer[0] === 0x2d && buffer[1] === 0x2d) {
+          state = "done";
+          return;
+        }
+        state = "headers";
+      }
+
+      if (state === "headers") {
+        const index = buffer.indexOf(HEADER_END);
+        if (index === -1) {
+          if (buffer.length > 16 * 1024) {
+            throw new MultipartError("multipart 標頭過長");
+          }
+          return;
+        }
+        if (++partCount > maxParts) {
+          throw new MultipartError(
+            `multipart 欄位數超過 ${maxParts} 個`,
+            "TOO_LARGE",
+          );
+        }
+        // 分隔線後的 CRLF（或其他填充）之後才是標頭
+        part = parsePartHeaders(buffer.subarray(0, index).toString("utf8"));
+        if (part.filename !== null) sink = onFile(part);
+        buffer = buffer.subarray(index + HEADER_END.length);
+        state = "body";
+      }
+
+      if (state === "done") return;
+    }
+  };
+
+  for await (const chunk of readChunks(source)) {
+    if (state === "done") continue;
+    buffer = buffer.length ? Buffer.concat([buffer, chunk]) : chunk;
+    consume();
+  }
+
+  if (state !== "done") {
+    throw new MultipartError("multipart 內容不完整");
+  }
+}
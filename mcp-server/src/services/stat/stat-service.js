@@ -5,12 +5,14 @@
  * 支援智能數據分析和結果解釋
  */
 
+import config from "../../config/config.js";
 import logger from "../../config/logger.js";
 import fetch from "node-fetch";
+import { globalWorkerPool } from "../../tools/worker-pool.js";
 
 class StatService {
   constructor() {
-    this.apiBaseUrl = "http://localhost:8000/api/v1";
+    this.apiBaseUrl = config.statApiUrl;
   }
 
   /**
@@ -163,32 +165,27 @@ class StatService {
 
   /**
    * 智能分析 CSV 數據結構
-   * @param {string} csvData - CSV 數據內容
+   * @param {string|Object} csvData - CSV 數據內容，或已解析的欄式資料（csv-parser 的結果）
    * @returns {Object} 數據分析結果
    */
   async analyzeDataStructure(csvData) {
     try {
-      const lines = csvData.trim().split("\n");
-      const headers = lines[0].split(",");
-      const dataRows = lines.slice(1).map(line => line.split(","));
+      // CSV 字串在 worker thread 以串流解析器轉為欄式資料，不建立逐列物件
+      const table =
+        typeof csvData === "string"
+          ? await globalWorkerPool.run("parseCSV", { csvData })
+          : csvData;
 
       const analysis = {
-        rowCount: dataRows.length,
-        columnCount: headers.length,
-        columns: headers.map((header, index) => {
-          const values = dataRows.map(row => row[index]);
-          const numericValues = values.filter(v => !isNaN(parseFloat(v)));
-
-          return {
-            name: header.trim(),
-            type:
-              numericValues.length > values.length * 0.8
-                ? "numeric"
-                : "categorical",
-            sampleValues: values.slice(0, 3),
-            uniqueCount: new Set(values).size,
-          };
-        }),
+        rowCount: table.rowCount,
+        columnCount: table.headers.length,
+        // 相異值過多的文字欄位（text）視為分類變數，uniqueCount 為下限
+        columns: table.columns.map(column => ({
+          name: column.name,
+          type: column.type === "numeric" ? "numeric" : "categorical",
+          sampleValues: column.sampleValues,
+          uniqueCount: column.uniqueCount,
+        })),
       };
 
       logger.info("數據結構分析完成", { analysis });
@@ -493,6 +490,52 @@ class StatService {
     }
   }
 
+  /**
+   * 執行批次檢定：同一個分組向量下對多個欄位各做一次檢定，並做多重比較校正
+   * @param {Object} data - 檢定數據
+   * @param {Object} data.columns - 欄位名稱 → 數值陣列（可為 Float64Array，NaN 或 null 為缺值）
+   * @param {Array} data.column_names - 要檢定的欄位與順序 (預設為 columns 的全部欄位)
+   * @param {Array} data.groups - 每筆數據的組別，長度與各欄位相同 (null 不納入)
+   * @param {Array} data.group_order - 組別順序；未列出的組別不納入 (預設依首次出現)
+   * @param {string} data.test - ttest、mann_whitney、anova 或 kruskal_wallis (預設 "ttest")
+   * @param {string} data.correction - holm、bh、bonferroni 或 none (預設 "holm")
+   * @param {number} data.alpha - 顯著水準 (預設 0.05)
+   * @param {Object} context - 分析上下文
+   * @returns {Object} 每個欄位一列的結果表
+   */
+  async performBatchTest(data, context = {}) {
+    try {
+      const names = data.column_names || Object.keys(data.columns || {});
+      logger.info("開始執行批次檢定", {
+        test: data.test || "ttest",
+        columnCount: names.length,
+        rowCount: data.groups?.length,
+        context: context.scenario,
+      });
+
+      const apiResult = await this.callStatAPI("/inferential/batch", {
+        // TypedArray 的 JSON 是物件，需轉為一般陣列；NaN 序列化為 null
+        columns: names.map(name => Array.from(data.columns[name])),
+        column_names: names,
+        groups: data.groups,
+        group_order: data.group_order,
+        test: data.test || "ttest",
+        correction: data.correction || "holm",
+        alpha: data.alpha || 0.05,
+        alternative: data.alternative || "two-sided",
+        equal_var: data.equal_var || false,
+      });
+
+      return {
+        ...apiResult,
+        context,
+      };
+    } catch (error) {
+      logger.error("批次檢定執行失敗", { error: error.message });
+      throw new Error(`批次檢定執行失敗: ${error.message}`);
+    }
+  }
+
   /**
    * 調用統計 API
    * @param {string} endpoint - API 端點
@@ -0,0 +1,173 @@
+/**
+ * 輕量級請求追蹤
+ *
+ * 以 W3C traceparent 標頭（00-<traceId>-<spanId>-01）延續 Python Agent 傳來的追蹤，
+ * 並透過 AsyncLocalStorage 在同一請求內傳遞目前的 span：
+ * loggingMiddleware（HTTP 請求）→ ToolManager.callTool（工具）→ DatabaseService.query（SQL）。
+ * 結束的 span 經由 BufferedFileSink 以 JSONL 批次非同步寫入本地檔案，
+ * 可用 qwen_agent_poc/trace_waterfall.py 檢視瀑布圖。
+ */
+
+import { AsyncLocalStorage } from "async_hooks";
+import crypto from "crypto";
+import path from "path";
+import { fileURLToPath } from "url";
+import config from "../config/config.js";
+import { BufferedFileSink } from "../config/log-sink.js";
+
+const __dirname = path.dirname(fileURLToPath(import.meta.url));
+
+const SERVICE_NAME = "mcp-server";
+const TRACEPARENT_PATTERN = /^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$/;
+const FLUSH_INTERVAL = 1000;
+const FLUSH_BATCH_SIZE = 100;
+
+const storage = new AsyncLocalStorage();
+
+/**
+ * 追蹤片段
+ */
+export class Span {
+  constructor(name, { traceId, parentSpanId = null, attributes = {} } = {}) {
+    this.traceId = traceId || crypto.randomBytes(16).toString("hex");
+    this.spanId = crypto.randomBytes(8).toString("hex");
+    this.parentSpanId = parentSpanId;
+    this.name = name;
+    this.attributes = { ...attributes };
+    this.startTime = performance.timeOrigin + performance.now();
+    this.status = "ok";
+    this.ended = false;
+  }
+
+  setAttribute(key, value) {
+    this.attributes[key] = value;
+    return this;
+  }
+
+  /**
+   * 結束 span 並送出匯出
+   * @param {string} status - ok 或 error
+   */
+  end(status = null) {
+    if (this.ended) return;
+    this.ended = true;
+    if (status) this.status = status;
+
+    exportSpan({
+      traceId: this.traceId,
+      spanId: this.spanId,
+      parentSpanId: this.parentSpanId,
+      name: this.name,
+      service: SERVICE_NAME,
+      startTime: Math.round(this.startTime * 1000) / 1000,
+      durationMs:
+        Math.round((performance.timeOrigin + performance.now() - this.startTime) * 1000) / 1000,
+      status: this.status,
+      attributes: this.attributes,
+    });
+  }
+
+  /**
+   * 輸出 traceparent 標頭值
+   */
+  toTraceparent() {
+    return `00-${this.traceId}-${this.spanId}-01`;
+  }
+}
+
+/**
+ * JSONL 匯出器：span 放入緩衝佇列，由 WriteStream 批次追加寫入，不阻塞事件迴圈
+ */
+const exporter = new BufferedFileSink({
+  name: "traces",
+  flushInterval: FLUSH_INTERVAL,
+  batchSize: FLUSH_BATCH_SIZE,
+});
+// 未經 flushSpans() 的結束（process.exit）仍同步寫出佇列中的 span
+process.once("exit", () => exporter.flushSync());
+
+function exportSpan(record) {
+  // 追蹤檔案路徑於寫出時才決定，測試與設定可在載入後調整 config.traceFile
+  exporter.push({
+    file: config.traceFile || path.join(__dirname, "../logs/traces.jsonl"),
+    line: JSON.stringify(record) + "\n",
+  });
+}
+
+/**
+ * 解析 traceparent 標頭
+ * @returns {{traceId: string, parentSpanId: string}|null}
+ */
+export function parseTraceparent(header) {
+  const match = typeof header === "string" && header.trim().match(TRACEPARENT_PATTERN);
+  if (!match || /^0+$/.test(match[1]) || /^0+$/.test(match[2])) return null;
+  return { traceId: match[1], parentSpanId: match[2] };
+}
+
+/**
+ * 是否啟用追蹤
+ */
+export function isTracingEnabled() {
+  return config.tracingEnabled;
+}
+
+/**
+ * 取得目前的 span
+ */
+export function getCurrentSpan() {
+  return storage.getStore() || null;
+}
+
+/**
+ * 建立 span
+ * @param {string} name - span 名稱
+ * @param {Object} options
+ * @param {Object} options.attributes - 屬性
+ * @param {Object} options.parent - { traceId, parentSpanId }，省略時使用目前的 span
+ * @param {boolean} options.root - 沒有上層 span 時是否建立新的追蹤
+ * @returns {Span|null} 未啟用追蹤或不需建立時返回 null
+ */
+export function startSpan(name, { attributes = {}, parent = null, root = false } = {}) {
+  if (!config.tracingEnabled) return null;
+
+  const current = getCurrentSpan();
+  const context =
+    parent || (current ? { traceId: current.traceId, parentSpanId: current.spanId } : null);
+  if (!context && !root) return null;
+
+  return new Span(name, { ...context, attributes });
+}
+
+/**
+ * 以 span 包裝非同步函數：函數內建立的 span 會成為其子 span
+ * 未啟用追蹤或沒有上層 span 時直接執行函數
+ */
+export async function withSpan(name, attributes, fn) {
+  const span = startSpan(name, { attributes });
+  if (!span) return fn(null);
+
+  try {
+    const result = await storage.run(span, () => fn(span));
+    span.end("ok");
+    return result;
+  } catch (error) {
+    span.setAttribute("error", error.message);
+    span.end("error");
+    throw error;
+  }
+}
+
+/**
+ * 在指定 span 的上下文中執行函數（用於中介層延續追蹤）
+ */
+export function runWithSpan(span, fn) {
+  return span ? storage.run(span, fn) : fn();
+}
+
+/**
+ * 寫出尚未匯出的 span（關閉服務時呼叫）
+ * @returns {Promise<void>} 寫入檔案完成後 resolve
+ */
+export function flushSpans() {
+  return exporter.flush();
+}
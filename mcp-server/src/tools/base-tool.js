@@ -15,6 +15,8 @@ import logger from "../config/logger.js";
 import { globalToolCache } from "./tool-cache.js";
 import { globalVersionManager } from "./version-manager.js";
 import { globalStatsManager, StatEventType } from "./stats-manager.js";
+import { globalToolTelemetry } from "./telemetry.js";
+import { globalWorkerPool, WorkerPoolError } from "./worker-pool.js";
 
 /**
  * 工具執行狀態
@@ -173,6 +175,241 @@ export class ParameterValidator {
   }
 }
 
+function validationError(message, details) {
+  return new ToolExecutionError(
+    message,
+    ToolErrorType.VALIDATION_ERROR,
+    details,
+  );
+}
+
+// 與 BaseTool._validateType 相同的類型判斷
+const TYPE_CHECKS = {
+  string: value => typeof value === "string",
+  number: value => typeof value === "number" && !isNaN(value),
+  integer: value => Number.isInteger(value),
+  boolean: value => typeof value === "boolean",
+  array: value => Array.isArray(value),
+  object: value =>
+    typeof value === "object" && value !== null && !Array.isArray(value),
+};
+
+/**
+ * 將欄位約束編譯成檢查函式陣列，錯誤訊息與 ParameterValidator 相同
+ */
+function compileConstraints(schema) {
+  const checks = [];
+
+  switch (schema.type) {
+    case "string": {
+      const { minLength, maxLength, pattern } = schema;
+      if (minLength) {
+        checks.push(value => {
+          if (value.length < minLength) {
+            throw validationError(
+              `String too short: minimum ${minLength} characters`,
+            );
+          }
+        });
+      }
+      if (maxLength) {
+        checks.push(value => {
+          if (value.length > maxLength) {
+            throw validationError(
+              `String too long: maximum ${maxLength} characters`,
+            );
+          }
+        });
+      }
+      if (pattern) {
+        let regex = null;
+        let patternError = null;
+        try {
+          regex = new RegExp(pattern);
+        } catch (error) {
+          patternError = error;
+        }
+        checks.push(value => {
+          if (patternError) throw patternError;
+          // 不使用 g / y 旗標，test() 不會保留 lastIndex，可重複使用
+          if (!regex.test(value)) {
+            throw validationError(
+              `String does not match required pattern: ${pattern}`,
+            );
+          }
+        });
+      }
+      if (schema.enum) {
+        const allowed = new Set(schema.enum);
+        const message = `Value must be one of: ${schema.enum.join(", ")}`;
+        checks.push(value => {
+          if (!allowed.has(value)) throw validationError(message);
+        });
+      }
+      break;
+    }
+
+    case "number":
+    case "integer": {
+      const { minimum, maximum, multipleOf } = schema;
+      if (minimum !== undefined) {
+        checks.push(value => {
+          if (value < minimum) {
+            throw validationError(`Number too small: minimum ${minimum}`);
+          }
+        });
+      }
+      if (maximum !== undefined) {
+        checks.push(value => {
+          if (value > maximum) {
+            throw validationError(`Number too large: maximum ${maximum}`);
+          }
+        });
+      }
+      if (multipleOf) {
+        checks.push(value => {
+          if (value % multipleOf !== 0) {
+            throw validationError(`Number must be multiple of ${multipleOf}`);
+          }
+        });
+      }
+      break;
+    }
+
+    case "array": {
+      const { minItems, maxItems, uniqueItems } = schema;
+      if (minItems) {
+        checks.push(value => {
+          if (value.length < minItems) {
+            throw validationError(`Array too short: minimum ${minItems} items`);
+          }
+        });
+      }
+      if (maxItems) {
+        checks.push(value => {
+          if (value.length > maxItems) {
+            throw validationError(`Array too long: maximum ${maxItems} items`);
+          }
+        });
+      }
+      if (uniqueItems) {
+        checks.push(value => {
+          if (new Set(value).size !== value.length) {
+            throw validationError("Array items must be unique");
+          }
+        });
+      }
+      break;
+    }
+  }
+
+  return checks;
+}
+
+/**
+ * 編譯單一欄位的驗證函式
+ */
+function compileFieldValidator(fieldName, schema) {
+  const expectedType = schema.type;
+  const typeCheck = Object.hasOwn(TYPE_CHECKS, expectedType)
+    ? TYPE_CHECKS[expectedType]
+    : null;
+  const checks = compileConstraints(schema);
+
+  return value => {
+    // 基本類型檢查
+    if (typeCheck && !typeCheck(value)) {
+      throw validationError(`Invalid type for parameter ${fieldName}`, {
+        field: fieldName,
+        expected: expectedType,
+        received: typeof value,
+      });
+    }
+
+    // 進階約束檢查
+    for (let i = 0; i < checks.length; i++) {
+      try {
+        checks[i](value);
+      } catch (error) {
+        // 重新拋出錯誤，包含欄位名稱資訊
+        throw new ToolExecutionError(
+          `Parameter '${fieldName}': ${error.message}`,
+          error.type,
+          { field: fieldName, ...error.details },
+        );
+      }
+    }
+  };
+}
+
+/**
+ * 將 inputSchema 編譯成驗證函式
+ *
+ * 檢查順序與錯誤訊息和逐次走訪 schema 的舊實作相同：
+ * 參數型別 → 未知參數 → 必要參數 → 各欄位類型與約束。
+ * 編譯後的函式只依賴閉包中預先整理好的資料，不再於每次呼叫時走訪 schema。
+ * @param {Object} schema - JSON Schema（type: "object"）
+ * @returns {Function} (params) => true，驗證失敗時拋出 ToolExecutionError
+ */
+export function compileInputValidator(schema) {
+  const properties = schema.properties || null;
+  const allowedParams = properties ? Object.keys(properties) : [];
+  const allowedSet = new Set(allowedParams);
+  const allowedText = allowedParams.join(", ");
+  const required = schema.required || [];
+  const fieldValidators = allowedParams.map(name =>
+    compileFieldValidator(name, properties[name]),
+  );
+
+  return params => {
+    if (!params || typeof params !== "object") {
+      throw validationError("Invalid input parameters", {
+        expected: "object",
+        received: typeof params,
+      });
+    }
+
+    // 檢查未知參數，防止 AI 幻覺
+    if (properties) {
+      const providedParams = Object.keys(params);
+      let unknownParams = null;
+      for (let i = 0; i < providedParams.length; i++) {
+        if (!allowedSet.has(providedParams[i])) {
+          (unknownParams ||= []).push(providedParams[i]);
+        }
+      }
+
+      if (unknownParams) {
+        throw validationError(
+          `Unknown parameter(s): ${unknownParams.join(", ")}. Allowed parameters: ${allowedText}`,
+          {
+            unknownParameters: unknownParams,
+            allowedParameters: allowedParams,
+            providedParameters: providedParams,
+          },
+        );
+      }
+    }
+
+    // 檢查必要參數
+    for (let i = 0; i < required.length; i++) {
+      if (!(required[i] in params)) {
+        throw validationError(`Missing required parameter: ${required[i]}`, {
+          missingField: required[i],
+        });
+      }
+    }
+
+    // 依 schema 順序檢查參數類型和約束條件
+    for (let i = 0; i < allowedParams.length; i++) {
+      const name = allowedParams[i];
+      if (name in params) fieldValidators[i](params[name]);
+    }
+
+    return true;
+  };
+}
+
 /**
  * 基礎工具類別
  */
@@ -183,10 +420,21 @@ export class BaseTool {
     this.inputSchema = inputSchema;
     this.version = options.version || "1.0.0";
     this.cacheable = options.cacheable !== false; // 預設啟用緩存
-    this.cacheTTL = options.cacheTTL || 300000; // 5 分鐘
+    // 5 分鐘；部分工具以 cacheExpiry（秒）宣告
+    this.cacheTTL =
+      options.cacheTTL ||
+      (options.cacheExpiry ? options.cacheExpiry * 1000 : 300000);
+    this.cacheStaleTTL = options.cacheStaleTTL || 0; // TTL 到期後仍返回舊值並背景更新的寬限期
+    this.negativeCacheTTL = options.negativeCacheTTL || 0; // 「找不到」結果的緩存時間，0 為停用
+    // 資料相依標籤：字串陣列或 (params) => 字串陣列，例如 ["mil:*"]
+    this.cacheTags = options.cacheTags || null; // 結果讀取的資料，異動時由 globalToolCache 清除
+    this.invalidatesTags = options.invalidatesTags || null; // 寫入型工具成功後要清除的標籤
     this.module = options.module || "other"; // 工具所屬模組
     this.requiredDatabases = options.requiredDatabases || []; // 需要的資料庫
+    this.maxHistory = options.maxHistory || 1000; // 保留的執行歷史筆數
     this.executionHistory = [];
+    this.runningExecutions = new Map();
+    this.totalExecutionTime = 0;
     this.stats = {
       totalExecutions: 0,
       successCount: 0,
@@ -202,111 +450,39 @@ export class BaseTool {
       description: this.description,
       cacheable: this.cacheable,
       cacheTTL: this.cacheTTL,
+      cacheStaleTTL: this.cacheStaleTTL,
+      negativeCacheTTL: this.negativeCacheTTL,
       module: this.module,
       requiredDatabases: this.requiredDatabases,
     });
   }
 
+  /**
+   * 編譯 inputSchema 的驗證函式（ToolManager 註冊工具時呼叫，之後重複使用）
+   * inputSchema 被替換時會在下次驗證時重新編譯
+   */
+  compileValidator() {
+    this._compiledSchema = this.inputSchema;
+    this._validator = compileInputValidator(this.inputSchema);
+    return this._validator;
+  }
+
   /**
    * 驗證輸入參數（增強版）
    */
   validateInput(params) {
-    if (!params || typeof params !== "object") {
-      throw new ToolExecutionError(
-        "Invalid input parameters",
-        ToolErrorType.VALIDATION_ERROR,
-        { expected: "object", received: typeof params },
-      );
-    }
-
-    // 🔧 新增：檢查未知參數，防止 AI 幻覺
-    if (this.inputSchema.properties) {
-      const allowedParams = Object.keys(this.inputSchema.properties);
-      const providedParams = Object.keys(params);
-      const unknownParams = providedParams.filter(param => !allowedParams.includes(param));
-      
-      if (unknownParams.length > 0) {
-        throw new ToolExecutionError(
-          `Unknown parameter(s): ${unknownParams.join(', ')}. Allowed parameters: ${allowedParams.join(', ')}`,
-          ToolErrorType.VALIDATION_ERROR,
-          { 
-            unknownParameters: unknownParams,
-            allowedParameters: allowedParams,
-            providedParameters: providedParams
-          },
-        );
-      }
-    }
-
-    // 檢查必要參數
-    if (this.inputSchema.required) {
-      for (const requiredField of this.inputSchema.required) {
-        if (!(requiredField in params)) {
-          throw new ToolExecutionError(
-            `Missing required parameter: ${requiredField}`,
-            ToolErrorType.VALIDATION_ERROR,
-            { missingField: requiredField },
-          );
-        }
-      }
-    }
-
-    // 檢查參數類型和約束條件
-    if (this.inputSchema.properties) {
-      for (const [fieldName, fieldSchema] of Object.entries(
-        this.inputSchema.properties,
-      )) {
-        if (fieldName in params) {
-          const value = params[fieldName];
-          this._validateFieldWithConstraints(fieldName, value, fieldSchema);
-        }
-      }
-    }
-
-    return true;
+    const validator =
+      this._compiledSchema === this.inputSchema
+        ? this._validator
+        : this.compileValidator();
+    return validator(params);
   }
 
   /**
    * 驗證單一欄位及其約束條件
    */
   _validateFieldWithConstraints(fieldName, value, schema) {
-    const expectedType = schema.type;
-
-    // 基本類型檢查
-    if (!this._validateType(value, expectedType)) {
-      throw new ToolExecutionError(
-        `Invalid type for parameter ${fieldName}`,
-        ToolErrorType.VALIDATION_ERROR,
-        {
-          field: fieldName,
-          expected: expectedType,
-          received: typeof value,
-        },
-      );
-    }
-
-    // 進階約束檢查
-    try {
-      switch (expectedType) {
-        case "string":
-          ParameterValidator.validateString(value, schema);
-          break;
-        case "number":
-        case "integer":
-          ParameterValidator.validateNumber(value, schema);
-          break;
-        case "array":
-          ParameterValidator.validateArray(value, schema);
-          break;
-      }
-    } catch (error) {
-      // 重新拋出錯誤，包含欄位名稱資訊
-      throw new ToolExecutionError(
-        `Parameter '${fieldName}': ${error.message}`,
-        error.type,
-        { field: fieldName, ...error.details },
-      );
-    }
+    compileFieldValidator(fieldName, schema)(value);
   }
 
   /**
@@ -335,64 +511,43 @@ export class BaseTool {
 
   /**
    * 執行工具 (增強版 - 包含緩存、統計、版本管理)
+   *
+   * 日誌、統計與執行歷史透過 globalToolTelemetry 在背景寫入，不阻塞工具執行；
+   * strict 模式下會等待寫入完成。
    */
   async execute(params, context = {}) {
     const executionId = this._generateExecutionId();
     const startTime = Date.now();
+    const telemetryContext = {
+      sessionId: context.sessionId,
+      userId: context.userId,
+    };
+    let pending;
 
     try {
-      // 記錄工具調用開始 - 混合日誌
-      await this.logger.logToolCall({
-        toolName: this.name,
-        executionId,
-        params: this._sanitizeParams(params),
-        context: {
-          sessionId: context.sessionId,
-          userId: context.userId,
-          timestamp: startTime,
-        },
-        status: "started",
-      });
-
-      // 記錄工具調用統計
-      globalStatsManager.recordToolCall(this.name, params, {
-        sessionId: context.sessionId,
-        userId: context.userId,
+      // 記錄工具調用開始
+      pending = this._emitTelemetry({
+        type: "call",
         executionId,
+        startTime,
+        params,
+        context: telemetryContext,
       });
+      if (pending) await pending;
 
       // 驗證輸入參數
       try {
         this.validateInput(params);
       } catch (validationError) {
-        // 記錄驗證錯誤
-        await this.logger.logToolCall({
-          toolName: this.name,
+        pending = this._emitTelemetry({
+          type: "error",
           executionId,
-          status: "error",
           executionTime: Date.now() - startTime,
-          error: {
-            message: validationError.message,
-            type: validationError.type || "validation_error",
-            details: validationError.details,
-          },
-          context: {
-            sessionId: context.sessionId,
-            userId: context.userId,
-          },
+          error: validationError,
+          defaultErrorType: "validation_error",
+          context: telemetryContext,
         });
-
-        // 記錄錯誤統計
-        globalStatsManager.recordToolError(
-          this.name,
-          validationError,
-          Date.now() - startTime,
-          {
-            sessionId: context.sessionId,
-            userId: context.userId,
-            executionId,
-          },
-        );
+        if (pending) await pending;
 
         throw validationError;
       }
@@ -401,164 +556,104 @@ export class BaseTool {
       try {
         await this.checkDatabaseAvailability();
       } catch (dbError) {
-        // 記錄資料庫可用性錯誤
-        await this.logger.logToolCall({
-          toolName: this.name,
+        pending = this._emitTelemetry({
+          type: "error",
           executionId,
-          status: "error",
           executionTime: Date.now() - startTime,
-          error: {
-            message: dbError.message,
-            type: dbError.type || "database_unavailable",
-            details: dbError.details,
-          },
-          context: {
-            sessionId: context.sessionId,
-            userId: context.userId,
-          },
+          error: dbError,
+          defaultErrorType: "database_unavailable",
+          context: telemetryContext,
         });
-
-        // 記錄錯誤統計
-        globalStatsManager.recordToolError(
-          this.name,
-          dbError,
-          Date.now() - startTime,
-          {
-            sessionId: context.sessionId,
-            userId: context.userId,
-            executionId,
-          },
-        );
+        if (pending) await pending;
 
         throw dbError;
       }
 
-      // 檢查緩存
+      // 檢查緩存：寬限期內的舊值先返回並在背景更新，「找不到」結果直接重現原本的錯誤
+      // 不緩存一般結果的工具（cacheable: false）仍可緩存「找不到」結果；
+      // 緩存鍵只取決於參數，context 中的 requestId 等每次不同的值不列入
       let result = null;
       let fromCache = false;
+      const cacheKey =
+        this.cacheable || this.negativeCacheTTL
+          ? globalToolCache.generateKey(this.name, params)
+          : null;
+
+      if (cacheKey) {
+        // L1 未命中時才查詢共用 L2（多個 worker 共用的 SQLite 緩存）
+        let cached = globalToolCache.lookup(cacheKey);
+        if (!cached && globalToolCache.l2) {
+          cached = await globalToolCache.lookupL2(cacheKey);
+        }
+        fromCache = cached !== null;
 
-      if (this.cacheable) {
-        const cacheKey = globalToolCache.generateKey(
-          this.name,
-          params,
-          context,
-        );
-        result = globalToolCache.get(cacheKey);
-
-        if (result !== null) {
-          fromCache = true;
-
-          // 記錄緩存命中
-          await this.logger.logToolCall({
-            toolName: this.name,
-            executionId,
-            status: "cache_hit",
-            cacheKey,
-            executionTime: Date.now() - startTime,
-          });
-
-          globalStatsManager.recordCacheHit(this.name, {
-            sessionId: context.sessionId,
-            userId: context.userId,
-            cacheKey,
-          });
+        pending = this._emitTelemetry({
+          type: fromCache ? "cache_hit" : "cache_miss",
+          executionId,
+          executionTime: Date.now() - startTime,
+          cacheKey,
+          context: telemetryContext,
+        });
+        if (pending) await pending;
 
-          logger.info(`Tool cache hit: ${this.name}`, {
-            toolName: this.name,
-            executionId,
-            cacheKey,
-          });
-        } else {
-          // 記錄緩存未命中
-          await this.logger.logToolCall({
-            toolName: this.name,
-            executionId,
-            status: "cache_miss",
-            cacheKey,
-          });
+        if (cached) {
+          if (cached.isStale()) {
+            globalToolCache.revalidate(cacheKey, () =>
+              this._refreshCache(params, context, cacheKey),
+            );
+          }
+          if (cached.negative) {
+            const { message, type, details } = cached.value;
+            const error = new ToolExecutionError(message, type, details);
+            pending = this._emitTelemetry({
+              type: "error",
+              executionId,
+              executionTime: Date.now() - startTime,
+              error,
+              context: telemetryContext,
+            });
+            if (pending) await pending;
 
-          globalStatsManager.recordCacheMiss(this.name, {
-            sessionId: context.sessionId,
-            userId: context.userId,
-            cacheKey,
-          });
+            throw error;
+          }
+          result = cached.value;
         }
       }
 
-      // 如果沒有緩存結果，執行工具邏輯
-      if (result === null) {
-        const logEntry = this._logExecutionStart(params, executionId);
-
+      // 如果沒有緩存結果，執行工具邏輯（同一個緩存鍵同時只執行一次）
+      if (!fromCache) {
+        let loaded;
         try {
-          result = await this._execute(params, context);
-
-          const executionTime = Date.now() - startTime;
-          this._logExecutionEnd(executionId, ToolStatus.SUCCESS, result);
-
-          // 記錄成功執行 - 混合日誌
-          await this.logger.logToolCall({
-            toolName: this.name,
-            executionId,
-            status: "success",
-            executionTime,
-            resultSize: JSON.stringify(result).length,
-            context: {
-              sessionId: context.sessionId,
-              userId: context.userId,
-            },
-          });
-
-          // 記錄成功統計
-          globalStatsManager.recordToolSuccess(
-            this.name,
-            executionTime,
-            result,
-            {
-              sessionId: context.sessionId,
-              userId: context.userId,
-              executionId,
-            },
-          );
-
-          // 存入緩存
-          if (this.cacheable && result !== null) {
-            const cacheKey = globalToolCache.generateKey(
-              this.name,
-              params,
-              context,
-            );
-            globalToolCache.set(cacheKey, result, this.cacheTTL);
-          }
+          loaded = cacheKey
+            ? await globalToolCache.singleFlight(cacheKey, () =>
+                this._loadAndCache(params, context, cacheKey, executionId),
+              )
+            : await this._loadAndCache(params, context, null, executionId);
         } catch (error) {
-          const executionTime = Date.now() - startTime;
-          this._logExecutionEnd(executionId, ToolStatus.ERROR, null, error);
-
-          // 記錄錯誤執行 - 混合日誌
-          await this.logger.logToolCall({
-            toolName: this.name,
-            executionId,
-            status: "error",
-            executionTime,
-            error: {
-              message: error.message,
-              type: error.type || "unknown",
-              stack: error.stack,
-            },
-            context: {
-              sessionId: context.sessionId,
-              userId: context.userId,
-            },
-          });
-
-          // 記錄錯誤統計
-          globalStatsManager.recordToolError(this.name, error, executionTime, {
-            sessionId: context.sessionId,
-            userId: context.userId,
+          pending = this._emitTelemetry({
+            type: "error",
             executionId,
+            executionTime: Date.now() - startTime,
+            error,
+            context: telemetryContext,
+            endTime: Date.now(),
           });
+          if (pending) await pending;
 
           throw error;
         }
+
+        result = loaded.result;
+        pending = this._emitTelemetry({
+          type: "success",
+          executionId,
+          executionTime: Date.now() - startTime,
+          result,
+          resultSize: loaded.resultSize,
+          context: telemetryContext,
+          endTime: Date.now(),
+        });
+        if (pending) await pending;
       }
 
       const executionTime = Date.now() - startTime;
@@ -598,6 +693,248 @@ export class BaseTool {
     }
   }
 
+  /**
+   * 執行工具邏輯並寫入緩存
+   * 一般結果依 cacheTTL / cacheStaleTTL 緩存；NOT_FOUND 錯誤依 negativeCacheTTL 緩存後重新拋出
+   * @returns {Promise<{result: *, resultSize: number|undefined}>}
+   */
+  async _loadAndCache(params, context, cacheKey, executionId) {
+    const pending = this._emitTelemetry({
+      type: "run",
+      executionId,
+      startTime: Date.now(),
+      params,
+    });
+    if (pending) await pending;
+
+    // 執行期間若有資料失效（包含其他行程寫入 L2 的失效），結果不寫回緩存
+    const epoch = globalToolCache.epoch;
+    const since = Date.now();
+    let result;
+    try {
+      result = await this._execute(params, context);
+    } catch (error) {
+      if (
+        cacheKey &&
+        this.negativeCacheTTL &&
+        error.type === ToolErrorType.NOT_FOUND
+      ) {
+        globalToolCache.set(
+          cacheKey,
+          { message: error.message, type: error.type, details: error.details },
+          this.negativeCacheTTL,
+          {
+            tool: this.name,
+            negative: true,
+            tags: this._resolveTags(this.cacheTags, params),
+            epoch,
+            since,
+          },
+        );
+      }
+      throw error;
+    }
+
+    if (this.invalidatesTags) {
+      globalToolCache.invalidateTags(
+        this._resolveTags(this.invalidatesTags, params),
+      );
+    }
+
+    let resultSize;
+    if (cacheKey && this.cacheable && result !== null) {
+      resultSize = JSON.stringify(result)?.length ?? 0;
+      globalToolCache.set(cacheKey, result, this.cacheTTL, {
+        tool: this.name,
+        jsonLength: resultSize,
+        staleTTL: this.cacheStaleTTL,
+        tags: this._resolveTags(this.cacheTags, params),
+        epoch,
+        since,
+      });
+    }
+
+    return { result, resultSize };
+  }
+
+  /**
+   * 解析標籤設定（陣列或依參數產生的函數）
+   */
+  _resolveTags(spec, params) {
+    if (!spec) return null;
+    const tags = typeof spec === "function" ? spec(params) : spec;
+    return tags && tags.length > 0 ? tags : null;
+  }
+
+  /**
+   * 背景更新寬限期內的緩存（由 globalToolCache.revalidate 呼叫）
+   * 以獨立的 executionId 記錄執行歷史，不計入工具調用統計
+   */
+  async _refreshCache(params, context, cacheKey) {
+    const executionId = this._generateExecutionId();
+    let loaded = null;
+    let error = null;
+
+    try {
+      loaded = await this._loadAndCache(params, context, cacheKey, executionId);
+      return loaded;
+    } catch (refreshError) {
+      error = refreshError;
+      throw refreshError;
+    } finally {
+      const pending = this._emitTelemetry({
+        type: "refresh",
+        executionId,
+        result: loaded?.result ?? null,
+        error,
+        endTime: Date.now(),
+      });
+      if (pending) await pending;
+    }
+  }
+
+  /**
+   * 放入遙測事件，strict 模式下返回需等待的 Promise
+   */
+  _emitTelemetry(event) {
+    return globalToolTelemetry.emit(this, event);
+  }
+
+  /**
+   * 處理遙測事件：寫入混合日誌、使用統計與執行歷史（由 globalToolTelemetry 呼叫）
+   */
+  async _recordTelemetry(event) {
+    const { type, executionId, executionTime, context } = event;
+    const statsContext = { ...context, executionId };
+
+    switch (type) {
+      case "call":
+        globalStatsManager.recordToolCall(
+          this.name,
+          event.params,
+          statsContext,
+        );
+        await this.logger.logToolCall({
+          toolName: this.name,
+          executionId,
+          params: this._sanitizeParams(event.params),
+          context: { ...context, timestamp: event.startTime },
+          status: "started",
+        });
+        break;
+
+      case "cache_hit":
+        globalStatsManager.recordCacheHit(this.name, {
+          ...context,
+          cacheKey: event.cacheKey,
+        });
+        logger.info(`Tool cache hit: ${this.name}`, {
+          toolName: this.name,
+          executionId,
+          cacheKey: event.cacheKey,
+        });
+        await this.logger.logToolCall({
+          toolName: this.name,
+          executionId,
+          status: "cache_hit",
+          cacheKey: event.cacheKey,
+          executionTime,
+        });
+        break;
+
+      case "cache_miss":
+        globalStatsManager.recordCacheMiss(this.name, {
+          ...context,
+          cacheKey: event.cacheKey,
+        });
+        await this.logger.logToolCall({
+          toolName: this.name,
+          executionId,
+          status: "cache_miss",
+          cacheKey: event.cacheKey,
+        });
+        break;
+
+      case "run":
+        this._logExecutionStart(event.params, executionId, event.startTime);
+        break;
+
+      case "refresh":
+        this._logExecutionEnd(
+          executionId,
+          event.error ? ToolStatus.ERROR : ToolStatus.SUCCESS,
+          event.result,
+          event.error,
+          event.endTime,
+        );
+        break;
+
+      case "success":
+        this._logExecutionEnd(
+          executionId,
+          ToolStatus.SUCCESS,
+          event.result,
+          null,
+          event.endTime,
+        );
+        globalStatsManager.recordToolSuccess(
+          this.name,
+          executionTime,
+          event.result,
+          statsContext,
+        );
+        await this.logger.logToolCall({
+          toolName: this.name,
+          executionId,
+          status: "success",
+          executionTime,
+          resultSize:
+            event.resultSize ?? JSON.stringify(event.result)?.length ?? 0,
+          context,
+        });
+        break;
+
+      case "error": {
+        const { error } = event;
+        // 執行階段的錯誤才有對應的執行歷史
+        if (event.endTime) {
+          this._logExecutionEnd(
+            executionId,
+            ToolStatus.ERROR,
+            null,
+            error,
+            event.endTime,
+          );
+        }
+        globalStatsManager.recordToolError(
+          this.name,
+          error,
+          executionTime,
+          statsContext,
+        );
+        await this.logger.logToolCall({
+          toolName: this.name,
+          executionId,
+          status: "error",
+          executionTime,
+          error: event.defaultErrorType
+            ? {
+                message: error.message,
+                type: error.type || event.defaultErrorType,
+                details: error.details,
+              }
+            : {
+                message: error.message,
+                type: error.type || "unknown",
+                stack: error.stack,
+              },
+          context,
+        });
+        break;
+      }
+    }
+  }
+
   /**
    * 具體的執行邏輯（子類別需要實作）
    */
@@ -609,14 +946,40 @@ export class BaseTool {
     );
   }
 
+  /**
+   * 在 worker thread 執行 CPU 密集的計算（任務定義於 tools/workers/ 下的模組）
+   * 數值陣列請以 Float64Array 傳入並列於 options.transfer，避免複製；
+   * 池的佇列已滿或任務逾時時拋出對應類型的 ToolExecutionError。
+   * @param {string} task - 任務名稱
+   * @param {*} payload - 任務參數
+   * @param {Object} options - { transfer, timeout }
+   */
+  async runInWorker(task, payload, options = {}) {
+    try {
+      return await globalWorkerPool.run(task, payload, options);
+    } catch (error) {
+      if (!(error instanceof WorkerPoolError)) throw error;
+      const type =
+        {
+          QUEUE_FULL: ToolErrorType.RATE_LIMIT_ERROR,
+          TIMEOUT: ToolErrorType.TIMEOUT_ERROR,
+        }[error.code] || ToolErrorType.EXECUTION_ERROR;
+      throw new ToolExecutionError(`背景計算失敗: ${error.message}`, type, {
+        toolName: this.name,
+        task,
+        code: error.code,
+      });
+    }
+  }
+
   /**
    * 記錄執行開始
    */
-  _logExecutionStart(params, executionId) {
+  _logExecutionStart(params, executionId, startTime = Date.now()) {
     const logEntry = {
       executionId,
       status: ToolStatus.RUNNING,
-      startTime: new Date(),
+      startTime: new Date(startTime),
       params: { ...params }, // 複製避免修改原始參數
       endTime: null,
       duration: null,
@@ -625,6 +988,17 @@ export class BaseTool {
     };
 
     this.executionHistory.push(logEntry);
+    if (this.executionHistory.length > this.maxHistory) {
+      const removed = this.executionHistory.splice(
+        0,
+        this.executionHistory.length - this.maxHistory,
+      );
+      // 遙測事件在佇列滿時可能被丟棄，移出歷史的項目不再等待完成
+      for (const entry of removed) {
+        this.runningExecutions.delete(entry.executionId);
+      }
+    }
+    this.runningExecutions.set(executionId, logEntry);
 
     logger.info(`Tool execution started: ${this.name}`, {
       toolName: this.name,
@@ -638,14 +1012,19 @@ export class BaseTool {
   /**
    * 記錄執行完成
    */
-  _logExecutionEnd(executionId, status, result = null, error = null) {
-    const logEntry = this.executionHistory.find(
-      entry => entry.executionId === executionId,
-    );
+  _logExecutionEnd(
+    executionId,
+    status,
+    result = null,
+    error = null,
+    endTime = Date.now(),
+  ) {
+    const logEntry = this.runningExecutions.get(executionId);
 
     if (logEntry) {
+      this.runningExecutions.delete(executionId);
       logEntry.status = status;
-      logEntry.endTime = new Date();
+      logEntry.endTime = new Date(endTime);
       logEntry.duration = logEntry.endTime - logEntry.startTime;
       logEntry.result = result;
       logEntry.error = error;
@@ -658,11 +1037,10 @@ export class BaseTool {
         this.stats.errorCount++;
       }
 
-      // 更新平均執行時間
-      const totalTime = this.executionHistory
-        .filter(entry => entry.duration !== null)
-        .reduce((sum, entry) => sum + entry.duration, 0);
-      this.stats.averageExecutionTime = totalTime / this.stats.totalExecutions;
+      // 更新平均執行時間（累計總時間，不重新掃描歷史）
+      this.totalExecutionTime += logEntry.duration;
+      this.stats.averageExecutionTime =
+        this.totalExecutionTime / this.stats.totalExecutions;
 
       logger.info(`Tool execution completed: ${this.name}`, {
         toolName: this.name,
@@ -748,6 +1126,8 @@ export class BaseTool {
    */
   clearHistory() {
     this.executionHistory = [];
+    this.runningExecutions.clear();
+    this.totalExecutionTime = 0;
     this.stats = {
       totalExecutions: 0,
       successCount: 0,
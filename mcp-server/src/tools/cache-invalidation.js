@@ -0,0 +1,153 @@
+/**
+ * 工具緩存失效來源
+ *
+ * 依資料異動清除 globalToolCache 中標記了對應標籤的項目，讓工具可以使用較長的 TTL：
+ * - ChangePollWatcher：定期查詢資料的版本（水位），與上次不同時清除指定標籤
+ * - HR 目錄快照異動：增量更新時只清除異動員工的 "hr:employee:<編號>"，完整載入時清除 "hr:*"
+ * 其他觸發方式：管理端點 POST /api/quality/cache/invalidate，以及宣告 invalidatesTags 的寫入型工具。
+ */
+
+import config from "../config/config.js";
+import logger from "../config/logger.js";
+import milService from "../services/mil/mil-service.js";
+import hrDirectory from "../services/hr/hr-directory.js";
+import { globalToolCache } from "./tool-cache.js";
+
+export class ChangePollWatcher {
+  /**
+   * @param {Object} options
+   * @param {Object} options.cache - 具 invalidateTags(tags) 的緩存
+   * @param {number} options.interval - 輪詢間隔（毫秒）
+   */
+  constructor(options = {}) {
+    this.cache = options.cache || globalToolCache;
+    this.interval = options.interval ?? 30000;
+    this.sources = new Map();
+    this.timer = null;
+  }
+
+  /**
+   * 註冊資料來源
+   * @param {string} name - 來源名稱（例如 "mil"）
+   * @param {Object} source
+   * @param {Function} source.fetchVersion - 返回目前版本字串的函數
+   * @param {string[]} source.tags - 版本變更時要清除的標籤
+   */
+  watch(name, { fetchVersion, tags }) {
+    this.sources.set(name, {
+      fetchVersion,
+      tags,
+      version: null,
+      checks: 0,
+      changes: 0,
+      errors: 0,
+      lastCheckedAt: null,
+    });
+  }
+
+  /**
+   * 檢查單一來源；第一次檢查只記錄版本
+   * @returns {Promise<boolean>} 是否偵測到變更
+   */
+  async poll(name) {
+    const source = this.sources.get(name);
+    const version = String(await source.fetchVersion());
+    source.checks++;
+    source.lastCheckedAt = new Date().toISOString();
+
+    const changed = source.version !== null && version !== source.version;
+    source.version = version;
+    if (changed) {
+      source.changes++;
+      const invalidated = this.cache.invalidateTags(source.tags);
+      logger.info(`${name} 資料已異動，清除相關工具緩存`, {
+        tags: source.tags,
+        invalidated,
+      });
+    }
+    return changed;
+  }
+
+  /**
+   * 檢查所有來源，個別來源失敗不影響其他來源
+   */
+  async pollAll() {
+    for (const [name, source] of this.sources) {
+      try {
+        await this.poll(name);
+      } catch (error) {
+        source.errors++;
+        logger.warn(`${name} 資料版本檢查失敗`, { error: error.message });
+      }
+    }
+  }
+
+  start() {
+    if (!this.interval || this.timer) return;
+
+    this.timer = setInterval(() => this.pollAll(), this.interval);
+    if (this.timer.unref) {
+      this.timer.unref();
+    }
+  }
+
+  stop() {
+    if (this.timer) {
+      clearInterval(this.timer);
+      this.timer = null;
+    }
+  }
+
+  getStats() {
+    const sources = {};
+    for (const [name, { fetchVersion, tags, ...stats }] of this.sources) {
+      sources[name] = { tags, ...stats };
+    }
+    return { interval: this.interval, running: this.timer !== null, sources };
+  }
+}
+
+/**
+ * HR 目錄快照異動對應的失效標籤
+ * @param {Object} event - hrDirectory.onChange 的事件 {type, employeeNos}
+ */
+export function hrChangeTags(event) {
+  if (event.type === "delta" && event.employeeNos?.length > 0) {
+    return event.employeeNos.map(employeeNo => `hr:employee:${employeeNo}`);
+  }
+  return ["hr:*"];
+}
+
+// 全域異動輪詢：MIL 水位與彙總快取共用同一次查詢
+export const globalChangeWatcher = new ChangePollWatcher({
+  interval: config.toolCacheInvalidationInterval,
+});
+
+let unsubscribeHR = null;
+
+/**
+ * 啟動資料異動觸發的緩存失效（伺服器啟動時呼叫）
+ */
+export function startCacheInvalidation() {
+  globalChangeWatcher.watch("mil", {
+    fetchVersion: () =>
+      milService.aggregateCache.getWatermark(globalChangeWatcher.interval),
+    tags: ["mil:*"],
+  });
+  globalChangeWatcher.start();
+
+  unsubscribeHR ||= hrDirectory.onChange(event => {
+    globalToolCache.invalidateTags(hrChangeTags(event));
+  });
+}
+
+/**
+ * 停止資料異動輪詢與監聽
+ */
+export function stopCacheInvalidation() {
+  globalChangeWatcher.stop();
+  if (unsubscribeHR) {
+    unsubscribeHR();
+    unsubscribeHR = null;
+  }
+}
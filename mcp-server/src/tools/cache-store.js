@@ -0,0 +1,394 @@
+/**
+ * 工具緩存 L2：SQLite 共用儲存
+ *
+ * 多個 worker 或同一台主機上的多個副本共用同一個 SQLite 檔案（WAL 模式），
+ * 每個行程的記憶體 L1 未命中時改讀 L2，避免叢集化後命中率依行程數下降。
+ *
+ * - 值以 JSON 序列化，超過 compressThreshold 的值以 gzip 壓縮後存成 BLOB
+ * - 儲存絕對的建立時間與 TTL / 寬限期，所有行程對同一項目算出相同的過期時間
+ * - 標籤失效與清空會寫入 tool_cache_invalidations 記錄，
+ *   其他行程以 pollInvalidations 取得後清除自己的 L1
+ */
+
+import fs from "fs";
+import path from "path";
+import zlib from "zlib";
+import { promisify } from "util";
+import sqlite3 from "sqlite3";
+import config from "../config/config.js";
+import logger from "../config/logger.js";
+import { globalToolCache, parseByteSize } from "./tool-cache.js";
+
+const gzip = promisify(zlib.gzip);
+const gunzip = promisify(zlib.gunzip);
+
+const TABLE = "tool_cache";
+const INVALIDATION_TABLE = "tool_cache_invalidations";
+// 失效記錄保留時間：其他行程至少每次輪詢都能讀到
+const INVALIDATION_RETENTION = 60 * 60 * 1000;
+
+/**
+ * 依標籤失效規則產生 SQL 條件（與 ToolCache._matchingTags 相同）：
+ * "ns:*" 清除所有 "ns:" 開頭的標籤；一般標籤也清除各層命名空間的 "ns:*"
+ * @returns {{clause: string, params: Array}} 作用於 json_each(tags).value 的條件
+ */
+export function buildTagCondition(tags) {
+  const exact = new Set();
+  const prefixes = [];
+
+  for (const tag of tags) {
+    if (tag === "*") return { clause: "1", params: [] };
+    if (tag.endsWith(":*")) {
+      prefixes.push(tag.slice(0, -1));
+      continue;
+    }
+    exact.add(tag);
+    const parts = tag.split(":");
+    for (let i = 1; i < parts.length; i++) {
+      exact.add(`${parts.slice(0, i).join(":")}:*`);
+    }
+  }
+
+  const clauses = [];
+  const params = [];
+  if (exact.size > 0) {
+    clauses.push(`value IN (${[...exact].map(() => "?").join(", ")})`);
+    params.push(...exact);
+  }
+  for (const prefix of prefixes) {
+    clauses.push("substr(value, 1, ?) = ?");
+    params.push(prefix.length, prefix);
+  }
+  return { clause: clauses.join(" OR ") || "0", params };
+}
+
+export class SqliteCacheStore {
+  /**
+   * @param {sqlite3.Database} db
+   * @param {Object} options
+   * @param {number} options.compressThreshold - 超過此位元組數的值以 gzip 壓縮
+   */
+  constructor(db, options = {}) {
+    this.db = db;
+    this.compressThreshold = options.compressThreshold ?? 4096;
+    // 失效或清空時遞增；壓縮期間發生失效的寫入會被捨棄
+    this.epoch = 0;
+    this.stats = {
+      hits: 0,
+      misses: 0,
+      writes: 0,
+      discardedWrites: 0,
+      compressedWrites: 0,
+      bytesWritten: 0,
+      rawBytesWritten: 0,
+      invalidations: 0,
+      invalidatedEntries: 0,
+      errors: 0,
+    };
+  }
+
+  run(sql, params = []) {
+    return new Promise((resolve, reject) => {
+      this.db.run(sql, params, function (err) {
+        if (err) reject(err);
+        else resolve(this);
+      });
+    });
+  }
+
+  all(sql, params = []) {
+    return new Promise((resolve, reject) => {
+      this.db.all(sql, params, (err, rows) => {
+        if (err) reject(err);
+        else resolve(rows);
+      });
+    });
+  }
+
+  exec(sql) {
+    return new Promise((resolve, reject) => {
+      this.db.exec(sql, err => {
+        if (err) reject(err);
+        else resolve();
+      });
+    });
+  }
+
+  async init() {
+    await this.exec(`
+      CREATE TABLE IF NOT EXISTS ${TABLE} (
+        key TEXT PRIMARY KEY,
+        tool TEXT,
+        value BLOB NOT NULL,
+        encoding TEXT NOT NULL,
+        created_at INTEGER NOT NULL,
+        ttl INTEGER NOT NULL,
+        stale_ttl INTEGER NOT NULL DEFAULT 0,
+        negative INTEGER NOT NULL DEFAULT 0,
+        tags TEXT,
+        expires_at INTEGER NOT NULL
+      ) WITHOUT ROWID;
+      CREATE INDEX IF NOT EXISTS idx_${TABLE}_expires_at
+        ON ${TABLE}(expires_at);
+      CREATE TABLE IF NOT EXISTS ${INVALIDATION_TABLE} (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        tags TEXT NOT NULL,
+        created_at INTEGER NOT NULL
+      );
+      CREATE INDEX IF NOT EXISTS idx_${INVALIDATION_TABLE}_created_at
+        ON ${INVALIDATION_TABLE}(created_at);
+    `);
+  }
+
+  /**
+   * 讀取未過期的項目
+   * @returns {Promise<Object|null>} {key, tool, value, createdAt, ttl, staleTTL, negative, tags}
+   */
+  async get(key, now = Date.now()) {
+    const [row] = await this.all(
+      `SELECT * FROM ${TABLE} WHERE key = ? AND expires_at >= ?`,
+      [key, now],
+    );
+    if (!row) {
+      this.stats.misses++;
+      return null;
+    }
+
+    this.stats.hits++;
+    const json =
+      row.encoding === "json+gzip"
+        ? (await gunzip(row.value)).toString("utf8")
+        : Buffer.isBuffer(row.value)
+          ? row.value.toString("utf8")
+          : row.value;
+
+    return {
+      key,
+      tool: row.tool,
+      value: JSON.parse(json),
+      createdAt: row.created_at,
+      ttl: row.ttl,
+      staleTTL: row.stale_ttl,
+      negative: row.negative === 1,
+      tags: row.tags ? JSON.parse(row.tags) : null,
+    };
+  }
+
+  /**
+   * 寫入項目
+   * @param {string} key
+   * @param {*} value
+   * @param {Object} options
+   * @param {number} options.createdAt - 與 L1 相同的建立時間
+   * @param {number} options.ttl
+   * @param {number} options.staleTTL
+   * @param {boolean} options.negative
+   * @param {string[]} options.tags
+   * @param {string} options.tool
+   * @param {number} options.since - 結果開始載入的時間；之後任何行程有失效則不寫入
+   * @returns {Promise<boolean>} 是否已寫入
+   */
+  async set(key, value, options = {}) {
+    const epoch = this.epoch;
+    const createdAt = options.createdAt ?? Date.now();
+    const ttl = options.ttl;
+    const staleTTL = options.staleTTL || 0;
+
+    const json = JSON.stringify(value) ?? "null";
+    let data = Buffer.from(json, "utf8");
+    const rawBytes = data.length;
+    let encoding = "json";
+    if (rawBytes > this.compressThreshold) {
+      data = await gzip(data);
+      encoding = "json+gzip";
+    }
+
+    if (epoch !== this.epoch) {
+      this.stats.discardedWrites++;
+      return false;
+    }
+
+    const since = options.since ?? createdAt;
+    const result = await this.run(
+      `INSERT OR REPLACE INTO ${TABLE}
+         (key, tool, value, encoding, created_at, ttl, stale_ttl, negative,
+          tags, expires_at)
+       SELECT ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
+        WHERE NOT EXISTS (SELECT 1 FROM ${INVALIDATION_TABLE} WHERE created_at >= ?)`,
+      [
+        key,
+        options.tool || null,
+        data,
+        encoding,
+        createdAt,
+        ttl,
+        staleTTL,
+        options.negative ? 1 : 0,
+        options.tags ? JSON.stringify(options.tags) : null,
+        createdAt + ttl + staleTTL,
+        since,
+      ],
+    );
+
+    if (result.changes === 0) {
+      this.stats.discardedWrites++;
+      return false;
+    }
+
+    this.stats.writes++;
+    this.stats.rawBytesWritten += rawBytes;
+    this.stats.bytesWritten += data.length;
+    if (encoding !== "json") this.stats.compressedWrites++;
+    return true;
+  }
+
+  async delete(key) {
+    const result = await this.run(`DELETE FROM ${TABLE} WHERE key = ?`, [key]);
+    return result.changes > 0;
+  }
+
+  /**
+   * 清除標記了指定標籤的項目，並記錄失效讓其他行程清除 L1
+   * @returns {Promise<{deleted: number, seq: number}>}
+   */
+  async invalidateTags(tags) {
+    this.epoch++;
+    const { clause, params } = buildTagCondition(tags);
+    const result = await this.run(
+      `DELETE FROM ${TABLE}
+        WHERE tags IS NOT NULL
+          AND EXISTS (SELECT 1 FROM json_each(${TABLE}.tags) WHERE ${clause})`,
+      params,
+    );
+    const seq = await this._logInvalidation(tags);
+
+    this.stats.invalidations++;
+    this.stats.invalidatedEntries += result.changes;
+    return { deleted: result.changes, seq };
+  }
+
+  /**
+   * 清空所有項目
+   * @returns {Promise<{deleted: number, seq: number}>}
+   */
+  async clear() {
+    this.epoch++;
+    const result = await this.run(`DELETE FROM ${TABLE}`);
+    const seq = await this._logInvalidation(["*"]);
+    return { deleted: result.changes, seq };
+  }
+
+  async _logInvalidation(tags) {
+    const result = await this.run(
+      `INSERT INTO ${INVALIDATION_TABLE} (tags, created_at) VALUES (?, ?)`,
+      [JSON.stringify(tags), Date.now()],
+    );
+    return result.lastID;
+  }
+
+  /**
+   * 最新的失效序號（行程啟動時作為輪詢起點）
+   */
+  async latestInvalidation() {
+    const [row] = await this.all(
+      `SELECT MAX(seq) AS seq FROM ${INVALIDATION_TABLE}`,
+    );
+    return row?.seq || 0;
+  }
+
+  /**
+   * 取得序號大於 sinceSeq 的失效記錄
+   * @returns {Promise<Array<{seq: number, tags: string[]}>>}
+   */
+  async pollInvalidations(sinceSeq) {
+    const rows = await this.all(
+      `SELECT seq, tags FROM ${INVALIDATION_TABLE} WHERE seq > ? ORDER BY seq`,
+      [sinceSeq],
+    );
+    return rows.map(row => ({ seq: row.seq, tags: JSON.parse(row.tags) }));
+  }
+
+  /**
+   * 刪除過期項目與舊的失效記錄
+   */
+  async purgeExpired(now = Date.now()) {
+    const result = await this.run(`DELETE FROM ${TABLE} WHERE expires_at < ?`, [
+      now,
+    ]);
+    await this.run(`DELETE FROM ${INVALIDATION_TABLE} WHERE created_at < ?`, [
+      now - INVALIDATION_RETENTION,
+    ]);
+    return result.changes;
+  }
+
+  close() {
+    return new Promise((resolve, reject) => {
+      this.db.close(err => (err ? reject(err) : resolve()));
+    });
+  }
+
+  getStats() {
+    const lookups = this.stats.hits + this.stats.misses;
+    return {
+      ...this.stats,
+      hitRate:
+        (lookups > 0 ? (this.stats.hits / lookups) * 100 : 0).toFixed(2) + "%",
+      compressionRatio:
+        this.stats.bytesWritten > 0
+          ? (this.stats.rawBytesWritten / this.stats.bytesWritten).toFixed(2)
+          : null,
+    };
+  }
+}
+
+/**
+ * 開啟 SQLite 檔案（WAL 模式，多行程共用）
+ */
+export function openCacheDatabase(filePath) {
+  fs.mkdirSync(path.dirname(filePath), { recursive: true });
+  return new Promise((resolve, reject) => {
+    const db = new sqlite3.Database(filePath, err => {
+      if (err) return reject(err);
+      db.exec("PRAGMA journal_mode=WAL; PRAGMA busy_timeout=5000;", pragmaErr =>
+        pragmaErr ? reject(pragmaErr) : resolve(db),
+      );
+    });
+  });
+}
+
+/**
+ * 依設定為 globalToolCache 掛上共用 L2（TOOL_CACHE_L2=sqlite）
+ * 失敗時只使用行程內 L1
+ */
+export async function initSharedToolCache(cache = globalToolCache) {
+  if (config.toolCacheL2 !== "sqlite") return null;
+
+  const filePath =
+    config.toolCacheL2Path ||
+    path.join(path.dirname(logger.dbPath), "tool-cache.db");
+  try {
+    const db = await openCacheDatabase(filePath);
+    const store = new SqliteCacheStore(db, {
+      compressThreshold: parseByteSize(config.toolCacheL2CompressThreshold),
+    });
+    await cache.attachL2(store, {
+      pollInterval: config.toolCacheL2PollInterval,
+    });
+    logger.info("工具緩存 L2 已啟用", { filePath });
+    return store;
+  } catch (error) {
+    logger.error("工具緩存 L2 初始化失敗，僅使用行程內緩存", {
+      filePath,
+      error: error.message,
+    });
+    return null;
+  }
+}
+
+/**
+ * 卸下並關閉 globalToolCache 的 L2（伺服器關閉時呼叫，L2 內容保留給其他行程）
+ */
+export async function closeSharedToolCache(cache = globalToolCache) {
+  const store = await cache.detachL2();
+  if (store) await store.close();
+}
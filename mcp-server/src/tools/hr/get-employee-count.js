@@ -56,6 +56,8 @@ export class GetEmployeeCountTool extends BaseTool {
         required: [],
       },
       {
+        cacheStaleTTL: 60 * 1000, // 過期後 1 分鐘內先返回舊值並背景更新
+        cacheTags: ["hr:*"],
         module: "hr",
         requiredDatabases: ["qms"],
       },
@@ -84,6 +84,8 @@ export class GetEmployeeTool extends BaseTool {
       },
       {
         cacheable: false, // 停用快取，避免個人資料被誤用
+        negativeCacheTTL: 30 * 1000, // 只緩存「員工不存在」30 秒，不含個人資料
+        cacheTags: params => [`hr:employee:${params.employeeNo}`],
         module: "hr", // 設定模組
         requiredDatabases: ["qms"], // 需要 QMS 資料庫
       },
@@ -46,6 +46,7 @@ export class SearchEmployeesTool extends BaseTool {
 
 搜尋功能特色：
 - 支援姓名模糊查詢
+- fuzzy=true 時容許錯字、比對別名/帳號/拼音，並依相關度排序（matchScore）
 - 可按部門、職位篩選
 - 可控制返回詳細程度
 - 支援分頁查詢
@@ -90,15 +91,28 @@ export class SearchEmployeesTool extends BaseTool {
             default: 20,
             description: "每頁筆數（1-50），用於分頁查詢",
           },
+          cursor: {
+            type: "string",
+            description:
+              "分頁游標（可選），傳入上一頁 pagination.nextCursor 取得下一頁，提供時忽略 page",
+          },
           includeDetails: {
             type: "boolean",
             default: false,
             description: "是否包含詳細資訊（如電子郵件、別名等）",
           },
+          fuzzy: {
+            type: "boolean",
+            default: false,
+            description:
+              "是否使用模糊搜尋（可選），需提供 name；容許錯字並依相關度排序，返回前 limit 筆",
+          },
         },
         required: [],
       },
       {
+        cacheStaleTTL: 60 * 1000, // 過期後 1 分鐘內先返回舊值並背景更新
+        cacheTags: ["hr:*"],
         module: "hr",
         requiredDatabases: ["qms"],
       },
@@ -117,6 +131,8 @@ export class SearchEmployeesTool extends BaseTool {
       page = 1,
       limit = 20,
       includeDetails = false,
+      cursor = null,
+      fuzzy = false,
     } = params;
 
     try {
@@ -155,12 +171,40 @@ export class SearchEmployeesTool extends BaseTool {
         status,
       };
 
+      // 模糊搜尋：依相關度排序，不分頁
+      if (fuzzy && name) {
+        const fuzzyResult = await employeeService.findEmployeesByNameOrDepartment(
+          filters,
+          limit,
+        );
+        return {
+          queryTime: new Date().toISOString(),
+          criteria: {
+            name,
+            department,
+            titleName,
+            status,
+            fuzzy: true,
+          },
+          data: fuzzyResult.employees,
+          pagination: {
+            page: 1,
+            limit,
+            total: fuzzyResult.count,
+            totalPages: 1,
+            hasMore: false,
+            nextCursor: null,
+          },
+        };
+      }
+
       // 呼叫服務層執行查詢
       const result = await employeeService.getEmployeeList(
         filters,
         page,
         limit,
         includeDetails,
+        cursor,
       );
 
       logger.info("Employee search completed", {
@@ -0,0 +1,355 @@
+/**
+ * 工具延遲分位數草圖
+ *
+ * 以對數分桶（DDSketch 演算法）記錄延遲分佈：每個桶涵蓋固定的相對誤差範圍，
+ * 因此任何分位數的估計值與實際值的相對誤差不超過 relativeAccuracy。
+ * 草圖可直接相加合併（同一工具的多個時間片、同一模組的多個工具、或 Python 客戶端的草圖），
+ * 並以 maxBins 限制記憶體用量。
+ */
+
+// 滑動視窗定義（毫秒）
+export const LATENCY_WINDOWS = {
+  "1m": 60 * 1000,
+  "5m": 5 * 60 * 1000,
+  "15m": 15 * 60 * 1000,
+  "1h": 60 * 60 * 1000,
+};
+
+const DEFAULT_RELATIVE_ACCURACY = 0.01;
+const DEFAULT_MAX_BINS = 1024;
+// 小於此值（毫秒）的延遲計入零桶
+const MIN_INDEXABLE_VALUE = 1e-3;
+
+/**
+ * 可合併的分位數草圖
+ */
+export class LatencySketch {
+  /**
+   * @param {Object} options
+   * @param {number} options.relativeAccuracy - 相對誤差上限（預設 1%）
+   * @param {number} options.maxBins - 桶數上限，超過時合併最低的桶
+   */
+  constructor(options = {}) {
+    this.relativeAccuracy =
+      options.relativeAccuracy || DEFAULT_RELATIVE_ACCURACY;
+    this.maxBins = options.maxBins || DEFAULT_MAX_BINS;
+    this.gamma = (1 + this.relativeAccuracy) / (1 - this.relativeAccuracy);
+    this.logGamma = Math.log(this.gamma);
+
+    this.bins = new Map(); // 桶序號 -> 次數
+    this.zeroCount = 0;
+    this.count = 0;
+    this.sum = 0;
+    this.min = Infinity;
+    this.max = -Infinity;
+  }
+
+  /**
+   * 記錄一筆延遲（毫秒）
+   */
+  add(value, weight = 1) {
+    if (!Number.isFinite(value) || value < 0) return;
+
+    if (value < MIN_INDEXABLE_VALUE) {
+      this.zeroCount += weight;
+    } else {
+      const index = Math.ceil(Math.log(value) / this.logGamma);
+      this.bins.set(index, (this.bins.get(index) || 0) + weight);
+      if (this.bins.size > this.maxBins) this._collapse();
+    }
+
+    this.count += weight;
+    this.sum += value * weight;
+    this.min = Math.min(this.min, value);
+    this.max = Math.max(this.max, value);
+  }
+
+  /**
+   * 合併另一個草圖（需使用相同的 relativeAccuracy）
+   */
+  merge(other) {
+    if (!other || other.count === 0) return this;
+    if (other.relativeAccuracy !== this.relativeAccuracy) {
+      throw new Error("無法合併相對誤差不同的延遲草圖");
+    }
+
+    for (const [index, count] of other.bins) {
+      this.bins.set(index, (this.bins.get(index) || 0) + count);
+    }
+    if (this.bins.size > this.maxBins) this._collapse();
+
+    this.zeroCount += other.zeroCount;
+    this.count += other.count;
+    this.sum += other.sum;
+    this.min = Math.min(this.min, other.min);
+    this.max = Math.max(this.max, other.max);
+    return this;
+  }
+
+  /**
+   * 估計分位數
+   * @param {number} q - 0 到 1 之間
+   * @returns {number|null}
+   */
+  quantile(q) {
+    if (this.count === 0) return null;
+    if (q <= 0) return this.min;
+    if (q >= 1) return this.max;
+
+    const rank = q * (this.count - 1);
+    let seen = this.zeroCount;
+    if (rank < seen) return this.min;
+
+    const indexes = [...this.bins.keys()].sort((a, b) => a - b);
+    for (const index of indexes) {
+      seen += this.bins.get(index);
+      if (seen > rank) {
+        const estimate = (2 * Math.pow(this.gamma, index)) / (this.gamma + 1);
+        return Math.min(Math.max(estimate, this.min), this.max);
+      }
+    }
+    return this.max;
+  }
+
+  /**
+   * 取得常用摘要（p50 / p90 / p99）
+   */
+  summary() {
+    const round = value => (value === null ? null : Math.round(value * 100) / 100);
+    return {
+      count: this.count,
+      mean: this.count > 0 ? round(this.sum / this.count) : null,
+      min: this.count > 0 ? round(this.min) : null,
+      max: this.count > 0 ? round(this.max) : null,
+      p50: round(this.quantile(0.5)),
+      p90: round(this.quantile(0.9)),
+      p99: round(this.quantile(0.99)),
+    };
+  }
+
+  /**
+   * 序列化（可由 Python 端的 LatencySketch.from_dict 還原並合併）
+   */
+  toJSON() {
+    return {
+      relativeAccuracy: this.relativeAccuracy,
+      zeroCount: this.zeroCount,
+      count: this.count,
+      sum: this.sum,
+      min: this.count > 0 ? this.min : null,
+      max: this.count > 0 ? this.max : null,
+      bins: [...this.bins.entries()],
+    };
+  }
+
+  /**
+   * 由序列化資料還原
+   */
+  static fromJSON(data, options = {}) {
+    const sketch = new LatencySketch({
+      ...options,
+      relativeAccuracy: data.relativeAccuracy,
+    });
+    for (const [index, count] of data.bins || []) {
+      sketch.bins.set(index, count);
+    }
+    sketch.zeroCount = data.zeroCount || 0;
+    sketch.count = data.count || 0;
+    sketch.sum = data.sum || 0;
+    sketch.min = data.min ?? Infinity;
+    sketch.max = data.max ?? -Infinity;
+    if (sketch.bins.size > sketch.maxBins) sketch._collapse();
+    return sketch;
+  }
+
+  // 桶數超過上限時，將最低的桶合併，保留高分位數的精度
+  _collapse() {
+    const indexes = [...this.bins.keys()].sort((a, b) => a - b);
+    const excess = indexes.length - this.maxBins;
+    const target = indexes[excess];
+    let collapsed = 0;
+    for (let i = 0; i < excess; i++) {
+      collapsed += this.bins.get(indexes[i]);
+      this.bins.delete(indexes[i]);
+    }
+    this.bins.set(target, this.bins.get(target) + collapsed);
+  }
+}
+
+/**
+ * 滑動視窗草圖：以固定時間片的環狀緩衝區保存草圖，查詢時合併視窗內的時間片
+ */
+export class WindowedLatencySketch {
+  /**
+   * @param {Object} options
+   * @param {number} options.sliceMs - 時間片長度（預設 10 秒）
+   * @param {number} options.horizonMs - 可查詢的最長視窗（預設 1 小時）
+   */
+  constructor(options = {}) {
+    this.options = options;
+    this.sliceMs = options.sliceMs || 10 * 1000;
+    this.size = Math.ceil((options.horizonMs || LATENCY_WINDOWS["1h"]) / this.sliceMs);
+    this.slices = new Array(this.size).fill(null);
+    this.lifetime = new LatencySketch(options);
+  }
+
+  /**
+   * 記錄一筆延遲
+   */
+  add(value, timestampMs = Date.now()) {
+    const index = Math.floor(timestampMs / this.sliceMs);
+    const position = index % this.size;
+    let slice = this.slices[position];
+
+    if (!slice || slice.index !== index) {
+      slice = { index, sketch: new LatencySketch(this.options) };
+      this.slices[position] = slice;
+    }
+
+    slice.sketch.add(value);
+    this.lifetime.add(value);
+  }
+
+  /**
+   * 取得指定視窗的合併草圖
+   * @param {string} window - "1m" / "5m" / "15m" / "1h" / "all"
+   */
+  getSketch(window = "5m", nowMs = Date.now()) {
+    if (window === "all") return this.lifetime;
+
+    const windowMs = LATENCY_WINDOWS[window];
+    if (!windowMs) {
+      throw new Error(`不支援的延遲視窗: ${window}`);
+    }
+
+    const current = Math.floor(nowMs / this.sliceMs);
+    const oldest = current - Math.min(Math.ceil(windowMs / this.sliceMs), this.size) + 1;
+    const merged = new LatencySketch(this.options);
+
+    for (const slice of this.slices) {
+      if (slice && slice.index >= oldest && slice.index <= current) {
+        merged.merge(slice.sketch);
+      }
+    }
+    return merged;
+  }
+}
+
+/**
+ * 依工具與模組分別記錄延遲
+ */
+export class LatencyTracker {
+  constructor(options = {}) {
+    this.options = options;
+    this.tools = new Map(); // toolName -> WindowedLatencySketch
+    this.modules = new Map(); // module -> WindowedLatencySketch
+  }
+
+  /**
+   * 記錄一次工具調用的延遲
+   * @param {string} toolName - 工具名稱
+   * @param {string} module - 所屬模組（可為 null）
+   * @param {number} durationMs - 延遲（毫秒）
+   */
+  record(toolName, module, durationMs, timestampMs = Date.now()) {
+    this._get(this.tools, toolName).add(durationMs, timestampMs);
+    if (module) {
+      this._get(this.modules, module).add(durationMs, timestampMs);
+    }
+  }
+
+  /**
+   * 取得單一工具各視窗的分位數
+   */
+  getToolPercentiles(toolName) {
+    const windowed = this.tools.get(toolName);
+    if (!windowed) return null;
+
+    const result = {};
+    for (const window of [...Object.keys(LATENCY_WINDOWS), "all"]) {
+      result[window] = windowed.getSketch(window).summary();
+    }
+    return result;
+  }
+
+  /**
+   * 取得所有工具與模組在指定視窗的分位數
+   * @param {string} window - 視窗名稱
+   * @param {Object} options
+   * @param {boolean} options.includeSketches - 是否附上序列化草圖（供外部合併）
+   */
+  getStats(window = "5m", { includeSketches = false } = {}) {
+    const describe = group => {
+      const result = {};
+      for (const [name, windowed] of group) {
+        const sketch = windowed.getSketch(window);
+        result[name] = includeSketches
+          ? { ...sketch.summary(), sketch: sketch.toJSON() }
+          : sketch.summary();
+      }
+      return result;
+    };
+
+    return {
+      window,
+      availableWindows: [...Object.keys(LATENCY_WINDOWS), "all"],
+      tools: describe(this.tools),
+      modules: describe(this.modules),
+    };
+  }
+
+  reset() {
+    this.tools.clear();
+    this.modules.clear();
+  }
+
+  _get(group, key) {
+    let windowed = group.get(key);
+    if (!windowed) {
+      windowed = new WindowedLatencySketch(this.options);
+      group.set(key, windowed);
+    }
+    return windowed;
+  }
+}
+
+/**
+ * 合併多個 LatencyTracker.getStats 的結果（需以 includeSketches 取得）
+ * cluster 模式下用於合併各 worker 的延遲分佈
+ * @param {Object[]} statsList - 同一視窗的 getStats 結果
+ * @param {Object} options
+ * @param {boolean} options.includeSketches - 結果是否附上合併後的草圖
+ */
+export function mergeLatencyStats(statsList, { includeSketches = false } = {}) {
+  const mergeGroup = group => {
+    const sketches = new Map();
+    for (const stats of statsList) {
+      for (const [name, entry] of Object.entries(stats[group])) {
+        const sketch = LatencySketch.fromJSON(entry.sketch);
+        const existing = sketches.get(name);
+        if (existing) existing.merge(sketch);
+        else sketches.set(name, sketch);
+      }
+    }
+
+    const result = {};
+    for (const [name, sketch] of sketches) {
+      result[name] = includeSketches
+        ? { ...sketch.summary(), sketch: sketch.toJSON() }
+        : sketch.summary();
+    }
+    return result;
+  };
+
+  return {
+    window: statsList[0]?.window ?? "5m",
+    availableWindows: [...Object.keys(LATENCY_WINDOWS), "all"],
+    tools: mergeGroup("tools"),
+    modules: mergeGroup("modules"),
+  };
+}
+
+// 全域延遲追蹤器實例
+export const globalLatencyTracker = new LatencyTracker();
+
+export default globalLatencyTracker;
@@ -8,7 +8,7 @@ import milService from "../../services/mil/mil-service.js";
 import logger from "../../config/logger.js";
 
 // 允許統計的欄位列表（防止 SQL 注入）
-const ALLOWED_COLUMNS = [
+export const ALLOWED_COLUMNS = [
   "MidTypeName",
   "naqi_num",
   "is_APPLY",
@@ -40,12 +40,18 @@ export class GetCountByTool extends BaseTool {
             enum: ALLOWED_COLUMNS,
             examples: ["Status", "TypeName", "ProposalFactory"],
           },
+          maxStaleness: {
+            type: "integer",
+            description:
+              "可接受的資料陳舊秒數（選填，預設 60）。0 表示強制確認資料是否有變更",
+            minimum: 0,
+          },
         },
         required: ["columnName"],
       },
       {
-        cacheable: true,
-        cacheExpiry: 60 * 5, // 5 分鐘
+        // 由 MIL 彙總快取依變更水位維護，不再使用工具層快取
+        cacheable: false,
         module: "mil",
         requiredDatabases: ["mil"],
       },
@@ -55,7 +61,7 @@ export class GetCountByTool extends BaseTool {
   // NOTE: 要注意是 _execute 不是 execute
   async _execute(params) {
     try {
-      const { columnName } = params;
+      const { columnName, maxStaleness } = params;
 
       // 驗證欄位名稱（防止 SQL 注入）
       if (!ALLOWED_COLUMNS.includes(columnName)) {
@@ -66,7 +72,7 @@ export class GetCountByTool extends BaseTool {
         );
       }
 
-      const result = await milService.getCountBy(columnName);
+      const result = await milService.getCountBy(columnName, { maxStaleness });
 
       // 記錄執行資訊
       logger.info("MIL 依欄位統計查詢成功", {
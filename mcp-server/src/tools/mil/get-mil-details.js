@@ -67,6 +67,9 @@ export class GetMILDetailsTool extends BaseTool {
       {
         cacheable: true,
         cacheExpiry: 60 * 5, // 5 分鐘
+        cacheStaleTTL: 60 * 1000, // 過期後 1 分鐘內先返回舊值並背景更新
+        negativeCacheTTL: 30 * 1000, // 不存在的 MIL 編號緩存 30 秒
+        cacheTags: params => [`mil:serial:${params.serialNumber}`],
         module: "mil",
         requiredDatabases: ["mil"],
       },
@@ -127,6 +127,18 @@ export class GetMILListTool extends BaseTool {
             description: "地點/區域（選填），支援模糊查詢",
             example: "A棟2F",
           },
+          keyword: {
+            type: "string",
+            description:
+              "問題描述關鍵字（選填），搜尋 IssueDiscription、Solution、Remark",
+            example: "漏水",
+          },
+          searchMode: {
+            type: "string",
+            description:
+              "文字篩選模式（選填，預設 like）：like=模糊比對，與資料表即時一致；auto=有全文索引時使用，fulltext=全文檢索，兩者查詢同步副本，最近數分鐘的新增或修改可能查不到",
+            enum: ["auto", "fulltext", "like"],
+          },
           isApply: {
             type: "string",
             description: "是否已申請結案（選填）",
@@ -146,6 +158,11 @@ export class GetMILListTool extends BaseTool {
             minimum: 1,
             maximum: 1000,
           },
+          cursor: {
+            type: "string",
+            description:
+              "分頁游標（選填）。傳入上一頁回傳的 nextCursor 取得下一頁，提供時忽略 page",
+          },
           fields: {
             type: "array",
             description:
@@ -185,8 +202,11 @@ export class GetMILListTool extends BaseTool {
         required: [],
       },
       {
-        cacheable: false, // 暫時關閉緩存
+        // MIL 變更水位涵蓋所有欄位，任何異動都會在下次輪詢（TOOL_CACHE_INVALIDATION_INTERVAL）
+        // 時依 "mil:*" 標籤清除
+        cacheable: true,
         cacheExpiry: 60 * 5, // 5 分鐘
+        cacheTags: ["mil:*"],
         module: "mil",
         requiredDatabases: ["mil"],
       },
@@ -220,6 +240,8 @@ export class GetMILListTool extends BaseTool {
 
       // 地點相關參數
       if (params.location) filters.location = params.location;
+      if (params.keyword) filters.keyword = params.keyword;
+      if (params.searchMode) filters.searchMode = params.searchMode;
 
       // 申請結案狀態參數
       if (params.isApply) filters.isApply = params.isApply;
@@ -230,6 +252,7 @@ export class GetMILListTool extends BaseTool {
       // 分頁參數
       const page = params.page || 1;
       const limit = params.limit || 100;
+      const cursor = params.cursor || null;
 
       // 呼叫服務取得資料
       const result = await milService.getMILList(
@@ -239,6 +262,7 @@ export class GetMILListTool extends BaseTool {
         "RecordDate",
         "OnGoing",
         selectedFields,
+        cursor,
       );
 
       // 記錄執行資訊
@@ -44,6 +44,8 @@ export class GetMILTypeListTool extends BaseTool {
       {
         cacheable: true,
         cacheExpiry: 60 * 30, // 30 分鐘快取，類型列表變動較少
+        cacheStaleTTL: 5 * 60 * 1000, // 過期後 5 分鐘內先返回舊值並背景更新
+        cacheTags: ["mil:*"],
         module: "mil",
         requiredDatabases: ["mil"],
       },
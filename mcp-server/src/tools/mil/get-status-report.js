@@ -25,6 +25,7 @@ export class GetStatusReportTool extends BaseTool {
   - 其他自定義狀態
 • Count: 該狀態的 MIL 數量
 • AvgDays: 該狀態 MIL 的平均處理天數 (從記錄日期到當前日期)
+• freshness: 資料新鮮度 (source=來源, computedAt=計算時間, ageMs=距上次確認的毫秒數)
 
 用途：
 - 快速了解整體 MIL 處理狀況
@@ -32,12 +33,19 @@ export class GetStatusReportTool extends BaseTool {
 - 評估平均處理時間`,
       {
         type: "object",
-        properties: {},
+        properties: {
+          maxStaleness: {
+            type: "integer",
+            description:
+              "可接受的資料陳舊秒數（選填，預設 60）。0 表示強制確認資料是否有變更",
+            minimum: 0,
+          },
+        },
         required: [],
       },
       {
-        cacheable: true,
-        cacheExpiry: 60 * 60, // 1 小時
+        // 由 MIL 彙總快取依變更水位維護，不再使用工具層快取
+        cacheable: false,
         module: "mil",
         requiredDatabases: ["mil"],
       },
@@ -51,7 +59,9 @@ export class GetStatusReportTool extends BaseTool {
   async _execute(params) {
     try {
       // 呼叫服務取得資料
-      const result = await milService.getStatusReport();
+      const result = await milService.getStatusReport({
+        maxStaleness: params.maxStaleness,
+      });
 
       // 記錄執行資訊
       logger.info("MIL 狀態報告生成成功", {
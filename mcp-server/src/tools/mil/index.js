@@ -9,6 +9,7 @@ import { GetMILDetailsTool } from "./get-mil-details.js";
 import { GetStatusReportTool } from "./get-status-report.js";
 import { GetMILTypeListTool } from "./get-mil-type-list.js";
 import { GetCountByTool } from "./get-count-by.js";
+import { SearchMILTool } from "./search-mil.js";
 
 // MIL 模組名稱
 export const MODULE_NAME = "mil";
@@ -36,6 +37,7 @@ export const milTools = [
   createTool(GetStatusReportTool),
   createTool(GetMILTypeListTool),
   createTool(GetCountByTool),
+  createTool(SearchMILTool),
 ];
 
 // 註冊所有 MIL 工具的函數
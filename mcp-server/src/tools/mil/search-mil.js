@@ -0,0 +1,106 @@
+/**
+ * MIL 工具：MIL 關鍵字搜尋
+ *
+ * 以關鍵字搜尋 MIL 的序號、人名、地點與問題描述，結果依相關度排序。
+ * 資料庫建立 ngram FULLTEXT 索引後使用全文檢索，否則退回 LIKE 查詢。
+ */
+
+import { BaseTool, ToolExecutionError, ToolErrorType } from "../base-tool.js";
+import milService from "../../services/mil/mil-service.js";
+import logger from "../../config/logger.js";
+
+/**
+ * MIL 關鍵字搜尋工具
+ */
+export class SearchMILTool extends BaseTool {
+  constructor() {
+    super(
+      "search-mil",
+      `以關鍵字搜尋 MIL，結果依相關度排序
+
+適用情境：
+• 只知道問題描述中的片段（如「漏水」、「異音」）
+• 只記得部分人名、地點或序號
+• 需要找出與某個主題最相關的 MIL
+
+返回欄位說明：
+• relevance: 相關度分數（越高越相關）
+• SerialNumber: MIL 序號
+• Status: 處理狀態
+• Proposer_Name / DRI_EmpName: 提案者 / 負責人姓名
+• Location: 發生地點
+• IssueDiscription: 問題描述內容
+• Solution: 解決方案
+• searchMode: fulltext=全文檢索（索引約每 5 分鐘同步，最近的新增或修改可能查不到），like=模糊比對（索引不存在時）`,
+      {
+        type: "object",
+        properties: {
+          query: {
+            type: "string",
+            description: "搜尋關鍵字（必填），建議至少兩個字",
+            example: "漏水",
+          },
+          status: {
+            type: "string",
+            description: "MIL 處理狀態（選填）",
+            example: "OnGoing",
+          },
+          limit: {
+            type: "integer",
+            description: "返回結果數量上限（選填，預設 20）",
+            default: 20,
+            minimum: 1,
+            maximum: 100,
+          },
+        },
+        required: ["query"],
+      },
+      {
+        cacheable: true,
+        cacheTTL: 60 * 1000, // 1 分鐘
+        cacheStaleTTL: 30 * 1000,
+        cacheTags: ["mil:*"],
+        module: "mil",
+        requiredDatabases: ["mil"],
+      },
+    );
+  }
+
+  /**
+   * 執行工具
+   * @param {Object} params - 工具參數
+   */
+  async _execute(params) {
+    try {
+      const result = await milService.searchMIL(params.query, {
+        limit: params.limit || 20,
+        status: params.status || null,
+      });
+
+      logger.info("MIL 關鍵字搜尋成功", {
+        toolName: this.name,
+        query: params.query,
+        searchMode: result.searchMode,
+        count: result.count,
+      });
+
+      return {
+        success: true,
+        data: result,
+      };
+    } catch (error) {
+      logger.error("MIL 關鍵字搜尋失敗", {
+        toolName: this.name,
+        query: params.query,
+        error: error.message,
+        stack: error.stack,
+      });
+
+      throw new ToolExecutionError(
+        `MIL 關鍵字搜尋失敗: ${error.message}`,
+        ToolErrorType.EXECUTION_ERROR,
+        { originalError: error.message },
+      );
+    }
+  }
+}
@@ -7,6 +7,7 @@
 import { BaseTool, ToolExecutionError, ToolErrorType } from "../base-tool.js";
 import statService from "../../services/stat/stat-service.js";
 import logger from "../../config/logger.js";
+import datasetStore from "../../services/stat/dataset-store.js";
 
 /**
  * 智能數據分析工具
@@ -23,6 +24,11 @@ export class AnalyzeDataTool extends BaseTool {
             type: "string",
             description: "CSV 格式的數據內容",
           },
+          datasetId: {
+            type: "string",
+            description:
+              "已透過 POST /api/stat/datasets 上傳的資料集編號（取代 csvData）",
+          },
           context: {
             type: "object",
             properties: {
@@ -44,7 +50,6 @@ export class AnalyzeDataTool extends BaseTool {
             },
           },
         },
-        required: ["csvData"],
       },
       "stat",
     );
@@ -57,17 +62,25 @@ export class AnalyzeDataTool extends BaseTool {
         domain: args.context?.domain,
       });
 
-      if (!args.csvData || args.csvData.trim().length === 0) {
+      // 已上傳的資料集直接使用解析好的欄式資料
+      let data = args.csvData;
+      if (args.datasetId) {
+        data = datasetStore.get(args.datasetId);
+        if (!data) {
+          throw new ToolExecutionError(
+            `找不到資料集 ${args.datasetId}，可能已過期，請重新上傳`,
+            ToolErrorType.NOT_FOUND,
+          );
+        }
+      } else if (!args.csvData || args.csvData.trim().length === 0) {
         throw new ToolExecutionError(
-          ToolErrorType.INVALID_INPUT,
           "CSV 數據不能為空",
+          ToolErrorType.VALIDATION_ERROR,
         );
       }
 
       // 分析數據結構
-      const dataStructure = await statService.analyzeDataStructure(
-        args.csvData,
-      );
+      const dataStructure = await statService.analyzeDataStructure(data);
 
       // 建議統計檢定
       const suggestions = await statService.suggestAppropriateTest(
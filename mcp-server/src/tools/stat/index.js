@@ -16,6 +16,7 @@ import { CreateScatterTool } from "./create-scatter.js";
 import { PerformMannWhitneyTool } from "./perform-mann-whitney.js";
 import { PerformWilcoxonTool } from "./perform-wilcoxon.js";
 import { PerformKruskalWallisTool } from "./perform-kruskal-wallis.js";
+import { PerformBatchTestTool } from "./perform-batch-test.js";
 
 // Stat 模組名稱
 export const MODULE_NAME = "stat";
@@ -44,6 +45,7 @@ export const statTools = [
   createTool(PerformMannWhitneyTool),
   createTool(PerformWilcoxonTool),
   createTool(PerformKruskalWallisTool),
+  createTool(PerformBatchTestTool),
   
   // 數據分析工具
   createTool(AnalyzeDataTool),
@@ -8,6 +8,9 @@
 import { BaseTool, ToolExecutionError, ToolErrorType } from "../base-tool.js";
 import statService from "../../services/stat/stat-service.js";
 import logger from "../../config/logger.js";
+import { describe } from "../workers/stat-tasks.js";
+import { getColumn } from "../../services/stat/csv-parser.js";
+import datasetStore from "../../services/stat/dataset-store.js";
 
 export class ParseCSVTTestTool extends BaseTool {
   constructor() {
@@ -21,6 +24,11 @@ export class ParseCSVTTestTool extends BaseTool {
             type: "string",
             description: "CSV 格式的數據內容，包含標題行",
           },
+          datasetId: {
+            type: "string",
+            description:
+              "已透過 POST /api/stat/datasets 上傳的資料集編號（取代 csvData）",
+          },
           question: {
             type: "string",
             description: "用戶的研究問題或分析需求（自然語言）",
@@ -51,7 +59,6 @@ export class ParseCSVTTestTool extends BaseTool {
             description: "對立假設類型，auto 表示根據問題自動判斷",
           },
         },
-        required: ["csvData"],
       },
       "stat",
     );
@@ -65,10 +72,10 @@ export class ParseCSVTTestTool extends BaseTool {
         testType: params.testType,
       });
 
-      // 1. 解析 CSV 數據
-      const parsedData = this.parseCSV(params.csvData);
+      // 1. 解析 CSV 數據（worker thread）或取用已上傳的資料集
+      const parsedData = await this.loadData(params);
       logger.info("CSV 解析完成", {
-        rowCount: parsedData.rows.length,
+        rowCount: parsedData.rowCount,
         columnCount: parsedData.headers.length,
         headers: parsedData.headers,
       });
@@ -92,11 +99,14 @@ export class ParseCSVTTestTool extends BaseTool {
         sample2
       );
 
-      // 5. 執行統計檢定
-      const result = await statService.performTTest(
-        statisticalParams.data,
-        statisticalParams.context,
-      );
+      // 5. 執行統計檢定，同時在 worker thread 計算報告用的描述性統計
+      const [result, sampleStats] = await Promise.all([
+        statService.performTTest(
+          statisticalParams.data,
+          statisticalParams.context,
+        ),
+        this.describeSamples(sample1, sample2),
+      ]);
 
       // 6. 生成用戶友好的報告
       const report = this.generateUserFriendlyReport(
@@ -105,6 +115,7 @@ export class ParseCSVTTestTool extends BaseTool {
         statisticalParams,
         result,
         params.question,
+        sampleStats,
       );
 
       return {
@@ -125,9 +136,9 @@ export class ParseCSVTTestTool extends BaseTool {
           statistical_result: result,
           user_friendly_report: report,
           raw_data_summary: {
-            total_rows: parsedData.rows.length,
+            total_rows: parsedData.rowCount,
             headers: parsedData.headers,
-            sample_preview: parsedData.rows.slice(0, 3),
+            sample_preview: parsedData.preview,
           },
         },
       };
@@ -137,6 +148,11 @@ export class ParseCSVTTestTool extends BaseTool {
         params: JSON.stringify(params, null, 2),
       });
 
+      // 背景計算佇列已滿、逾時等錯誤保留原本的類型
+      if (error instanceof ToolExecutionError) {
+        throw error;
+      }
+
       throw new ToolExecutionError(
         `智能統計分析失敗: ${error.message}`,
         ToolErrorType.EXECUTION_ERROR,
@@ -146,29 +162,51 @@ export class ParseCSVTTestTool extends BaseTool {
   }
 
   /**
-   * 解析 CSV 數據
+   * 取得欄式資料：datasetId 優先，否則解析 csvData
    */
-  parseCSV(csvData) {
-    const lines = csvData.trim().split('\n');
-    if (lines.length < 2) {
-      throw new Error("CSV 數據至少需要包含標題行和一行數據");
-    }
-
-    const headers = lines[0].split(',').map(h => h.trim());
-    const rows = [];
-
-    for (let i = 1; i < lines.length; i++) {
-      const values = lines[i].split(',').map(v => v.trim());
-      if (values.length === headers.length) {
-        const row = {};
-        headers.forEach((header, index) => {
-          row[header] = values[index];
-        });
-        rows.push(row);
+  async loadData(params) {
+    if (params.datasetId) {
+      const table = datasetStore.get(params.datasetId);
+      if (!table) {
+        throw new ToolExecutionError(
+          `找不到資料集 ${params.datasetId}，可能已過期，請重新上傳`,
+          ToolErrorType.NOT_FOUND,
+        );
       }
+      return table;
     }
+    if (!params.csvData) {
+      throw new ToolExecutionError(
+        "需要提供 csvData 或 datasetId",
+        ToolErrorType.VALIDATION_ERROR,
+      );
+    }
+    return this.parseCSV(params.csvData);
+  }
+
+  /**
+   * 在 worker thread 解析 CSV 數據（RFC 4180，見 services/stat/csv-parser.js）
+   * @returns {Promise<Object>} { headers, rowCount, skippedRows, preview, columns }，
+   *   數值欄位的 values 為 Float64Array（非數值為 NaN）
+   */
+  async parseCSV(csvData) {
+    return this.runInWorker("parseCSV", { csvData });
+  }
 
-    return { headers, rows };
+  /**
+   * 在 worker thread 計算樣本的描述性統計
+   * @returns {Promise<Array>} [sample1 統計, sample2 統計或 null]
+   */
+  async describeSamples(sample1, sample2) {
+    const groups = [sample1, sample2]
+      .filter(Boolean)
+      .map(sample => Float64Array.from(sample));
+    const stats = await this.runInWorker(
+      "describeGroups",
+      { groups },
+      { transfer: groups.map(group => group.buffer) },
+    );
+    return [stats[0], stats[1] || null];
   }
 
   /**
@@ -309,36 +347,13 @@ export class ParseCSVTTestTool extends BaseTool {
 
   /**
    * 識別數值欄位
+   * 解析時推斷為數值（超過 80% 非空值為數值）且不是 ID 欄位者
    */
   identifyNumericColumns(parsedData) {
-    const numericColumns = [];
-
-    for (const header of parsedData.headers) {
-      // 跳過明顯的 ID 欄位
-      if (/id|編號|序號/i.test(header)) {
-        continue;
-      }
-
-      let numericCount = 0;
-      let totalCount = 0;
-
-      for (const row of parsedData.rows) {
-        const value = row[header];
-        if (value !== null && value !== undefined && value !== '') {
-          totalCount++;
-          if (!isNaN(parseFloat(value))) {
-            numericCount++;
-          }
-        }
-      }
-
-      // 如果超過 80% 的值是數值，則認為是數值欄位
-      if (totalCount > 0 && numericCount / totalCount > 0.8) {
-        numericColumns.push(header);
-      }
-    }
-
-    return numericColumns;
+    return parsedData.columns
+      .filter(column => column.type === "numeric")
+      .map(column => column.name)
+      .filter(name => !/id|編號|序號/i.test(name)); // 跳過明顯的 ID 欄位
   }
 
   /**
@@ -348,13 +363,19 @@ export class ParseCSVTTestTool extends BaseTool {
     const sample1 = [];
     const sample2 = [];
 
-    for (const row of parsedData.rows) {
-      const value1 = parseFloat(row[column1]);
+    // 非數值欄位沒有 values，視為沒有有效數值
+    const values1 = getColumn(parsedData, column1)?.values || [];
+    const values2 = column2
+      ? getColumn(parsedData, column2)?.values || []
+      : null;
+
+    for (let i = 0; i < parsedData.rowCount; i++) {
+      const value1 = values1[i];
       if (!isNaN(value1)) {
         sample1.push(value1);
 
-        if (column2) {
-          const value2 = parseFloat(row[column2]);
+        if (values2) {
+          const value2 = values2[i];
           if (!isNaN(value2)) {
             sample2.push(value2);
           }
@@ -404,10 +425,15 @@ export class ParseCSVTTestTool extends BaseTool {
 
   /**
    * 生成用戶友好的報告
+   * sampleStats 為 describeSamples 的結果，未提供時在此計算
    */
-  generateUserFriendlyReport(parsedData, analysisConfig, statisticalParams, result, userQuestion) {
+  generateUserFriendlyReport(parsedData, analysisConfig, statisticalParams, result, userQuestion, sampleStats) {
     const { scenario, testType, column1, column2 } = analysisConfig;
-    const { alpha } = statisticalParams.data;
+    const { alpha, sample1, sample2 } = statisticalParams.data;
+    const [stats1, stats2] = sampleStats || [
+      describe(sample1),
+      sample2 ? describe(sample2) : null,
+    ];
     const isSignificant = result.p_value < alpha;
 
     let report = `# 📊 統計分析報告\n\n`;
@@ -429,9 +455,7 @@ export class ParseCSVTTestTool extends BaseTool {
     report += `## 🎯 快速結論\n\n`;
     
     if (scenario === 'medical' && testType === 'paired') {
-      const sample1Mean = statisticalParams.data.sample1.reduce((a, b) => a + b, 0) / statisticalParams.data.sample1.length;
-      const sample2Mean = statisticalParams.data.sample2.reduce((a, b) => a + b, 0) / statisticalParams.data.sample2.length;
-      const difference = sample1Mean - sample2Mean;
+      const difference = stats1.mean - stats2.mean;
       
       if (isSignificant) {
         report += `✅ **治療效果顯著**: 統計分析顯示治療前後有顯著差異 (p = ${result.p_value.toFixed(4)})。\n\n`;
@@ -499,28 +523,16 @@ export class ParseCSVTTestTool extends BaseTool {
 
     // 數據摘要
     report += `## 📊 數據摘要\n\n`;
-    const sample1Mean = statisticalParams.data.sample1.reduce((a, b) => a + b, 0) / statisticalParams.data.sample1.length;
-    const sample1Std = Math.sqrt(
-      statisticalParams.data.sample1.reduce((a, b) => a + Math.pow(b - sample1Mean, 2), 0) / 
-      (statisticalParams.data.sample1.length - 1)
-    );
-
     report += `**${column1}**:\n`;
-    report += `- 樣本數: ${statisticalParams.data.sample1.length}\n`;
-    report += `- 平均值: ${sample1Mean.toFixed(2)}\n`;
-    report += `- 標準差: ${sample1Std.toFixed(2)}\n\n`;
-
-    if (statisticalParams.data.sample2) {
-      const sample2Mean = statisticalParams.data.sample2.reduce((a, b) => a + b, 0) / statisticalParams.data.sample2.length;
-      const sample2Std = Math.sqrt(
-        statisticalParams.data.sample2.reduce((a, b) => a + Math.pow(b - sample2Mean, 2), 0) / 
-        (statisticalParams.data.sample2.length - 1)
-      );
+    report += `- 樣本數: ${stats1.n}\n`;
+    report += `- 平均值: ${stats1.mean.toFixed(2)}\n`;
+    report += `- 標準差: ${stats1.std.toFixed(2)}\n\n`;
 
+    if (stats2) {
       report += `**${column2}**:\n`;
-      report += `- 樣本數: ${statisticalParams.data.sample2.length}\n`;
-      report += `- 平均值: ${sample2Mean.toFixed(2)}\n`;
-      report += `- 標準差: ${sample2Std.toFixed(2)}\n\n`;
+      report += `- 樣本數: ${stats2.n}\n`;
+      report += `- 平均值: ${stats2.mean.toFixed(2)}\n`;
+      report += `- 標準差: ${stats2.std.toFixed(2)}\n\n`;
     }
 
     return report;
@@ -8,6 +8,7 @@
 import { BaseTool, ToolExecutionError, ToolErrorType } from "../base-tool.js";
 import statService from "../../services/stat/stat-service.js";
 import logger from "../../config/logger.js";
+import { describe } from "../workers/stat-tasks.js";
 
 /**
  * ANOVA 檢定工具
@@ -173,8 +174,17 @@ export class PerformANOVATool extends BaseTool {
         }
       }
 
+      // 後端未返回各組統計時，在 worker thread 從原始數據計算
+      const groupStats =
+        result.group_stats || (await this.describeGroups(args.data.groups));
+
       // 生成情境化報告
-      const report = this.generateANOVAReport(result, args, visualizations);
+      const report = this.generateANOVAReport(
+        result,
+        args,
+        visualizations,
+        groupStats,
+      );
 
       return {
         content: [
@@ -268,9 +278,15 @@ export class PerformANOVATool extends BaseTool {
    * @param {Object} result - 統計結果
    * @param {Object} args - 原始參數
    * @param {Object} visualizations - 視覺化結果
+   * @param {Array} groupStats - 各組描述性統計（預設使用後端返回的 group_stats）
    * @returns {string} 格式化報告
    */
-  generateANOVAReport(result, args, visualizations = {}) {
+  generateANOVAReport(
+    result,
+    args,
+    visualizations = {},
+    groupStats = result.group_stats,
+  ) {
     const { scenario, hypothesis, variables } = args.context || {};
 
     let report = "";
@@ -308,7 +324,7 @@ export class PerformANOVATool extends BaseTool {
 
     // 描述性統計
     report += "## 📈 描述性統計\n\n";
-    report += this.formatDescriptiveStats(result, args);
+    report += this.formatDescriptiveStats(groupStats, args);
 
     // 統計量
     report += "## 📊 ANOVA 統計量\n\n";
@@ -424,39 +440,37 @@ export class PerformANOVATool extends BaseTool {
     return "大";
   }
 
+  /**
+   * 在 worker thread 計算各組描述性統計
+   * @param {Array<Array<number>>} groups - 各組數據
+   * @returns {Promise<Array>} 各組的 { n, mean, std, se, min, max }
+   */
+  async describeGroups(groups) {
+    const arrays = groups.map(group => Float64Array.from(group));
+    return this.runInWorker(
+      "describeGroups",
+      { groups: arrays },
+      { transfer: arrays.map(array => array.buffer) },
+    );
+  }
+
   /**
    * 格式化描述性統計
-   * @param {Object} result - 統計結果
+   * @param {Array} groupStats - 各組描述性統計，未提供時從原始數據計算
    * @param {Object} args - 原始參數
    * @returns {string} 格式化的描述性統計
    */
-  formatDescriptiveStats(result, args) {
-    const { groups } = args.data;
+  formatDescriptiveStats(groupStats, args) {
     const { group_names } = args.context?.variables || {};
+    const stats = groupStats || args.data.groups.map(describe);
 
     let table = "| 組別 | 樣本數 | 平均數 | 標準差 | 標準誤 |\n";
     table += "|------|--------|--------|--------|--------|\n";
 
-    if (result.group_stats) {
-      result.group_stats.forEach((stats, i) => {
-        const groupName = group_names?.[i] || `組別 ${i + 1}`;
-        table += `| ${groupName} | ${stats.n} | ${stats.mean.toFixed(3)} | ${stats.std.toFixed(3)} | ${stats.se.toFixed(3)} |\n`;
-      });
-    } else {
-      // 從原始數據計算
-      groups.forEach((group, i) => {
-        const groupName = group_names?.[i] || `組別 ${i + 1}`;
-        const n = group.length;
-        const mean = group.reduce((sum, val) => sum + val, 0) / n;
-        const variance =
-          group.reduce((sum, val) => sum + Math.pow(val - mean, 2), 0) /
-          (n - 1);
-        const std = Math.sqrt(variance);
-        const se = std / Math.sqrt(n);
-
-        table += `| ${groupName} | ${n} | ${mean.toFixed(3)} | ${std.toFixed(3)} | ${se.toFixed(3)} |\n`;
-      });
-    }
+    stats.forEach(({ n, mean, std, se }, i) => {
+      const groupName = group_names?.[i] || `組別 ${i + 1}`;
+      table += `| ${groupName} | ${n} | ${mean.toFixed(3)} | ${std.toFixed(3)} | ${se.toFixed(3)} |\n`;
+    });
 
     return table + "\n";
   }
@@ -0,0 +1,365 @@
+/**
+ * 批次統計檢定 MCP 工具
+ *
+ * 同一個分組向量下對多個數值欄位各做一次檢定（例如數十個製程參數比較兩條產線），
+ * 由統計後端一次算完所有欄位並做多重比較校正，回傳一張精簡的結果表
+ */
+
+import { BaseTool, ToolExecutionError, ToolErrorType } from "../base-tool.js";
+import statService from "../../services/stat/stat-service.js";
+import logger from "../../config/logger.js";
+import { getColumn } from "../../services/stat/csv-parser.js";
+import datasetStore from "../../services/stat/dataset-store.js";
+
+const TEST_LABELS = {
+  ttest: "獨立樣本 t 檢定",
+  mann_whitney: "Mann-Whitney U 檢定",
+  anova: "單因子 ANOVA",
+  kruskal_wallis: "Kruskal-Wallis 檢定",
+};
+
+const CORRECTION_LABELS = {
+  holm: "Holm（控制族系錯誤率）",
+  bh: "Benjamini-Hochberg（控制偽發現率）",
+  bonferroni: "Bonferroni",
+  none: "未校正",
+};
+
+const EFFECT_LABELS = {
+  ttest: "Cohen's d",
+  mann_whitney: "r",
+  anova: "η²",
+  kruskal_wallis: "η²",
+};
+
+/**
+ * 批次統計檢定工具
+ */
+export class PerformBatchTestTool extends BaseTool {
+  constructor() {
+    super(
+      "perform_batch_test",
+      "批次統計檢定：以同一個分組對多個欄位同時檢定，並做 Holm / BH 多重比較校正",
+      {
+        type: "object",
+        properties: {
+          columns: {
+            type: "object",
+            description:
+              "欄位名稱 → 數值陣列，每個陣列長度與 groups 相同（null 為缺值）",
+            additionalProperties: {
+              type: "array",
+              items: { type: ["number", "null"] },
+            },
+          },
+          groups: {
+            type: "array",
+            items: { type: ["string", "number", "null"] },
+            description: "每筆數據的組別（null 不納入）",
+          },
+          datasetId: {
+            type: "string",
+            description:
+              "已透過 POST /api/stat/datasets 上傳的資料集編號（取代 columns 與 groups）",
+          },
+          group_column: {
+            type: "string",
+            description: "使用 datasetId 時作為分組的欄位名稱",
+          },
+          column_names: {
+            type: "array",
+            items: { type: "string" },
+            description: "要檢定的欄位（預設為全部數值欄位，不含分組欄位）",
+          },
+          group_order: {
+            type: "array",
+            items: { type: "string" },
+            description:
+              "組別順序，未列出的組別不納入；兩組檢定時第 1 組為 sample1",
+          },
+          test: {
+            type: "string",
+            enum: ["ttest", "mann_whitney", "anova", "kruskal_wallis"],
+            default: "ttest",
+            description:
+              "檢定方法：ttest / mann_whitney 需恰好 2 組，anova / kruskal_wallis 可多組",
+          },
+          correction: {
+            type: "string",
+            enum: ["holm", "bh", "bonferroni", "none"],
+            default: "holm",
+            description: "多重比較校正方法",
+          },
+          alpha: {
+            type: "number",
+            default: 0.05,
+            minimum: 0.001,
+            maximum: 0.1,
+            description: "顯著水準（套用於校正後 p 值）",
+          },
+          alternative: {
+            type: "string",
+            enum: ["two-sided", "less", "greater"],
+            default: "two-sided",
+            description: "對立假設（僅兩組檢定）",
+          },
+          equal_var: {
+            type: "boolean",
+            default: false,
+            description: "t 檢定是否假設變異數相等（預設 Welch）",
+          },
+          context: {
+            type: "object",
+            properties: {
+              scenario: {
+                type: "string",
+                description: "分析場景 (medical, education, quality, etc.)",
+              },
+              description: {
+                type: "string",
+                description: "研究問題描述",
+              },
+            },
+          },
+        },
+      },
+      {
+        cacheable: false,
+      },
+    );
+  }
+
+  /**
+   * 執行工具
+   * @param {Object} params - 工具參數
+   */
+  async _execute(params) {
+    try {
+      const data = this.loadData(params);
+
+      logger.info("收到批次檢定請求", {
+        test: params.test || "ttest",
+        columnCount: data.column_names.length,
+        rowCount: data.groups.length,
+        datasetId: params.datasetId,
+      });
+
+      const result = await statService.performBatchTest(
+        {
+          ...data,
+          group_order: params.group_order,
+          test: params.test,
+          correction: params.correction,
+          alpha: params.alpha,
+          alternative: params.alternative,
+          equal_var: params.equal_var,
+        },
+        params.context || {},
+      );
+
+      const report = this.generateBatchReport(result, params);
+
+      logger.info("批次檢定執行成功", {
+        toolName: this.name,
+        nTested: result.n_tested,
+        nSignificant: result.n_significant,
+      });
+
+      return {
+        success: true,
+        data: {
+          result: result,
+          report: report,
+        },
+        _meta: {
+          tool_type: "batch_statistical_test",
+          test_type: result.test_type,
+          correction: result.correction,
+          n_columns: result.n_columns,
+          n_tested: result.n_tested,
+          n_significant: result.n_significant,
+        },
+      };
+    } catch (error) {
+      if (error instanceof ToolExecutionError) {
+        throw error;
+      }
+      throw new ToolExecutionError(
+        `批次檢定執行失敗: ${error.message}`,
+        ToolErrorType.EXECUTION_ERROR,
+        { originalError: error.message },
+      );
+    }
+  }
+
+  /**
+   * 取得欄位與分組：datasetId 優先，否則使用 columns 與 groups
+   * @returns {Object} { columns, column_names, groups }
+   */
+  loadData(params) {
+    if (params.datasetId) {
+      return this.loadDataset(params);
+    }
+    if (!params.columns || !Array.isArray(params.groups)) {
+      throw new ToolExecutionError(
+        "需要提供 columns 與 groups，或 datasetId 與 group_column",
+        ToolErrorType.VALIDATION_ERROR,
+      );
+    }
+
+    const names = params.column_names || Object.keys(params.columns);
+    if (names.length === 0) {
+      throw new ToolExecutionError(
+        "至少需要 1 個檢定欄位",
+        ToolErrorType.VALIDATION_ERROR,
+      );
+    }
+    for (const name of names) {
+      const values = params.columns[name];
+      if (!Array.isArray(values)) {
+        throw new ToolExecutionError(
+          `找不到欄位 ${name}`,
+          ToolErrorType.VALIDATION_ERROR,
+        );
+      }
+      if (values.length !== params.groups.length) {
+        throw new ToolExecutionError(
+          `欄位 ${name} 有 ${values.length} 筆數據，groups 有 ${params.groups.length} 筆`,
+          ToolErrorType.VALIDATION_ERROR,
+        );
+      }
+    }
+    return {
+      columns: params.columns,
+      column_names: names,
+      groups: params.groups,
+    };
+  }
+
+  /**
+   * 從已上傳的資料集取出數值欄位與分組向量
+   * 數值欄位直接以 Float64Array 交給 StatService，不逐列轉換
+   */
+  loadDataset(params) {
+    const table = datasetStore.get(params.datasetId);
+    if (!table) {
+      throw new ToolExecutionError(
+        `找不到資料集 ${params.datasetId}，可能已過期，請重新上傳`,
+        ToolErrorType.NOT_FOUND,
+      );
+    }
+    if (!params.group_column) {
+      throw new ToolExecutionError(
+        "使用 datasetId 時需要指定 group_column",
+        ToolErrorType.VALIDATION_ERROR,
+      );
+    }
+
+    const groupColumn = getColumn(table, params.group_column);
+    if (!groupColumn) {
+      throw new ToolExecutionError(
+        `資料集中沒有分組欄位 ${params.group_column}`,
+        ToolErrorType.VALIDATION_ERROR,
+      );
+    }
+    let groups;
+    if (groupColumn.type === "categorical") {
+      const { dictionary } = groupColumn;
+      groups = Array.from(groupColumn.codes, code => dictionary[code] || null);
+    } else if (groupColumn.type === "numeric") {
+      groups = Array.from(groupColumn.values, value =>
+        Number.isNaN(value) ? null : value,
+      );
+    } else {
+      throw new ToolExecutionError(
+        `分組欄位 ${params.group_column} 的相異值過多，無法作為分組`,
+        ToolErrorType.VALIDATION_ERROR,
+      );
+    }
+
+    const names =
+      params.column_names ||
+      table.columns
+        .filter(
+          column =>
+            column.type === "numeric" && column.name !== params.group_column,
+        )
+        .map(column => column.name);
+    const columns = {};
+    for (const name of names) {
+      const column = getColumn(table, name);
+      if (!column || column.type !== "numeric") {
+        throw new ToolExecutionError(
+          `欄位 ${name} 不存在或不是數值欄位`,
+          ToolErrorType.VALIDATION_ERROR,
+        );
+      }
+      columns[name] = column.values;
+    }
+    if (names.length === 0) {
+      throw new ToolExecutionError(
+        "資料集中沒有可檢定的數值欄位",
+        ToolErrorType.VALIDATION_ERROR,
+      );
+    }
+    return { columns, column_names: names, groups };
+  }
+
+  /**
+   * 生成批次檢定報告：依校正後 p 值排序的單一表格
+   * @param {Object} result - 統計結果
+   * @param {Object} params - 輸入參數
+   * @returns {string} 格式化報告
+   */
+  generateBatchReport(result, params) {
+    const format = (value, digits) =>
+      value === null || value === undefined ? "—" : value.toFixed(digits);
+    const formatP = value =>
+      value === null || value === undefined
+        ? "—"
+        : value < 0.0001
+          ? "< 0.0001"
+          : value.toFixed(4);
+
+    let report = `# 批次統計檢定報告\n\n`;
+    report += `**檢定方法**: ${TEST_LABELS[result.test_type]}\n`;
+    report += `**多重比較校正**: ${CORRECTION_LABELS[result.correction]}\n`;
+    report += `**顯著水準**: α = ${result.alpha}（校正後 p 值）\n`;
+    report += `**組別**: ${result.groups.join("、")}\n`;
+    report += `**顯著欄位**: ${result.n_significant} / ${result.n_tested}`;
+    if (result.n_tested < result.n_columns) {
+      report += `（${result.n_columns - result.n_tested} 個欄位數據不足未檢定）`;
+    }
+    report += `\n\n`;
+
+    if (params.context?.description) {
+      report += `**研究問題**: ${params.context.description}\n\n`;
+    }
+
+    // 依校正後 p 值排序，未檢定的欄位放最後
+    const rows = [...result.results].sort(
+      (a, b) => (a.p_adjusted ?? Infinity) - (b.p_adjusted ?? Infinity),
+    );
+    const groupHeaders = result.groups.map(
+      group => `${group} ${result.summary_label}`,
+    );
+    report += `| 欄位 | n | ${groupHeaders.join(" | ")} | 統計量 | p 值 | 校正後 p | ${EFFECT_LABELS[result.test_type]} | 結果 |\n`;
+    report += `|${" --- |".repeat(groupHeaders.length + 7)}\n`;
+    for (const row of rows) {
+      const summaries = row.group_summary.map(value => format(value, 3));
+      const verdict =
+        row.p_adjusted === null
+          ? "未檢定"
+          : row.reject_null
+            ? "🔴 顯著"
+            : "不顯著";
+      report += `| ${row.column} | ${row.n.join("/")} | ${summaries.join(" | ")} | ${format(row.statistic, 3)} | ${formatP(row.p_value)} | ${formatP(row.p_adjusted)} | ${format(row.effect_size, 3)} | ${verdict} |\n`;
+    }
+
+    report += `\n`;
+    if (result.correction !== "none" && result.n_tested > 1) {
+      report += `已對 ${result.n_tested} 個檢定做多重比較校正，請以校正後 p 值判斷顯著性。\n`;
+    }
+    return report;
+  }
+}
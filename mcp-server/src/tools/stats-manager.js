@@ -2,9 +2,14 @@
  * 工具使用統計系統
  *
  * 收集、分析和報告工具使用情況的詳細統計資訊
+ *
+ * 統計查詢不再掃描原始事件：recordEvent 時即更新每分鐘 / 每小時的環狀緩衝區彙總，
+ * getGlobalStats 的成本只與桶數有關。原始事件僅保留供明細查詢，可用 keepRawEvents 關閉。
  */
 
+import config from "../config/config.js";
 import logger from "../config/logger.js";
+import { globalLatencyTracker } from "./latency-sketch.js";
 
 /**
  * 統計事件類型
@@ -38,28 +43,334 @@ class StatEvent {
   }
 }
 
+/**
+ * 建立空白計數器
+ */
+function createCounters() {
+  return {
+    events: 0,
+    calls: 0,
+    successes: 0,
+    errors: 0,
+    cacheHits: 0,
+    cacheMisses: 0,
+    executionTime: 0,
+    executions: 0,
+  };
+}
+
+/**
+ * 依事件類型累加計數器
+ */
+function addToCounters(counters, type, data) {
+  counters.events++;
+  switch (type) {
+    case StatEventType.TOOL_CALL:
+      counters.calls++;
+      break;
+    case StatEventType.TOOL_SUCCESS:
+      counters.successes++;
+      if (data.executionTime) {
+        counters.executionTime += data.executionTime;
+        counters.executions++;
+      }
+      break;
+    case StatEventType.TOOL_ERROR:
+      counters.errors++;
+      break;
+    case StatEventType.CACHE_HIT:
+      counters.cacheHits++;
+      break;
+    case StatEventType.CACHE_MISS:
+      counters.cacheMisses++;
+      break;
+    default:
+      break;
+  }
+}
+
+/**
+ * 固定大小的時間桶環狀緩衝區
+ *
+ * 每個槽位保存一個時間桶（起始時間 = 桶序號 × 桶寬度）的計數與各工具調用次數；
+ * 寫入時若槽位屬於舊的時間桶則先重置，因此不需要另外清理。
+ */
+export class RollupRing {
+  /**
+   * @param {number} bucketMs - 桶寬度（毫秒）
+   * @param {number} size - 桶數量（可回溯的時間 = bucketMs × size）
+   */
+  constructor(bucketMs, size) {
+    this.bucketMs = bucketMs;
+    this.size = size;
+    this.slots = new Array(size).fill(null);
+  }
+
+  /**
+   * 將事件累加到所屬的時間桶
+   */
+  add(timestampMs, type, toolName, data) {
+    const index = Math.floor(timestampMs / this.bucketMs);
+    const position = index % this.size;
+    let slot = this.slots[position];
+
+    if (!slot || slot.index !== index) {
+      if (slot && slot.index > index) return; // 早於可回溯範圍的事件
+      slot = { index, counters: createCounters(), tools: new Map() };
+      this.slots[position] = slot;
+    }
+
+    addToCounters(slot.counters, type, data);
+    if (type === StatEventType.TOOL_CALL) {
+      slot.tools.set(toolName, (slot.tools.get(toolName) || 0) + 1);
+    }
+  }
+
+  /**
+   * 彙總最近 periods 個時間桶（含目前的桶）
+   * @returns {{counters: Object, tools: Map<string, number>}}
+   */
+  sum(periods, nowMs = Date.now()) {
+    const current = Math.floor(nowMs / this.bucketMs);
+    const oldest = current - Math.min(periods, this.size) + 1;
+    const counters = createCounters();
+    const tools = new Map();
+
+    for (const slot of this.slots) {
+      if (!slot || slot.index < oldest || slot.index > current) continue;
+      for (const key of Object.keys(counters)) {
+        counters[key] += slot.counters[key];
+      }
+      for (const [toolName, count] of slot.tools) {
+        tools.set(toolName, (tools.get(toolName) || 0) + count);
+      }
+    }
+
+    return { counters, tools };
+  }
+
+  /**
+   * 取得指定起始時間的時間桶
+   */
+  get(startMs) {
+    const index = Math.floor(startMs / this.bucketMs);
+    const slot = this.slots[index % this.size];
+    return slot && slot.index === index ? slot : null;
+  }
+
+  /**
+   * 依時間順序列出最近 periods 個時間桶（沒有事件的桶以 0 填補）
+   */
+  series(periods, nowMs = Date.now()) {
+    const current = Math.floor(nowMs / this.bucketMs);
+    const count = Math.min(periods, this.size);
+    const result = [];
+
+    for (let index = current - count + 1; index <= current; index++) {
+      const slot = this.slots[index % this.size];
+      const counters =
+        slot && slot.index === index ? slot.counters : createCounters();
+      result.push({ start: new Date(index * this.bucketMs), ...counters });
+    }
+
+    return result;
+  }
+
+  clear() {
+    this.slots.fill(null);
+  }
+}
+
+const MINUTE_MS = 60 * 1000;
+const HOUR_MS = 60 * MINUTE_MS;
+
+/**
+ * 依調用次數排序工具
+ * @param {Map|Object} toolCounts - 工具 -> 調用次數
+ */
+function rankTools(toolCounts, limit = 10) {
+  const entries =
+    toolCounts instanceof Map
+      ? Array.from(toolCounts.entries())
+      : Object.entries(toolCounts);
+  return entries
+    .sort((a, b) => b[1] - a[1])
+    .slice(0, limit)
+    .map(([toolName, count]) => ({ toolName, count }));
+}
+
+/**
+ * 合併多個統計快照（各 worker 的 getSnapshot）
+ * 計數相加；用戶取最後調用時間；效能指標合併最小 / 最大值；最近錯誤依時間合併
+ */
+export function mergeStatsSnapshots(snapshots) {
+  const merged = {
+    startedAt: null,
+    retentionDays: 0,
+    rawEventsRetained: 0,
+    maxRecentErrors: 0,
+    tools: [],
+    periods: {},
+    users: {},
+    performance: {},
+    recentErrors: [],
+  };
+  const tools = new Set();
+
+  for (const snapshot of snapshots) {
+    const startedAt = new Date(snapshot.startedAt);
+    if (!merged.startedAt || startedAt < merged.startedAt) {
+      merged.startedAt = startedAt;
+    }
+    merged.retentionDays = Math.max(
+      merged.retentionDays,
+      snapshot.retentionDays,
+    );
+    merged.rawEventsRetained += snapshot.rawEventsRetained;
+    merged.maxRecentErrors = Math.max(
+      merged.maxRecentErrors,
+      snapshot.maxRecentErrors,
+    );
+    snapshot.tools.forEach(toolName => tools.add(toolName));
+
+    for (const [name, period] of Object.entries(snapshot.periods)) {
+      const target = (merged.periods[name] ||= {
+        counters: createCounters(),
+        tools: {},
+        since: period.since,
+      });
+      for (const key of Object.keys(target.counters)) {
+        target.counters[key] += period.counters[key] || 0;
+      }
+      for (const [toolName, count] of Object.entries(period.tools)) {
+        target.tools[toolName] = (target.tools[toolName] || 0) + count;
+      }
+    }
+
+    for (const [userId, lastCall] of Object.entries(snapshot.users)) {
+      merged.users[userId] = Math.max(merged.users[userId] || 0, lastCall);
+    }
+
+    for (const [toolName, perfStats] of Object.entries(snapshot.performance)) {
+      const target = merged.performance[toolName];
+      merged.performance[toolName] = target
+        ? {
+            totalTime: target.totalTime + perfStats.totalTime,
+            callCount: target.callCount + perfStats.callCount,
+            minTime: Math.min(target.minTime, perfStats.minTime),
+            maxTime: Math.max(target.maxTime, perfStats.maxTime),
+          }
+        : { ...perfStats };
+    }
+
+    merged.recentErrors.push(...snapshot.recentErrors);
+  }
+
+  merged.tools = [...tools];
+  merged.recentErrors = merged.recentErrors
+    .sort((a, b) => new Date(a.timestamp) - new Date(b.timestamp))
+    .slice(-merged.maxRecentErrors);
+  return merged;
+}
+
+/**
+ * 由統計快照產生 getGlobalStats 的輸出格式
+ * @param {Object} snapshot - getSnapshot 或 mergeStatsSnapshots 的結果
+ * @param {Object} options
+ * @param {Function} options.percentiles - toolName => 延遲分位數摘要（或 null）
+ */
+export function formatGlobalStats(snapshot, { percentiles = () => null } = {}) {
+  const userLastCalls = Object.values(snapshot.users);
+
+  // 期間統計；since 為期間起始時間（用於計算活躍用戶數）
+  const periodStats = ({ counters, tools, since }) => {
+    const { calls, successes, errors, cacheHits, cacheMisses } = counters;
+    return {
+      totalCalls: calls,
+      successfulCalls: successes,
+      failedCalls: errors,
+      successRate:
+        calls > 0 ? ((successes / calls) * 100).toFixed(2) + "%" : "0%",
+      cacheHits,
+      cacheMisses,
+      cacheHitRate:
+        cacheHits + cacheMisses > 0
+          ? ((cacheHits / (cacheHits + cacheMisses)) * 100).toFixed(2) + "%"
+          : "0%",
+      uniqueTools: Object.keys(tools).length,
+      uniqueUsers: userLastCalls.filter(lastCall => lastCall >= since).length,
+    };
+  };
+
+  const performanceMetrics = {};
+  for (const [toolName, perfStats] of Object.entries(snapshot.performance)) {
+    performanceMetrics[toolName] = {
+      averageTime:
+        (perfStats.totalTime / perfStats.callCount).toFixed(2) + "ms",
+      minTime: perfStats.minTime + "ms",
+      maxTime: perfStats.maxTime + "ms",
+      totalCalls: perfStats.callCount,
+      totalTime: perfStats.totalTime + "ms",
+      percentiles: percentiles(toolName),
+    };
+  }
+
+  const { allTime } = snapshot.periods;
+  return {
+    overview: {
+      totalEvents: allTime.counters.events,
+      totalTools: snapshot.tools.length,
+      totalUsers: userLastCalls.length,
+      dataRetentionDays: snapshot.retentionDays,
+      rawEventsRetained: snapshot.rawEventsRetained,
+      since: snapshot.startedAt,
+    },
+    last24Hours: periodStats(snapshot.periods.last24Hours),
+    last7Days: periodStats(snapshot.periods.last7Days),
+    allTime: periodStats(allTime),
+    topTools: rankTools(allTime.tools, 10),
+    recentErrors: snapshot.recentErrors.slice(-10).reverse(),
+    performanceMetrics,
+  };
+}
+
 /**
  * 工具使用統計管理器
  */
 export class ToolStatsManager {
   constructor(options = {}) {
-    this.events = []; // 儲存所有事件
+    this.keepRawEvents = options.keepRawEvents ?? true; // 是否保留原始事件供明細查詢
+    this.events = []; // 原始事件（keepRawEvents 為 false 時不保存）
     this.maxEvents = options.maxEvents || 10000; // 最大事件數量
     this.retentionDays = options.retentionDays || 30; // 資料保留天數
     this.cleanupInterval = options.cleanupInterval || 3600000; // 1 小時清理間隔
+    this.maxRecentErrors = options.maxRecentErrors || 50; // 保留的最近錯誤數量
+
+    this._resetRollups();
+
+    // 啟動定期清理
+    this.startCleanupTimer();
+  }
+
+  /**
+   * 重置所有彙總資料
+   */
+  _resetRollups() {
+    // 每分鐘桶涵蓋 24 小時，每小時桶涵蓋資料保留天數
+    this.minuteRollups = new RollupRing(MINUTE_MS, 24 * 60);
+    this.hourRollups = new RollupRing(HOUR_MS, Math.max(this.retentionDays, 7) * 24);
+    this.totals = createCounters();
+    this.recentErrors = [];
+    this.startedAt = new Date();
 
     // 實時統計快取
     this.realtimeStats = {
       toolCalls: new Map(), // toolName -> count
       errors: new Map(), // toolName -> errorCount
       performance: new Map(), // toolName -> { totalTime, callCount }
-      hourlyStats: new Map(), // hour -> stats
-      dailyStats: new Map(), // date -> stats
+      tools: new Map(), // toolName -> { counters, firstCall, lastSeen }
       userStats: new Map(), // userId -> stats
     };
-
-    // 啟動定期清理
-    this.startCleanupTimer();
   }
 
   /**
@@ -68,15 +379,16 @@ export class ToolStatsManager {
   recordEvent(type, toolName, data = {}) {
     const event = new StatEvent(type, toolName, data);
 
-    // 添加到事件列表
-    this.events.push(event);
-
-    // 更新實時統計
+    // 更新實時統計與時間桶彙總
     this._updateRealtimeStats(event);
 
-    // 檢查事件數量限制
-    if (this.events.length > this.maxEvents) {
-      this._trimOldEvents();
+    if (this.keepRawEvents) {
+      this.events.push(event);
+
+      // 檢查事件數量限制
+      if (this.events.length > this.maxEvents) {
+        this._trimOldEvents();
+      }
     }
 
     logger.debug("Stat event recorded", {
@@ -141,6 +453,7 @@ export class ToolStatsManager {
    */
   _updateRealtimeStats(event) {
     const { type, toolName, timestamp, data } = event;
+    const timestampMs = timestamp.getTime();
 
     // 更新工具調用計數
     if (type === StatEventType.TOOL_CALL) {
@@ -152,6 +465,17 @@ export class ToolStatsManager {
     if (type === StatEventType.TOOL_ERROR) {
       const currentErrors = this.realtimeStats.errors.get(toolName) || 0;
       this.realtimeStats.errors.set(toolName, currentErrors + 1);
+
+      this.recentErrors.push({
+        toolName,
+        errorType: data.errorType,
+        errorMessage: data.errorMessage,
+        timestamp,
+        executionTime: data.executionTime,
+      });
+      if (this.recentErrors.length > this.maxRecentErrors) {
+        this.recentErrors.shift();
+      }
     }
 
     // 更新效能統計
@@ -171,8 +495,24 @@ export class ToolStatsManager {
       this.realtimeStats.performance.set(toolName, perfStats);
     }
 
+    // 更新累計與各工具計數
+    addToCounters(this.totals, type, data);
+
+    let toolStats = this.realtimeStats.tools.get(toolName);
+    if (!toolStats) {
+      toolStats = {
+        counters: createCounters(),
+        firstCall: timestamp,
+        lastSeen: timestamp,
+      };
+      this.realtimeStats.tools.set(toolName, toolStats);
+    }
+    addToCounters(toolStats.counters, type, data);
+    toolStats.lastSeen = timestamp;
+
     // 更新時段統計
-    this._updateTimeBasedStats(timestamp, type, toolName);
+    this.minuteRollups.add(timestampMs, type, toolName, data);
+    this.hourRollups.add(timestampMs, type, toolName, data);
 
     // 更新用戶統計
     if (data.userId) {
@@ -180,42 +520,6 @@ export class ToolStatsManager {
     }
   }
 
-  /**
-   * 更新時段統計
-   */
-  _updateTimeBasedStats(timestamp, type, toolName) {
-    const hour = new Date(timestamp).getHours();
-    const date = timestamp.toISOString().split("T")[0];
-
-    // 小時統計
-    const hourlyKey = `${date}-${hour.toString().padStart(2, "0")}`;
-    const hourlyStats = this.realtimeStats.hourlyStats.get(hourlyKey) || {
-      calls: 0,
-      errors: 0,
-      tools: new Set(),
-    };
-
-    if (type === StatEventType.TOOL_CALL) hourlyStats.calls++;
-    if (type === StatEventType.TOOL_ERROR) hourlyStats.errors++;
-    hourlyStats.tools.add(toolName);
-
-    this.realtimeStats.hourlyStats.set(hourlyKey, hourlyStats);
-
-    // 日統計
-    const dailyStats = this.realtimeStats.dailyStats.get(date) || {
-      calls: 0,
-      errors: 0,
-      tools: new Set(),
-      users: new Set(),
-    };
-
-    if (type === StatEventType.TOOL_CALL) dailyStats.calls++;
-    if (type === StatEventType.TOOL_ERROR) dailyStats.errors++;
-    dailyStats.tools.add(toolName);
-
-    this.realtimeStats.dailyStats.set(date, dailyStats);
-  }
-
   /**
    * 更新用戶統計
    */
@@ -240,20 +544,9 @@ export class ToolStatsManager {
    * 獲取工具統計摘要
    */
   getToolSummary(toolName) {
-    const events = this.events.filter(e => e.toolName === toolName);
-    const calls = events.filter(e => e.type === StatEventType.TOOL_CALL).length;
-    const successes = events.filter(
-      e => e.type === StatEventType.TOOL_SUCCESS,
-    ).length;
-    const errors = events.filter(
-      e => e.type === StatEventType.TOOL_ERROR,
-    ).length;
-    const cacheHits = events.filter(
-      e => e.type === StatEventType.CACHE_HIT,
-    ).length;
-    const cacheMisses = events.filter(
-      e => e.type === StatEventType.CACHE_MISS,
-    ).length;
+    const toolStats = this.realtimeStats.tools.get(toolName);
+    const counters = toolStats ? toolStats.counters : createCounters();
+    const { calls, successes, errors, cacheHits, cacheMisses } = counters;
 
     const perfStats = this.realtimeStats.performance.get(toolName);
     const avgExecutionTime = perfStats
@@ -278,129 +571,102 @@ export class ToolStatsManager {
       avgExecutionTime: avgExecutionTime.toFixed(2) + "ms",
       minExecutionTime: perfStats ? perfStats.minTime + "ms" : "N/A",
       maxExecutionTime: perfStats ? perfStats.maxTime + "ms" : "N/A",
-      firstCall: events.length > 0 ? events[0].timestamp : null,
-      lastCall: events.length > 0 ? events[events.length - 1].timestamp : null,
+      firstCall: toolStats ? toolStats.firstCall : null,
+      lastCall: toolStats ? toolStats.lastSeen : null,
     };
   }
 
   /**
-   * 獲取全域統計
+   * 獲取工具統計（無資料時返回 null）
    */
-  getGlobalStats() {
-    const now = new Date();
-    const last24h = new Date(now.getTime() - 24 * 60 * 60 * 1000);
-    const last7days = new Date(now.getTime() - 7 * 24 * 60 * 60 * 1000);
-
-    const allEvents = this.events;
-    const events24h = allEvents.filter(e => e.timestamp >= last24h);
-    const events7d = allEvents.filter(e => e.timestamp >= last7days);
-
-    return {
-      overview: {
-        totalEvents: allEvents.length,
-        totalTools: new Set(allEvents.map(e => e.toolName)).size,
-        totalUsers: new Set(allEvents.map(e => e.data.userId).filter(Boolean))
-          .size,
-        dataRetentionDays: this.retentionDays,
-      },
-      last24Hours: this._calculatePeriodStats(events24h),
-      last7Days: this._calculatePeriodStats(events7d),
-      allTime: this._calculatePeriodStats(allEvents),
-      topTools: this._getTopTools(allEvents, 10),
-      recentErrors: this._getRecentErrors(10),
-      performanceMetrics: this._getPerformanceMetrics(),
-    };
+  getToolStats(toolName) {
+    if (!this.realtimeStats.tools.has(toolName)) return null;
+    return this.getToolSummary(toolName);
   }
 
   /**
-   * 計算期間統計
+   * 獲取最熱門工具（累計調用次數）
    */
-  _calculatePeriodStats(events) {
-    const calls = events.filter(e => e.type === StatEventType.TOOL_CALL).length;
-    const successes = events.filter(
-      e => e.type === StatEventType.TOOL_SUCCESS,
-    ).length;
-    const errors = events.filter(
-      e => e.type === StatEventType.TOOL_ERROR,
-    ).length;
-    const cacheHits = events.filter(
-      e => e.type === StatEventType.CACHE_HIT,
-    ).length;
-    const cacheMisses = events.filter(
-      e => e.type === StatEventType.CACHE_MISS,
-    ).length;
-
-    return {
-      totalCalls: calls,
-      successfulCalls: successes,
-      failedCalls: errors,
-      successRate:
-        calls > 0 ? ((successes / calls) * 100).toFixed(2) + "%" : "0%",
-      cacheHits,
-      cacheMisses,
-      cacheHitRate:
-        cacheHits + cacheMisses > 0
-          ? ((cacheHits / (cacheHits + cacheMisses)) * 100).toFixed(2) + "%"
-          : "0%",
-      uniqueTools: new Set(events.map(e => e.toolName)).size,
-      uniqueUsers: new Set(events.map(e => e.data.userId).filter(Boolean)).size,
-    };
-  }
-
-  /**
-   * 獲取最熱門工具
-   */
-  _getTopTools(events, limit = 10) {
-    const toolCounts = new Map();
-
-    events
-      .filter(e => e.type === StatEventType.TOOL_CALL)
-      .forEach(e => {
-        const count = toolCounts.get(e.toolName) || 0;
-        toolCounts.set(e.toolName, count + 1);
-      });
-
-    return Array.from(toolCounts.entries())
-      .sort((a, b) => b[1] - a[1])
-      .slice(0, limit)
-      .map(([toolName, count]) => ({ toolName, count }));
+  getTopTools(limit = 10) {
+    return rankTools(this.realtimeStats.toolCalls, limit);
   }
 
   /**
-   * 獲取最近錯誤
+   * 獲取全域統計
    */
-  _getRecentErrors(limit = 10) {
-    return this.events
-      .filter(e => e.type === StatEventType.TOOL_ERROR)
-      .sort((a, b) => b.timestamp - a.timestamp)
-      .slice(0, limit)
-      .map(e => ({
-        toolName: e.toolName,
-        errorType: e.data.errorType,
-        errorMessage: e.data.errorMessage,
-        timestamp: e.timestamp,
-        executionTime: e.data.executionTime,
-      }));
+  getGlobalStats() {
+    return formatGlobalStats(this.getSnapshot(), {
+      percentiles: toolName =>
+        globalLatencyTracker.getToolPercentiles(toolName)?.["5m"] ?? null,
+    });
   }
 
   /**
-   * 獲取效能指標
+   * 匯出可合併的統計快照（cluster 模式下由 mergeStatsSnapshots 合併各 worker）
    */
-  _getPerformanceMetrics() {
-    const metrics = {};
+  getSnapshot(now = Date.now()) {
+    const period = ({ counters, tools }, since) => ({
+      counters: { ...counters },
+      tools: Object.fromEntries(tools),
+      since,
+    });
 
+    const users = {};
+    for (const [userId, userStats] of this.realtimeStats.userStats) {
+      users[userId] = userStats.lastCall.getTime();
+    }
+    const performance = {};
     for (const [toolName, perfStats] of this.realtimeStats.performance) {
-      metrics[toolName] = {
-        averageTime:
-          (perfStats.totalTime / perfStats.callCount).toFixed(2) + "ms",
-        minTime: perfStats.minTime + "ms",
-        maxTime: perfStats.maxTime + "ms",
-        totalCalls: perfStats.callCount,
-        totalTime: perfStats.totalTime + "ms",
-      };
+      performance[toolName] = { ...perfStats };
     }
 
-    return metrics;
+    return {
+      startedAt: this.startedAt,
+      retentionDays: this.retentionDays,
+      rawEventsRetained: this.events.length,
+      maxRecentErrors: this.maxRecentErrors,
+      tools: [...this.realtimeStats.tools.keys()],
+      periods: {
+        last24Hours: period(
+          this.minuteRollups.sum(24 * 60, now),
+          now - 24 * HOUR_MS,
+        ),
+        last7Days: period(
+          this.hourRollups.sum(7 * 24, now),
+          now - 7 * 24 * HOUR_MS,
+        ),
+        allTime: period(
+          { counters: this.totals, tools: this.realtimeStats.toolCalls },
+          0,
+        ),
+      },
+      users,
+      performance,
+      recentErrors: [...this.recentErrors],
+    };
+  }
+
+  /**
+   * 獲取時間序列（每分鐘或每小時）
+   * @param {string} granularity - "minute" 或 "hour"
+   * @param {number} periods - 返回的時間桶數量
+   */
+  getTimeSeries(granularity = "minute", periods = 60) {
+    const rollups =
+      granularity === "hour" ? this.hourRollups : this.minuteRollups;
+
+    return rollups.series(periods).map(bucket => ({
+      start: bucket.start,
+      calls: bucket.calls,
+      successes: bucket.successes,
+      errors: bucket.errors,
+      cacheHits: bucket.cacheHits,
+      cacheMisses: bucket.cacheMisses,
+      avgExecutionTime:
+        bucket.executions > 0
+          ? Number((bucket.executionTime / bucket.executions).toFixed(2))
+          : 0,
+    }));
   }
 
   /**
@@ -411,22 +677,21 @@ export class ToolStatsManager {
     const hourlyData = [];
 
     for (let hour = 0; hour < 24; hour++) {
-      const hourKey = `${targetDate}-${hour.toString().padStart(2, "0")}`;
-      const stats = this.realtimeStats.hourlyStats.get(hourKey) || {
-        calls: 0,
-        errors: 0,
-        tools: new Set(),
-      };
+      const start = new Date(
+        `${targetDate}T${hour.toString().padStart(2, "0")}:00:00`,
+      );
+      const slot = this.hourRollups.get(start.getTime());
+      const calls = slot ? slot.counters.calls : 0;
+      const errors = slot ? slot.counters.errors : 0;
 
       hourlyData.push({
         hour,
-        calls: stats.calls,
-        errors: stats.errors,
-        uniqueTools: stats.tools.size,
+        calls,
+        errors,
+        uniqueTools: slot ? slot.tools.size : 0,
         successRate:
-          stats.calls > 0
-            ? (((stats.calls - stats.errors) / stats.calls) * 100).toFixed(2) +
-              "%"
+          calls > 0
+            ? (((calls - errors) / calls) * 100).toFixed(2) + "%"
             : "0%",
       });
     }
@@ -434,6 +699,24 @@ export class ToolStatsManager {
     return hourlyData;
   }
 
+  /**
+   * 查詢原始事件（需啟用 keepRawEvents）
+   * @param {Object} filters - { toolName, type, since, limit }
+   */
+  getRawEvents({ toolName = null, type = null, since = null, limit = 100 } = {}) {
+    const result = [];
+
+    for (let i = this.events.length - 1; i >= 0 && result.length < limit; i--) {
+      const event = this.events[i];
+      if (since && event.timestamp < since) break;
+      if (toolName && event.toolName !== toolName) continue;
+      if (type && event.type !== type) continue;
+      result.push(event);
+    }
+
+    return result;
+  }
+
   /**
    * 清理過期事件
    */
@@ -442,12 +725,27 @@ export class ToolStatsManager {
     cutoffDate.setDate(cutoffDate.getDate() - this.retentionDays);
 
     const initialLength = this.events.length;
-    this.events = this.events.filter(event => event.timestamp >= cutoffDate);
+
+    // 事件依時間順序加入，只需找出第一個未過期的位置
+    let start = 0;
+    while (start < this.events.length && this.events[start].timestamp < cutoffDate) {
+      start++;
+    }
+    // 超過上限時一次修剪到上限的 90%，避免之後每筆事件都搬移整個陣列
+    if (this.events.length > this.maxEvents) {
+      start = Math.max(
+        start,
+        this.events.length - Math.floor(this.maxEvents * 0.9),
+      );
+    }
+    if (start > 0) {
+      this.events.splice(0, start);
+    }
 
     const removedCount = initialLength - this.events.length;
 
     if (removedCount > 0) {
-      logger.info("Old stat events cleaned up", {
+      logger.debug("Old stat events cleaned up", {
         removedCount,
         remainingCount: this.events.length,
         cutoffDate,
@@ -462,6 +760,10 @@ export class ToolStatsManager {
     this.cleanupTimer = setInterval(() => {
       this._trimOldEvents();
     }, this.cleanupInterval);
+
+    if (this.cleanupTimer.unref) {
+      this.cleanupTimer.unref();
+    }
   }
 
   /**
@@ -486,8 +788,7 @@ export class ToolStatsManager {
     };
 
     // 為每個工具生成摘要
-    const uniqueTools = new Set(this.events.map(e => e.toolName));
-    for (const toolName of uniqueTools) {
+    for (const toolName of this.realtimeStats.tools.keys()) {
       data.toolSummaries[toolName] = this.getToolSummary(toolName);
     }
 
@@ -500,14 +801,7 @@ export class ToolStatsManager {
   destroy() {
     this.stopCleanupTimer();
     this.events = [];
-    this.realtimeStats = {
-      toolCalls: new Map(),
-      errors: new Map(),
-      performance: new Map(),
-      hourlyStats: new Map(),
-      dailyStats: new Map(),
-      userStats: new Map(),
-    };
+    this._resetRollups();
   }
 }
 
@@ -516,4 +810,5 @@ export const globalStatsManager = new ToolStatsManager({
   maxEvents: 10000,
   retentionDays: 30,
   cleanupInterval: 3600000, // 1 小時
+  keepRawEvents: config.toolStatsRawEvents,
 });
@@ -0,0 +1,131 @@
+/**
+ * 工具遙測佇列
+ *
+ * BaseTool.execute 不再等待日誌、統計與執行歷史的寫入：事件放入記憶體佇列後立即返回，
+ * 由背景以 setImmediate 分批處理，交給各工具的 _recordTelemetry 寫入 logger、
+ * globalStatsManager 與執行歷史。
+ *
+ * strict 模式（測試用）在放入事件時就同步處理並返回 Promise，
+ * execute 結束時所有紀錄都已完成，與舊行為一致。
+ */
+
+import config from "../config/config.js";
+
+export class ToolTelemetry {
+  /**
+   * @param {Object} options
+   * @param {boolean} options.strict - 是否同步處理事件
+   * @param {number} options.maxQueue - 佇列上限，超過時丟棄非錯誤事件
+   * @param {number} options.batchSize - 每次讓出事件迴圈前處理的事件數
+   */
+  constructor(options = {}) {
+    this.strict = options.strict ?? false;
+    this.maxQueue = options.maxQueue ?? 10000;
+    this.batchSize = options.batchSize ?? 1024;
+
+    this.queue = [];
+    this.head = 0;
+    this.scheduled = false;
+    this.idleWaiters = [];
+
+    this.stats = {
+      enqueued: 0,
+      processed: 0,
+      dropped: 0,
+      errors: 0,
+      maxQueueLength: 0,
+    };
+  }
+
+  /**
+   * 放入一筆事件
+   * @param {Object} handler - 具 _recordTelemetry(event) 的物件（通常是 BaseTool）
+   * @param {Object} event - 事件資料，event.type 為 "error" 時不會被丟棄
+   * @returns {Promise|undefined} strict 模式下返回處理完成的 Promise
+   */
+  emit(handler, event) {
+    if (this.strict) {
+      this.stats.enqueued++;
+      return this._process(handler, event);
+    }
+
+    // 佇列中每筆事件佔兩格：handler、event
+    const length = (this.queue.length - this.head) / 2;
+    if (length >= this.maxQueue && event.type !== "error") {
+      this.stats.dropped++;
+      return undefined;
+    }
+
+    this.queue.push(handler, event);
+    this.stats.enqueued++;
+    if (length + 1 > this.stats.maxQueueLength) {
+      this.stats.maxQueueLength = length + 1;
+    }
+
+    if (!this.scheduled) {
+      this.scheduled = true;
+      setImmediate(() => this._drain());
+    }
+    return undefined;
+  }
+
+  async _process(handler, event) {
+    try {
+      await handler._recordTelemetry(event);
+      this.stats.processed++;
+    } catch (error) {
+      this.stats.errors++;
+      console.error("工具遙測事件處理失敗:", error.message);
+    }
+  }
+
+  _drain() {
+    const end = Math.min(this.queue.length, this.head + this.batchSize * 2);
+    for (let i = this.head; i < end; i += 2) {
+      // 不等待各事件的非同步日誌寫入，logger 本身已是緩衝寫入
+      this._process(this.queue[i], this.queue[i + 1]);
+    }
+    this.head = end;
+
+    if (this.head < this.queue.length) {
+      setImmediate(() => this._drain());
+      return;
+    }
+
+    this.queue = [];
+    this.head = 0;
+    this.scheduled = false;
+    const waiters = this.idleWaiters;
+    this.idleWaiters = [];
+    for (const resolve of waiters) resolve();
+  }
+
+  /**
+   * 等待佇列中的事件全部處理完成
+   */
+  flush() {
+    if (!this.scheduled) return Promise.resolve();
+    return new Promise(resolve => this.idleWaiters.push(resolve));
+  }
+
+  /**
+   * 切換 strict 模式；切換前先處理完佇列
+   */
+  async setStrict(strict) {
+    await this.flush();
+    this.strict = strict;
+  }
+
+  getStats() {
+    return {
+      ...this.stats,
+      queueLength: (this.queue.length - this.head) / 2,
+      strict: this.strict,
+    };
+  }
+}
+
+// 全域遙測佇列（測試環境預設 strict）
+export const globalToolTelemetry = new ToolTelemetry({
+  strict: config.toolTelemetryStrict,
+});
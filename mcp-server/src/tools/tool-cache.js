@@ -2,29 +2,149 @@
  * 工具執行緩存系統
  *
  * 提供智能緩存功能，減少重複計算和 API 調用
+ *
+ * LRU 以雙向鏈結串列維護使用順序：命中時移到尾端，驅逐時取最前端，皆為 O(1)。
+ * （不直接用 Map 插入順序：V8 的 Map 刪除前端項目後會留下空槽，
+ *   取第一個項目需略過空槽，容量上萬時每次驅逐約需 10µs。）
+ * 容量同時以項目數（maxSize）與估算位元組（maxBytes）限制，並可為個別工具設定位元組配額，
+ * 避免單一大型結果（例如 MIL 清單）擠掉大量小型查詢。
+ *
+ * 過期處理（由各工具的 BaseTool 選項決定）：
+ * - staleTTL：TTL 到期後的寬限期，期間仍返回舊值，並由 revalidate 在背景更新一次
+ * - negative：「找不到」結果以短 TTL 緩存，避免不存在的編號反覆查詢資料庫
+ * - singleFlight：同一個鍵同時只執行一次載入，其他呼叫共用同一個 Promise
+ *
+ * 資料相依標籤：項目可標記讀取的資料（例如 "mil:*"、"mil:serial:G250619001"、
+ * "hr:employee:A001"），資料異動時以 invalidateTags 清除相關項目。
+ * "ns:*" 代表整個命名空間：清除 "mil:*" 會清除所有 "mil:" 開頭的標籤；
+ * 清除 "mil:serial:X" 也會清除依賴整個 MIL 資料的 "mil:*" 項目。
+ *
+ * 兩層緩存：以 attachL2 掛上共用儲存（cache-store.js 的 SqliteCacheStore）後，
+ * 寫入同時寫到 L2，L1 未命中時由 lookupL2 讀取並放回 L1。
+ * L2 項目保留原本的建立時間，各行程對同一項目的 TTL 與寬限期一致；
+ * 標籤失效與清空也寫到 L2，其他行程定期讀取失效記錄後清除自己的 L1。
  */
 
 import crypto from "crypto";
+import config from "../config/config.js";
 import logger from "../config/logger.js";
 
+// 每個項目的物件額外開銷估算（位元組）
+const ENTRY_OVERHEAD = 100;
+
+const SIZE_UNITS = { b: 1, kb: 1024, mb: 1024 * 1024, gb: 1024 * 1024 * 1024 };
+
+/**
+ * 解析位元組大小，支援 kb / mb / gb 單位（例如 "16mb"）
+ * @returns {number|null} 無法解析時返回 null
+ */
+export function parseByteSize(value) {
+  if (typeof value === "number") return value;
+  const match = /^\s*(\d+(?:\.\d+)?)\s*(b|kb|mb|gb)?\s*$/i.exec(
+    String(value),
+  );
+  if (!match) return null;
+  const unit = SIZE_UNITS[(match[2] || "b").toLowerCase()];
+  return Math.floor(parseFloat(match[1]) * unit);
+}
+
+/**
+ * 解析工具配額設定，格式為 "tool=size,tool=size"
+ * 例如 "get-mil-list=16mb,get-mil-details=4mb"，無效項目會被忽略
+ * @returns {Object<string, number>}
+ */
+export function parseToolQuotas(spec) {
+  const quotas = {};
+  if (!spec) return quotas;
+
+  for (const part of spec.split(",")) {
+    const [tool, size] = part.split("=").map(text => text && text.trim());
+    const bytes = parseByteSize(size);
+    if (tool && bytes !== null) quotas[tool] = bytes;
+  }
+  return quotas;
+}
+
+/**
+ * 估算緩存項目佔用的位元組（字串以 UTF-16 計算）
+ * @param {string} key
+ * @param {*} value
+ * @param {number} [jsonLength] - 已知的 JSON 序列化長度，避免重複 JSON.stringify
+ */
+export function estimateEntrySize(key, value, jsonLength) {
+  const length = jsonLength ?? (JSON.stringify(value) || "").length;
+  return key.length * 2 + length * 2 + ENTRY_OVERHEAD;
+}
+
+/**
+ * 雙向鏈結串列（使用順序），節點需有 prev / next 欄位
+ */
+class LRUList {
+  constructor() {
+    this.head = {};
+    this.head.prev = this.head;
+    this.head.next = this.head;
+    this.size = 0;
+  }
+
+  push(node) {
+    node.prev = this.head.prev;
+    node.next = this.head;
+    this.head.prev.next = node;
+    this.head.prev = node;
+    this.size++;
+  }
+
+  remove(node) {
+    node.prev.next = node.next;
+    node.next.prev = node.prev;
+    node.prev = null;
+    node.next = null;
+    this.size--;
+  }
+
+  /**
+   * 最久未使用的節點
+   */
+  first() {
+    return this.size > 0 ? this.head.next : null;
+  }
+}
+
 /**
  * 緩存項目
  */
 class CacheItem {
-  constructor(key, value, ttl = 300000) {
+  constructor(key, value, ttl = 300000, tool = null, size = 0, options = {}) {
     // 默認 5 分鐘 TTL
     this.key = key;
     this.value = value;
-    this.createdAt = Date.now();
+    this.tool = tool;
+    this.size = size;
+    this.staleTTL = options.staleTTL || 0; // TTL 到期後仍可返回舊值的寬限期
+    this.negative = options.negative || false; // 是否為「找不到」結果
+    this.tags = options.tags || null; // 資料相依標籤
+    // 全域 LRU 串列指標；toolNode 為所屬工具串列中的節點
+    this.prev = null;
+    this.next = null;
+    this.toolNode = { item: this, prev: null, next: null };
+    this.createdAt = options.createdAt ?? Date.now(); // 來自 L2 時保留原本的建立時間
     this.ttl = ttl;
     this.accessCount = 1;
     this.lastAccessed = Date.now();
   }
 
   /**
-   * 檢查緩存是否過期
+   * 檢查緩存是否過期（超過 TTL 與寬限期，不能再返回）
    */
   isExpired() {
+    return Date.now() - this.createdAt > this.ttl + this.staleTTL;
+  }
+
+  /**
+   * 檢查緩存是否已超過 TTL（寬限期內仍可返回，但需要更新）
+   */
+  isStale() {
     return Date.now() - this.createdAt > this.ttl;
   }
 
@@ -43,11 +163,17 @@ class CacheItem {
   getInfo() {
     return {
       key: this.key,
+      tool: this.tool,
+      size: this.size,
       createdAt: this.createdAt,
       ttl: this.ttl,
       accessCount: this.accessCount,
       lastAccessed: this.lastAccessed,
+      staleTTL: this.staleTTL,
+      negative: this.negative,
+      tags: this.tags,
       age: Date.now() - this.createdAt,
+      isStale: this.isStale(),
       isExpired: this.isExpired(),
     };
   }
@@ -59,15 +185,50 @@ class CacheItem {
 export class ToolCache {
   constructor(options = {}) {
     this.cache = new Map();
+    this.lru = new LRUList();
     this.maxSize = options.maxSize || 1000; // 最大緩存項目數
+    this.maxBytes = options.maxBytes || Infinity; // 估算位元組上限
+    this.toolQuotas = { ...(options.toolQuotas || {}) }; // 工具 -> 位元組配額
     this.defaultTTL = options.defaultTTL || 300000; // 5 分鐘
     this.cleanupInterval = options.cleanupInterval || 60000; // 1 分鐘清理間隔
+
+    // 每個工具自己的 LRU 串列與位元組用量，用於配額驅逐與記憶體報表
+    this.toolUsage = new Map();
+    this.totalBytes = 0;
+
+    // 進行中的載入：key -> Promise
+    this.inflight = new Map();
+
+    // 標籤 -> 項目鍵集合；epoch 在每次失效時遞增，
+    // 失效前開始的載入寫回時會被拒絕，避免把舊資料放回緩存
+    this.tagIndex = new Map();
+    this.epoch = 0;
+
+    // 共用 L2：l2Seq 為已處理的失效記錄序號，l2OwnSeqs 為本行程寫入的失效記錄
+    this.l2 = null;
+    this.l2Seq = 0;
+    this.l2OwnSeqs = new Set();
+    this.l2Pending = new Set();
+    this.l2Timer = null;
+
     this.stats = {
       hits: 0,
       misses: 0,
       sets: 0,
       evictions: 0,
       cleanups: 0,
+      rejected: 0,
+      staleHits: 0,
+      negativeHits: 0,
+      coalesced: 0,
+      revalidations: 0,
+      revalidationErrors: 0,
+      invalidations: 0,
+      invalidatedEntries: 0,
+      discardedWrites: 0,
+      l2Promotions: 0,
+      l2Errors: 0,
+      l2RemoteInvalidations: 0,
     };
 
     // 啟動定期清理
@@ -78,13 +239,13 @@ export class ToolCache {
    * 生成緩存鍵
    */
   generateKey(toolName, params, additionalContext = {}) {
-    const keyData = {
+    // 參數已排序；不可把鍵名陣列當 JSON.stringify 的 replacer，
+    // 它會套用到每一層，導致參數內容全被略過、不同參數共用同一個鍵
+    const keyString = JSON.stringify({
       tool: toolName,
       params: this._normalizeParams(params),
-      context: additionalContext,
-    };
-
-    const keyString = JSON.stringify(keyData, Object.keys(keyData).sort());
+      context: this._normalizeParams(additionalContext),
+    });
     return crypto
       .createHash("sha256")
       .update(keyString)
@@ -115,20 +276,84 @@ export class ToolCache {
 
   /**
    * 設置緩存
+   * @param {string} key
+   * @param {*} value
+   * @param {number} ttl
+   * @param {Object} options
+   * @param {string} options.tool - 所屬工具，用於配額與記憶體統計
+   * @param {number} options.jsonLength - 已知的 JSON 序列化長度
+   * @param {number} options.staleTTL - TTL 到期後仍可返回舊值的寬限期
+   * @param {boolean} options.negative - 是否為「找不到」結果
+   * @param {string[]} options.tags - 資料相依標籤
+   * @param {number} options.epoch - 開始載入時的 epoch，之後有失效發生則不寫入
+   * @param {number} options.since - 開始載入的時間，之後其他行程有失效則不寫入 L2
+   * @param {number} options.createdAt - 建立時間（預設為現在）
+   * @param {boolean} options.fromL2 - 由 L2 讀回的項目，不再寫回 L2
+   * @returns {boolean} 是否已放入 L1（超過總上限或工具配額的單一結果不放入 L1，但仍寫入 L2）
    */
-  set(key, value, ttl = this.defaultTTL) {
-    // 檢查緩存大小限制
-    if (this.cache.size >= this.maxSize) {
-      this._evictOldest();
+  set(key, value, ttl = this.defaultTTL, options = {}) {
+    const tool = options.tool || null;
+    if (options.epoch !== undefined && options.epoch !== this.epoch) {
+      this.stats.discardedWrites++;
+      logger.debug("Tool cache discarded write after invalidation", { key });
+      return false;
+    }
+
+    const createdAt = options.createdAt ?? Date.now();
+    if (this.l2 && !options.fromL2) {
+      this._l2Call(
+        this.l2.set(key, value, {
+          tool,
+          ttl,
+          createdAt,
+          staleTTL: options.staleTTL,
+          negative: options.negative,
+          tags: options.tags,
+          since: options.since,
+        }),
+        key,
+      );
     }
 
-    const cacheItem = new CacheItem(key, value, ttl);
-    this.cache.set(key, cacheItem);
+    const size = estimateEntrySize(key, value, options.jsonLength);
+    const quota = tool ? this.toolQuotas[tool] : undefined;
+
+    const existing = this.cache.get(key);
+    if (existing) this._remove(existing);
+
+    if (size > this.maxBytes || (quota !== undefined && size > quota)) {
+      this.stats.rejected++;
+      logger.debug("Tool cache rejected oversized item", { key, tool, size });
+      return false;
+    }
+
+    // 先在工具配額內驅逐同工具最久未使用的項目，再處理整體上限
+    if (quota !== undefined) {
+      const usage = this.toolUsage.get(tool);
+      while (usage && usage.list.size > 0 && usage.bytes + size > quota) {
+        this._evict(usage.list.first().item);
+      }
+    }
+    while (
+      this.cache.size > 0 &&
+      (this.cache.size >= this.maxSize ||
+        this.totalBytes + size > this.maxBytes)
+    ) {
+      this._evict(this.lru.first());
+    }
+
+    const cacheItem = new CacheItem(key, value, ttl, tool, size, {
+      ...options,
+      createdAt,
+    });
+    this._add(cacheItem);
     this.stats.sets++;
 
     logger.debug("Tool cache set", {
       key,
+      tool,
       ttl,
+      size,
       cacheSize: this.cache.size,
     });
 
@@ -136,31 +361,155 @@ export class ToolCache {
   }
 
   /**
-   * 獲取緩存
+   * 獲取緩存（只返回未超過 TTL 的一般結果）
    */
   get(key) {
-    const item = this.cache.get(key);
+    const item = this._find(key);
 
-    if (!item) {
+    if (!item || item.negative || item.isStale()) {
       this.stats.misses++;
       logger.debug("Tool cache miss", { key });
       return null;
     }
 
-    if (item.isExpired()) {
-      this.cache.delete(key);
+    this.stats.hits++;
+    logger.debug("Tool cache hit", {
+      key,
+      accessCount: item.accessCount,
+    });
+
+    return item.access();
+  }
+
+  /**
+   * 查詢緩存項目，寬限期內的舊值與「找不到」結果也會返回
+   * 呼叫端以 item.isStale() 判斷是否需要 revalidate，以 item.negative 判斷結果類型
+   * @returns {CacheItem|null}
+   */
+  lookup(key) {
+    const item = this._find(key);
+
+    if (!item) {
       this.stats.misses++;
-      logger.debug("Tool cache expired", { key });
+      logger.debug("Tool cache miss", { key });
       return null;
     }
 
     this.stats.hits++;
+    if (item.negative) this.stats.negativeHits++;
+    else if (item.isStale()) this.stats.staleHits++;
     logger.debug("Tool cache hit", {
       key,
       accessCount: item.accessCount,
+      negative: item.negative,
     });
 
-    return item.access();
+    item.access();
+    return item;
+  }
+
+  /**
+   * L1 未命中後查詢 L2，命中時放回 L1（保留原本的建立時間）
+   * 與 lookup 相同，寬限期內的舊值與「找不到」結果也會返回
+   * @returns {Promise<CacheItem|null>}
+   */
+  async lookupL2(key) {
+    if (!this.l2) return null;
+
+    const epoch = this.epoch;
+    let record;
+    try {
+      record = await this.l2.get(key);
+    } catch (error) {
+      this.stats.l2Errors++;
+      logger.warn("Tool cache L2 read failed", { key, error: error.message });
+      return null;
+    }
+    // 讀取期間發生失效時，讀到的可能是失效前的值
+    if (!record || epoch !== this.epoch) return null;
+
+    const options = {
+      tool: record.tool,
+      staleTTL: record.staleTTL,
+      negative: record.negative,
+      tags: record.tags,
+      createdAt: record.createdAt,
+      fromL2: true,
+    };
+    this.set(key, record.value, record.ttl, options);
+    this.stats.l2Promotions++;
+    logger.debug("Tool cache L2 hit", { key, tool: record.tool });
+
+    // 超過 L1 上限的項目不放入 L1，直接返回
+    return (
+      this.cache.get(key) ||
+      new CacheItem(key, record.value, record.ttl, record.tool, 0, options)
+    );
+  }
+
+  /**
+   * 取得未超過寬限期的項目並標記為最近使用，過期項目直接移除
+   */
+  _find(key) {
+    const item = this.cache.get(key);
+    if (!item) return null;
+
+    if (item.isExpired()) {
+      this._remove(item);
+      logger.debug("Tool cache expired", { key });
+      return null;
+    }
+
+    // 移到尾端成為最近使用
+    this.lru.remove(item);
+    this.lru.push(item);
+    const { list } = this.toolUsage.get(item.tool || "");
+    list.remove(item.toolNode);
+    list.push(item.toolNode);
+
+    return item;
+  }
+
+  /**
+   * 同一個鍵同時只執行一次 loader，其他呼叫等待同一個結果（或錯誤）
+   * @param {string} key
+   * @param {Function} loader - () => Promise
+   * @returns {Promise}
+   */
+  singleFlight(key, loader) {
+    const pending = this.inflight.get(key);
+    if (pending) {
+      this.stats.coalesced++;
+      return pending;
+    }
+
+    const promise = (async () => {
+      try {
+        return await loader();
+      } finally {
+        // 失效時 inflight 會被清空，之後可能已有新的載入使用同一個鍵
+        if (this.inflight.get(key) === promise) this.inflight.delete(key);
+      }
+    })();
+    this.inflight.set(key, promise);
+    return promise;
+  }
+
+  /**
+   * 在背景更新寬限期內的舊值；已有載入進行中時不重複執行
+   * loader 負責寫回緩存，失敗時保留舊值直到寬限期結束
+   */
+  revalidate(key, loader) {
+    if (this.inflight.has(key)) return;
+
+    this.stats.revalidations++;
+    this.singleFlight(key, loader).catch(error => {
+      this.stats.revalidationErrors++;
+      logger.warn("Tool cache revalidation failed", {
+        key,
+        error: error.message,
+      });
+    });
   }
 
   /**
@@ -168,66 +517,199 @@ export class ToolCache {
    */
   has(key) {
     const item = this.cache.get(key);
-    return item && !item.isExpired();
+    return item && !item.isStale();
   }
 
   /**
    * 刪除緩存
    */
   delete(key) {
-    const deleted = this.cache.delete(key);
-    if (deleted) {
-      logger.debug("Tool cache deleted", { key });
+    const item = this.cache.get(key);
+    if (!item) return false;
+
+    this._remove(item);
+    if (this.l2) this._l2Call(this.l2.delete(key), key);
+    logger.debug("Tool cache deleted", { key });
+    return true;
+  }
+
+  /**
+   * 清除標記了指定標籤的項目
+   * @param {string[]} tags - 例如 ["mil:*"]、["hr:employee:A001"]
+   * @returns {number} 清除的 L1 項目數（L2 以非同步方式清除並通知其他行程）
+   */
+  invalidateTags(tags) {
+    if (this.l2) {
+      this._l2Call(
+        this.l2.invalidateTags(tags).then(({ seq }) => this.l2OwnSeqs.add(seq)),
+      );
     }
-    return deleted;
+    return this._invalidateLocal(tags);
   }
 
   /**
-   * 清空所有緩存
+   * 只清除本行程 L1 中標記了指定標籤的項目
+   */
+  _invalidateLocal(tags) {
+    this.epoch++;
+    this.inflight.clear();
+    this.stats.invalidations++;
+
+    const keys = new Set();
+    for (const tag of tags) {
+      for (const matched of this._matchingTags(tag)) {
+        for (const key of this.tagIndex.get(matched)) keys.add(key);
+      }
+    }
+
+    for (const key of keys) {
+      this._remove(this.cache.get(key));
+    }
+    this.stats.invalidatedEntries += keys.size;
+
+    logger.info("Tool cache invalidated by tags", {
+      tags,
+      invalidatedItems: keys.size,
+    });
+    return keys.size;
+  }
+
+  /**
+   * 找出受 tag 失效影響的已索引標籤
+   */
+  _matchingTags(tag) {
+    if (tag === "*") return [...this.tagIndex.keys()];
+
+    if (tag.endsWith(":*")) {
+      const prefix = tag.slice(0, -1);
+      return [...this.tagIndex.keys()].filter(indexed =>
+        indexed.startsWith(prefix),
+      );
+    }
+
+    // 本身與各層命名空間的萬用標籤，例如 mil:serial:X -> mil:*、mil:serial:*
+    const matched = [tag];
+    const parts = tag.split(":");
+    for (let i = 1; i < parts.length; i++) {
+      matched.push(`${parts.slice(0, i).join(":")}:*`);
+    }
+    return matched.filter(indexed => this.tagIndex.has(indexed));
+  }
+
+  /**
+   * 清空所有緩存（包含 L2）
    */
   clear() {
+    if (this.l2) {
+      this._l2Call(this.l2.clear().then(({ seq }) => this.l2OwnSeqs.add(seq)));
+    }
+    return this._clearLocal();
+  }
+
+  /**
+   * 只清空本行程的 L1
+   */
+  _clearLocal() {
     const size = this.cache.size;
+    this.epoch++;
+    this.inflight.clear();
     this.cache.clear();
+    this.lru = new LRUList();
+    this.toolUsage.clear();
+    this.tagIndex.clear();
+    this.totalBytes = 0;
     logger.info("Tool cache cleared", { clearedItems: size });
     return size;
   }
 
   /**
-   * 驅逐最舊的緩存項目
+   * 設定或移除（bytes 為 null）工具的位元組配額
    */
-  _evictOldest() {
-    let oldestKey = null;
-    let oldestTime = Date.now();
+  setToolQuota(tool, bytes) {
+    if (bytes == null) {
+      delete this.toolQuotas[tool];
+      return;
+    }
+    this.toolQuotas[tool] = bytes;
+    const usage = this.toolUsage.get(tool);
+    while (usage && usage.list.size > 0 && usage.bytes > bytes) {
+      this._evict(usage.list.first().item);
+    }
+  }
 
-    for (const [key, item] of this.cache) {
-      if (item.createdAt < oldestTime) {
-        oldestTime = item.createdAt;
-        oldestKey = key;
+  _add(item) {
+    this.cache.set(item.key, item);
+    this.lru.push(item);
+    this.totalBytes += item.size;
+
+    const tool = item.tool || "";
+    let usage = this.toolUsage.get(tool);
+    if (!usage) {
+      usage = { list: new LRUList(), bytes: 0 };
+      this.toolUsage.set(tool, usage);
+    }
+    usage.list.push(item.toolNode);
+    usage.bytes += item.size;
+
+    if (item.tags) {
+      for (const tag of item.tags) {
+        let keys = this.tagIndex.get(tag);
+        if (!keys) {
+          keys = new Set();
+          this.tagIndex.set(tag, keys);
+        }
+        keys.add(item.key);
       }
     }
+  }
 
-    if (oldestKey) {
-      this.cache.delete(oldestKey);
-      this.stats.evictions++;
-      logger.debug("Tool cache evicted oldest item", { key: oldestKey });
+  _remove(item) {
+    this.cache.delete(item.key);
+    this.lru.remove(item);
+    this.totalBytes -= item.size;
+
+    const tool = item.tool || "";
+    const usage = this.toolUsage.get(tool);
+    usage.list.remove(item.toolNode);
+    usage.bytes -= item.size;
+    if (usage.list.size === 0) this.toolUsage.delete(tool);
+
+    if (item.tags) {
+      for (const tag of item.tags) {
+        const keys = this.tagIndex.get(tag);
+        keys.delete(item.key);
+        if (keys.size === 0) this.tagIndex.delete(tag);
+      }
     }
   }
 
+  /**
+   * 驅逐指定項目（由呼叫端取 LRU 串列最前端）
+   */
+  _evict(item) {
+    this._remove(item);
+    this.stats.evictions++;
+    logger.debug("Tool cache evicted least recently used item", {
+      key: item.key,
+      tool: item.tool,
+    });
+  }
+
   /**
    * 清理過期緩存
    */
   cleanup() {
     let cleanedCount = 0;
-    const now = Date.now();
 
-    for (const [key, item] of this.cache) {
+    for (const item of this.cache.values()) {
       if (item.isExpired()) {
-        this.cache.delete(key);
+        this._remove(item);
         cleanedCount++;
       }
     }
 
     this.stats.cleanups++;
+    if (this.l2) this._l2Call(this.l2.purgeExpired());
 
     if (cleanedCount > 0) {
       logger.debug("Tool cache cleanup completed", {
@@ -239,6 +721,93 @@ export class ToolCache {
     return cleanedCount;
   }
 
+  /**
+   * 掛上共用 L2
+   * @param {Object} store - 具 get / set / delete / invalidateTags / clear /
+   *   pollInvalidations 的儲存（例如 SqliteCacheStore）
+   * @param {Object} options
+   * @param {number} options.pollInterval - 讀取其他行程失效記錄的間隔（毫秒，0 為不輪詢）
+   */
+  async attachL2(store, options = {}) {
+    await store.init();
+    this.l2Seq = await store.latestInvalidation();
+    this.l2 = store;
+
+    const pollInterval = options.pollInterval ?? 2000;
+    if (pollInterval > 0) {
+      this.l2Timer = setInterval(() => {
+        this.pollL2Invalidations().catch(error => {
+          this.stats.l2Errors++;
+          logger.warn("Tool cache L2 invalidation poll failed", {
+            error: error.message,
+          });
+        });
+      }, pollInterval);
+      if (this.l2Timer.unref) {
+        this.l2Timer.unref();
+      }
+    }
+  }
+
+  /**
+   * 卸下 L2（不清除 L2 內容），等待進行中的寫入完成
+   * @returns {Promise<Object|null>} 原本的儲存
+   */
+  async detachL2() {
+    if (this.l2Timer) {
+      clearInterval(this.l2Timer);
+      this.l2Timer = null;
+    }
+    await this.flushL2();
+    const store = this.l2;
+    this.l2 = null;
+    this.l2OwnSeqs.clear();
+    return store;
+  }
+
+  /**
+   * 套用其他行程寫入 L2 的失效記錄到本行程 L1
+   * @returns {Promise<number>} 套用的失效記錄數
+   */
+  async pollL2Invalidations() {
+    if (!this.l2) return 0;
+
+    let applied = 0;
+    for (const { seq, tags } of await this.l2.pollInvalidations(this.l2Seq)) {
+      this.l2Seq = Math.max(this.l2Seq, seq);
+      if (this.l2OwnSeqs.delete(seq)) continue;
+
+      if (tags.includes("*")) this._clearLocal();
+      else this._invalidateLocal(tags);
+      this.stats.l2RemoteInvalidations++;
+      applied++;
+    }
+    return applied;
+  }
+
+  /**
+   * 等待進行中的 L2 操作
+   */
+  async flushL2() {
+    await Promise.allSettled([...this.l2Pending]);
+  }
+
+  /**
+   * 追蹤 L2 的非同步操作；失敗只記錄，不影響 L1
+   */
+  _l2Call(promise, key) {
+    const tracked = promise
+      .catch(error => {
+        this.stats.l2Errors++;
+        logger.warn("Tool cache L2 operation failed", {
+          key,
+          error: error.message,
+        });
+      })
+      .finally(() => this.l2Pending.delete(tracked));
+    this.l2Pending.add(tracked);
+  }
+
   /**
    * 啟動定期清理計時器
    */
@@ -272,21 +841,36 @@ export class ToolCache {
       hitRate: hitRate.toFixed(2) + "%",
       cacheSize: this.cache.size,
       maxSize: this.maxSize,
+      maxBytes: Number.isFinite(this.maxBytes) ? this.maxBytes : null,
+      inflight: this.inflight.size,
+      tags: this.tagIndex.size,
       memoryUsage: this._estimateMemoryUsage(),
+      tiers: {
+        l1: {
+          hits: this.stats.hits,
+          misses: this.stats.misses,
+          hitRate: hitRate.toFixed(2) + "%",
+          entries: this.cache.size,
+          bytes: this.totalBytes,
+        },
+        l2: this.l2
+          ? {
+              ...this.l2.getStats(),
+              promotions: this.stats.l2Promotions,
+              errors: this.stats.l2Errors,
+              remoteInvalidations: this.stats.l2RemoteInvalidations,
+              pendingOperations: this.l2Pending.size,
+            }
+          : null,
+      },
     };
   }
 
   /**
-   * 估算記憶體使用量
+   * 估算記憶體使用量（寫入時已累計，不需重新序列化）
    */
   _estimateMemoryUsage() {
-    let totalSize = 0;
-
-    for (const [key, item] of this.cache) {
-      totalSize += key.length * 2; // UTF-16 編碼
-      totalSize += JSON.stringify(item.value).length * 2;
-      totalSize += 100; // 物件額外開銷估算
-    }
+    const totalSize = this.totalBytes;
 
     return {
       bytes: totalSize,
@@ -295,13 +879,29 @@ export class ToolCache {
     };
   }
 
+  /**
+   * 各工具的緩存項目數、估算位元組與配額，依位元組由大到小排序
+   */
+  getToolUsage() {
+    const usage = [];
+    for (const [tool, { list, bytes }] of this.toolUsage) {
+      usage.push({
+        tool: tool || null,
+        entries: list.size,
+        bytes,
+        quota: this.toolQuotas[tool] ?? null,
+      });
+    }
+    return usage.sort((a, b) => b.bytes - a.bytes);
+  }
+
   /**
    * 獲取緩存項目詳細資訊
    */
   getItemsInfo() {
     const items = [];
 
-    for (const [key, item] of this.cache) {
+    for (const item of this.cache.values()) {
       items.push(item.getInfo());
     }
 
@@ -313,13 +913,19 @@ export class ToolCache {
    */
   destroy() {
     this.stopCleanupTimer();
-    this.clear();
+    if (this.l2Timer) {
+      clearInterval(this.l2Timer);
+      this.l2Timer = null;
+    }
+    this._clearLocal();
   }
 }
 
 // 全域緩存實例
 export const globalToolCache = new ToolCache({
-  maxSize: 1000,
+  maxSize: config.toolCacheMaxEntries,
+  maxBytes: parseByteSize(config.toolCacheMaxBytes),
+  toolQuotas: parseToolQuotas(config.toolCacheToolQuotas),
   defaultTTL: 300000, // 5 分鐘
   cleanupInterval: 60000, // 1 分鐘
 });
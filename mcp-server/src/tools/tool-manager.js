@@ -6,6 +6,9 @@
 
 import logger from "../config/logger.js";
 import { ToolExecutionError, ToolErrorType } from "./base-tool.js";
+import { globalLatencyTracker, LATENCY_WINDOWS } from "./latency-sketch.js";
+import { toolCallDuration } from "../services/metrics.js";
+import { withSpan } from "../services/tracing.js";
 
 /**
  * 工具管理器類別
@@ -50,6 +53,8 @@ export class ToolManager {
       };
       this.tools.set(tool.name, wrappedTool);
     } else {
+      // 註冊時先編譯參數驗證函式，之後每次呼叫直接重用
+      tool.compileValidator?.();
       this.tools.set(tool.name, tool);
     }
 
@@ -99,6 +104,8 @@ export class ToolManager {
    * 調用工具
    */
   async callTool(toolName, params, options = {}) {
+    const startTime = Date.now();
+
     try {
       // 檢查工具是否存在
       if (!this.hasTool(toolName)) {
@@ -117,7 +124,12 @@ export class ToolManager {
       });
 
       // 執行工具
-      const result = await tool.execute(params, options);
+      const result = await withSpan(
+        `tool ${toolName}`,
+        { tool: toolName, module: tool.module || "other" },
+        () => tool.execute(params, options),
+      );
+      this._recordLatency(toolName, startTime, "success");
 
       // 更新全域統計
       this.globalStats.totalExecutions++;
@@ -131,6 +143,10 @@ export class ToolManager {
 
       return result;
     } catch (error) {
+      if (this.hasTool(toolName)) {
+        this._recordLatency(toolName, startTime, "error");
+      }
+
       // 更新全域統計
       this.globalStats.totalExecutions++;
       this.globalStats.totalErrors++;
@@ -147,6 +163,20 @@ export class ToolManager {
     }
   }
 
+  /**
+   * 記錄工具與所屬模組的延遲
+   */
+  _recordLatency(toolName, startTime, status) {
+    const module = this.getTool(toolName)?.module || null;
+    const duration = Date.now() - startTime;
+
+    globalLatencyTracker.record(toolName, module, duration);
+    toolCallDuration.observe(
+      { tool: toolName, module: module || "other", status },
+      duration / 1000,
+    );
+  }
+
   /**
    * 清理敏感參數用於日誌記錄
    */
@@ -224,9 +254,21 @@ export class ToolManager {
               100
             ).toFixed(2) + "%"
           : "0%",
+      latency: globalLatencyTracker.getToolPercentiles(toolName),
     };
   }
 
+  /**
+   * 獲取延遲分位數（各工具與模組）
+   * @param {string} window - 滑動視窗（1m / 5m / 15m / 1h / all）
+   * @param {Object} options - { includeSketches }
+   */
+  getLatencyStats(window = "5m", options = {}) {
+    const validWindow =
+      window === "all" || LATENCY_WINDOWS[window] ? window : "5m";
+    return globalLatencyTracker.getStats(validWindow, options);
+  }
+
   /**
    * 獲取所有工具的統計資料
    */
@@ -240,6 +282,7 @@ export class ToolManager {
     return {
       global: this.getGlobalStats(),
       tools: stats,
+      latency: this.getLatencyStats(),
     };
   }
 
@@ -258,6 +301,7 @@ export class ToolManager {
     for (const tool of this.tools.values()) {
       tool.clearHistory();
     }
+    globalLatencyTracker.reset();
 
     logger.info("Tool manager stats reset");
   }
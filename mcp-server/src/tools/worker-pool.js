@@ -0,0 +1,327 @@
+/**
+ * CPU 密集工具計算的 worker thread 池
+ *
+ * 統計工具的描述性統計、CSV 解析等計算若在主執行緒執行，會阻塞事件迴圈，
+ * 同時進行的 HR / MIL 查詢與 SSE 心跳都要等它完成。BaseTool 子類別以
+ * this.runInWorker(task, payload) 把這類計算交給此池：
+ * - 任務定義於 workers/ 下的模組（匯出 tasks 物件），在 worker 中以名稱呼叫
+ * - 數值陣列以 Float64Array 傳遞，呼叫端指定的 buffer 與返回值中的 TypedArray 以 transfer 交換，不複製
+ * - 所有 worker 忙碌時任務排隊；佇列達 maxQueue 時立即拒絕（QUEUE_FULL），由呼叫端返回錯誤而非無限堆積
+ * - 任務逾時時終止該 worker 並補上新的 worker
+ * size 為 0 時在主執行緒直接執行任務（測試或單核環境）。worker 在第一次使用時才啟動。
+ */
+
+import os from "os";
+import { Worker } from "worker_threads";
+import config from "../config/config.js";
+import logger from "../config/logger.js";
+
+const WORKER_SCRIPT = new URL("./workers/task-worker.js", import.meta.url);
+const DEFAULT_MODULES = [
+  new URL("./workers/stat-tasks.js", import.meta.url).href,
+];
+
+/**
+ * 依 CPU 核心數決定預設 worker 數：保留一個核心給主執行緒，最多 4 個
+ */
+function defaultPoolSize() {
+  const cores = os.availableParallelism
+    ? os.availableParallelism()
+    : os.cpus().length;
+  return Math.min(4, Math.max(1, cores - 1));
+}
+
+export class WorkerPoolError extends Error {
+  /**
+   * @param {string} message
+   * @param {string} code - QUEUE_FULL、TIMEOUT、WORKER_EXIT 或 TERMINATED
+   */
+  constructor(message, code) {
+    super(message);
+    this.name = "WorkerPoolError";
+    this.code = code;
+  }
+}
+
+export class WorkerPool {
+  /**
+   * @param {Object} options
+   * @param {number} options.size - worker 數，0 為在主執行緒執行，負數為依 CPU 核心數決定
+   * @param {number} options.maxQueue - 等待中任務的上限
+   * @param {number} options.taskTimeout - 單一任務的執行上限（毫秒，0 為不限制）
+   * @param {string[]} options.modules - 任務模組的 URL
+   */
+  constructor(options = {}) {
+    // NaN 或非整數會讓 workers.size >= size 永遠不成立，視為未設定
+    const size = Number.isInteger(options.size) ? options.size : -1;
+    this.size = size < 0 ? defaultPoolSize() : size;
+    this.maxQueue = options.maxQueue ?? 64;
+    this.taskTimeout = options.taskTimeout ?? 60000;
+    this.modules = options.modules || DEFAULT_MODULES;
+
+    this.workers = new Set();
+    this.idle = [];
+    this.queue = [];
+    this.taskCounter = 0;
+    this.inlineTasks = null;
+    this.destroyed = false;
+
+    this.stats = {
+      completed: 0,
+      failed: 0,
+      rejected: 0,
+      timedOut: 0,
+      workerRestarts: 0,
+      maxQueueLength: 0,
+      totalWaitTime: 0,
+      totalRunTime: 0,
+    };
+  }
+
+  /**
+   * 執行任務
+   * @param {string} task - 任務名稱（任務模組 tasks 物件的鍵）
+   * @param {*} payload - 以 structured clone 傳給 worker
+   * @param {Object} options
+   * @param {ArrayBuffer[]} options.transfer - 要 transfer 給 worker 的 buffer（呼叫後呼叫端不可再使用）
+   * @param {number} options.timeout - 覆寫 taskTimeout
+   * @returns {Promise<*>} 任務的返回值
+   */
+  run(task, payload, options = {}) {
+    if (this.destroyed) {
+      return Promise.reject(
+        new WorkerPoolError("Worker pool has been destroyed", "TERMINATED"),
+      );
+    }
+    if (this.size === 0) {
+      return this._runInline(task, payload);
+    }
+
+    // 佇列只在所有 worker 都忙碌時才有任務
+    if (this.queue.length >= this.maxQueue) {
+      this.stats.rejected++;
+      return Promise.reject(
+        new WorkerPoolError(
+          `Worker pool queue is full (${this.maxQueue} tasks waiting)`,
+          "QUEUE_FULL",
+        ),
+      );
+    }
+
+    return new Promise((resolve, reject) => {
+      this.queue.push({
+        id: ++this.taskCounter,
+        task,
+        payload,
+        transfer: options.transfer || [],
+        timeout: options.timeout ?? this.taskTimeout,
+        queuedAt: Date.now(),
+        resolve,
+        reject,
+      });
+      this.stats.maxQueueLength = Math.max(
+        this.stats.maxQueueLength,
+        this.queue.length,
+      );
+      this._dispatch();
+    });
+  }
+
+  async _runInline(task, payload) {
+    if (!this.inlineTasks) {
+      const modules = await Promise.all(this.modules.map(url => import(url)));
+      this.inlineTasks = Object.assign({}, ...modules.map(m => m.tasks));
+    }
+    const handler = this.inlineTasks[task];
+    if (!handler) {
+      throw new Error(`Unknown worker task: ${task}`);
+    }
+
+    const startTime = Date.now();
+    try {
+      const result = await handler(payload);
+      this.stats.completed++;
+      return result;
+    } catch (error) {
+      this.stats.failed++;
+      throw error;
+    } finally {
+      this.stats.totalRunTime += Date.now() - startTime;
+    }
+  }
+
+  _dispatch() {
+    while (this.queue.length > 0) {
+      let slot = this.idle.pop();
+      if (!slot) {
+        if (this.workers.size >= this.size) return;
+        slot = this._spawn();
+      }
+      this._start(slot, this.queue.shift());
+    }
+  }
+
+  _spawn() {
+    const worker = new Worker(WORKER_SCRIPT, {
+      workerData: { modules: this.modules },
+    });
+    const slot = { worker, job: null, timer: null };
+    this.workers.add(slot);
+    // 閒置的 worker 不阻止行程結束；執行任務時才 ref
+    worker.unref();
+
+    worker.on("message", message => this._onMessage(slot, message));
+    worker.on("error", error => this._onExit(slot, error));
+    worker.on("exit", code => {
+      if (this.workers.has(slot)) {
+        this._onExit(
+          slot,
+          new WorkerPoolError(`Worker exited with code ${code}`, "WORKER_EXIT"),
+        );
+      }
+    });
+    return slot;
+  }
+
+  _start(slot, job) {
+    const startedAt = Date.now();
+    this.stats.totalWaitTime += startedAt - job.queuedAt;
+    slot.job = { ...job, startedAt };
+    slot.worker.ref();
+
+    if (job.timeout > 0) {
+      slot.timer = setTimeout(() => {
+        this.stats.timedOut++;
+        this._onExit(
+          slot,
+          new WorkerPoolError(
+            `Worker task ${job.task} timed out after ${job.timeout} ms`,
+            "TIMEOUT",
+          ),
+        );
+      }, job.timeout);
+    }
+
+    try {
+      slot.worker.postMessage(
+        { id: job.id, task: job.task, payload: job.payload },
+        job.transfer,
+      );
+    } catch (error) {
+      // payload 無法 structured clone：worker 本身仍可使用
+      this._finish(slot);
+      this.stats.failed++;
+      job.reject(error);
+    }
+  }
+
+  _finish(slot) {
+    const job = slot.job;
+    clearTimeout(slot.timer);
+    slot.timer = null;
+    slot.job = null;
+    if (job) this.stats.totalRunTime += Date.now() - job.startedAt;
+
+    if (this.workers.has(slot)) {
+      slot.worker.unref();
+      this.idle.push(slot);
+      this._dispatch();
+    }
+    return job;
+  }
+
+  _onMessage(slot, message) {
+    if (!slot.job || slot.job.id !== message.id) return;
+    const job = this._finish(slot);
+
+    if (message.error) {
+      this.stats.failed++;
+      const error = new Error(message.error.message);
+      error.name = message.error.name;
+      error.stack = message.error.stack;
+      job.reject(error);
+    } else {
+      this.stats.completed++;
+      job.resolve(message.result);
+    }
+  }
+
+  /**
+   * worker 發生未捕捉錯誤、異常結束或任務逾時：移除該 worker，
+   * 拒絕它正在執行的任務，並為等待中的任務補上新的 worker
+   */
+  _onExit(slot, error) {
+    if (!this.workers.delete(slot)) return;
+    const index = this.idle.indexOf(slot);
+    if (index !== -1) this.idle.splice(index, 1);
+
+    const job = slot.job;
+    clearTimeout(slot.timer);
+    slot.job = null;
+    slot.worker.terminate().catch(() => {});
+
+    if (job) {
+      this.stats.failed++;
+      this.stats.totalRunTime += Date.now() - job.startedAt;
+      job.reject(error);
+    }
+    if (!this.destroyed) {
+      this.stats.workerRestarts++;
+      logger.warn("Worker thread removed from pool", {
+        task: job?.task,
+        error: error.message,
+      });
+      this._dispatch();
+    }
+  }
+
+  /**
+   * 池的狀態（/health 顯示）
+   */
+  getStats() {
+    const finished = this.stats.completed + this.stats.failed;
+    return {
+      size: this.size,
+      mode: this.size === 0 ? "inline" : "worker_threads",
+      workers: this.workers.size,
+      busy: this.workers.size - this.idle.length,
+      queued: this.queue.length,
+      maxQueue: this.maxQueue,
+      ...this.stats,
+      averageRunTime: finished ? this.stats.totalRunTime / finished : 0,
+      averageWaitTime: finished ? this.stats.totalWaitTime / finished : 0,
+    };
+  }
+
+  /**
+   * 終止所有 worker；等待中與執行中的任務以 TERMINATED 拒絕
+   */
+  async destroy() {
+    this.destroyed = true;
+    const error = new WorkerPoolError("Worker pool destroyed", "TERMINATED");
+    for (const job of this.queue.splice(0)) {
+      job.reject(error);
+    }
+
+    const slots = [...this.workers];
+    this.workers.clear();
+    this.idle = [];
+    await Promise.all(
+      slots.map(slot => {
+        clearTimeout(slot.timer);
+        slot.job?.reject(error);
+        slot.job = null;
+        return slot.worker.terminate();
+      }),
+    );
+  }
+}
+
+// 全域 worker 池實例
+export const globalWorkerPool = new WorkerPool({
+  size: config.workerPoolSize,
+  maxQueue: config.workerPoolMaxQueue,
+  taskTimeout: config.workerPoolTaskTimeout,
+});
+
+export default globalWorkerPool;
@@ -0,0 +1,57 @@
+/**
+ * 統計工具的 CPU 密集計算
+ *
+ * 由 WorkerPool 在 worker thread 中執行（WORKER_POOL_SIZE=0 時在主執行緒直接呼叫），
+ * 因此只能是純函數：不可引用 logger、資料庫或其他有狀態的模組。
+ * 數值陣列一律以 Float64Array 傳入與返回，返回值中的 TypedArray 會以 transfer 方式交回主執行緒。
+ */
+
+import { parseCSVText } from "../../services/stat/csv-parser.js";
+
+/**
+ * 計算單組的描述性統計（兩次掃描，避免大數相減的精度損失）
+ * @param {Float64Array|number[]} values
+ * @returns {{n: number, mean: number, std: number, se: number, min: number, max: number}}
+ */
+export function describe(values) {
+  const n = values.length;
+  let sum = 0;
+  let min = Infinity;
+  let max = -Infinity;
+  for (let i = 0; i < n; i++) {
+    const value = values[i];
+    sum += value;
+    if (value < min) min = value;
+    if (value > max) max = value;
+  }
+  const mean = n > 0 ? sum / n : NaN;
+
+  let squares = 0;
+  for (let i = 0; i < n; i++) {
+    const diff = values[i] - mean;
+    squares += diff * diff;
+  }
+  const std = n > 1 ? Math.sqrt(squares / (n - 1)) : 0;
+
+  return { n, mean, std, se: n > 0 ? std / Math.sqrt(n) : NaN, min, max };
+}
+
+/**
+ * WorkerPool 可呼叫的任務
+ */
+export const tasks = {
+  /**
+   * @param {{groups: Float64Array[]}} payload
+   */
+  describeGroups({ groups }) {
+    return groups.map(describe);
+  },
+
+  /**
+   * 解析為欄式資料（見 services/stat/csv-parser.js）
+   * @param {{csvData: string, options: Object}} payload
+   */
+  parseCSV({ csvData, options }) {
+    return parseCSVText(csvData, options);
+  },
+};
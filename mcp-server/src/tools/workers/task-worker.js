@@ -0,0 +1,30 @@
+/**
+ * WorkerPool 的 worker thread 入口
+ *
+ * 載入 workerData.modules 中各模組匯出的 tasks，依主執行緒送來的 { id, task, payload } 執行，
+ * 返回 { id, result } 或 { id, error }；result 中的 TypedArray 以 transfer 方式交回。
+ */
+
+import { parentPort, workerData } from "worker_threads";
+import { collectTransferables } from "./transferables.js";
+
+const tasks = {};
+for (const url of workerData.modules) {
+  Object.assign(tasks, (await import(url)).tasks);
+}
+
+parentPort.on("message", async ({ id, task, payload }) => {
+  try {
+    const handler = tasks[task];
+    if (!handler) {
+      throw new Error(`Unknown worker task: ${task}`);
+    }
+    const result = await handler(payload);
+    parentPort.postMessage({ id, result }, collectTransferables(result));
+  } catch (error) {
+    parentPort.postMessage({
+      id,
+      error: { name: error.name, message: error.message, stack: error.stack },
+    });
+  }
+});
@@ -0,0 +1,31 @@
+/**
+ * 收集 value 中可 transfer 的 ArrayBuffer
+ *
+ * 走訪一般物件與陣列（最多 depth 層），取出 TypedArray 的 buffer；
+ * SharedArrayBuffer 本來就共用，不列入。transfer 後原本的 TypedArray 會變成長度 0。
+ * @param {*} value
+ * @param {number} depth
+ * @returns {ArrayBuffer[]}
+ */
+export function collectTransferables(value, depth = 3) {
+  const buffers = new Set();
+
+  const visit = (item, level) => {
+    if (item === null || typeof item !== "object") return;
+    if (ArrayBuffer.isView(item)) {
+      if (item.buffer instanceof ArrayBuffer) buffers.add(item.buffer);
+      return;
+    }
+    if (item instanceof ArrayBuffer) {
+      buffers.add(item);
+      return;
+    }
+    if (level >= depth) return;
+    for (const child of Array.isArray(item) ? item : Object.values(item)) {
+      visit(child, level + 1);
+    }
+  };
+
+  visit(value, 0);
+  return [...buffers];
+}
@@ -0,0 +1,125 @@
+import { describe, test, expect, afterEach } from "@jest/globals";
+import { ToolCache, globalToolCache } from "../src/tools/tool-cache.js";
+import { BaseTool } from "../src/tools/base-tool.js";
+import {
+  ChangePollWatcher,
+  hrChangeTags,
+} from "../src/tools/cache-invalidation.js";
+
+class TaggedTool extends BaseTool {
+  constructor(name, options) {
+    super(
+      name,
+      "標籤失效測試工具",
+      { type: "object", properties: { id: { type: "string" } } },
+      options,
+    );
+    this.runs = 0;
+  }
+
+  async _execute({ id }) {
+    this.runs++;
+    return { id, version: this.runs };
+  }
+}
+
+describe("依資料相依標籤清除緩存", () => {
+  let cache;
+
+  afterEach(() => cache?.destroy());
+
+  test("萬用標籤與實體標籤應互相涵蓋", () => {
+    cache = new ToolCache();
+    cache.set("list", [], undefined, { tags: ["mil:*"] });
+    cache.set("g1", {}, undefined, { tags: ["mil:serial:G1"] });
+    cache.set("g2", {}, undefined, { tags: ["mil:serial:G2"] });
+    cache.set("emp", {}, undefined, { tags: ["hr:employee:A001"] });
+
+    // 單筆異動：清除該筆與依賴整個 MIL 的清單
+    expect(cache.invalidateTags(["mil:serial:G1"])).toBe(2);
+    expect(cache.has("list")).toBeFalsy();
+    expect(cache.has("g2")).toBe(true);
+
+    // 命名空間異動：清除所有 mil: 標籤
+    cache.set("list", [], undefined, { tags: ["mil:*"] });
+    expect(cache.invalidateTags(["mil:*"])).toBe(2);
+    expect(cache.has("emp")).toBe(true);
+    expect(cache.tagIndex.has("mil:serial:G2")).toBe(false);
+    expect(cache.getStats().invalidatedEntries).toBe(4);
+  });
+
+  test("失效前開始的載入不應寫回緩存", () => {
+    cache = new ToolCache();
+    const epoch = cache.epoch;
+    cache.invalidateTags(["mil:*"]);
+
+    expect(cache.set("k", "old", undefined, { epoch })).toBe(false);
+    expect(cache.getStats().discardedWrites).toBe(1);
+    const current = cache.epoch;
+    expect(cache.set("k", "new", undefined, { epoch: current })).toBe(true);
+  });
+
+  test("刪除與驅逐應同步移除標籤索引", () => {
+    cache = new ToolCache({ maxSize: 1 });
+    cache.set("a", 1, undefined, { tags: ["hr:*"] });
+    cache.set("b", 2, undefined, { tags: ["mil:*"] });
+
+    expect(cache.tagIndex.has("hr:*")).toBe(false);
+    cache.delete("b");
+    expect(cache.tagIndex.size).toBe(0);
+  });
+});
+
+describe("工具標籤與異動來源", () => {
+  afterEach(() => globalToolCache.clear());
+
+  test("工具結果應帶標籤，寫入型工具成功後清除相關緩存", async () => {
+    const reader = new TaggedTool("tag_reader", {
+      cacheTags: params => [`mil:serial:${params.id}`],
+    });
+    const writer = new TaggedTool("tag_writer", {
+      cacheable: false,
+      invalidatesTags: params => [`mil:serial:${params.id}`],
+    });
+
+    await reader.execute({ id: "G1" });
+    expect((await reader.execute({ id: "G1" })).fromCache).toBe(true);
+
+    await writer.execute({ id: "G1" });
+    const fresh = await reader.execute({ id: "G1" });
+    expect(fresh.fromCache).toBe(false);
+    expect(fresh.result.version).toBe(2);
+  });
+
+  test("輪詢到版本變更時應清除指定標籤", async () => {
+    const cache = new ToolCache();
+    const watcher = new ChangePollWatcher({ cache, interval: 0 });
+    let version = "1";
+    watcher.watch("mil", {
+      fetchVersion: async () => version,
+      tags: ["mil:*"],
+    });
+    cache.set("list", [], undefined, { tags: ["mil:*"] });
+
+    expect(await watcher.poll("mil")).toBe(false);
+    expect(await watcher.poll("mil")).toBe(false);
+    expect(cache.has("list")).toBe(true);
+
+    version = "2";
+    expect(await watcher.poll("mil")).toBe(true);
+    expect(cache.has("list")).toBeFalsy();
+    expect(watcher.getStats().sources.mil).toMatchObject({
+      version: "2",
+      checks: 3,
+      changes: 1,
+    });
+    cache.destroy();
+  });
+
+  test("HR 快照增量異動只清除異動員工", () => {
+    expect(
+      hrChangeTags({ type: "delta", employeeNos: ["A001", "A002"] }),
+    ).toEqual(["hr:employee:A001", "hr:employee:A002"]);
+    expect(hrChangeTags({ type: "reload" })).toEqual(["hr:*"]);
+  });
+});
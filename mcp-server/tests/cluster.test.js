@@ -0,0 +1,208 @@
+import { describe, test, expect } from "@jest/globals";
+import { EventEmitter } from "events";
+import {
+  ClusterBus,
+  attachClusterPrimary,
+} from "../src/services/cluster-bus.js";
+import {
+  SSEConnectionManager,
+  connectionOwner,
+  mergeSSEStats,
+} from "../src/services/sse-manager.js";
+import {
+  ToolStatsManager,
+  mergeStatsSnapshots,
+  formatGlobalStats,
+} from "../src/tools/stats-manager.js";
+import {
+  LatencyTracker,
+  mergeLatencyStats,
+} from "../src/tools/latency-sketch.js";
+
+// IPC 訊息經 JSON 序列化傳遞
+const clone = message => JSON.parse(JSON.stringify(message));
+const tick = () => new Promise(resolve => setTimeout(resolve, 10));
+
+/**
+ * 以 EventEmitter 模擬 node:cluster：每個 worker 一個 ClusterBus
+ */
+function createCluster(count, options = {}) {
+  const primary = new EventEmitter();
+  primary.workers = {};
+  const buses = [];
+
+  for (let id = 1; id <= count; id++) {
+    const channel = new EventEmitter();
+    const worker = {
+      id,
+      connected: true,
+      isConnected() {
+        return this.connected;
+      },
+      send: message =>
+        setImmediate(() => channel.emit("message", clone(message))),
+    };
+    channel.send = message =>
+      setImmediate(() => primary.emit("message", worker, clone(message)));
+    primary.workers[id] = worker;
+    buses.push(
+      new ClusterBus({ channel, enabled: true, workerId: id, ...options }),
+    );
+  }
+
+  const detach = attachClusterPrimary(primary);
+  return { primary, buses, detach };
+}
+
+describe("ClusterBus", () => {
+  test("collect 應收集所有 worker（包含自己）的結果", async () => {
+    const { buses, detach } = createCluster(3);
+    buses.forEach(bus => bus.on("count", ({ base }) => base + bus.workerId));
+
+    const results = await buses[1].collect("count", { base: 10 });
+    expect(results.map(({ result }) => result).sort()).toEqual([11, 12, 13]);
+    detach();
+  });
+
+  test("未回應的 worker 應在逾時後略過", async () => {
+    const { buses, detach } = createCluster(2, { timeout: 50 });
+    buses[0].on("slow", () => "ok");
+    buses[1].on("slow", () => new Promise(() => {}));
+
+    const results = await buses[0].collect("slow");
+    expect(results).toEqual([{ workerId: 1, result: "ok" }]);
+    detach();
+  });
+
+  test("send 只送到指定 worker，publish 不送給自己", async () => {
+    const { buses, detach } = createCluster(3);
+    const received = [];
+    buses.forEach(bus =>
+      bus.on("ping", payload => received.push([bus.workerId, payload.n])),
+    );
+
+    buses[0].send(3, "ping", { n: 1 });
+    buses[0].publish("ping", { n: 2 });
+    await tick();
+
+    expect(received.sort()).toEqual([
+      [2, 2],
+      [3, 1],
+      [3, 2],
+    ]);
+    detach();
+  });
+});
+
+describe("SSE 連接歸屬", () => {
+  function fakeResponse() {
+    return {
+      writableEnded: false,
+      chunks: [],
+      writeHead() {},
+      write(chunk) {
+        this.chunks.push(chunk);
+      },
+      end() {
+        this.writableEnded = true;
+      },
+    };
+  }
+
+  test("其他 worker 的連接事件應轉送給持有連接的 worker", async () => {
+    const { buses, detach } = createCluster(2);
+    const managers = buses.map(bus => {
+      const manager = new SSEConnectionManager({ bus });
+      bus.on("sse:send", ({ connectionId, event, data }) =>
+        manager.sendToConnection(connectionId, event, data),
+      );
+      bus.on("sse:broadcast", ({ event, data }) =>
+        manager.broadcastLocal(event, data),
+      );
+      bus.on("sse:stats", () => manager.getStats());
+      return manager;
+    });
+
+    const response = fakeResponse();
+    const connectionId = managers[0].createConnection(
+      new EventEmitter(),
+      response,
+    );
+    expect(connectionId).toBe("conn_1_1");
+    expect(connectionOwner(connectionId)).toBe(1);
+
+    const sent = managers[1].sendToConnection(connectionId, "result", {
+      id: 7,
+    });
+    expect(sent).toBe(true);
+    managers[1].broadcast("notice", { text: "hi" });
+    await tick();
+
+    const output = response.chunks.join("");
+    expect(output).toContain('event: result\ndata: {"id":7}');
+    expect(output).toContain("event: notice");
+
+    const stats = mergeSSEStats(await buses[1].collect("sse:stats"));
+    expect(stats.activeConnections).toBe(1);
+    expect(stats.connections[0].workerId).toBe(1);
+
+    managers[0].closeAllConnections();
+    detach();
+  });
+});
+
+describe("跨 worker 統計合併", () => {
+  test("合併各 worker 快照應等同單一行程的統計", () => {
+    const single = new ToolStatsManager({ cleanupInterval: 3600000 });
+    const workers = [
+      new ToolStatsManager({ cleanupInterval: 3600000 }),
+      new ToolStatsManager({ cleanupInterval: 3600000 }),
+    ];
+    const record = (index, method, ...args) => {
+      single[method](...args);
+      workers[index][method](...args);
+    };
+
+    record(0, "recordToolCall", "get-mil-list", {}, { userId: "u1" });
+    record(0, "recordToolSuccess", "get-mil-list", 40);
+    record(1, "recordToolCall", "get-mil-list", {}, { userId: "u1" });
+    record(1, "recordToolSuccess", "get-mil-list", 10);
+    record(1, "recordToolCall", "search_employees", {}, { userId: "u2" });
+    record(1, "recordToolError", "search_employees", new Error("boom"));
+
+    const merged = formatGlobalStats(
+      mergeStatsSnapshots(workers.map(manager => clone(manager.getSnapshot()))),
+    );
+    const expected = clone(single.getGlobalStats());
+
+    expect(merged.allTime).toEqual(expected.allTime);
+    expect(merged.last24Hours).toEqual(expected.last24Hours);
+    expect(merged.topTools).toEqual(expected.topTools);
+    expect(merged.overview.totalUsers).toBe(2);
+    expect(merged.performanceMetrics["get-mil-list"].minTime).toBe("10ms");
+    expect(merged.performanceMetrics["get-mil-list"].maxTime).toBe("40ms");
+    expect(merged.recentErrors[0].errorMessage).toBe("boom");
+
+    [single, ...workers].forEach(manager => manager.stopCleanupTimer());
+  });
+
+  test("延遲草圖合併後的分位數應等同單一行程", () => {
+    const single = new LatencyTracker();
+    const workers = [new LatencyTracker(), new LatencyTracker()];
+    for (let i = 1; i <= 200; i++) {
+      single.record("get-mil-list", "mil", i);
+      workers[i % 2].record("get-mil-list", "mil", i);
+    }
+
+    const merged = mergeLatencyStats(
+      workers.map(tracker =>
+        clone(tracker.getStats("5m", { includeSketches: true })),
+      ),
+    );
+    const expected = single.getStats("5m");
+    expect(merged.tools["get-mil-list"]).toEqual(
+      expected.tools["get-mil-list"],
+    );
+    expect(merged.modules.mil.count).toBe(200);
+  });
+});
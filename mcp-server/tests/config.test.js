@@ -1,5 +1,5 @@
 import { describe, test, expect } from "@jest/globals";
-import config from "../src/config/config.js";
+import config, { intEnv } from "../src/config/config.js";
 
 describe("配置模組", () => {
   test("應該有預設值", () => {
@@ -19,4 +19,21 @@ describe("配置模組", () => {
   test("validate() 方法應該正常運作", () => {
     expect(() => config.validate()).not.toThrow();
   });
+
+  test("intEnv() 遇到空字串、非數字或低於下限時應使用預設值", () => {
+    const name = "CONFIG_TEST_INT";
+    try {
+      for (const value of [undefined, "", "abc", "-5"]) {
+        if (value === undefined) delete process.env[name];
+        else process.env[name] = value;
+        expect(intEnv(name, -1, { min: -1 })).toBe(-1);
+      }
+      process.env[name] = "0";
+      expect(intEnv(name, 30000, { min: 0 })).toBe(0);
+      process.env[name] = "8";
+      expect(intEnv(name, -1, { min: -1 })).toBe(8);
+    } finally {
+      delete process.env[name];
+    }
+  });
 });
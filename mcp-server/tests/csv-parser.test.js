@@ -0,0 +1,244 @@
+import { describe, test, expect } from "@jest/globals";
+import { Readable } from "stream";
+import {
+  CSVColumnParser,
+  CSVParseError,
+  getColumn,
+  parseCSVStream,
+  parseCSVText,
+} from "../src/services/stat/csv-parser.js";
+import { getBoundary, readMultipart } from "../src/services/stat/multipart.js";
+import { DatasetStore } from "../src/services/stat/dataset-store.js";
+
+// 把欄式資料還原為逐列字串，方便比較
+function rowsOf(table) {
+  return Array.from({ length: table.rowCount }, (_, row) =>
+    table.columns.map(column => {
+      if (column.type === "numeric") return column.values[row];
+      if (column.type === "categorical") {
+        return column.dictionary[column.codes[row]];
+      }
+      return undefined;
+    }),
+  );
+}
+
+describe("CSVColumnParser", () => {
+  test("應處理引號、欄位內的分隔字元與換行、跳脫引號與 CRLF", () => {
+    const table = parseCSVText(
+      '﻿name,comment,score\r\n' +
+        '"Wang, Ming","said ""hi""\r\nthen left",90\r\n' +
+        'Lee,plain,85\r\n',
+    );
+
+    expect(table.headers).toEqual(["name", "comment", "score"]);
+    expect(rowsOf(table)).toEqual([
+      ["Wang, Ming", 'said "hi"\r\nthen left', 90],
+      ["Lee", "plain", 85],
+    ]);
+  });
+
+  test("任意切段寫入應與一次寫入的結果相同", () => {
+    const csv =
+      'id,group,value\n1,"A",1.5\n2,B,"2.5"\n3,"C\nD",3\n4,A,\n5,B,x\n';
+    const expected = parseCSVText(csv);
+
+    for (const size of [1, 2, 3, 7]) {
+      const parser = new CSVColumnParser();
+      for (let i = 0; i < csv.length; i += size) {
+        parser.write(csv.slice(i, i + size));
+      }
+      const table = parser.end();
+      expect(table.rowCount).toBe(expected.rowCount);
+      expect(rowsOf(table)).toEqual(rowsOf(expected));
+    }
+  });
+
+  test("多位元組字元被切在 Buffer 邊界時應正確解碼", () => {
+    const bytes = Buffer.from("部門,人數\n研發,12\n業務,8\n");
+    const parser = new CSVColumnParser();
+    for (let i = 0; i < bytes.length; i++) {
+      parser.write(bytes.subarray(i, i + 1));
+    }
+    const table = parser.end();
+
+    expect(table.headers).toEqual(["部門", "人數"]);
+    expect(getColumn(table, "部門").dictionary).toEqual(["研發", "業務"]);
+    expect(Array.from(getColumn(table, "人數").values)).toEqual([12, 8]);
+  });
+
+  test("應推斷數值、分類與文字欄位", () => {
+    const lines = ["id,score,dept,note"];
+    for (let i = 0; i < 50; i++) {
+      lines.push(`E${i},${i % 10 === 0 ? "n/a" : i},${["A", "B"][i % 2]},x${i}`);
+    }
+    const table = parseCSVText(lines.join("\n"), { dictionaryLimit: 20 });
+
+    const score = getColumn(table, "score");
+    expect(score.type).toBe("numeric");
+    expect(score.values).toBeInstanceOf(Float64Array);
+    expect(Number.isNaN(score.values[0])).toBe(true);
+    expect(score.numericCount).toBe(45);
+
+    const dept = getColumn(table, "dept");
+    expect(dept.type).toBe("categorical");
+    expect(dept.codes).toBeInstanceOf(Uint8Array);
+    expect(dept.uniqueCount).toBe(2);
+
+    // 相異值超過 dictionaryLimit：只保留樣本值與相異值下限
+    const note = getColumn(table, "note");
+    expect(note.type).toBe("text");
+    expect(note.codes).toBeUndefined();
+    expect(note.uniqueCount).toBe(21);
+    expect(note.sampleValues).toEqual(["x0", "x1", "x2"]);
+  });
+
+  test("欄位數不符的資料列應略過，空白行忽略", () => {
+    const table = parseCSVText("a,b\n1,2\n\n3\n4,5,6\n7,8", {
+      previewRows: 1,
+    });
+
+    expect(table.rowCount).toBe(2);
+    expect(table.skippedRows).toBe(2);
+    expect(table.preview).toEqual([{ a: "1", b: "2" }]);
+    expect(rowsOf(table)).toEqual([
+      [1, 2],
+      [7, 8],
+    ]);
+  });
+
+  test("結尾的分隔字元應產生空欄位", () => {
+    const table = parseCSVText("a,b\n1,");
+    expect(table.rowCount).toBe(1);
+    expect(getColumn(table, "b").sampleValues).toEqual([""]);
+  });
+
+  test("未結束的引號與超過大小上限應拋出 CSVParseError", () => {
+    expect(() => parseCSVText('a,b\n1,"oops')).toThrow(CSVParseError);
+
+    const parser = new CSVColumnParser({ maxBytes: 10 });
+    parser.write("a,b\n");
+    let error = null;
+    try {
+      parser.write("1,2\n3,4\n");
+    } catch (caught) {
+      error = caught;
+    }
+    expect(error.code).toBe("TOO_LARGE");
+  });
+
+  test("parseCSVStream 應從串流讀取", async () => {
+    const source = Readable.from([Buffer.from("x,y\n1,"), Buffer.from("2\n")]);
+    const table = await parseCSVStream(source);
+    expect(rowsOf(table)).toEqual([[1, 2]]);
+  });
+});
+
+describe("multipart 上傳", () => {
+  function multipartBody(boundary, parts) {
+    const chunks = parts.map(({ name, filename, content }) => {
+      const disposition = filename
+        ? `form-data; name="${name}"; filename="${filename}"`
+        : `form-data; name="${name}"`;
+      return (
+        `--${boundary}\r\nContent-Disposition: ${disposition}\r\n` +
+        (filename ? "Content-Type: text/csv\r\n" : "") +
+        `\r\n${content}\r\n`
+      );
+    });
+    return Buffer.from(chunks.join("") + `--${boundary}--\r\n`);
+  }
+
+  test("應把檔案內容串流給解析器並收集文字欄位", async () => {
+    const boundary = "----form7MA4YWxk";
+    const body = multipartBody(boundary, [
+      { name: "tool", content: "analyze_data" },
+      { name: "file", filename: "data.csv", content: "a,b\r\n1,2\r\n3,4" },
+      { name: "alpha", content: "0.01" },
+    ]);
+    expect(getBoundary(`multipart/form-data; boundary=${boundary}`)).toBe(
+      boundary,
+    );
+
+    // 逐位元組送入，驗證分隔線跨越 chunk 邊界的情況
+    const source = Readable.from(
+      Array.from(body, byte => Buffer.from([byte])),
+    );
+    const fields = {};
+    const files = [];
+    let parser = null;
+    await readMultipart(source, boundary, {
+      onField: (name, value) => {
+        fields[name] = value;
+      },
+      onFile: part => {
+        files.push(part.filename);
+        parser = new CSVColumnParser();
+        return parser;
+      },
+    });
+
+    expect(fields).toEqual({ tool: "analyze_data", alpha: "0.01" });
+    expect(files).toEqual(["data.csv"]);
+    expect(rowsOf(parser.end())).toEqual([
+      [1, 2],
+      [3, 4],
+    ]);
+  });
+
+  test("缺少結尾分隔線時應拋出錯誤", async () => {
+    const source = Readable.from([
+      Buffer.from('--b\r\nContent-Disposition: form-data; name="x"\r\n\r\n1'),
+    ]);
+    await expect(readMultipart(source, "b")).rejects.toThrow("不完整");
+  });
+
+  test("略過的檔案也應套用大小上限", async () => {
+    const boundary = "cap";
+    const body = multipartBody(boundary, [
+      { name: "file", filename: "small.csv", content: "a\r\n1" },
+      { name: "extra", filename: "big.bin", content: "x".repeat(200) },
+    ]);
+    let files = 0;
+    const error = await readMultipart(Readable.from([body]), boundary, {
+      maxFileBytes: 100,
+      onFile: () => (files++ === 0 ? new CSVColumnParser() : null),
+    }).catch(error => error);
+
+    expect(error.code).toBe("TOO_LARGE");
+    expect(error.message).toContain("big.bin");
+  });
+
+  test("欄位數超過上限時應拋出錯誤", async () => {
+    const parts = Array.from({ length: 5 }, (_, i) => ({
+      name: `f${i}`,
+      content: "1",
+    }));
+    const source = Readable.from([multipartBody("n", parts)]);
+    await expect(
+      readMultipart(source, "n", { maxParts: 4 }),
+    ).rejects.toThrow("欄位數超過");
+  });
+});
+
+describe("DatasetStore", () => {
+  test("應依最後使用時間淘汰並在過期後移除", () => {
+    const table = parseCSVText("v\n1\n2\n3\n4");
+    const store = new DatasetStore({ ttl: 1000, maxBytes: 80 });
+
+    const first = store.put(table, { name: "first" });
+    const second = store.put(table);
+    expect(store.get(first)).toBe(table); // first 變為最近使用
+    const third = store.put(table);
+
+    expect(store.get(second)).toBeNull();
+    expect(store.get(first)).toBe(table);
+    expect(store.describe(third).columns[0]).toMatchObject({
+      name: "v",
+      type: "numeric",
+    });
+
+    store.purgeExpired(Date.now() + 2000);
+    expect(store.getStats()).toMatchObject({ datasets: 0, totalBytes: 0 });
+  });
+});
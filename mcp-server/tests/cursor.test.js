@@ -0,0 +1,41 @@
+import { describe, test, expect } from "@jest/globals";
+import {
+  encodeCursor,
+  decodeCursor,
+  buildKeysetCondition,
+} from "../src/services/cursor.js";
+
+describe("分頁游標", () => {
+  test("編碼後應可還原排序鍵", () => {
+    const cursor = encodeCursor("mil:list", ["2025-06-19 08:00:00", "G250619001"]);
+    expect(typeof cursor).toBe("string");
+    expect(decodeCursor(cursor, "mil:list", 2)).toEqual([
+      "2025-06-19 08:00:00",
+      "G250619001",
+    ]);
+  });
+
+  test("範圍或格式不符時應拋出錯誤", () => {
+    const cursor = encodeCursor("mil:list", ["a", "b"]);
+    expect(() => decodeCursor(cursor, "hr:employee-list", 2)).toThrow();
+    expect(() => decodeCursor(cursor, "mil:list", 3)).toThrow();
+    expect(() => decodeCursor("not-a-cursor", "mil:list", 2)).toThrow();
+  });
+
+  test("應產生降冪 keyset 條件", () => {
+    const { clause, params } = buildKeysetCondition(
+      ["RecordDate", "SerialNumber"],
+      ["2025-06-19", "G1"],
+    );
+    expect(clause).toBe(
+      "((RecordDate < ?) OR (RecordDate = ? AND SerialNumber < ?))",
+    );
+    expect(params).toEqual(["2025-06-19", "2025-06-19", "G1"]);
+  });
+
+  test("升冪時應使用大於比較", () => {
+    const { clause } = buildKeysetCondition(["name", "employee_no"], ["王", "A1"], "ASC");
+    expect(clause).toContain("name > ?");
+    expect(clause).toContain("employee_no > ?");
+  });
+});
@@ -0,0 +1,128 @@
+import { describe, test, expect, beforeAll } from "@jest/globals";
+import databaseService from "../src/services/database.js";
+import hrDirectory from "../src/services/hr/hr-directory.js";
+
+const employees = [
+  { employee_no: "A000001", name: "王小明", group_code: "IT", group_name: "資訊部", title_name: "工程師", is_suspended: Buffer.from([0]), sex: "M", updated_at: "2026-01-01 08:00:00" },
+  { employee_no: "A000002", name: "王大同", group_code: "IT", group_name: "資訊部", title_name: "經理", is_suspended: null, sex: "M", updated_at: "2026-01-02 08:00:00" },
+  { employee_no: "A000003", name: "李美玲", group_code: "HR", group_name: "人力資源部", title_name: "專員", is_suspended: Buffer.from([1]), sex: "F", updated_at: "2026-01-03 08:00:00" },
+  // 沒有員工編號的資料不會進入快照
+  { employee_no: null, name: "外包人員", group_code: "IT", group_name: "資訊部", title_name: "顧問", is_suspended: 0, sex: "F", updated_at: "2026-01-01 08:00:00" },
+  { employee_no: "A000004", name: "test 帳號", group_code: "IT", group_name: "資訊部", title_name: "工程師", is_suspended: 0, sex: "M", updated_at: "2026-01-03 08:00:00" },
+];
+
+// 以內容雜湊模擬 MySQL 的 CRC32(CONCAT_WS(...))
+const rowCrc = row => {
+  let hash = 0;
+  for (const char of JSON.stringify(row)) {
+    hash = (Math.imul(hash, 31) + char.charCodeAt(0)) >>> 0;
+  }
+  return hash;
+};
+
+describe("HR 目錄快照", () => {
+  const queries = [];
+
+  beforeAll(async () => {
+    databaseService.query = async (dbName, sql, params) => {
+      queries.push(sql);
+      // 與 SQL 相同：只有帶 employee_no 條件的查詢會排除沒有員工編號的資料
+      const table = sql.includes("employee_no <> ''")
+        ? employees.filter(row => row.employee_no)
+        : employees;
+      if (sql.includes("BIT_XOR")) {
+        const checksum = table.reduce((xor, row) => (xor ^ rowCrc(row)) >>> 0, 0);
+        return [{ total: table.length, checksum: String(checksum) }];
+      }
+      const rows = sql.includes("updated_at >= ?")
+        ? table.filter(row => row.updated_at >= params[0])
+        : table;
+      return rows.map(row => ({ ...row, __crc: rowCrc(row) }));
+    };
+    await hrDirectory.reload();
+  });
+
+  test("應依員工編號查詢並排除測試帳號", () => {
+    expect(hrDirectory.getEmployee("A000001").name).toBe("王小明");
+    expect(hrDirectory.getEmployee("A000004")).toBeNull();
+  });
+
+  test("應支援姓名與部門篩選", () => {
+    expect(hrDirectory.findEmployees({ name: "王" }).map(row => row.employee_no)).toEqual(["A000002", "A000001"]);
+    expect(hrDirectory.findEmployees({ department: "IT", status: "active" })).toHaveLength(2);
+    expect(hrDirectory.findEmployees({ department: "it", status: "active" })).toHaveLength(2);
+    expect(hrDirectory.findEmployees({ department: "人力", status: "all" })).toHaveLength(1);
+  });
+
+  test("部門篩選應與逐筆比對的結果相同", () => {
+    for (const department of ["IT", "資訊", "人力資源部", "HR", "財務"]) {
+      const filters = { department, status: "all" };
+      expect(hrDirectory.findEmployees(filters)).toEqual(
+        hrDirectory.sortedEmployees.filter(hrDirectory.createFilter(filters)),
+      );
+    }
+  });
+
+  test("應統計在職與離職人數", () => {
+    const counts = hrDirectory.getCounts();
+    expect(counts.all.total).toBe(3);
+    expect(counts.active.total).toBe(2);
+    expect(counts.inactive.female).toBe(1);
+  });
+
+  test("快照的員工資料不應包含逐筆指紋欄位", () => {
+    expect("__crc" in hrDirectory.getEmployee("A000001")).toBe(false);
+  });
+
+  test("資料表未變更時不應重新載入", async () => {
+    const fullLoads = hrDirectory.stats.fullLoads;
+    expect(await hrDirectory.refresh()).toEqual({ changed: false });
+    expect(hrDirectory.stats.fullLoads).toBe(fullLoads);
+  });
+
+  test("異動有更新 updated_at 時應以增量套用", async () => {
+    const fullLoads = hrDirectory.stats.fullLoads;
+    employees[0] = { ...employees[0], title_name: "資深工程師", updated_at: "2026-01-04 08:00:00" };
+
+    const result = await hrDirectory.refresh();
+    // 水位以 >= 比較，同一時間點的資料會再取一次
+    expect(result).toMatchObject({ changed: true, fullReload: false });
+    expect(hrDirectory.stats.fullLoads).toBe(fullLoads);
+    expect(hrDirectory.getEmployee("A000001").title_name).toBe("資深工程師");
+  });
+
+  test("增量更新調動部門時應更新部門索引", async () => {
+    employees[0] = { ...employees[0], group_code: "HR", group_name: "人力資源部", updated_at: "2026-01-04 09:00:00" };
+
+    expect((await hrDirectory.refresh()).fullReload).toBe(false);
+    const inHR = hrDirectory.findEmployees({ department: "HR", status: "all" });
+    expect(inHR.map(row => row.employee_no)).toEqual(["A000003", "A000001"]);
+    expect(hrDirectory.findEmployees({ department: "資訊部", status: "all" }).map(row => row.employee_no)).toEqual(["A000002"]);
+  });
+
+  test("異動未更新 updated_at 時快照指紋不符，應完整重新載入", async () => {
+    const fullLoads = hrDirectory.stats.fullLoads;
+    // 水位之後仍有其他異動，增量查詢有資料，但這筆不在其中
+    employees[1] = { ...employees[1], title_name: "協理" };
+    employees[2] = { ...employees[2], updated_at: "2026-01-05 08:00:00" };
+
+    const result = await hrDirectory.refresh();
+    expect(result).toEqual({ changed: true, fullReload: true });
+    expect(hrDirectory.stats.fullLoads).toBe(fullLoads + 1);
+    expect(hrDirectory.getEmployee("A000002").title_name).toBe("協理");
+  });
+
+  test("員工被刪除時應完整重新載入", async () => {
+    const [removed] = employees.splice(1, 1);
+    employees[0] = { ...employees[0], updated_at: "2026-01-06 08:00:00" };
+
+    const result = await hrDirectory.refresh();
+    expect(result.fullReload).toBe(true);
+    expect(hrDirectory.getEmployee(removed.employee_no)).toBeNull();
+    expect(hrDirectory.findEmployees({ name: "王" })).toHaveLength(1);
+  });
+
+  test("部門篩選只依員工資料上的部門，不讀取 org_group", () => {
+    expect(queries.some(sql => sql.includes("org_group"))).toBe(false);
+  });
+});
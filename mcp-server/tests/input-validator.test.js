@@ -0,0 +1,101 @@
+import { describe, test, expect } from "@jest/globals";
+import { BaseTool, compileInputValidator } from "../src/tools/base-tool.js";
+
+const schema = {
+  type: "object",
+  properties: {
+    status: { type: "string", enum: ["OnGoing", "Completed"] },
+    code: { type: "string", pattern: "^[A-Z]{2}\\d+$" },
+    limit: { type: "integer", minimum: 1, maximum: 100 },
+    tags: { type: "array", uniqueItems: true },
+  },
+  required: ["status"],
+};
+
+function errorOf(fn) {
+  try {
+    fn();
+  } catch (error) {
+    return error;
+  }
+  throw new Error("預期應拋出錯誤");
+}
+
+class DemoTool extends BaseTool {
+  constructor() {
+    super("demo", "驗證測試工具", schema);
+  }
+
+  async _execute(params) {
+    return params;
+  }
+}
+
+describe("編譯後的參數驗證函式", () => {
+  const validate = compileInputValidator(schema);
+
+  test("合法參數應通過驗證", () => {
+    const params = { status: "OnGoing", limit: 20, code: "AB12" };
+    expect(validate(params)).toBe(true);
+  });
+
+  test("未知參數與缺少必要參數的錯誤訊息應與舊版相同", () => {
+    const unknown = errorOf(() => validate({ status: "OnGoing", foo: 1 }));
+    expect(unknown.message).toBe(
+      "Unknown parameter(s): foo. Allowed parameters: status, code, limit, tags",
+    );
+    expect(unknown.details.providedParameters).toEqual(["status", "foo"]);
+
+    const missing = errorOf(() => validate({ limit: 1 }));
+    expect(missing.message).toBe("Missing required parameter: status");
+    expect(missing.type).toBe("validation_error");
+  });
+
+  test("類型與約束錯誤應帶欄位名稱，並依 schema 順序回報", () => {
+    const type = errorOf(() => validate({ status: "OnGoing", limit: "5" }));
+    expect(type.message).toBe("Invalid type for parameter limit");
+    expect(type.details).toEqual({
+      field: "limit",
+      expected: "integer",
+      received: "string",
+    });
+
+    const range = errorOf(() => validate({ status: "OnGoing", limit: 500 }));
+    expect(range.message).toBe(
+      "Parameter 'limit': Number too large: maximum 100",
+    );
+    expect(range.details.field).toBe("limit");
+
+    // code 在 schema 中排在 limit 之前
+    const first = errorOf(() =>
+      validate({ limit: 0, code: "x", status: "OnGoing" }),
+    );
+    expect(first.message).toBe(
+      "Parameter 'code': String does not match required pattern: ^[A-Z]{2}\\d+$",
+    );
+
+    const enumError = errorOf(() => validate({ status: "Done" }));
+    expect(enumError.message).toBe(
+      "Parameter 'status': Value must be one of: OnGoing, Completed",
+    );
+    const tags = errorOf(() => validate({ status: "OnGoing", tags: [1, 1] }));
+    expect(tags.message).toBe("Parameter 'tags': Array items must be unique");
+  });
+
+  test("工具應重用快取的驗證函式，schema 變更時重新編譯", () => {
+    const tool = new DemoTool();
+    const validator = tool.compileValidator();
+    tool.validateInput({ status: "OnGoing" });
+    expect(tool._validator).toBe(validator);
+
+    tool.inputSchema = {
+      type: "object",
+      properties: { q: { type: "string" } },
+    };
+    const error = errorOf(() => tool.validateInput({ status: "OnGoing" }));
+    expect(error.message).toBe(
+      "Unknown parameter(s): status. Allowed parameters: q",
+    );
+    expect(tool._validator).not.toBe(validator);
+  });
+});
@@ -0,0 +1,46 @@
+import { describe, test, expect } from "@jest/globals";
+import {
+  LatencySketch,
+  LatencyTracker,
+} from "../src/tools/latency-sketch.js";
+
+describe("延遲分位數草圖", () => {
+  test("分位數估計應在相對誤差範圍內", () => {
+    const sketch = new LatencySketch({ relativeAccuracy: 0.01 });
+    for (let i = 1; i <= 10000; i++) sketch.add(i);
+
+    expect(Math.abs(sketch.quantile(0.5) - 5000) / 5000).toBeLessThan(0.02);
+    expect(Math.abs(sketch.quantile(0.99) - 9900) / 9900).toBeLessThan(0.02);
+  });
+
+  test("合併與序列化後結果應一致", () => {
+    const a = new LatencySketch();
+    const b = new LatencySketch();
+    for (let i = 1; i <= 100; i++) (i % 2 ? a : b).add(i);
+    a.merge(b);
+
+    const restored = LatencySketch.fromJSON(JSON.parse(JSON.stringify(a)));
+    expect(restored.summary()).toEqual(a.summary());
+    expect(a.count).toBe(100);
+  });
+
+  test("桶數應受 maxBins 限制", () => {
+    const sketch = new LatencySketch({ maxBins: 32 });
+    for (let i = 1; i <= 100000; i += 7) sketch.add(i);
+    expect(sketch.bins.size).toBeLessThanOrEqual(32);
+    expect(sketch.quantile(1)).toBe(sketch.max);
+  });
+
+  test("滑動視窗只包含視窗內的資料並依模組彙總", () => {
+    const tracker = new LatencyTracker();
+    const now = Date.now();
+    tracker.record("get-mil-list", "mil", 500, now - 30 * 60 * 1000);
+    tracker.record("get-mil-list", "mil", 20, now);
+    tracker.record("get-count-by", "mil", 40, now);
+
+    const stats = tracker.getStats("5m");
+    expect(stats.tools["get-mil-list"].count).toBe(1);
+    expect(stats.modules.mil.count).toBe(2);
+    expect(tracker.getStats("1h").tools["get-mil-list"].count).toBe(2);
+  });
+});
@@ -0,0 +1,138 @@
+import { describe, test, expect, beforeAll, afterAll } from "@jest/globals";
+import fs from "fs";
+import os from "os";
+import path from "path";
+import {
+  tailLines,
+  updateLogIndex,
+  resolveOffsets,
+  searchLogs,
+  indexPathFor,
+} from "../src/config/log-reader.js";
+
+const BASE_TIME = Date.parse("2025-06-01T00:00:00.000Z");
+
+// 每秒一筆的日誌行，訊息含中文以驗證多位元組字元跨區塊讀取
+function writeLogFile(filePath, count, startIndex = 0) {
+  const lines = [];
+  for (let i = startIndex; i < startIndex + count; i++) {
+    lines.push(
+      JSON.stringify({
+        timestamp: new Date(BASE_TIME + i * 1000).toISOString(),
+        level: i % 10 === 0 ? "ERROR" : "INFO",
+        message: `工具調用 #${i}`,
+      }),
+    );
+  }
+  fs.writeFileSync(filePath, lines.join("\n") + "\n");
+}
+
+describe("日誌檔案讀取與時間索引", () => {
+  const dir = fs.mkdtempSync(path.join(os.tmpdir(), "log-reader-"));
+  const filePath = path.join(dir, "combined.log");
+
+  beforeAll(() => {
+    writeLogFile(path.join(dir, "combined.2025-05-31T00-00-00-000Z.log"), 1000, 0);
+    writeLogFile(filePath, 2000, 1000);
+  });
+
+  afterAll(() => {
+    fs.rmSync(dir, { recursive: true, force: true });
+  });
+
+  test("應從尾端讀取最後 N 行並維持時間順序", async () => {
+    const lines = await tailLines(filePath, 5, { chunkSize: 37 });
+    expect(lines.map(line => JSON.parse(line).message)).toEqual([
+      "工具調用 #2995",
+      "工具調用 #2996",
+      "工具調用 #2997",
+      "工具調用 #2998",
+      "工具調用 #2999",
+    ]);
+
+    const all = await tailLines(filePath, 10000);
+    expect(all).toHaveLength(2000);
+  });
+
+  test("索引應記錄檢查點並可增量更新", async () => {
+    const index = await updateLogIndex(filePath, { interval: 4096 });
+    expect(index.entries.length).toBeGreaterThan(10);
+    expect(index.entries[0]).toEqual([0, new Date(BASE_TIME + 1000 * 1000).toISOString()]);
+    expect(index.lastTime).toBe(new Date(BASE_TIME + 2999 * 1000).toISOString());
+    expect(fs.existsSync(indexPathFor(filePath))).toBe(true);
+
+    // 每個檢查點都指向行首
+    const content = fs.readFileSync(filePath);
+    for (const [offset] of index.entries) {
+      expect(offset === 0 || content[offset - 1] === 0x0a).toBe(true);
+    }
+
+    const entryCount = index.entries.length;
+    fs.appendFileSync(
+      filePath,
+      JSON.stringify({
+        timestamp: new Date(BASE_TIME + 3000 * 1000).toISOString(),
+        message: "工具調用 #3000",
+      }) + "\n",
+    );
+    const updated = await updateLogIndex(filePath, { interval: 4096 });
+    expect(updated.entries.length).toBeGreaterThanOrEqual(entryCount);
+    expect(updated.lastTime).toBe(new Date(BASE_TIME + 3000 * 1000).toISOString());
+  });
+
+  test("時間範圍應換算為較小的位移範圍", async () => {
+    const index = await updateLogIndex(filePath, { interval: 4096 });
+    const { start, end } = resolveOffsets(
+      index,
+      new Date(BASE_TIME + 2000 * 1000).toISOString(),
+      new Date(BASE_TIME + 2010 * 1000).toISOString(),
+    );
+    expect(start).toBeGreaterThan(0);
+    expect(end - start).toBeLessThan(3 * 4096);
+  });
+
+  test("依時間範圍搜尋應跨越輪轉檔並遵守筆數上限", async () => {
+    const result = await searchLogs(filePath, {
+      query: "ERROR",
+      startTime: new Date(BASE_TIME + 990 * 1000).toISOString(),
+      endTime: new Date(BASE_TIME + 1030 * 1000).toISOString(),
+      limit: 100,
+    });
+    expect(result.segments).toBe(2);
+    expect(result.matches.map(line => JSON.parse(line).message)).toEqual([
+      "工具調用 #990",
+      "工具調用 #1000",
+      "工具調用 #1010",
+      "工具調用 #1020",
+      "工具調用 #1030",
+    ]);
+
+    const limited = await searchLogs(filePath, {
+      query: "工具調用",
+      startTime: new Date(BASE_TIME + 1500 * 1000).toISOString(),
+      limit: 3,
+    });
+    expect(limited.truncated).toBe(true);
+    expect(limited.matches.map(line => JSON.parse(line).message)).toEqual([
+      "工具調用 #1500",
+      "工具調用 #1501",
+      "工具調用 #1502",
+    ]);
+  });
+
+  test("未指定時間範圍時只搜尋最近的行數並逐筆回呼", async () => {
+    const streamed = [];
+    const result = await searchLogs(filePath, {
+      query: "ERROR",
+      maxLines: 50,
+      onMatch: line => streamed.push(JSON.parse(line).message),
+    });
+    expect(result.searchedLines).toBe(50);
+    expect(streamed).toEqual([
+      "工具調用 #2960",
+      "工具調用 #2970",
+      "工具調用 #2980",
+      "工具調用 #2990",
+    ]);
+  });
+});
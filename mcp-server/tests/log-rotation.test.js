@@ -0,0 +1,163 @@
+import { describe, test, expect, afterAll } from "@jest/globals";
+import { EventEmitter } from "events";
+import fs from "fs";
+import os from "os";
+import path from "path";
+import { BufferedFileSink } from "../src/config/log-sink.js";
+import { listLogSegments } from "../src/config/log-reader.js";
+import {
+  LogRotationClient,
+  attachLogRotationPrimary,
+} from "../src/config/log-rotation.js";
+
+/**
+ * 以 EventEmitter 模擬 node:cluster：primary 與各 worker 的 IPC 皆為非同步傳遞
+ */
+function createFakeCluster() {
+  const clusterModule = new EventEmitter();
+  clusterModule.workers = {};
+
+  const addWorker = id => {
+    const channel = new EventEmitter();
+    const worker = {
+      id,
+      isConnected: () => true,
+      send: message => setImmediate(() => channel.emit("message", message)),
+    };
+    channel.send = message =>
+      setImmediate(() => clusterModule.emit("message", worker, message));
+    clusterModule.workers[id] = worker;
+    return channel;
+  };
+
+  return { clusterModule, addWorker };
+}
+
+const wait = ms => new Promise(resolve => setTimeout(resolve, ms));
+
+describe("cluster 日誌輪轉", () => {
+  const dir = fs.mkdtempSync(path.join(os.tmpdir(), "log-rotation-"));
+
+  afterAll(() => {
+    fs.rmSync(dir, { recursive: true, force: true });
+  });
+
+  test("只由 primary 更名一次，輪轉後的日誌不會寫入舊檔", async () => {
+    const file = path.join(dir, "combined.log");
+    const maxFileSize = 1000;
+    const { clusterModule, addWorker } = createFakeCluster();
+
+    let rotations = 0;
+    const primary = attachLogRotationPrimary(clusterModule, {
+      maxFileSize,
+      files: [file],
+      checkInterval: 20,
+      rotate: fileName => {
+        rotations++;
+        fs.renameSync(fileName, path.join(dir, `combined.${rotations}.log`));
+      },
+    });
+
+    const workers = [1, 2].map(id => {
+      const channel = addWorker(id);
+      const client = new LogRotationClient({ channel });
+      const sink = new BufferedFileSink({
+        batchSize: 1,
+        maxFileSize,
+        onRotate: (fileName, size) => client.request(fileName, size),
+      });
+      client.sink = sink;
+      return { id, sink, client };
+    });
+
+    // 兩個 worker 交錯寫入，合計 1500 bytes，只超過上限一次；
+    // 各 worker 只寫入 750 bytes，由 primary 定期檢查實際檔案大小觸發輪轉
+    for (let i = 0; i < 30; i++) {
+      for (const { id, sink } of workers) {
+        const line = `${id}:${String(i).padStart(3, "0")}:before`;
+        sink.push({ file, line: line.padEnd(24, ".") + "\n" });
+        await sink.flush();
+      }
+    }
+    await wait(100);
+    expect(rotations).toBe(1);
+
+    for (const { id, sink } of workers) {
+      sink.push({ file, line: `${id}:after\n` });
+      await sink.close();
+    }
+    primary.detach();
+    workers.forEach(({ client }) => client.detach());
+
+    const segments = listLogSegments(file);
+    expect(segments).toHaveLength(2);
+    const rotated = fs.readFileSync(segments[0], "utf8");
+    const current = fs.readFileSync(segments[1], "utf8");
+    expect(rotated).not.toContain("after");
+    expect(current).toContain("1:after");
+    expect(current).toContain("2:after");
+
+    // 沒有遺失或重複的日誌行
+    const lines = (rotated + current).trim().split("\n");
+    expect(lines).toHaveLength(62);
+    expect(new Set(lines).size).toBe(62);
+  });
+
+  test("worker 超過上限時應請求 primary 輪轉", async () => {
+    const file = path.join(dir, "access.log");
+    const { clusterModule, addWorker } = createFakeCluster();
+    const renamed = [];
+    const primary = attachLogRotationPrimary(clusterModule, {
+      maxFileSize: 500,
+      checkInterval: 0,
+      rotate: (fileName, size) => {
+        renamed.push(size);
+        fs.renameSync(fileName, `${fileName}.${renamed.length}`);
+      },
+    });
+
+    const client = new LogRotationClient({ channel: addWorker(1) });
+    const sink = new BufferedFileSink({
+      batchSize: 1,
+      maxFileSize: 500,
+      onRotate: (fileName, size) => client.request(fileName, size),
+    });
+    client.sink = sink;
+
+    for (let i = 0; i < 30; i++) {
+      sink.push({ file, line: "x".repeat(24) + "\n" });
+      await sink.flush();
+      await wait(1);
+    }
+    await wait(50);
+    await sink.close();
+    primary.detach();
+    client.detach();
+
+    expect(renamed.length).toBeGreaterThan(0);
+    expect(renamed.every(size => size >= 500)).toBe(true);
+    expect(fs.statSync(file).size).toBeLessThan(500);
+  });
+
+  test("暫停期間的日誌應保留，恢復後依序寫入新檔", async () => {
+    const file = path.join(dir, "tool-calls.log");
+    const sink = new BufferedFileSink({ batchSize: 1 });
+
+    sink.push({ file, line: "a\n" });
+    await sink.flush();
+    await sink.pauseFile(file);
+    sink.push({ file, line: "b\n" });
+    sink.push({ file, line: "c\n" });
+    await sink.flush();
+
+    fs.renameSync(file, `${file}.old`);
+    expect(fs.existsSync(file)).toBe(false);
+
+    sink.resumeFile(file);
+    sink.push({ file, line: "d\n" });
+    await sink.close();
+
+    expect(fs.readFileSync(`${file}.old`, "utf8")).toBe("a\n");
+    expect(fs.readFileSync(file, "utf8")).toBe("b\nc\nd\n");
+  });
+});
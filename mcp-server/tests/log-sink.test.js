@@ -0,0 +1,114 @@
+import { describe, test, expect, afterAll } from "@jest/globals";
+import fs from "fs";
+import os from "os";
+import path from "path";
+import {
+  BufferedFileSink,
+  BatchedDatabaseSink,
+} from "../src/config/log-sink.js";
+
+describe("緩衝式日誌輸出", () => {
+  const dir = fs.mkdtempSync(path.join(os.tmpdir(), "log-sink-"));
+
+  afterAll(() => {
+    fs.rmSync(dir, { recursive: true, force: true });
+  });
+
+  test("檔案日誌應批次寫出並在 flush 後完整落地", async () => {
+    const file = path.join(dir, "combined.log");
+    const sink = new BufferedFileSink({ batchSize: 50, flushInterval: 1000 });
+
+    for (let i = 0; i < 120; i++) {
+      sink.push({ file, line: JSON.stringify({ i }) + "\n" });
+    }
+    await sink.close();
+
+    const lines = fs.readFileSync(file, "utf8").trim().split("\n");
+    expect(lines).toHaveLength(120);
+    expect(JSON.parse(lines[119])).toEqual({ i: 119 });
+    expect(sink.getStats().written).toBe(120);
+    expect(sink.getStats().flushes).toBeLessThan(120);
+  });
+
+  test("超過大小上限時應呼叫輪轉並寫入新檔案", async () => {
+    const file = path.join(dir, "tool-calls.log");
+    const rotated = [];
+    const sink = new BufferedFileSink({
+      batchSize: 1,
+      maxFileSize: 100,
+      onRotate: (fileName, size) => {
+        rotated.push(size);
+        fs.renameSync(fileName, `${fileName}.${rotated.length}`);
+      },
+    });
+
+    for (let i = 0; i < 5; i++) {
+      sink.push({ file, line: "x".repeat(59) + "\n" });
+      await sink.flush();
+    }
+    await sink.close();
+
+    expect(rotated.length).toBeGreaterThan(0);
+    expect(fs.statSync(file).size).toBeLessThanOrEqual(100);
+  });
+
+  test("佇列已滿時應依策略丟棄，但保留 ERROR 日誌", () => {
+    const newest = new BatchedDatabaseSink({
+      write: async rows => rows.length,
+      maxQueue: 3,
+      batchSize: 100,
+      flushInterval: 60000,
+    });
+    for (let i = 0; i < 5; i++) newest.push({ params: [`m${i}`] });
+    newest.push({ params: ["error"], critical: true });
+
+    expect(newest.queue.map(item => item.params[0])).toEqual([
+      "m0",
+      "m1",
+      "m2",
+      "error",
+    ]);
+    expect(newest.getStats().dropped).toBe(2);
+
+    const oldest = new BatchedDatabaseSink({
+      write: async rows => rows.length,
+      maxQueue: 3,
+      batchSize: 100,
+      flushInterval: 60000,
+      dropPolicy: "drop-oldest",
+    });
+    for (let i = 0; i < 5; i++) oldest.push({ params: [`m${i}`] });
+
+    expect(oldest.queue.map(item => item.params[0])).toEqual([
+      "m2",
+      "m3",
+      "m4",
+    ]);
+    clearTimeout(newest.timer);
+    clearTimeout(oldest.timer);
+  });
+
+  test("資料庫日誌應整批交給 write，未寫入的筆數計為丟棄", async () => {
+    const batches = [];
+    const sink = new BatchedDatabaseSink({
+      write: async rows => {
+        batches.push(rows);
+        // 模擬資料庫忙碌時放棄第二批
+        return batches.length === 1 ? rows.length : 0;
+      },
+      batchSize: 1000,
+    });
+
+    for (let i = 0; i < 100; i++) sink.push({ params: [i, `m${i}`] });
+    await sink.flush();
+    sink.push({ params: [100, "m100"] });
+    await sink.flush();
+
+    expect(batches).toHaveLength(2);
+    expect(batches[0]).toHaveLength(100);
+    expect(batches[0][99]).toEqual([99, "m99"]);
+    expect(sink.getStats().written).toBe(100);
+    expect(sink.getStats().dropped).toBe(1);
+    await sink.close();
+  });
+});
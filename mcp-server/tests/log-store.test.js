@@ -0,0 +1,232 @@
+import { describe, test, expect, beforeAll, afterAll } from "@jest/globals";
+import fs from "fs";
+import os from "os";
+import path from "path";
+import sqlite3 from "sqlite3";
+import {
+  LogStore,
+  LOG_COLUMNS,
+  aggregateRollups,
+  partitionDay,
+} from "../src/config/log-store.js";
+
+function openDatabase(filePath) {
+  return new Promise((resolve, reject) => {
+    const db = new sqlite3.Database(filePath, err =>
+      err ? reject(err) : resolve(db),
+    );
+  });
+}
+
+function all(db, sql, params = []) {
+  return new Promise((resolve, reject) => {
+    db.all(sql, params, (err, rows) => (err ? reject(err) : resolve(rows)));
+  });
+}
+
+function exec(db, sql) {
+  return new Promise((resolve, reject) => {
+    db.exec(sql, err => (err ? reject(err) : resolve()));
+  });
+}
+
+function closeDatabase(db) {
+  return new Promise(resolve => db.close(() => resolve()));
+}
+
+// 依 LOG_COLUMNS 排列的資料列
+function logRow(fields) {
+  const entry = {
+    level: "INFO",
+    service: "mcp-server",
+    environment: "test",
+    message: "ok",
+    ...fields,
+  };
+  return LOG_COLUMNS.map(column => entry[column] ?? null);
+}
+
+describe("日誌分區儲存", () => {
+  const dir = fs.mkdtempSync(path.join(os.tmpdir(), "log-store-"));
+  let db;
+  let store;
+
+  beforeAll(async () => {
+    db = await openDatabase(path.join(dir, "logs.db"));
+
+    // 分區化之前的 logs 資料表
+    await exec(
+      db,
+      `CREATE TABLE logs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT NOT NULL, level TEXT NOT NULL,
+        service TEXT NOT NULL, environment TEXT NOT NULL, message TEXT NOT NULL,
+        category TEXT, tool_name TEXT, duration INTEGER, success INTEGER, client_id TEXT,
+        method TEXT, url TEXT, status_code INTEGER, ip TEXT, user_agent TEXT, meta TEXT,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+      );
+      INSERT INTO logs (timestamp, level, service, environment, message, category, tool_name, duration, success)
+      VALUES ('2025-05-30T10:00:00.000Z', 'INFO', 'mcp-server', 'test', '工具調用', 'tool-call', 'get-mil-list', 100, 1),
+             ('2025-05-30T10:30:00.000Z', 'ERROR', 'mcp-server', 'test', '連線逾時', 'tool-call', 'get-mil-list', 300, 0);`,
+    );
+
+    store = new LogStore(db, { retentionDays: 30, rollupRetentionDays: 180 });
+    await store.init();
+  });
+
+  afterAll(async () => {
+    await closeDatabase(db);
+    fs.rmSync(dir, { recursive: true, force: true });
+  });
+
+  test("應將舊資料表更名並回填彙總", async () => {
+    expect(store.hasLegacy).toBe(true);
+    const [{ count }] = await all(db, "SELECT COUNT(*) AS count FROM logs");
+    expect(count).toBe(2);
+
+    const rollups = await store.getRollups("2025-05-30T00:00:00.000Z");
+    const tool = rollups.find(row => row.kind === "tool");
+    expect(tool).toMatchObject({
+      key: "get-mil-list",
+      count: 2,
+      successCount: 1,
+      durationSum: 400,
+    });
+    expect(rollups.find(row => row.kind === "error").key).toBe("連線逾時");
+  });
+
+  test("寫入時應依日期建立分區並累加彙總", async () => {
+    const rows = [];
+    for (let i = 0; i < 150; i++) {
+      const day = i < 100 ? "2025-06-01" : "2025-06-02";
+      rows.push(
+        logRow({
+          timestamp: `${day}T12:${String(i).padStart(2, "0")}:00.000Z`,
+          category: "api-access",
+          method: "GET",
+          url: `/api/hr/employees?page=${i}`,
+          status_code: i % 10 === 0 ? 500 : 200,
+          duration: 10,
+        }),
+      );
+    }
+    await expect(store.writeBatch(rows)).resolves.toBe(150);
+
+    expect(store.partitions.has("20250601")).toBe(true);
+    expect(store.partitions.has("20250602")).toBe(true);
+    const tables = await all(
+      db,
+      "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'logs_p20250601'",
+    );
+    expect(tables.map(table => table.name)).toContain("idx_logs_p20250601_tool_name");
+
+    const [{ count }] = await all(db, "SELECT COUNT(*) AS count FROM logs");
+    expect(count).toBe(152);
+
+    const rollups = await store.getRollups("2025-06-01T00:00:00.000Z");
+    const api = rollups.filter(row => row.kind === "api");
+    expect(api).toHaveLength(1);
+    expect(api[0]).toMatchObject({
+      key: "GET /api/hr/employees",
+      count: 150,
+      durationSum: 1500,
+    });
+    const errors = rollups.find(
+      row => row.kind === "status" && row.key === "500",
+    );
+    expect(errors.count).toBe(15);
+  });
+
+  test("游標分頁應跨分區依時間由新到舊且不重複", async () => {
+    const seen = [];
+    let cursor = null;
+    do {
+      const page = await store.queryLogPage({ limit: 40, cursor });
+      seen.push(...page.logs);
+      cursor = page.nextCursor;
+    } while (cursor);
+
+    expect(seen).toHaveLength(152);
+    const keys = new Set(seen.map(log => `${log.timestamp}:${log.id}`));
+    expect(keys.size).toBe(152);
+    const timestamps = seen.map(log => log.timestamp);
+    expect([...timestamps].sort().reverse()).toEqual(timestamps);
+
+    const filtered = await store.queryLogPage({
+      level: "error",
+      startTime: "2025-05-30T00:00:00.000Z",
+      endTime: "2025-05-31T00:00:00.000Z",
+    });
+    expect(filtered.logs.map(log => log.message)).toEqual(["連線逾時"]);
+    expect(filtered.nextCursor).toBeNull();
+  });
+
+  test("保留期限應刪除過期分區、舊資料與彙總", async () => {
+    const result = await store.applyRetention(
+      new Date("2025-07-02T12:00:00.000Z"),
+    );
+
+    expect(result.droppedPartitions).toContain("logs_p20250601");
+    expect(result.legacyDeleted).toBe(2);
+    expect(store.hasLegacy).toBe(false);
+    expect(store.partitions.has("20250602")).toBe(true);
+
+    const [{ count }] = await all(db, "SELECT COUNT(*) AS count FROM logs");
+    expect(count).toBe(50);
+    const legacy = await all(
+      db,
+      "SELECT name FROM sqlite_master WHERE name = 'logs_legacy'",
+    );
+    expect(legacy).toHaveLength(0);
+  });
+
+  test("彙總鍵應去除查詢字串並截斷錯誤訊息", () => {
+    const rollups = aggregateRollups([
+      logRow({
+        timestamp: "2025-06-01T08:15:00.000Z",
+        level: "ERROR",
+        message: "x".repeat(500),
+      }),
+      logRow({
+        timestamp: "2025-06-01T08:45:00.000Z",
+        category: "tool-call",
+        tool_name: "t",
+        success: 1,
+        duration: 5,
+      }),
+    ]);
+    const [error, tool] = [...rollups.values()];
+    expect(error[0]).toBe("2025-06-01T08");
+    expect(error[2]).toHaveLength(200);
+    expect(tool).toEqual(["2025-06-01T08", "tool", "t", 1, 1, 5, 1]);
+    expect(partitionDay("2025-06-01T08:15:00.000Z")).toBe("20250601");
+  });
+
+  test("任一筆寫入失敗時應整批回滾", async () => {
+    const countLogs = "SELECT COUNT(*) AS count FROM logs";
+    const sumRollups = "SELECT SUM(count) AS total FROM log_rollup_hourly";
+    const [{ count: before }] = await all(db, countLogs);
+    const rollupsBefore = await all(db, sumRollups);
+
+    // 日誌列寫入成功後，彙總的 upsert 失敗
+    const upsert = store.rollupUpsertSuffix;
+    store.rollupUpsertSuffix = () => "ON CONFLICT(no_such_column) DO NOTHING";
+    try {
+      const rows = [
+        logRow({
+          timestamp: new Date().toISOString(),
+          category: "api-access",
+        }),
+      ];
+      await expect(store.writeBatch(rows)).rejects.toThrow();
+    } finally {
+      store.rollupUpsertSuffix = upsert;
+    }
+
+    const [{ count: after }] = await all(db, countLogs);
+    expect(after).toBe(before);
+    expect(await all(db, sumRollups)).toEqual(rollupsBefore);
+    await expect(
+      store.writeBatch([logRow({ timestamp: new Date().toISOString() })]),
+    ).resolves.toBe(1);
+  });
+});
@@ -0,0 +1,62 @@
+import { describe, test, expect } from "@jest/globals";
+import {
+  MetricsRegistry,
+  metricsRegistry,
+  toolCallDuration,
+} from "../src/services/metrics.js";
+import "../src/routes/metrics-routes.js";
+
+const SAMPLE_LINE =
+  /^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{(?:[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\\n]|\\.)*",?)*\})? (-?[0-9.e+-]+|[+-]Inf|NaN)$/;
+
+/**
+ * 以 Prometheus 文字格式規則驗證輸出，返回每個指標的樣本
+ */
+function parseExposition(text) {
+  expect(text.endsWith("\n")).toBe(true);
+  const types = new Map();
+  const samples = [];
+
+  for (const line of text.trimEnd().split("\n")) {
+    if (line.startsWith("# HELP ")) continue;
+    if (line.startsWith("# TYPE ")) {
+      const [, , name, type] = line.split(" ");
+      expect(["counter", "gauge", "histogram", "summary", "untyped"]).toContain(type);
+      expect(types.has(name)).toBe(false);
+      types.set(name, type);
+      continue;
+    }
+
+    const match = line.match(SAMPLE_LINE);
+    expect(match).not.toBeNull();
+    const base = match[1].replace(/_(bucket|sum|count)$/, "");
+    expect(types.has(match[1]) || types.get(base) === "histogram").toBe(true);
+    samples.push({ name: match[1], line, value: match[3] });
+  }
+
+  return { types, samples };
+}
+
+describe("Prometheus 指標輸出", () => {
+  test("直方圖桶應為累積值且 +Inf 等於總數", () => {
+    const registry = new MetricsRegistry();
+    const histogram = registry.histogram("test_duration_seconds", "測試", ["tool"], [0.1, 1]);
+    histogram.observe({ tool: 'a"b' }, 0.05);
+    histogram.observe({ tool: 'a"b' }, 0.5);
+    histogram.observe({ tool: 'a"b' }, 5);
+
+    const { samples } = parseExposition(registry.render());
+    expect(samples.map(sample => sample.value)).toEqual(["1", "2", "3", "5.55", "3"]);
+    expect(samples[0].line).toContain('tool="a\\"b"');
+  });
+
+  test("全域註冊表應輸出合法格式並包含主要指標", () => {
+    toolCallDuration.observe({ tool: "get-mil-list", module: "mil", status: "success" }, 0.12);
+
+    const { types } = parseExposition(metricsRegistry.render());
+    expect(types.get("mcp_tool_call_duration_seconds")).toBe("histogram");
+    expect(types.get("mcp_tool_cache_hit_ratio")).toBe("gauge");
+    expect(types.get("mcp_sse_active_connections")).toBe("gauge");
+    expect(types.get("mcp_db_pool_utilization_ratio")).toBe("gauge");
+  });
+});
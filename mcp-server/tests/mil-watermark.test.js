@@ -0,0 +1,69 @@
+import { describe, test, expect, beforeEach } from "@jest/globals";
+import databaseService from "../src/services/database.js";
+import milService from "../src/services/mil/mil-service.js";
+
+/**
+ * 以欄位清單與查詢記錄模擬 v_mil_kd
+ */
+function mockView(columns) {
+  const queries = [];
+  databaseService.query = async (dbName, sql) => {
+    queries.push(sql);
+    if (sql.includes("information_schema.COLUMNS")) {
+      return columns.map(name => ({ name }));
+    }
+    if (sql.includes("BIT_XOR")) {
+      return [{ total: 3, latest: "2026-01-01", checksum: 42 }];
+    }
+    return [{ total: 3, latest: new Date("2026-01-02T00:00:00Z") }];
+  };
+  return queries;
+}
+
+describe("MIL 變更水位", () => {
+  beforeEach(() => {
+    milService.viewColumns = null;
+  });
+
+  test("有 updated_at 欄位時只查筆數與最新異動時間", async () => {
+    const queries = mockView(["SerialNumber", "Status", "updated_at"]);
+
+    expect(await milService._fetchChangeWatermark()).toBe(
+      "3:2026-01-02T00:00:00.000Z",
+    );
+    expect(queries[1]).toContain("MAX(`updated_at`)");
+    expect(queries[1]).not.toContain("CRC32");
+
+    // 欄位清單只查詢一次
+    await milService._fetchChangeWatermark();
+    expect(
+      queries.filter(sql => sql.includes("information_schema")),
+    ).toHaveLength(1);
+  });
+
+  test("沒有異動時間欄位時以所有欄位的 CRC32 指紋比對，NULL 先轉為空字串", async () => {
+    const queries = mockView(["SerialNumber", "Status", "IssueDiscription"]);
+
+    expect(await milService._fetchChangeWatermark()).toBe("3:2026-01-01:42");
+    const sql = queries[1];
+    expect(sql).toContain("COALESCE(`SerialNumber`, '')");
+    expect(sql).toContain("COALESCE(`Status`, '')");
+    // 文字欄位的修改也要讓 "mil:*" 緩存失效
+    expect(sql).toContain("COALESCE(`IssueDiscription`, '')");
+  });
+
+  test("讀不到欄位清單時改用涵蓋工具返回欄位的預設清單", async () => {
+    const queries = [];
+    databaseService.query = async (dbName, sql) => {
+      queries.push(sql);
+      if (sql.includes("information_schema")) throw new Error("denied");
+      return [{ total: 1, latest: "2026-01-01", checksum: 7 }];
+    };
+
+    expect(await milService._fetchChangeWatermark()).toBe("1:2026-01-01:7");
+    for (const column of ["Solution", "Location", "ActualFinishDate"]) {
+      expect(queries[1]).toContain(`COALESCE(\`${column}\`, '')`);
+    }
+    expect(milService.viewColumns).toBeNull();
+  });
+});
@@ -0,0 +1,46 @@
+import { describe, test, expect, beforeEach } from "@jest/globals";
+import {
+  NameSearchIndex,
+  generateGrams,
+} from "../src/services/hr/name-search-index.js";
+
+describe("員工姓名模糊搜尋索引", () => {
+  let index;
+
+  beforeEach(() => {
+    index = new NameSearchIndex();
+    index.upsert("A000001", { name: "張小明", nickname: "Ming", account: "ming.chang", department: "資訊部" });
+    index.upsert("A000002", { name: "張大同", nickname: "Tony", account: "tony.chang", department: "資訊部" });
+    index.upsert("A000003", { name: "李美玲", nickname: "Meiling", account: "meiling.li", department: "人力資源部" });
+  });
+
+  test("中文使用單字與雙字 n-gram", () => {
+    expect([...generateGrams("張小明")]).toEqual(
+      expect.arrayContaining(["張", "小", "明", "張小", "小明"]),
+    );
+  });
+
+  test("完全符合應排在最前面", () => {
+    const results = index.search("張小明");
+    expect(results[0]).toMatchObject({ id: "A000001", field: "name" });
+  });
+
+  test("應容忍一個錯字", () => {
+    expect(index.search("張曉明")[0].id).toBe("A000001");
+    expect(index.search("meilng")[0].id).toBe("A000003");
+  });
+
+  test("應可依部門名稱找到成員並套用篩選", () => {
+    const ids = index.search("人力資源").map(result => result.id);
+    expect(ids).toEqual(["A000003"]);
+    expect(index.search("資訊部", { filter: id => id !== "A000002" }).map(r => r.id)).toEqual(["A000001"]);
+  });
+
+  test("應支援增量更新與移除", () => {
+    index.upsert("A000001", { name: "陳小明", department: "財務部" });
+    expect(index.search("資訊部").map(result => result.id)).toEqual(["A000002"]);
+    index.remove("A000003");
+    expect(index.search("李美玲")).toHaveLength(0);
+    expect(index.getStats()).toMatchObject({ documents: 2, departments: 2 });
+  });
+});
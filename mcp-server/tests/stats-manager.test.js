@@ -0,0 +1,57 @@
+import { describe, test, expect, afterEach } from "@jest/globals";
+import {
+  ToolStatsManager,
+  RollupRing,
+  StatEventType,
+} from "../src/tools/stats-manager.js";
+
+describe("工具使用統計彙總", () => {
+  let manager;
+
+  afterEach(() => manager?.destroy());
+
+  test("時間桶應在超過回溯範圍後重置", () => {
+    const ring = new RollupRing(1000, 3);
+    ring.add(0, StatEventType.TOOL_CALL, "a", {});
+    ring.add(1500, StatEventType.TOOL_CALL, "b", {});
+    ring.add(3200, StatEventType.TOOL_CALL, "a", {});
+
+    const { counters, tools } = ring.sum(3, 3500);
+    expect(counters.calls).toBe(2);
+    expect(tools.get("a")).toBe(1);
+    expect(ring.series(3, 3500).map(bucket => bucket.calls)).toEqual([1, 0, 1]);
+  });
+
+  test("全域統計應由彙總計算且不需原始事件", () => {
+    manager = new ToolStatsManager({ keepRawEvents: false });
+    manager.recordToolCall("get-mil-list", {}, { userId: "u1" });
+    manager.recordToolSuccess("get-mil-list", 12);
+    manager.recordToolCall("get_employee_info", {}, { userId: "u2" });
+    manager.recordToolError("get_employee_info", new Error("boom"), 5);
+    manager.recordCacheHit("get-mil-list");
+
+    const stats = manager.getGlobalStats();
+    expect(manager.events).toHaveLength(0);
+    expect(stats.overview).toMatchObject({ totalEvents: 5, totalTools: 2, totalUsers: 2 });
+    expect(stats.last24Hours).toMatchObject({
+      totalCalls: 2,
+      successfulCalls: 1,
+      failedCalls: 1,
+      cacheHits: 1,
+      uniqueTools: 2,
+      uniqueUsers: 2,
+    });
+    expect(stats.topTools).toHaveLength(2);
+    expect(stats.recentErrors[0]).toMatchObject({ toolName: "get_employee_info", errorMessage: "boom" });
+    expect(manager.getToolSummary("get-mil-list")).toMatchObject({ totalCalls: 1, cacheHits: 1 });
+  });
+
+  test("原始事件應受 maxEvents 限制", () => {
+    manager = new ToolStatsManager({ maxEvents: 10 });
+    for (let i = 0; i < 25; i++) manager.recordToolCall("tool");
+
+    expect(manager.events.length).toBeLessThanOrEqual(10);
+    expect(manager.getGlobalStats().allTime.totalCalls).toBe(25);
+    expect(manager.getRawEvents({ limit: 3 })).toHaveLength(3);
+  });
+});
@@ -0,0 +1,203 @@
+import { describe, test, expect, beforeEach, afterEach } from "@jest/globals";
+import fs from "fs";
+import os from "os";
+import path from "path";
+import { ToolCache, globalToolCache } from "../src/tools/tool-cache.js";
+import { BaseTool } from "../src/tools/base-tool.js";
+import {
+  SqliteCacheStore,
+  buildTagCondition,
+  openCacheDatabase,
+} from "../src/tools/cache-store.js";
+
+class SharedTool extends BaseTool {
+  constructor() {
+    super(
+      "l2_shared_lookup",
+      "共用緩存測試工具",
+      { type: "object", properties: { id: { type: "string" } } },
+      { cacheTTL: 60000, cacheTags: params => [`mil:serial:${params.id}`] },
+    );
+    this.runs = 0;
+  }
+
+  async _execute({ id }) {
+    this.runs++;
+    return { id, version: this.runs };
+  }
+}
+
+// 模擬兩個 worker：各自的 L1 與資料庫連線，共用同一個 SQLite 檔案
+async function openWorker(filePath, options = {}) {
+  const store = new SqliteCacheStore(await openCacheDatabase(filePath), {
+    compressThreshold: 256,
+  });
+  const cache = new ToolCache();
+  await cache.attachL2(store, { pollInterval: 0, ...options });
+  return cache;
+}
+
+describe("SqliteCacheStore", () => {
+  let dir;
+  let store;
+
+  beforeEach(async () => {
+    dir = fs.mkdtempSync(path.join(os.tmpdir(), "tool-cache-l2-"));
+    store = new SqliteCacheStore(
+      await openCacheDatabase(path.join(dir, "cache.db")),
+      { compressThreshold: 256 },
+    );
+    await store.init();
+  });
+
+  afterEach(async () => {
+    await store.close();
+    fs.rmSync(dir, { recursive: true, force: true });
+  });
+
+  test("大型值應壓縮儲存並可還原", async () => {
+    const rows = Array.from({ length: 200 }, (_, i) => ({
+      serialNumber: `G${i}`,
+      status: "OnGoing",
+    }));
+    await store.set("small", { id: 1 }, { ttl: 1000 });
+    await store.set("large", rows, { ttl: 1000, tags: ["mil:*"] });
+
+    expect((await store.get("small")).value).toEqual({ id: 1 });
+    const large = await store.get("large");
+    expect(large.value).toEqual(rows);
+    expect(large.tags).toEqual(["mil:*"]);
+
+    const stats = store.getStats();
+    expect(stats.compressedWrites).toBe(1);
+    expect(stats.bytesWritten).toBeLessThan(stats.rawBytesWritten);
+  });
+
+  test("超過 TTL 與寬限期的項目應視為未命中", async () => {
+    const createdAt = Date.now() - 1500;
+    await store.set("k", "v", { ttl: 1000, staleTTL: 1000, createdAt });
+    expect((await store.get("k")).createdAt).toBe(createdAt);
+    expect(await store.get("k", createdAt + 2001)).toBeNull();
+
+    expect(await store.purgeExpired(createdAt + 2001)).toBe(1);
+  });
+
+  test("標籤失效規則應與 L1 相同", async () => {
+    await store.set("list", [], { ttl: 1000, tags: ["mil:*"] });
+    await store.set("g1", {}, { ttl: 1000, tags: ["mil:serial:G1"] });
+    await store.set("g2", {}, { ttl: 1000, tags: ["mil:serial:G2"] });
+    await store.set("emp", {}, { ttl: 1000, tags: ["hr:employee:A001"] });
+
+    expect((await store.invalidateTags(["mil:serial:G1"])).deleted).toBe(2);
+    expect(await store.get("g2")).not.toBeNull();
+    expect((await store.invalidateTags(["mil:*"])).deleted).toBe(1);
+    expect(await store.get("emp")).not.toBeNull();
+
+    expect(buildTagCondition(["*"]).clause).toBe("1");
+    expect(await store.pollInvalidations(0)).toEqual([
+      { seq: 1, tags: ["mil:serial:G1"] },
+      { seq: 2, tags: ["mil:*"] },
+    ]);
+  });
+
+  test("載入開始後有失效時不應寫入", async () => {
+    const since = Date.now();
+    await store.invalidateTags(["mil:*"]);
+
+    expect(await store.set("k", "old", { ttl: 1000, since })).toBe(false);
+    expect(store.getStats().discardedWrites).toBe(1);
+    expect(await store.get("k")).toBeNull();
+  });
+});
+
+describe("ToolCache 兩層緩存", () => {
+  let dir;
+  let workers;
+
+  beforeEach(async () => {
+    dir = fs.mkdtempSync(path.join(os.tmpdir(), "tool-cache-l2-"));
+    const filePath = path.join(dir, "cache.db");
+    workers = [await openWorker(filePath), await openWorker(filePath)];
+  });
+
+  afterEach(async () => {
+    for (const cache of workers) {
+      const store = await cache.detachL2();
+      cache.destroy();
+      await store.close();
+    }
+    fs.rmSync(dir, { recursive: true, force: true });
+  });
+
+  test("L1 未命中時應讀取其他 worker 寫入的值並保留建立時間", async () => {
+    const [a, b] = workers;
+    a.set("k", { rows: 3 }, 1000, { tool: "t", staleTTL: 500 });
+    await a.flushL2();
+
+    expect(b.lookup("k")).toBeNull();
+    const item = await b.lookupL2("k");
+    expect(item.value).toEqual({ rows: 3 });
+    expect(item.createdAt).toBe(a.cache.get("k").createdAt);
+    expect(item.staleTTL).toBe(500);
+
+    // 已放回 L1，不會再寫回 L2
+    expect(b.lookup("k").value).toEqual({ rows: 3 });
+    const { l1, l2 } = b.getStats().tiers;
+    expect(l1.hits).toBe(1);
+    expect(l1.misses).toBe(1);
+    expect(l2.hits).toBe(1);
+    expect(l2.promotions).toBe(1);
+    expect(l2.writes).toBe(0);
+  });
+
+  test("失效應清除 L2 並由其他 worker 輪詢後清除 L1", async () => {
+    const [a, b] = workers;
+    b.set("g1", {}, 1000, { tags: ["mil:serial:G1"] });
+    b.set("emp", {}, 1000, { tags: ["hr:*"] });
+    await b.flushL2();
+
+    a.invalidateTags(["mil:serial:G1"]);
+    await a.flushL2();
+    expect(await a.pollL2Invalidations()).toBe(0);
+
+    expect(await b.pollL2Invalidations()).toBe(1);
+    expect(b.cache.has("g1")).toBe(false);
+    expect(b.cache.has("emp")).toBe(true);
+    expect(await b.lookupL2("g1")).toBeNull();
+
+    a.clear();
+    await a.flushL2();
+    await b.pollL2Invalidations();
+    expect(b.cache.size).toBe(0);
+    expect(b.getStats().tiers.l2.remoteInvalidations).toBe(2);
+  });
+});
+
+describe("BaseTool 使用 L2", () => {
+  let dir;
+
+  afterEach(async () => {
+    const store = await globalToolCache.detachL2();
+    globalToolCache.destroy();
+    await store?.close();
+    fs.rmSync(dir, { recursive: true, force: true });
+  });
+
+  test("重新啟動後（L1 為空）應由 L2 命中", async () => {
+    dir = fs.mkdtempSync(path.join(os.tmpdir(), "tool-cache-l2-"));
+    const store = new SqliteCacheStore(
+      await openCacheDatabase(path.join(dir, "cache.db")),
+    );
+    await globalToolCache.attachL2(store, { pollInterval: 0 });
+
+    const tool = new SharedTool();
+    await tool.execute({ id: "G1" });
+    await globalToolCache.flushL2();
+    globalToolCache._clearLocal();
+
+    const cached = await tool.execute({ id: "G1" });
+    expect(cached.fromCache).toBe(true);
+    expect(cached.result.version).toBe(1);
+    expect(tool.runs).toBe(1);
+  });
+});
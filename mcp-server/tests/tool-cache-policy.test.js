@@ -0,0 +1,176 @@
+import { describe, test, expect, afterEach } from "@jest/globals";
+import { ToolCache, globalToolCache } from "../src/tools/tool-cache.js";
+import {
+  BaseTool,
+  ToolExecutionError,
+  ToolErrorType,
+} from "../src/tools/base-tool.js";
+
+// 讓緩存項目提前老化
+function age(cache, key, ms) {
+  cache.cache.get(key).createdAt -= ms;
+}
+
+function deferred() {
+  let resolve;
+  const promise = new Promise(r => (resolve = r));
+  return { promise, resolve };
+}
+
+class LookupTool extends BaseTool {
+  constructor(options = {}) {
+    super(
+      "cache_policy_lookup",
+      "緩存策略測試工具",
+      { type: "object", properties: { id: { type: "string" } } },
+      { cacheTTL: 1000, ...options },
+    );
+    this.runs = 0;
+    this.gate = null;
+  }
+
+  async _execute({ id }) {
+    this.runs++;
+    if (this.gate) await this.gate;
+    if (id === "missing") {
+      throw new ToolExecutionError(`找不到 ${id}`, ToolErrorType.NOT_FOUND, {
+        id,
+      });
+    }
+    return { id, version: this.runs };
+  }
+}
+
+describe("ToolCache 寬限期、負緩存與 single-flight", () => {
+  let cache;
+
+  afterEach(() => cache?.destroy());
+
+  test("寬限期內 lookup 應返回舊值，get 視為未命中", () => {
+    cache = new ToolCache();
+    cache.set("k", "v", 1000, { staleTTL: 1000 });
+    age(cache, "k", 1500);
+
+    const item = cache.lookup("k");
+    expect(item.value).toBe("v");
+    expect(item.isStale()).toBe(true);
+    expect(cache.get("k")).toBeNull();
+    expect(cache.getStats().staleHits).toBe(1);
+
+    age(cache, "k", 1000);
+    expect(cache.lookup("k")).toBeNull();
+    expect(cache.cache.size).toBe(0);
+  });
+
+  test("singleFlight 應合併同一個鍵的並行載入", async () => {
+    cache = new ToolCache();
+    const gate = deferred();
+    let calls = 0;
+    const loader = async () => {
+      calls++;
+      await gate.promise;
+      return calls;
+    };
+
+    const first = cache.singleFlight("k", loader);
+    const second = cache.singleFlight("k", loader);
+    gate.resolve();
+
+    expect(await first).toBe(1);
+    expect(await second).toBe(1);
+    expect(cache.getStats().coalesced).toBe(1);
+    expect(cache.inflight.size).toBe(0);
+  });
+
+  test("不同參數應產生不同的緩存鍵", () => {
+    cache = new ToolCache();
+    const key = cache.generateKey("t", { id: "a", page: 1 });
+    expect(cache.generateKey("t", { page: 1, id: "a" })).toBe(key);
+    expect(cache.generateKey("t", { id: "b", page: 1 })).not.toBe(key);
+  });
+
+  test("revalidate 失敗時應保留舊值", async () => {
+    cache = new ToolCache();
+    cache.set("k", "old", 1000, { staleTTL: 1000 });
+    age(cache, "k", 1500);
+
+    cache.revalidate("k", async () => {
+      throw new Error("連線逾時");
+    });
+    await Promise.resolve();
+    await Promise.resolve();
+
+    expect(cache.getStats()).toMatchObject({
+      revalidations: 1,
+      revalidationErrors: 1,
+    });
+    expect(cache.lookup("k").value).toBe("old");
+  });
+});
+
+describe("BaseTool 緩存策略", () => {
+  afterEach(() => globalToolCache.clear());
+
+  test("過期後應先返回舊值並只在背景更新一次", async () => {
+    const tool = new LookupTool({ cacheStaleTTL: 5000 });
+    const first = await tool.execute({ id: "a" });
+    expect(first.result.version).toBe(1);
+
+    const key = globalToolCache.generateKey(tool.name, { id: "a" });
+    age(globalToolCache, key, 2000);
+
+    const gate = deferred();
+    tool.gate = gate.promise;
+    const [stale1, stale2] = await Promise.all([
+      tool.execute({ id: "a" }),
+      tool.execute({ id: "a" }),
+    ]);
+    expect(stale1.fromCache).toBe(true);
+    expect(stale1.result.version).toBe(1);
+    expect(stale2.result.version).toBe(1);
+
+    gate.resolve();
+    await globalToolCache.inflight.get(key);
+    expect(tool.runs).toBe(2);
+
+    const fresh = await tool.execute({ id: "a" });
+    expect(fresh.fromCache).toBe(true);
+    expect(fresh.result.version).toBe(2);
+  });
+
+  test("未命中時並行呼叫只執行一次", async () => {
+    const tool = new LookupTool();
+    const gate = deferred();
+    tool.gate = gate.promise;
+
+    const calls = Promise.all([
+      tool.execute({ id: "b" }),
+      tool.execute({ id: "b" }),
+      tool.execute({ id: "b" }),
+    ]);
+    await new Promise(resolve => setImmediate(resolve));
+    gate.resolve();
+    const results = await calls;
+
+    expect(tool.runs).toBe(1);
+    expect(results.every(result => result.success)).toBe(true);
+    expect(results.map(result => result.result.version)).toEqual([1, 1, 1]);
+  });
+
+  test("找不到的結果應以短 TTL 緩存，停用一般緩存的工具也適用", async () => {
+    const tool = new LookupTool({ cacheable: false, negativeCacheTTL: 1000 });
+
+    const first = await tool.execute({ id: "missing" });
+    const second = await tool.execute({ id: "missing" });
+    expect(first.error.type).toBe("not_found");
+    expect(second.success).toBe(false);
+    expect(second.error).toEqual(first.error);
+    expect(tool.runs).toBe(1);
+
+    // 一般結果仍不緩存
+    await tool.execute({ id: "c" });
+    await tool.execute({ id: "c" });
+    expect(tool.runs).toBe(3);
+    expect(globalToolCache.getStats().negativeHits).toBe(1);
+  });
+});
@@ -0,0 +1,109 @@
+import { describe, test, expect, afterEach } from "@jest/globals";
+import {
+  ToolCache,
+  parseByteSize,
+  parseToolQuotas,
+  estimateEntrySize,
+} from "../src/tools/tool-cache.js";
+
+describe("工具緩存 LRU 與位元組配額", () => {
+  let cache;
+
+  afterEach(() => cache?.destroy());
+
+  test("超過項目數時應驅逐最久未使用的項目", () => {
+    cache = new ToolCache({ maxSize: 3 });
+    cache.set("a", 1);
+    cache.set("b", 2);
+    cache.set("c", 3);
+
+    // 讀取 a 後，最久未使用的是 b
+    expect(cache.get("a")).toBe(1);
+    cache.set("d", 4);
+
+    expect(cache.has("b")).toBeFalsy();
+    expect(cache.has("a")).toBe(true);
+
+    // 接著驅逐 c，再來才是 a
+    cache.set("e", 5);
+    expect(cache.has("c")).toBeFalsy();
+    expect(cache.has("a")).toBe(true);
+    expect(cache.getStats().evictions).toBe(2);
+  });
+
+  test("應依估算位元組限制總量並拒絕過大的單一結果", () => {
+    const value = { text: "x".repeat(1000) };
+    const size = estimateEntrySize("k1", value);
+    cache = new ToolCache({ maxBytes: size * 2 + 10 });
+
+    cache.set("k1", value, undefined, { tool: "t" });
+    cache.set("k2", value, undefined, { tool: "t" });
+    cache.set("k3", value, undefined, { tool: "t" });
+
+    expect(cache.cache.size).toBe(2);
+    expect(cache.has("k1")).toBeFalsy();
+    expect(cache.getStats().memoryUsage.bytes).toBe(size * 2);
+
+    const huge = { text: "x".repeat(10000) };
+    expect(cache.set("huge", huge)).toBe(false);
+    expect(cache.getStats().rejected).toBe(1);
+    expect(cache.cache.size).toBe(2);
+  });
+
+  test("工具配額只驅逐同一工具的項目", () => {
+    const value = { text: "x".repeat(1000) };
+    const size = estimateEntrySize("m1", value);
+    cache = new ToolCache({ toolQuotas: { "get-mil-list": size * 2 } });
+
+    cache.set("e1", { id: 1 }, undefined, { tool: "get-employee-info" });
+    cache.set("m1", value, undefined, { tool: "get-mil-list" });
+    cache.set("m2", value, undefined, { tool: "get-mil-list" });
+    cache.set("m3", value, undefined, { tool: "get-mil-list" });
+
+    expect(cache.has("e1")).toBe(true);
+    expect(cache.has("m1")).toBeFalsy();
+
+    const usage = cache.getToolUsage();
+    expect(usage[0]).toEqual({
+      tool: "get-mil-list",
+      entries: 2,
+      bytes: size * 2,
+      quota: size * 2,
+    });
+    expect(usage[1]).toMatchObject({ tool: "get-employee-info", entries: 1 });
+
+    cache.setToolQuota("get-mil-list", size);
+    expect(cache.getToolUsage()[0].entries).toBe(1);
+  });
+
+  test("覆寫、刪除與過期清理應同步更新用量", () => {
+    cache = new ToolCache();
+    cache.set("a", { v: 1 }, undefined, { tool: "t" });
+    cache.set("a", { v: 2 }, undefined, { tool: "t" });
+    expect(cache.getToolUsage()).toEqual([
+      {
+        tool: "t",
+        entries: 1,
+        bytes: estimateEntrySize("a", { v: 2 }),
+        quota: null,
+      },
+    ]);
+
+    cache.set("b", "x", -1, { tool: "t" });
+    expect(cache.cleanup()).toBe(1);
+    expect(cache.delete("a")).toBe(true);
+    expect(cache.getToolUsage()).toEqual([]);
+    expect(cache.totalBytes).toBe(0);
+  });
+
+  test("應解析位元組單位與工具配額設定", () => {
+    expect(parseByteSize("64mb")).toBe(64 * 1024 * 1024);
+    expect(parseByteSize("1.5 KB")).toBe(1536);
+    expect(parseByteSize("abc")).toBeNull();
+    const quotas = parseToolQuotas("get-mil-list=16mb, get-mil-details=4096, x");
+    expect(quotas).toEqual({
+      "get-mil-list": 16 * 1024 * 1024,
+      "get-mil-details": 4096,
+    });
+  });
+});
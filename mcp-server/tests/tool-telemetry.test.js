@@ -0,0 +1,91 @@
+import { describe, test, expect, afterAll } from "@jest/globals";
+import { ToolTelemetry, globalToolTelemetry } from "../src/tools/telemetry.js";
+import { BaseTool } from "../src/tools/base-tool.js";
+
+function createRecorder() {
+  return {
+    events: [],
+    async _recordTelemetry(event) {
+      this.events.push(event.type);
+    },
+  };
+}
+
+describe("工具遙測佇列", () => {
+  afterAll(() => globalToolTelemetry.setStrict(true));
+
+  test("非 strict 模式應立即返回並在背景依序處理", async () => {
+    const telemetry = new ToolTelemetry();
+    const recorder = createRecorder();
+
+    expect(telemetry.emit(recorder, { type: "call" })).toBeUndefined();
+    telemetry.emit(recorder, { type: "success" });
+    expect(recorder.events).toEqual([]);
+
+    await telemetry.flush();
+    expect(recorder.events).toEqual(["call", "success"]);
+    expect(telemetry.getStats()).toMatchObject({
+      enqueued: 2,
+      processed: 2,
+      queueLength: 0,
+    });
+  });
+
+  test("strict 模式應在返回的 Promise 完成前處理事件", async () => {
+    const telemetry = new ToolTelemetry({ strict: true });
+    const recorder = createRecorder();
+
+    await telemetry.emit(recorder, { type: "call" });
+    expect(recorder.events).toEqual(["call"]);
+  });
+
+  test("佇列已滿時應丟棄一般事件但保留錯誤事件", async () => {
+    const telemetry = new ToolTelemetry({ maxQueue: 2 });
+    const recorder = createRecorder();
+
+    for (let i = 0; i < 4; i++) telemetry.emit(recorder, { type: "call" });
+    telemetry.emit(recorder, { type: "error" });
+    await telemetry.flush();
+
+    expect(recorder.events).toEqual(["call", "call", "error"]);
+    expect(telemetry.getStats().dropped).toBe(2);
+  });
+
+  test("BaseTool 應透過佇列更新執行歷史與統計", async () => {
+    class EchoTool extends BaseTool {
+      constructor() {
+        super(
+          "telemetry_echo",
+          "遙測測試工具",
+          { type: "object", properties: { value: { type: "string" } } },
+          { cacheable: false, maxHistory: 2 },
+        );
+      }
+
+      async _execute(params) {
+        if (params.value === "error") throw new Error("boom");
+        return { echo: params.value };
+      }
+    }
+
+    const tool = new EchoTool();
+    await globalToolTelemetry.setStrict(false);
+
+    const result = await tool.execute({ value: "a" });
+    expect(result.success).toBe(true);
+    await globalToolTelemetry.flush();
+    expect(tool.stats.totalExecutions).toBe(1);
+
+    await globalToolTelemetry.setStrict(true);
+    await tool.execute({ value: "error" });
+    await tool.execute({ value: "b" });
+
+    expect(tool.stats).toMatchObject({
+      totalExecutions: 3,
+      successCount: 2,
+      errorCount: 1,
+    });
+    expect(tool.getExecutionHistory()).toHaveLength(2);
+    expect(tool.runningExecutions.size).toBe(0);
+  });
+});
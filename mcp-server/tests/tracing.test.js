@@ -0,0 +1,64 @@
+import { describe, test, expect, beforeAll } from "@jest/globals";
+import fs from "fs";
+import os from "os";
+import path from "path";
+import config from "../src/config/config.js";
+import {
+  parseTraceparent,
+  startSpan,
+  withSpan,
+  runWithSpan,
+  flushSpans,
+} from "../src/services/tracing.js";
+
+describe("請求追蹤", () => {
+  const traceFile = path.join(os.tmpdir(), `traces-${process.pid}.jsonl`);
+
+  beforeAll(() => {
+    config.tracingEnabled = true;
+    config.traceFile = traceFile;
+  });
+
+  test("應解析合法的 traceparent 並拒絕無效值", () => {
+    expect(
+      parseTraceparent("00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"),
+    ).toEqual({
+      traceId: "0af7651916cd43dd8448eb211c80319c",
+      parentSpanId: "b7ad6b7169203331",
+    });
+    expect(parseTraceparent("00-00000000000000000000000000000000-b7ad6b7169203331-01")).toBeNull();
+    expect(parseTraceparent("invalid")).toBeNull();
+  });
+
+  test("沒有上層 span 時不建立非入口 span", async () => {
+    expect(startSpan("db.query")).toBeNull();
+    await expect(withSpan("db.query", {}, span => span)).resolves.toBeNull();
+  });
+
+  test("子 span 應延續同一個 trace 並寫入 JSONL", async () => {
+    const root = startSpan("HTTP POST /api/mil/get-mil-list", {
+      parent: parseTraceparent("00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"),
+      root: true,
+    });
+
+    await runWithSpan(root, () =>
+      withSpan("tool get-mil-list", {}, () => withSpan("db.query", {}, async () => "rows")),
+    );
+    root.end();
+    await flushSpans();
+
+    const spans = fs
+      .readFileSync(traceFile, "utf8")
+      .trim()
+      .split("\n")
+      .map(line => JSON.parse(line));
+    const byName = Object.fromEntries(spans.map(span => [span.name, span]));
+
+    expect(new Set(spans.map(span => span.traceId))).toEqual(
+      new Set(["0af7651916cd43dd8448eb211c80319c"]),
+    );
+    expect(byName["db.query"].parentSpanId).toBe(byName["tool get-mil-list"].spanId);
+    expect(byName["tool get-mil-list"].parentSpanId).toBe(root.spanId);
+    fs.unlinkSync(traceFile);
+  });
+});
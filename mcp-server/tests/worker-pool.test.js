@@ -0,0 +1,223 @@
+import { describe, test, expect, afterAll } from "@jest/globals";
+import {
+  WorkerPool,
+  WorkerPoolError,
+  globalWorkerPool,
+} from "../src/tools/worker-pool.js";
+import { describe as describeValues } from "../src/tools/workers/stat-tasks.js";
+import { collectTransferables } from "../src/tools/workers/transferables.js";
+import { ToolErrorType } from "../src/tools/base-tool.js";
+import { PerformANOVATool } from "../src/tools/stat/perform-anova.js";
+import { ParseCSVTTestTool } from "../src/tools/stat/parse-csv-ttest.js";
+
+// 測試用任務模組：以 data: URL 載入，不需額外的檔案
+const TEST_TASKS = `data:text/javascript,${encodeURIComponent(`
+  export const tasks = {
+    double({ values }) {
+      for (let i = 0; i < values.length; i++) values[i] *= 2;
+      return { values };
+    },
+    spin({ ms }) {
+      const end = Date.now() + ms;
+      while (Date.now() < end) {}
+      return ms;
+    },
+    fail() {
+      throw new RangeError("bad input");
+    },
+  };
+`)}`;
+
+const pools = [];
+function createPool(options) {
+  const pool = new WorkerPool({ modules: [TEST_TASKS], ...options });
+  pools.push(pool);
+  return pool;
+}
+
+afterAll(async () => {
+  await Promise.all(pools.map(pool => pool.destroy()));
+  await globalWorkerPool.destroy();
+});
+
+describe("統計任務", () => {
+  test("describe 應與逐項計算的結果一致", () => {
+    const values = [2, 4, 4, 4, 5, 5, 7, 9];
+    const stats = describeValues(Float64Array.from(values));
+    const mean = values.reduce((sum, value) => sum + value, 0) / 8;
+    const variance =
+      values.reduce((sum, value) => sum + (value - mean) ** 2, 0) / 7;
+
+    expect(stats.n).toBe(8);
+    expect(stats.mean).toBe(mean);
+    expect(stats.std).toBeCloseTo(Math.sqrt(variance), 12);
+    expect(stats.se).toBeCloseTo(Math.sqrt(variance / 8), 12);
+    expect([stats.min, stats.max]).toEqual([2, 9]);
+  });
+
+  test("collectTransferables 應找出巢狀 TypedArray 的 buffer", () => {
+    const a = new Float64Array(4);
+    const b = new Float64Array(a.buffer, 8, 2);
+    const c = new Int32Array(3);
+    const buffers = collectTransferables({ groups: [a, b], nested: { c } });
+    expect(buffers).toHaveLength(2);
+    expect(buffers).toContain(a.buffer);
+    expect(buffers).toContain(c.buffer);
+  });
+});
+
+describe("WorkerPool", () => {
+  test("應在 worker thread 執行任務並以 transfer 交換 buffer", async () => {
+    const pool = createPool({ size: 1 });
+    const values = Float64Array.from([1, 2, 3]);
+
+    const result = await pool.run(
+      "double",
+      { values },
+      { transfer: [values.buffer] },
+    );
+
+    expect(values.byteLength).toBe(0); // 已 transfer 給 worker
+    expect(result.values).toBeInstanceOf(Float64Array);
+    expect(Array.from(result.values)).toEqual([2, 4, 6]);
+    expect(pool.getStats()).toMatchObject({ completed: 1, workers: 1 });
+  });
+
+  test("任務錯誤應以原本的錯誤名稱與訊息拒絕，worker 仍可繼續使用", async () => {
+    const pool = createPool({ size: 1 });
+
+    await expect(pool.run("fail", {})).rejects.toThrow("bad input");
+    await expect(pool.run("spin", { ms: 1 })).resolves.toBe(1);
+    await expect(pool.run("missing", {})).rejects.toThrow(
+      "Unknown worker task",
+    );
+    expect(pool.getStats().workers).toBe(1);
+  });
+
+  test("佇列滿時應立即拒絕新任務", async () => {
+    const pool = createPool({ size: 1, maxQueue: 1 });
+
+    const running = pool.run("spin", { ms: 100 });
+    const queued = pool.run("spin", { ms: 1 });
+    const rejected = pool.run("spin", { ms: 1 });
+
+    await expect(rejected).rejects.toMatchObject({ code: "QUEUE_FULL" });
+    await expect(running).resolves.toBe(100);
+    await expect(queued).resolves.toBe(1);
+    expect(pool.getStats()).toMatchObject({ rejected: 1, maxQueueLength: 1 });
+  });
+
+  test("任務逾時應終止 worker 並由新的 worker 執行後續任務", async () => {
+    const pool = createPool({ size: 1, taskTimeout: 50 });
+
+    const slow = pool.run("spin", { ms: 5000 });
+    const next = pool.run("spin", { ms: 1 }, { timeout: 1000 });
+
+    await expect(slow).rejects.toBeInstanceOf(WorkerPoolError);
+    await expect(slow).rejects.toMatchObject({ code: "TIMEOUT" });
+    await expect(next).resolves.toBe(1);
+    expect(pool.getStats()).toMatchObject({ timedOut: 1, workerRestarts: 1 });
+  });
+
+  test("worker 執行計算時主執行緒的計時器應照常觸發", async () => {
+    const pool = createPool({ size: 2 });
+    await pool.run("spin", { ms: 0 }); // 先啟動 worker
+
+    const startedAt = Date.now();
+    const heavy = Promise.all([
+      pool.run("spin", { ms: 300 }),
+      pool.run("spin", { ms: 300 }),
+    ]);
+    const tickDelay = await new Promise(resolve =>
+      setTimeout(() => resolve(Date.now() - startedAt), 20),
+    );
+    await heavy;
+
+    expect(tickDelay).toBeLessThan(150);
+  });
+
+  test("size 為 NaN 時應使用預設大小而非無上限", () => {
+    const pool = createPool({ size: NaN });
+    expect(Number.isInteger(pool.size)).toBe(true);
+    expect(pool.size).toBeGreaterThan(0);
+  });
+
+  test("size 0 時應在主執行緒執行任務", async () => {
+    const pool = createPool({ size: 0 });
+    const result = await pool.run("double", {
+      values: Float64Array.from([5]),
+    });
+
+    expect(Array.from(result.values)).toEqual([10]);
+    expect(pool.getStats()).toMatchObject({ mode: "inline", workers: 0 });
+  });
+
+  test("destroy 應拒絕等待中的任務", async () => {
+    const pool = createPool({ size: 1 });
+    const settled = Promise.allSettled([
+      pool.run("spin", { ms: 200 }),
+      pool.run("spin", { ms: 1 }),
+    ]);
+
+    await pool.destroy();
+    const results = await settled;
+    expect(results.map(({ reason }) => reason.code)).toEqual([
+      "TERMINATED",
+      "TERMINATED",
+    ]);
+  });
+});
+
+describe("統計工具使用 worker 池", () => {
+  test("ANOVA 描述性統計應由 worker 計算", async () => {
+    const tool = new PerformANOVATool();
+    const groups = [
+      [1, 2, 3, 4, 5],
+      [6, 7, 8, 9, 10],
+    ];
+
+    const stats = await tool.describeGroups(groups);
+    expect(stats.map(({ n, mean }) => [n, mean])).toEqual([
+      [5, 3],
+      [5, 8],
+    ]);
+    expect(groups[0]).toEqual([1, 2, 3, 4, 5]); // 原始陣列不受 transfer 影響
+
+    const table = tool.formatDescriptiveStats(stats, {
+      data: { groups },
+      context: { variables: { group_names: ["A", "B"] } },
+    });
+    expect(table).toContain("| A | 5 | 3.000 | 1.581 | 0.707 |");
+    expect(tool.formatDescriptiveStats(null, { data: { groups } })).toContain(
+      "| 組別 2 | 5 | 8.000 | 1.581 | 0.707 |",
+    );
+  });
+
+  test("CSV 解析與樣本提取應保留配對資料的對齊方式", async () => {
+    const tool = new ParseCSVTTestTool();
+    const parsed = await tool.parseCSV(
+      "patient,before,after\nP1,120,110\nP2,,108\nP3,130,\nP4,125,115",
+    );
+
+    expect(tool.identifyNumericColumns(parsed)).toEqual(["before", "after"]);
+    const { sample1, sample2 } = tool.extractSamples(parsed, "before", "after");
+    expect(sample1).toEqual([120, 130, 125]);
+    expect(sample2).toEqual([110, 115]);
+  });
+
+  test("佇列已滿應轉為 RATE_LIMIT_ERROR 的工具錯誤", async () => {
+    const tool = new ParseCSVTTestTool();
+    const original = globalWorkerPool.run;
+    globalWorkerPool.run = () =>
+      Promise.reject(new WorkerPoolError("queue is full", "QUEUE_FULL"));
+
+    try {
+      await expect(tool.parseCSV("a,b\n1,2")).rejects.toMatchObject({
+        name: "ToolExecutionError",
+        type: ToolErrorType.RATE_LIMIT_ERROR,
+      });
+    } finally {
+      globalWorkerPool.run = original;
+    }
+  });
+});
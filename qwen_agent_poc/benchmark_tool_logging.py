@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+工具調用日誌效能測試
+比較原本的 f-string 日誌（logger.info(f"工具調用結果: {result}")）與 ToolLogger 在大型回應下的每次呼叫成本
+
+使用方式：
+    python benchmark_tool_logging.py
+    python benchmark_tool_logging.py --rows 20000 --iterations 50
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from structured_log import ToolLogger
+
+
+def make_payload(rows: int) -> dict:
+    """模擬 get_employee_list 的大型回應"""
+    return {
+        "success": True,
+        "data": {
+            "employees": [
+                {
+                    "employeeId": f"A{i:06d}",
+                    "name": "王小明",
+                    "department": "資訊部",
+                    "jobTitle": "工程師",
+                    "email": f"user{i}@example.com",
+                    "phone": "02-1234-5678",
+                    "hireDate": "2020-01-01",
+                    "status": "active",
+                }
+                for i in range(rows)
+            ],
+            "total": rows,
+        },
+    }
+
+
+def make_logger(level: int) -> logging.Logger:
+    """建立輸出到 /dev/null 的 logger（包含 Formatter 成本，排除終端機輸出成本）"""
+    logger = logging.getLogger(f"benchmark.{level}")
+    logger.handlers.clear()
+    logger.propagate = False
+    logger.setLevel(level)
+    handler = logging.StreamHandler(open(os.devnull, "w", encoding="utf-8"))
+    handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+    logger.addHandler(handler)
+    return logger
+
+
+def measure(fn, iterations: int) -> float:
+    """返回每次呼叫的平均微秒數"""
+    fn()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="工具調用日誌效能測試")
+    parser.add_argument("--rows", type=int, default=5000, help="回應中的員工筆數")
+    parser.add_argument("--iterations", type=int, default=100, help="每種情境的呼叫次數")
+    args = parser.parse_args()
+
+    result = make_payload(args.rows)
+    print(f"回應大小: {len(str(result)) / 1024:.0f} KB（{args.rows} 筆），每種情境 {args.iterations} 次\n")
+
+    enabled = make_logger(logging.INFO)
+    disabled = make_logger(logging.WARNING)
+    tool = "hr.get_employee_list"
+
+    structured = ToolLogger(enabled, sample_rates={})
+    sampled = ToolLogger(enabled, sample_rates={tool: 0.1})
+    structured_disabled = ToolLogger(disabled, sample_rates={})
+
+    scenarios = [
+        ("f-string，INFO 啟用", lambda: enabled.info(f"工具調用結果: {result}")),
+        ("ToolLogger，INFO 啟用", lambda: structured.info("工具調用結果", tool=tool, result=result)),
+        ("ToolLogger，取樣 10%", lambda: sampled.info("工具調用結果", tool=tool, result=result)),
+        ("f-string，INFO 停用", lambda: disabled.info(f"工具調用結果: {result}")),
+        ("ToolLogger，INFO 停用", lambda: structured_disabled.info("工具調用結果", tool=tool, result=result)),
+    ]
+
+    baseline = None
+    print(f"{'情境':<24}{'µs/次':>12}{'相對 f-string':>16}")
+    for name, fn in scenarios:
+        micros = measure(fn, args.iterations)
+        if name.startswith("f-string"):
+            baseline = micros
+        print(f"{name:<24}{micros:>12.1f}{baseline / micros:>15.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -151,9 +151,26 @@ GRADIO_CONFIG = {
     "server_name": os.getenv("GRADIO_SERVER_NAME", "0.0.0.0")
 }
 
+# Prometheus 指標端點（0 表示不啟動）
+METRICS_CONFIG = {
+    "port": int(os.getenv("AGENT_METRICS_PORT", "0")),
+    "host": os.getenv("AGENT_METRICS_HOST", "0.0.0.0"),
+}
+
+# 請求追蹤（span 以 JSONL 寫入，可與 MCP Server 的 src/logs/traces.jsonl 一起用 trace_waterfall.py 檢視）
+TRACING_CONFIG = {
+    "enabled": os.getenv("TRACING_ENABLED", "false").lower() == "true",
+    "file": os.getenv("AGENT_TRACE_FILE", "traces.jsonl"),
+}
+
 # 日誌配置
 LOGGING_CONFIG = {
     "level": os.getenv("LOG_LEVEL", "INFO"),
     "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    "file": "qwen_agent_poc.log"
+    "file": "qwen_agent_poc.log",
+    # 工具調用日誌：單一欄位最多輸出的字元數
+    "max_field_chars": int(os.getenv("TOOL_LOG_MAX_FIELD_CHARS", "500")),
+    # 工具調用日誌取樣率，格式為「工具=比例」，以逗號分隔，例如 "hr.get_employee_list=0.1,*=1"
+    # 警告與錯誤等級的日誌不取樣
+    "tool_sample_rates": os.getenv("TOOL_LOG_SAMPLE_RATES", ""),
 } 
\ No newline at end of file
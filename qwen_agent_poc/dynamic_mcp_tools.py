@@ -11,6 +11,7 @@ from functools import wraps
 import inspect
 
 from config import MCP_SERVER_CONFIG
+from schema_validator import compile_validator, schema_from_tool_info
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +22,7 @@ class DynamicMCPToolManager:
         self.base_url = base_url or MCP_SERVER_CONFIG["base_url"]
         self.tools_cache = {}
         self.tool_functions = {}
+        self.validators = {}
         
     def discover_tools(self) -> Dict[str, List[Dict]]:
         """從 MCP Server 發現所有可用工具"""
@@ -57,13 +59,17 @@ class DynamicMCPToolManager:
         """動態生成工具函數"""
         tool_name = tool_info.get("name")
         tool_description = tool_info.get("description", "")
-        tool_parameters = tool_info.get("parameters", {})
+        tool_schema = schema_from_tool_info(tool_info)
+        
+        # 註冊時編譯一次參數驗證函式，每次調用直接重用
+        validator = compile_validator(tool_schema) if tool_schema else None
+        self.validators[f"{module}_{tool_name}"] = validator
         
         def dynamic_tool_function(**kwargs) -> str:
             """動態生成的工具函數"""
             try:
-                # 驗證參數
-                validated_params = self._validate_parameters(kwargs, tool_parameters)
+                # 驗證參數，不合法的呼叫不送出請求
+                validated_params = self._validate_parameters(kwargs, validator)
                 
                 # 調用 MCP 工具
                 response = requests.post(
@@ -88,32 +94,41 @@ class DynamicMCPToolManager:
         工具: {tool_name}
         
         參數:
-        {self._format_parameters_doc(tool_parameters)}
+        {self._format_parameters_doc(tool_schema)}
         """
         
         return dynamic_tool_function
     
-    def _validate_parameters(self, params: Dict, schema: Dict) -> Dict:
-        """驗證和處理參數"""
+    def _validate_parameters(self, params: Dict, validator: Callable = None) -> Dict:
+        """
+        驗證和處理參數
+        
+        略過值為 None 的選填參數後，以工具 schema 編譯出的驗證函式檢查；
+        錯誤訊息與 MCP Server 端相同，驗證失敗時拋出 ParameterValidationError
+        """
         validated = {}
         
-        # 簡單的參數驗證邏輯
         for key, value in params.items():
             if value is not None:
                 validated[key] = value
         
+        if validator:
+            validator(validated)
+        
         return validated
     
-    def _format_parameters_doc(self, parameters: Dict) -> str:
+    def _format_parameters_doc(self, schema: Dict) -> str:
         """格式化參數文檔"""
-        if not parameters:
+        properties = (schema or {}).get("properties")
+        if not properties:
             return "無參數"
         
+        required_params = set(schema.get("required") or [])
         doc_lines = []
-        for param_name, param_info in parameters.items():
+        for param_name, param_info in properties.items():
             param_type = param_info.get("type", "any")
             param_desc = param_info.get("description", "")
-            required = param_info.get("required", False)
+            required = param_name in required_params
             
             required_text = " (必填)" if required else " (選填)"
             doc_lines.append(f"- {param_name} ({param_type}){required_text}: {param_desc}")
@@ -163,6 +178,7 @@ class DynamicMCPToolManager:
         logger.info("🔄 刷新工具快取...")
         self.tools_cache.clear()
         self.tool_functions.clear()
+        self.validators.clear()
         self.discover_tools()
 
 # 全局動態工具管理器實例
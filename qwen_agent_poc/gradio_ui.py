@@ -20,7 +20,9 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 try:
-    from config import GRADIO_CONFIG, TEST_CASES, AGENT_CONFIG
+    from config import GRADIO_CONFIG, TEST_CASES, AGENT_CONFIG, METRICS_CONFIG
+    from metrics_exporter import chat_duration, start_metrics_server
+    from tracing import start_span
     from mcp_tools import test_mcp_connection, get_tools_status, get_employee_info
     from tool_result_enforcer import tool_result_enforcer
     print("✅ 成功導入強化版模組")
@@ -72,10 +74,18 @@ class GradioQwenAgentUI:
             self.tools_status = {"error": str(e)}
     
     def chat_with_agent(self, message: str, history: List[Tuple[str, str]]) -> Tuple[str, List[Tuple[str, str]]]:
-        """強化版對話處理 - 直接使用工具，無需 BasicAgent"""
+        """強化版對話處理 - 直接使用工具，無需 BasicAgent（每輪對話為一個追蹤）"""
+        with start_span("gradio.chat", root=True, message_length=len(message)):
+            return self._chat_with_agent(message, history)
+    
+    def _chat_with_agent(self, message: str, history: List[Tuple[str, str]]) -> Tuple[str, List[Tuple[str, str]]]:
+        """對話處理主體"""
         if not message.strip():
             return "", history
         
+        # 成功與失敗都以同一個起點量測整輪對話
+        started = time.perf_counter()
+        status = "error"
         try:
             # 更新統計
             self.anti_hallucination_stats["total_queries"] += 1
@@ -129,11 +139,14 @@ class GradioQwenAgentUI:
             })
             
             logger.info(f"強化版對話完成，執行時間: {end_time - start_time:.2f} 秒")
+            status = "success"
             
         except Exception as e:
             error_msg = f"❌ 處理對話時發生錯誤: {str(e)}"
             history[-1] = (message, error_msg)
             logger.error(f"對話處理錯誤: {e}")
+        finally:
+            chat_duration.observe({"handler": "gradio", "status": status}, time.perf_counter() - started)
         
         return "", history
     
@@ -589,6 +602,9 @@ def main():
     if not test_mcp_connection():
         print("⚠️ 警告: MCP Server 連接失敗，某些功能可能無法正常運作")
     
+    # 啟動 Prometheus 指標端點（設定 AGENT_METRICS_PORT 時）
+    start_metrics_server(METRICS_CONFIG["port"], METRICS_CONFIG["host"])
+    
     # 建立並啟動 Gradio 介面
     demo = create_gradio_interface()
     
@@ -0,0 +1,237 @@
+"""
+工具延遲分位數統計
+以對數分桶草圖（DDSketch）記錄 MCP 工具調用延遲，與 Node 端 src/tools/latency-sketch.js
+使用相同的分桶方式，因此可直接合併伺服器回傳的草圖（/api/tools/stats?includeSketches=true）
+"""
+
+import math
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+# 滑動視窗定義（秒）
+LATENCY_WINDOWS = {
+    "1m": 60,
+    "5m": 5 * 60,
+    "15m": 15 * 60,
+    "1h": 60 * 60,
+}
+
+DEFAULT_RELATIVE_ACCURACY = 0.01
+DEFAULT_MAX_BINS = 1024
+# 小於此值（毫秒）的延遲計入零桶
+MIN_INDEXABLE_VALUE = 1e-3
+
+
+class LatencySketch:
+    """可合併的分位數草圖（延遲單位：毫秒）"""
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY,
+                 max_bins: int = DEFAULT_MAX_BINS):
+        self.relative_accuracy = relative_accuracy
+        self.max_bins = max_bins
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float, weight: int = 1) -> None:
+        """記錄一筆延遲（毫秒）"""
+        if value is None or value < 0 or math.isnan(value) or math.isinf(value):
+            return
+
+        if value < MIN_INDEXABLE_VALUE:
+            self.zero_count += weight
+        else:
+            index = math.ceil(math.log(value) / self.log_gamma)
+            self.bins[index] = self.bins.get(index, 0) + weight
+            if len(self.bins) > self.max_bins:
+                self._collapse()
+
+        self.count += weight
+        self.sum += value * weight
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "LatencySketch") -> "LatencySketch":
+        """合併另一個草圖（需使用相同的相對誤差）"""
+        if other is None or other.count == 0:
+            return self
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("無法合併相對誤差不同的延遲草圖")
+
+        for index, count in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + count
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def quantile(self, q: float) -> Optional[float]:
+        """估計分位數（q 介於 0 到 1）"""
+        if self.count == 0:
+            return None
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return self.min
+
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if seen > rank:
+                estimate = 2 * self.gamma ** index / (self.gamma + 1)
+                return min(max(estimate, self.min), self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, Any]:
+        """取得常用摘要（p50 / p90 / p99）"""
+        def _round(value):
+            return None if value is None else round(value, 2)
+
+        has_data = self.count > 0
+        return {
+            "count": self.count,
+            "mean": _round(self.sum / self.count) if has_data else None,
+            "min": _round(self.min) if has_data else None,
+            "max": _round(self.max) if has_data else None,
+            "p50": _round(self.quantile(0.5)),
+            "p90": _round(self.quantile(0.9)),
+            "p99": _round(self.quantile(0.99)),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """序列化（欄位名稱與 Node 端 toJSON 相同）"""
+        return {
+            "relativeAccuracy": self.relative_accuracy,
+            "zeroCount": self.zero_count,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "bins": [[index, count] for index, count in self.bins.items()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], max_bins: int = DEFAULT_MAX_BINS) -> "LatencySketch":
+        """由序列化資料還原（可用於合併伺服器端草圖）"""
+        sketch = cls(data.get("relativeAccuracy", DEFAULT_RELATIVE_ACCURACY), max_bins)
+        for index, count in data.get("bins", []):
+            sketch.bins[int(index)] = count
+        sketch.zero_count = data.get("zeroCount", 0)
+        sketch.count = data.get("count", 0)
+        sketch.sum = data.get("sum", 0.0)
+        sketch.min = data["min"] if data.get("min") is not None else math.inf
+        sketch.max = data["max"] if data.get("max") is not None else -math.inf
+        if len(sketch.bins) > sketch.max_bins:
+            sketch._collapse()
+        return sketch
+
+    def _collapse(self) -> None:
+        """桶數超過上限時合併最低的桶，保留高分位數的精度"""
+        indexes = sorted(self.bins)
+        excess = len(indexes) - self.max_bins
+        target = indexes[excess]
+        collapsed = sum(self.bins.pop(index) for index in indexes[:excess])
+        self.bins[target] += collapsed
+
+
+class WindowedLatencySketch:
+    """滑動視窗草圖：以固定時間片的環狀緩衝區保存草圖，查詢時合併視窗內的時間片"""
+
+    def __init__(self, slice_seconds: int = 10, horizon_seconds: int = LATENCY_WINDOWS["1h"],
+                 **sketch_options):
+        self.slice_seconds = slice_seconds
+        self.size = math.ceil(horizon_seconds / slice_seconds)
+        self.sketch_options = sketch_options
+        self.slices: List[Optional[tuple]] = [None] * self.size
+        self.lifetime = LatencySketch(**sketch_options)
+
+    def add(self, value: float, timestamp: float = None) -> None:
+        index = int((timestamp or time.time()) // self.slice_seconds)
+        position = index % self.size
+        current = self.slices[position]
+
+        if current is None or current[0] != index:
+            current = (index, LatencySketch(**self.sketch_options))
+            self.slices[position] = current
+
+        current[1].add(value)
+        self.lifetime.add(value)
+
+    def get_sketch(self, window: str = "5m", now: float = None) -> LatencySketch:
+        """取得指定視窗（1m / 5m / 15m / 1h / all）的合併草圖"""
+        if window == "all":
+            return self.lifetime
+        if window not in LATENCY_WINDOWS:
+            raise ValueError(f"不支援的延遲視窗: {window}")
+
+        current = int((now or time.time()) // self.slice_seconds)
+        span = min(math.ceil(LATENCY_WINDOWS[window] / self.slice_seconds), self.size)
+        oldest = current - span + 1
+        merged = LatencySketch(**self.sketch_options)
+
+        for entry in self.slices:
+            if entry is not None and oldest <= entry[0] <= current:
+                merged.merge(entry[1])
+        return merged
+
+
+class LatencyRecorder:
+    """依工具與模組分別記錄 MCP 工具調用延遲（執行緒安全）"""
+
+    def __init__(self, **options):
+        self.options = options
+        self.tools: Dict[str, WindowedLatencySketch] = {}
+        self.modules: Dict[str, WindowedLatencySketch] = {}
+        self._lock = threading.Lock()
+
+    def record(self, module: str, tool_name: str, duration_ms: float) -> None:
+        """記錄一次工具調用的延遲（毫秒）"""
+        with self._lock:
+            self._get(self.tools, tool_name).add(duration_ms)
+            if module:
+                self._get(self.modules, module).add(duration_ms)
+
+    def get_stats(self, window: str = "5m") -> Dict[str, Any]:
+        """取得所有工具與模組在指定視窗的 p50 / p90 / p99"""
+        with self._lock:
+            return {
+                "window": window,
+                "tools": {name: ws.get_sketch(window).summary() for name, ws in self.tools.items()},
+                "modules": {name: ws.get_sketch(window).summary() for name, ws in self.modules.items()},
+            }
+
+    def get_sketch(self, name: str, window: str = "5m", group: str = "tools") -> Optional[LatencySketch]:
+        """取得單一工具（或模組）的合併草圖"""
+        with self._lock:
+            windowed = (self.tools if group == "tools" else self.modules).get(name)
+            return windowed.get_sketch(window) if windowed else None
+
+    def reset(self) -> None:
+        with self._lock:
+            self.tools.clear()
+            self.modules.clear()
+
+    def _get(self, group: Dict[str, WindowedLatencySketch], key: str) -> WindowedLatencySketch:
+        if key not in group:
+            group[key] = WindowedLatencySketch(**self.options)
+        return group[key]
+
+
+# 全局延遲記錄器實例
+latency_recorder = LatencyRecorder()
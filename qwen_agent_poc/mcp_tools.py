@@ -3,18 +3,25 @@ MCP 工具包裝器
 將 SFDA MCP Server 的 HTTP API 包裝成 Qwen-Agent 可使用的函數工具
 """
 
+import asyncio
 import requests
 import json
 import time
-from typing import Dict, Any, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple, Iterator, AsyncIterator
 from datetime import datetime, timedelta
 import logging
 
 from config import MCP_SERVER_CONFIG
+from latency_stats import latency_recorder
+from metrics_exporter import tool_call_duration
+from structured_log import ToolLogger
+from tracing import current_traceparent, start_span
 
 # 設定日誌
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
+tool_log = ToolLogger(logger)
 
 class MCPClient:
     """MCP Server 客戶端，處理與 SFDA MCP Server 的通信"""
@@ -29,12 +36,18 @@ class MCPClient:
         """發送 HTTP 請求到 MCP Server"""
         url = f"{self.base_url}{endpoint}"
         
+        # 傳遞追蹤標頭，讓 MCP Server 延續同一個 trace
+        headers = {}
+        traceparent = current_traceparent()
+        if traceparent:
+            headers["traceparent"] = traceparent
+        
         for attempt in range(self.retry_attempts):
             try:
                 if method.upper() == "GET":
-                    response = requests.get(url, params=data, timeout=self.timeout)
+                    response = requests.get(url, params=data, headers=headers, timeout=self.timeout)
                 else:
-                    response = requests.post(url, json=data, timeout=self.timeout)
+                    response = requests.post(url, json=data, headers=headers, timeout=self.timeout)
                 
                 response.raise_for_status()
                 return response.json()
@@ -49,10 +62,20 @@ class MCPClient:
     def call_tool(self, module: str, tool_name: str, parameters: Dict) -> Dict:
         """調用指定的 MCP 工具"""
         endpoint = f"/api/{module}/{tool_name}"
-        logger.info(f"調用工具: {module}.{tool_name} 參數: {parameters}")
+        tool = f"{module}.{tool_name}"
+        tool_log.info("調用工具", tool=tool, parameters=parameters)
         
-        result = self._make_request("POST", endpoint, parameters)
-        logger.info(f"工具調用結果: {result}")
+        started = time.perf_counter()
+        status = "error"
+        try:
+            with start_span(f"mcp {module}.{tool_name}", module=module, tool=tool_name):
+                result = self._make_request("POST", endpoint, parameters)
+            status = "success"
+        finally:
+            elapsed = time.perf_counter() - started
+            latency_recorder.record(module, tool_name, elapsed * 1000)
+            tool_call_duration.observe({"module": module, "tool": tool_name, "status": status}, elapsed)
+        tool_log.info("工具調用結果", tool=tool, elapsed_ms=round(elapsed * 1000, 1), result=result)
         return result
 
 # 全局 MCP 客戶端實例
@@ -362,6 +385,245 @@ def get_budget_status(budgetType: str = "department", budgetId: str = None,
     except Exception as e:
         return f"查詢預算狀態時發生錯誤: {str(e)}"
 
+# ================================
+# 分頁迭代器
+# ================================
+
+# 回應中可能存放資料列的欄位名稱（依優先順序）
+_PAGE_ROW_KEYS = ("data", "employees", "tasks", "items", "rows")
+
+
+def _extract_page(response: Any) -> Tuple[List[Any], Dict[str, Any]]:
+    """
+    從工具回應中取出資料列與分頁資訊
+
+    各模組的回應層數不同（例如 HR 為 result.result.data，
+    MIL 為 result.data.data），因此逐層往下找到第一個包含資料列的物件。
+
+    Returns:
+        (資料列, 資料列所在層的物件)
+    """
+    node = response
+    for _ in range(6):
+        if not isinstance(node, dict):
+            break
+        if node.get("success") is False:
+            error = node.get("error", node.get("message", "未知錯誤"))
+            if isinstance(error, dict):
+                error = error.get("message", error)
+            raise Exception(f"分頁查詢失敗: {error}")
+        for key in _PAGE_ROW_KEYS:
+            if isinstance(node.get(key), list):
+                return node[key], node
+        node = node.get("result", node.get("data"))
+    return [], {}
+
+
+def _page_info(meta: Dict[str, Any]) -> Dict[str, Any]:
+    """取出分頁資訊（可能在 pagination 子物件或同一層）"""
+    return meta.get("pagination") if isinstance(meta.get("pagination"), dict) else meta
+
+
+def _has_more_pages(meta: Dict[str, Any], rows: List[Any], page: int, page_size: int) -> bool:
+    """依回應中的分頁資訊判斷是否還有下一頁，沒有資訊時以本頁筆數推斷"""
+    pagination = _page_info(meta)
+    if pagination.get("hasMore") is not None:
+        return bool(pagination["hasMore"])
+    total_pages = pagination.get("totalPages")
+    if total_pages is not None:
+        return page < int(total_pages)
+    return len(rows) >= page_size
+
+
+class MCPPageIterator:
+    """
+    MCP 列表工具的自動分頁迭代器
+
+    逐筆產出資料列，消費第 N 頁時已在背景預先抓取第 N+1 頁。
+    記憶體中最多只保留兩頁資料，並可用 max_rows 限制總筆數。
+    若回應帶有 nextCursor，下一頁自動改用游標查詢，不再送出 page/offset。
+    同時支援同步（for）與非同步（async for）兩種用法。
+    """
+
+    def __init__(self, module: str, tool_name: str, parameters: Dict = None,
+                 page_size: int = 20, max_rows: int = None, paging: str = "page",
+                 prefetch: bool = True, client: "MCPClient" = None):
+        """
+        Args:
+            module: 工具模組名稱（hr/mil）
+            tool_name: 工具名稱
+            parameters: 查詢條件（不含分頁參數）
+            page_size: 每頁筆數
+            max_rows: 最多產出的資料筆數，None 表示不限制
+            paging: 分頁參數格式，page 為 page/limit，offset 為 offset/limit
+            prefetch: 是否在背景預先抓取下一頁
+            client: MCP 客戶端，預設使用全局實例
+        """
+        if paging not in ("page", "offset"):
+            raise ValueError(f"不支援的分頁格式: {paging}")
+        if page_size < 1:
+            raise ValueError("page_size 必須大於 0")
+
+        self.module = module
+        self.tool_name = tool_name
+        self.parameters = {k: v for k, v in (parameters or {}).items() if v is not None}
+        self.page_size = page_size
+        self.max_rows = max_rows
+        self.paging = paging
+        self.prefetch = prefetch
+        self.client = client or mcp_client
+
+    def _page_params(self, page: int, cursor: str = None) -> Dict:
+        """組合指定頁碼（或游標）的請求參數"""
+        params = dict(self.parameters)
+        params["limit"] = self.page_size
+        if cursor:
+            params["cursor"] = cursor
+        elif self.paging == "offset":
+            params["offset"] = (page - 1) * self.page_size
+        else:
+            params["page"] = page
+        return params
+
+    def _fetch(self, page: int, cursor: str = None) -> Tuple[List[Any], bool, Optional[str]]:
+        """抓取單頁，返回 (資料列, 是否還有下一頁, 下一頁游標)"""
+        response = self.client.call_tool(self.module, self.tool_name,
+                                         self._page_params(page, cursor))
+        rows, meta = _extract_page(response)
+        next_cursor = _page_info(meta).get("nextCursor")
+        has_more = bool(rows) and _has_more_pages(meta, rows, page, self.page_size)
+        return rows, has_more, next_cursor
+
+    def _remaining(self, yielded: int) -> Optional[int]:
+        return None if self.max_rows is None else self.max_rows - yielded
+
+    def __iter__(self) -> Iterator[Any]:
+        if self.max_rows is not None and self.max_rows <= 0:
+            return
+        executor = ThreadPoolExecutor(max_workers=1) if self.prefetch else None
+        try:
+            page = 1
+            rows, has_more, cursor = self._fetch(page)
+            yielded = 0
+            while True:
+                remaining = self._remaining(yielded)
+                if remaining is not None and remaining <= len(rows):
+                    rows, has_more = rows[:remaining], False
+
+                # 先送出下一頁請求，再消費本頁
+                pending = None
+                if has_more and executor:
+                    pending = executor.submit(self._fetch, page + 1, cursor)
+
+                for row in rows:
+                    yield row
+                yielded += len(rows)
+
+                if not has_more:
+                    break
+                page += 1
+                rows, has_more, cursor = pending.result() if pending else self._fetch(page, cursor)
+        finally:
+            if executor:
+                executor.shutdown(wait=False)
+
+    async def __aiter__(self) -> AsyncIterator[Any]:
+        if self.max_rows is not None and self.max_rows <= 0:
+            return
+        loop = asyncio.get_running_loop()
+        page = 1
+        rows, has_more, cursor = await loop.run_in_executor(None, self._fetch, page)
+        yielded = 0
+        pending = None
+        try:
+            while True:
+                remaining = self._remaining(yielded)
+                if remaining is not None and remaining <= len(rows):
+                    rows, has_more = rows[:remaining], False
+
+                # 先送出下一頁請求，再消費本頁
+                pending = None
+                if has_more and self.prefetch:
+                    pending = loop.run_in_executor(None, self._fetch, page + 1, cursor)
+
+                for row in rows:
+                    yield row
+                yielded += len(rows)
+
+                if not has_more:
+                    break
+                page += 1
+                if pending is None:
+                    pending = loop.run_in_executor(None, self._fetch, page, cursor)
+                rows, has_more, cursor = await pending
+                pending = None
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    def pages(self) -> Iterator[List[Any]]:
+        """以整頁為單位產出資料（同樣受 max_rows 限制）"""
+        batch = []
+        for row in self:
+            batch.append(row)
+            if len(batch) >= self.page_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+def iter_search_employees(name: str = None, department: str = None, titleName: str = None,
+                          status: str = "active", includeDetails: bool = False,
+                          page_size: int = 50, max_rows: int = None,
+                          prefetch: bool = True) -> MCPPageIterator:
+    """
+    自動分頁逐筆迭代員工搜尋結果
+
+    第一頁以 page/limit 查詢，之後依回應的 pagination.nextCursor 以游標取得下一頁。
+    模糊搜尋（fuzzy）只返回前 limit 筆，不支援分頁，因此不提供此參數。
+
+    Args:
+        name: 員工姓名
+        department: 部門名稱或代碼
+        titleName: 職位名稱
+        status: 員工狀態 (active/inactive/all)
+        includeDetails: 是否包含詳細資訊
+        page_size: 每頁筆數（對應 limit，上限 50）
+        max_rows: 最多返回筆數
+        prefetch: 是否預先抓取下一頁
+
+    Returns:
+        可用於 for / async for 的迭代器
+    """
+    params = {
+        "name": name,
+        "department": department,
+        "titleName": titleName,
+        "status": status,
+        "includeDetails": includeDetails
+    }
+    return MCPPageIterator("hr", "search-employees", params, page_size=page_size,
+                           max_rows=max_rows, paging="page", prefetch=prefetch)
+
+
+def iter_mil_list(page_size: int = 100, max_rows: int = None, prefetch: bool = True,
+                  **filters) -> MCPPageIterator:
+    """
+    自動分頁逐筆迭代 MIL 列表
+
+    Args:
+        page_size: 每頁筆數（對應 limit，上限 1000）
+        max_rows: 最多返回筆數
+        prefetch: 是否預先抓取下一頁
+        **filters: 與 get-mil-list 相同的過濾參數（如 status、driName、fields）
+
+    Returns:
+        可用於 for / async for 的迭代器
+    """
+    return MCPPageIterator("mil", "get-mil-list", filters, page_size=page_size,
+                           max_rows=max_rows, paging="page", prefetch=prefetch)
+
 # ================================
 # 工具註冊列表
 # ================================
@@ -482,6 +744,33 @@ def get_tools_status() -> Dict:
             "tools_list": []
         }
 
+def get_latency_stats(window: str = "5m", include_server: bool = True) -> Dict:
+    """
+    取得工具調用延遲的 p50 / p90 / p99
+    
+    Args:
+        window: 滑動視窗（1m / 5m / 15m / 1h / all）
+        include_server: 是否一併取得伺服器端（ToolManager.callTool）的延遲分位數
+    
+    Returns:
+        {"client": 客戶端量測（含網路往返）, "server": 伺服器端量測}
+        伺服器端草圖可加上 includeSketches=true 取得，並以 LatencySketch.from_dict 還原後合併
+    """
+    stats = {"client": latency_recorder.get_stats(window)}
+    if not include_server:
+        return stats
+
+    try:
+        server = mcp_client._make_request(
+            "GET", "/api/tools/stats", {"window": window}
+        ).get("latency")
+    except Exception as e:
+        logger.warning(f"取得伺服器端延遲統計失敗: {e}")
+        server = None
+
+    stats["server"] = server
+    return stats
+
 if __name__ == "__main__":
     # 執行連接測試
     test_mcp_connection()
@@ -0,0 +1,279 @@
+"""
+Prometheus 指標匯出
+以 Prometheus 文字格式（text/plain; version=0.0.4）輸出 Agent 行程的指標：
+MCP 工具調用延遲、LLM 首個 token 延遲（TTFT）與輸出速度（tokens/s）、對話處理時間。
+格式與 Node 端 GET /metrics 相同，設定 AGENT_METRICS_PORT 後以背景執行緒提供 /metrics。
+"""
+
+import logging
+import math
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 延遲直方圖的桶上限（秒）
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+# LLM 延遲通常較長
+LLM_LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120)
+TOKENS_PER_SECOND_BUCKETS = (1, 2, 5, 10, 20, 40, 80, 160)
+
+_METRIC_NAME_PATTERN = re.compile(r"^[a-zA-Z_:][a-zA-Z0-9_:]*$")
+_CJK_PATTERN = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af]")
+
+
+def _escape_label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    value = float(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape_label_value(v)}"' for k, v in labels.items()) + "}"
+
+
+class _Metric:
+    """指標基底類別"""
+
+    type = "untyped"
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        if not _METRIC_NAME_PATTERN.match(name):
+            raise ValueError(f"無效的指標名稱: {name}")
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self._series: Dict[tuple, dict] = {}
+        self._lock = threading.Lock()
+
+    def _labels(self, labels: Dict[str, str]) -> Dict[str, str]:
+        return {name: str(labels.get(name, "")) for name in self.label_names}
+
+    def _key(self, labels: Dict[str, str]) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def header(self) -> List[str]:
+        help_text = self.help.replace("\\", "\\\\").replace("\n", "\\n")
+        return [f"# HELP {self.name} {help_text}", f"# TYPE {self.name} {self.type}"]
+
+
+class Counter(_Metric):
+    """計數器（只增不減）"""
+
+    type = "counter"
+
+    def inc(self, labels: Dict[str, str] = None, value: float = 1) -> None:
+        labels = labels or {}
+        with self._lock:
+            entry = self._series.setdefault(self._key(labels), {"labels": self._labels(labels), "value": 0})
+            entry["value"] += value
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        with self._lock:
+            for entry in self._series.values():
+                lines.append(f"{self.name}{_format_labels(entry['labels'])} {_format_value(entry['value'])}")
+        return lines
+
+
+class Gauge(Counter):
+    """量測值（可增可減）"""
+
+    type = "gauge"
+
+    def set(self, labels: Dict[str, str] = None, value: float = 0) -> None:
+        labels = labels or {}
+        with self._lock:
+            self._series[self._key(labels)] = {"labels": self._labels(labels), "value": value}
+
+
+class Histogram(_Metric):
+    """直方圖（累積桶計數 + _sum + _count）"""
+
+    type = "histogram"
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, help_text, label_names)
+        self.buckets = sorted(buckets)
+
+    def observe(self, labels: Dict[str, str] = None, value: float = 0) -> None:
+        labels = labels or {}
+        with self._lock:
+            entry = self._series.get(self._key(labels))
+            if entry is None:
+                entry = {"labels": self._labels(labels), "counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+                self._series[self._key(labels)] = entry
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry["counts"][i] += 1
+                    break
+            entry["sum"] += value
+            entry["count"] += 1
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        with self._lock:
+            for entry in self._series.values():
+                labels = entry["labels"]
+                cumulative = 0
+                for bound, count in zip(self.buckets, entry["counts"]):
+                    cumulative += count
+                    bucket_labels = {**labels, "le": _format_value(float(bound))}
+                    lines.append(f"{self.name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+                lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': '+Inf'})} {entry['count']}")
+                lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(entry['sum'])}")
+                lines.append(f"{self.name}_count{_format_labels(labels)} {entry['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    """指標註冊表"""
+
+    def __init__(self):
+        self.metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self.metrics:
+            raise ValueError(f"指標已註冊: {metric.name}")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help_text, label_names))
+
+    def gauge(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, help_text, label_names))
+
+    def histogram(self, name: str, help_text: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help_text, label_names, buckets))
+
+    def render(self) -> str:
+        """輸出 Prometheus 文字格式"""
+        lines: List[str] = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# 全局指標註冊表
+registry = MetricsRegistry()
+
+tool_call_duration = registry.histogram(
+    "qwen_agent_tool_call_duration_seconds",
+    "MCP 工具調用延遲（秒，含網路往返）",
+    ("module", "tool", "status"),
+)
+llm_time_to_first_token = registry.histogram(
+    "qwen_agent_llm_time_to_first_token_seconds",
+    "LLM 首個輸出的延遲（秒）",
+    ("model",),
+    LLM_LATENCY_BUCKETS,
+)
+llm_tokens_per_second = registry.histogram(
+    "qwen_agent_llm_tokens_per_second",
+    "LLM 輸出速度（估計 token / 秒）",
+    ("model",),
+    TOKENS_PER_SECOND_BUCKETS,
+)
+llm_output_tokens = registry.counter(
+    "qwen_agent_llm_output_tokens_total",
+    "LLM 輸出 token 數（估計值）",
+    ("model",),
+)
+chat_duration = registry.histogram(
+    "qwen_agent_chat_duration_seconds",
+    "對話請求處理時間（秒）",
+    ("handler", "status"),
+    LLM_LATENCY_BUCKETS,
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    估計文字的 token 數
+    中日韓文字約一字一 token，其他文字約四個字元一 token（未使用模型的 tokenizer）
+    """
+    if not text:
+        return 0
+    cjk = len(_CJK_PATTERN.findall(text))
+    return cjk + math.ceil((len(text) - cjk) / 4)
+
+
+def record_llm_generation(model: str, started: float, first_token_at: Optional[float],
+                          finished: float, text: str) -> None:
+    """
+    記錄一次 LLM 生成的 TTFT 與輸出速度
+
+    Args:
+        model: 模型名稱
+        started / first_token_at / finished: time.perf_counter() 時間點
+        text: 最終輸出文字
+    """
+    labels = {"model": model}
+    tokens = estimate_tokens(text)
+    llm_output_tokens.inc(labels, tokens)
+
+    if first_token_at is None:
+        return
+    llm_time_to_first_token.observe(labels, first_token_at - started)
+    generation_seconds = finished - first_token_at
+    if tokens > 0 and generation_seconds > 0:
+        llm_tokens_per_second.observe(labels, tokens / generation_seconds)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # 抓取請求不寫入一般日誌
+        pass
+
+
+_server: Optional[ThreadingHTTPServer] = None
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0") -> Optional[ThreadingHTTPServer]:
+    """
+    以背景執行緒啟動 /metrics 端點（重複呼叫時沿用已啟動的伺服器）
+
+    Args:
+        port: 監聽埠號，0 或未設定時不啟動
+    """
+    global _server
+    if _server is not None or not port:
+        return _server
+
+    try:
+        _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    except OSError as e:
+        logger.warning(f"無法啟動指標端點 {host}:{port}: {e}")
+        return None
+
+    thread = threading.Thread(target=_server.serve_forever, name="metrics-exporter", daemon=True)
+    thread.start()
+    logger.info(f"Prometheus 指標端點已啟動: http://{host}:{_server.server_port}/metrics")
+    return _server
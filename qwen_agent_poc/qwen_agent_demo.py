@@ -6,6 +6,7 @@ Qwen-Agent PoC 主要測試腳本
 import os
 import json
 import logging
+import time
 from typing import Dict, List, Any
 from datetime import datetime
 
@@ -25,8 +26,10 @@ except ImportError as e:
     print("提示：請確認已安裝 qwen-agent 套件")
     exit(1)
 
-from config import QWEN_MODEL_CONFIG, AGENT_CONFIG, TEST_CASES
+from config import QWEN_MODEL_CONFIG, AGENT_CONFIG, TEST_CASES, METRICS_CONFIG
 from mcp_tools import test_mcp_connection
+from metrics_exporter import chat_duration, record_llm_generation, start_metrics_server
+from tracing import start_span
 from qwen_tools import get_qwen_tools, get_tool_descriptions
 from tool_result_enforcer import tool_result_enforcer
 
@@ -131,8 +134,24 @@ class SFDAQwenAgent:
 """
         return system_prompt.strip()
     
+    @staticmethod
+    def _has_content(item: Any) -> bool:
+        """判斷串流回應項目是否已包含輸出內容"""
+        if isinstance(item, list):
+            return any(SFDAQwenAgent._has_content(x) for x in item)
+        if isinstance(item, dict):
+            return bool(item.get('content') or item.get('text'))
+        return bool(item)
+
     def chat(self, message: str) -> str:
-        """與 Agent 進行對話，強制使用工具結果"""
+        """與 Agent 進行對話，強制使用工具結果（每輪對話為一個追蹤）"""
+        with start_span("agent.chat", root=True, message_length=len(message)):
+            return self._chat(message)
+    
+    def _chat(self, message: str) -> str:
+        """對話處理主體"""
+        started = time.perf_counter()
+        status = "error"
         try:
             logger.info(f"🗣️ 用戶輸入: {message}")
             
@@ -149,9 +168,17 @@ class SFDAQwenAgent:
             
             # 處理回應（生成器轉換為列表）
             tool_calls_made = []
+            first_token_at = None
             if hasattr(response, '__iter__') and hasattr(response, '__next__'):
-                # 這是一個生成器，轉換為列表
-                response_list = list(response)
+                # 這是一個生成器，轉換為列表（同時記錄首個輸出的時間）
+                response_list = []
+                with start_span("llm.agent_run", model=QWEN_MODEL_CONFIG["model"]) as run_span:
+                    for item in response:
+                        if first_token_at is None and self._has_content(item):
+                            first_token_at = time.perf_counter()
+                            if run_span:
+                                run_span.set_attribute("ttftMs", round((first_token_at - started) * 1000, 1))
+                        response_list.append(item)
                 logger.info(f"收到 {len(response_list)} 個回應項目")
                 
                 if response_list:
@@ -189,6 +216,11 @@ class SFDAQwenAgent:
             else:
                 final_response = str(response)
             
+            record_llm_generation(
+                QWEN_MODEL_CONFIG["model"], started, first_token_at,
+                time.perf_counter(), final_response
+            )
+            
             # 🚨 強制工具結果執行檢查
             context = {"employee_id": self._extract_employee_id(message)}
             
@@ -216,6 +248,7 @@ class SFDAQwenAgent:
             })
             
             logger.info(f"🤖 Agent 回應: {final_response[:100]}...")
+            status = "success"
             return final_response
             
         except Exception as e:
@@ -224,6 +257,8 @@ class SFDAQwenAgent:
             logger.error(error_msg)
             logger.error(f"完整錯誤追蹤: {traceback.format_exc()}")
             return error_msg
+        finally:
+            chat_duration.observe({"handler": "agent", "status": status}, time.perf_counter() - started)
     
     def _extract_employee_id(self, message: str) -> str:
         """從訊息中提取員工編號"""
@@ -408,6 +443,7 @@ def main():
     """主程式入口"""
     print("🚀 SFDA Nexus × Qwen-Agent PoC 測試程式")
     print("🔧 正在初始化 Agent...")
+    start_metrics_server(METRICS_CONFIG["port"], METRICS_CONFIG["host"])
     
     try:
         # 建立 Agent 實例
@@ -11,8 +11,10 @@ from mcp_tools import (
     create_task, get_task_list, get_budget_status
 )
 from tool_result_enforcer import tool_result_enforcer
+from structured_log import ToolLogger
 
 logger = logging.getLogger(__name__)
+tool_log = ToolLogger(logger)
 
 class GetEmployeeInfoTool(BaseTool):
     name = "get_employee_info"
@@ -46,7 +48,7 @@ class GetEmployeeInfoTool(BaseTool):
         )
         
         # 記錄詳細執行過程
-        logger.info(f"🔧 執行 get_employee_info: {employeeId} -> {result}")
+        tool_log.info("🔧 執行工具", tool="hr.get_employee_info", employeeId=employeeId, result=result)
         
         # 檢查結果類型並強制返回實際結果
         if isinstance(result, dict) and "error" in result:
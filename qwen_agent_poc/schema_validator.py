@@ -0,0 +1,256 @@
+"""
+MCP 工具參數驗證
+依 /api/{module}/tools 回傳的 inputSchema 在本地驗證參數，
+不合法的呼叫在送出 HTTP 請求前就被拒絕。
+
+檢查順序與錯誤訊息與 mcp-server 的 BaseTool.validateInput 相同：
+未知參數 → 必要參數 → 各欄位類型與約束（依 schema 順序）。
+每個 schema 只編譯一次，之後重複使用編譯後的驗證函式。
+"""
+
+import math
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+
+class ParameterValidationError(ValueError):
+    """參數驗證失敗"""
+
+    def __init__(self, message: str, details: Optional[Dict] = None):
+        super().__init__(message)
+        self.details = details or {}
+
+
+def _js_str(value: Any) -> str:
+    """以 JavaScript 字串轉換的格式輸出，讓錯誤訊息與伺服器端一致"""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if value is None:
+        return "null"
+    return str(value)
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and not (
+        isinstance(value, float) and math.isnan(value)
+    )
+
+
+def _is_integer(value: Any) -> bool:
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, int):
+        return True
+    return isinstance(value, float) and value.is_integer()
+
+
+# 與 BaseTool._validateType 相同的類型判斷
+_TYPE_CHECKS = {
+    "string": lambda value: isinstance(value, str),
+    "number": _is_number,
+    "integer": _is_integer,
+    "boolean": lambda value: isinstance(value, bool),
+    "array": lambda value: isinstance(value, (list, tuple)),
+    "object": lambda value: isinstance(value, dict),
+}
+
+_TYPE_NAMES = {
+    str: "string",
+    bool: "boolean",
+    int: "number",
+    float: "number",
+    list: "object",
+    tuple: "object",
+    dict: "object",
+}
+
+
+def _compile_constraints(schema: Dict) -> List[Callable[[Any], Optional[str]]]:
+    """將欄位約束編譯成檢查函式列表，每個函式返回錯誤訊息或 None"""
+    checks = []
+    field_type = schema.get("type")
+
+    if field_type == "string":
+        min_length = schema.get("minLength")
+        max_length = schema.get("maxLength")
+        pattern = schema.get("pattern")
+        if min_length:
+            checks.append(
+                lambda value: f"String too short: minimum {min_length} characters"
+                if len(value) < min_length
+                else None
+            )
+        if max_length:
+            checks.append(
+                lambda value: f"String too long: maximum {max_length} characters"
+                if len(value) > max_length
+                else None
+            )
+        try:
+            regex = re.compile(pattern) if pattern else None
+        except re.error:
+            # JavaScript 專用的正規表示式語法交由伺服器端驗證
+            regex = None
+        if regex:
+            checks.append(
+                lambda value: f"String does not match required pattern: {pattern}"
+                if not regex.search(value)
+                else None
+            )
+        if schema.get("enum"):
+            allowed = schema["enum"]
+            message = "Value must be one of: " + ", ".join(_js_str(item) for item in allowed)
+            checks.append(lambda value: message if value not in allowed else None)
+
+    elif field_type in ("number", "integer"):
+        minimum = schema.get("minimum")
+        maximum = schema.get("maximum")
+        multiple_of = schema.get("multipleOf")
+        if minimum is not None:
+            checks.append(
+                lambda value: f"Number too small: minimum {_js_str(minimum)}"
+                if value < minimum
+                else None
+            )
+        if maximum is not None:
+            checks.append(
+                lambda value: f"Number too large: maximum {_js_str(maximum)}"
+                if value > maximum
+                else None
+            )
+        if multiple_of:
+            checks.append(
+                lambda value: f"Number must be multiple of {_js_str(multiple_of)}"
+                if math.fmod(value, multiple_of) != 0
+                else None
+            )
+
+    elif field_type == "array":
+        min_items = schema.get("minItems")
+        max_items = schema.get("maxItems")
+        if min_items:
+            checks.append(
+                lambda value: f"Array too short: minimum {min_items} items"
+                if len(value) < min_items
+                else None
+            )
+        if max_items:
+            checks.append(
+                lambda value: f"Array too long: maximum {max_items} items"
+                if len(value) > max_items
+                else None
+            )
+        if schema.get("uniqueItems"):
+            checks.append(
+                lambda value: "Array items must be unique"
+                if len({repr(item) for item in value}) != len(value)
+                else None
+            )
+
+    return checks
+
+
+def _compile_field(field_name: str, schema: Dict) -> Callable[[Any], None]:
+    """編譯單一欄位的驗證函式"""
+    expected_type = schema.get("type")
+    type_check = _TYPE_CHECKS.get(expected_type)
+    checks = _compile_constraints(schema)
+
+    def validate(value: Any) -> None:
+        if type_check and not type_check(value):
+            raise ParameterValidationError(
+                f"Invalid type for parameter {field_name}",
+                {
+                    "field": field_name,
+                    "expected": expected_type,
+                    "received": _TYPE_NAMES.get(type(value), "object"),
+                },
+            )
+        for check in checks:
+            message = check(value)
+            if message:
+                raise ParameterValidationError(
+                    f"Parameter '{field_name}': {message}", {"field": field_name}
+                )
+
+    return validate
+
+
+def compile_validator(schema: Optional[Dict]) -> Callable[[Dict], Dict]:
+    """
+    將 JSON Schema 編譯成驗證函式
+
+    Args:
+        schema: 工具的 inputSchema（type: "object"）
+
+    Returns:
+        (params) -> params，驗證失敗時拋出 ParameterValidationError
+    """
+    schema = schema or {}
+    properties = schema.get("properties")
+    allowed = list(properties) if properties else []
+    allowed_set = set(allowed)
+    allowed_text = ", ".join(allowed)
+    required = list(schema.get("required") or [])
+    fields = [(name, _compile_field(name, properties[name] or {})) for name in allowed]
+
+    def validate(params: Dict) -> Dict:
+        if not isinstance(params, dict):
+            raise ParameterValidationError(
+                "Invalid input parameters", {"expected": "object"}
+            )
+
+        # 檢查未知參數，防止 AI 幻覺
+        if properties:
+            unknown = [name for name in params if name not in allowed_set]
+            if unknown:
+                raise ParameterValidationError(
+                    f"Unknown parameter(s): {', '.join(unknown)}. "
+                    f"Allowed parameters: {allowed_text}",
+                    {"unknownParameters": unknown, "allowedParameters": allowed},
+                )
+
+        # 檢查必要參數
+        for name in required:
+            if name not in params:
+                raise ParameterValidationError(
+                    f"Missing required parameter: {name}", {"missingField": name}
+                )
+
+        # 依 schema 順序檢查參數類型和約束條件
+        for name, validate_field in fields:
+            if name in params:
+                validate_field(params[name])
+
+        return params
+
+    return validate
+
+
+def schema_from_tool_info(tool_info: Dict) -> Optional[Dict]:
+    """
+    從工具資訊取得 JSON Schema
+
+    伺服器回傳 inputSchema；舊格式的 parameters（參數名稱 -> 說明，
+    以 required 旗標標示必填）轉換成等價的 schema。
+    """
+    schema = tool_info.get("inputSchema")
+    if schema:
+        return schema
+
+    parameters = tool_info.get("parameters")
+    if not parameters:
+        return None
+    if "properties" in parameters:
+        return parameters
+
+    return {
+        "type": "object",
+        "properties": {
+            name: {key: value for key, value in info.items() if key != "required"}
+            for name, info in parameters.items()
+        },
+        "required": [name for name, info in parameters.items() if info.get("required")],
+    }
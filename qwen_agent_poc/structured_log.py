@@ -0,0 +1,174 @@
+"""
+工具調用結構化日誌
+以「事件 + 欄位」記錄工具調用，避免以 f-string 把整個回應轉成字串：
+- 等級未啟用時直接返回，不建立任何字串
+- 欄位延遲到 handler 真正輸出時才格式化
+- 每個欄位依 LOGGING_CONFIG["max_field_chars"] 截斷，大型 dict / list 只走訪輸出得到的部分
+- 依 LOGGING_CONFIG["tool_sample_rates"] 對 INFO 以下的日誌按工具取樣
+"""
+
+import json
+import logging
+import random
+from typing import Any, Dict, Optional
+
+from config import LOGGING_CONFIG
+
+_ELLIPSIS = "…"
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """
+    解析取樣率設定
+
+    Args:
+        spec: 例如 "hr.get_employee_list=0.1,*=1"（* 為預設值）
+
+    Returns:
+        工具名稱 -> 取樣率（0~1）
+    """
+    rates = {}
+    for item in (spec or "").split(","):
+        if "=" not in item:
+            continue
+        name, _, value = item.partition("=")
+        try:
+            rates[name.strip()] = min(max(float(value), 0.0), 1.0)
+        except ValueError:
+            continue
+    return rates
+
+
+def summarize(value: Any, limit: int) -> str:
+    """
+    將值轉成約 limit 個字元的字串（另加省略標記與括號）
+    dict / list 逐項輸出，超過上限即停止走訪，並標示省略的項目數
+    """
+    parts = []
+    _write(value, parts, [limit])
+    return "".join(parts)
+
+
+def _write(value: Any, parts: list, budget: list) -> None:
+    """依剩餘額度 budget[0] 輸出 value，額度用完時停止"""
+    if budget[0] <= 0:
+        return
+
+    if isinstance(value, dict):
+        parts.append("{")
+        budget[0] -= 1
+        total = len(value)
+        for index, (key, item) in enumerate(value.items()):
+            if budget[0] <= 0:
+                parts.append(f"{_ELLIPSIS}(+{total - index} keys)")
+                break
+            if index:
+                parts.append(", ")
+                budget[0] -= 2
+            key_text = f"{key}: "
+            parts.append(key_text)
+            budget[0] -= len(key_text)
+            _write(item, parts, budget)
+        parts.append("}")
+        return
+
+    if isinstance(value, (list, tuple)):
+        parts.append("[")
+        budget[0] -= 1
+        total = len(value)
+        for index, item in enumerate(value):
+            if budget[0] <= 0:
+                parts.append(f"{_ELLIPSIS}(+{total - index} items)")
+                break
+            if index:
+                parts.append(", ")
+                budget[0] -= 2
+            _write(item, parts, budget)
+        parts.append("]")
+        return
+
+    if isinstance(value, str):
+        text = value
+    elif isinstance(value, (int, float, bool)) or value is None:
+        text = json.dumps(value)
+    else:
+        text = str(value)
+
+    if len(text) > budget[0]:
+        text = text[:max(budget[0], 0)] + f"{_ELLIPSIS}({len(text)} chars)"
+    parts.append(text)
+    budget[0] -= len(text)
+
+
+class LazyMessage:
+    """延遲格式化的日誌訊息，只有在 handler 輸出時才呼叫 __str__"""
+
+    __slots__ = ("event", "fields", "limit")
+
+    def __init__(self, event: str, fields: Dict[str, Any], limit: int):
+        self.event = event
+        self.fields = fields
+        self.limit = limit
+
+    def __str__(self) -> str:
+        items = " ".join(f"{key}={summarize(value, self.limit)}" for key, value in self.fields.items())
+        return f"{self.event} {items}" if items else self.event
+
+
+class ToolLogger:
+    """工具調用日誌記錄器"""
+
+    def __init__(self, logger: logging.Logger, max_field_chars: int = None,
+                 sample_rates: Dict[str, float] = None):
+        self.logger = logger
+        self.max_field_chars = max_field_chars or LOGGING_CONFIG.get("max_field_chars", 500)
+        if sample_rates is None:
+            sample_rates = parse_sample_rates(LOGGING_CONFIG.get("tool_sample_rates", ""))
+        self.sample_rates = sample_rates
+        self.default_rate = sample_rates.get("*", 1.0)
+        self.sampled_out = 0
+
+    def _sampled(self, level: int, tool: Optional[str]) -> bool:
+        if level >= logging.WARNING:
+            return True
+        rate = self.sample_rates.get(tool, self.default_rate) if tool else self.default_rate
+        if rate >= 1.0:
+            return True
+        if rate > 0 and random.random() < rate:
+            return True
+        self.sampled_out += 1
+        return False
+
+    def log(self, level: int, event: str, tool: str = None, **fields) -> None:
+        """
+        記錄結構化日誌
+
+        Args:
+            level: logging 等級
+            event: 事件描述
+            tool: 工具名稱（用於取樣，並作為 tool 欄位輸出）
+            fields: 其他欄位，輸出時各自截斷
+        """
+        if not self.logger.isEnabledFor(level) or not self._sampled(level, tool):
+            return
+        if tool:
+            fields = {"tool": tool, **fields}
+        self.logger.log(level, "%s", LazyMessage(event, fields, self.max_field_chars),
+                        extra={"event": event, "fields": fields})
+
+    def debug(self, event: str, tool: str = None, **fields) -> None:
+        self.log(logging.DEBUG, event, tool, **fields)
+
+    def info(self, event: str, tool: str = None, **fields) -> None:
+        self.log(logging.INFO, event, tool, **fields)
+
+    def warning(self, event: str, tool: str = None, **fields) -> None:
+        self.log(logging.WARNING, event, tool, **fields)
+
+    def error(self, event: str, tool: str = None, **fields) -> None:
+        self.log(logging.ERROR, event, tool, **fields)
+
+
+def get_tool_logger(name: str) -> ToolLogger:
+    """取得指定名稱的工具調用日誌記錄器"""
+    return ToolLogger(logging.getLogger(name))
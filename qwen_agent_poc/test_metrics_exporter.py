@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Prometheus 指標端點抓取測試
+啟動本機 /metrics 端點，抓取後依 Prometheus 文字格式規則驗證輸出
+"""
+
+import os
+import re
+import sys
+import urllib.request
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from metrics_exporter import (
+    CONTENT_TYPE, chat_duration, record_llm_generation, start_metrics_server, tool_call_duration
+)
+
+SAMPLE_LINE = re.compile(
+    r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{([a-zA-Z_][a-zA-Z0-9_]*="([^"\\\n]|\\.)*",?)*\})? '
+    r'(-?[0-9.e+-]+|[+-]Inf|NaN)$'
+)
+
+
+def validate_exposition(text: str) -> dict:
+    """驗證 Prometheus 文字格式，返回指標名稱與類型"""
+    assert text.endswith("\n"), "輸出必須以換行結尾"
+    types = {}
+    for line in text.rstrip("\n").split("\n"):
+        if line.startswith("# HELP "):
+            continue
+        if line.startswith("# TYPE "):
+            _, _, name, metric_type = line.split(" ")
+            assert metric_type in ("counter", "gauge", "histogram", "summary", "untyped"), line
+            assert name not in types, f"重複的 TYPE: {name}"
+            types[name] = metric_type
+            continue
+        match = SAMPLE_LINE.match(line)
+        assert match, f"格式錯誤: {line}"
+        base = re.sub(r"_(bucket|sum|count)$", "", match.group(1))
+        assert match.group(1) in types or types.get(base) == "histogram", f"未宣告的指標: {line}"
+    return types
+
+
+def test_metrics_scrape():
+    """啟動端點並驗證抓取結果"""
+    print("🧪 開始測試 Prometheus 指標端點...")
+
+    tool_call_duration.observe({"module": "hr", "tool": "get_employee_info", "status": "success"}, 0.12)
+    chat_duration.observe({"handler": "agent", "status": "success"}, 3.4)
+    record_llm_generation("qwen3:8b", 0.0, 0.8, 2.8, "員工 A123456 的資料如下 name: test")
+
+    server = start_metrics_server(19091, "127.0.0.1")
+    assert server is not None, "指標端點啟動失敗"
+    with urllib.request.urlopen(f"http://127.0.0.1:{server.server_port}/metrics", timeout=5) as response:
+        assert response.headers["Content-Type"] == CONTENT_TYPE
+        text = response.read().decode("utf-8")
+
+    types = validate_exposition(text)
+    for name in ("qwen_agent_tool_call_duration_seconds",
+                 "qwen_agent_llm_time_to_first_token_seconds",
+                 "qwen_agent_llm_tokens_per_second"):
+        assert types.get(name) == "histogram", f"缺少指標: {name}"
+
+    print(f"✅ 格式驗證通過，共 {len(types)} 個指標")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    test_metrics_scrape()
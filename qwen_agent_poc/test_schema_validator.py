@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+動態工具參數驗證測試
+驗證錯誤訊息與 MCP Server 端一致，且不合法的呼叫不會送出 HTTP 請求
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from schema_validator import ParameterValidationError, compile_validator, schema_from_tool_info
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "status": {"type": "string", "enum": ["OnGoing", "Completed"]},
+        "code": {"type": "string", "pattern": "^[A-Z]{2}\\d+$"},
+        "limit": {"type": "integer", "minimum": 1, "maximum": 100},
+        "tags": {"type": "array", "uniqueItems": True},
+    },
+    "required": ["status"],
+}
+
+
+def _error_of(validate, params):
+    try:
+        validate(params)
+    except ParameterValidationError as e:
+        return str(e)
+    raise AssertionError(f"預期驗證失敗: {params}")
+
+
+def test_schema_validator():
+    """測試參數驗證"""
+    print("🧪 測試動態工具參數驗證...")
+    validate = compile_validator(SCHEMA)
+
+    # 1. 合法參數
+    params = {"status": "OnGoing", "limit": 20.0, "code": "AB12"}
+    assert validate(params) is params
+    print("✅ 合法參數通過")
+
+    # 2. 未知參數與必要參數
+    assert _error_of(validate, {"status": "OnGoing", "foo": 1}) == (
+        "Unknown parameter(s): foo. Allowed parameters: status, code, limit, tags"
+    )
+    assert _error_of(validate, {"limit": 1}) == "Missing required parameter: status"
+    print("✅ 未知參數與必要參數")
+
+    # 3. 類型與約束，依 schema 順序回報第一個錯誤
+    assert _error_of(validate, {"status": "OnGoing", "limit": True}) == "Invalid type for parameter limit"
+    assert _error_of(validate, {"status": "OnGoing", "limit": 500}) == (
+        "Parameter 'limit': Number too large: maximum 100"
+    )
+    assert _error_of(validate, {"limit": 0, "code": "x", "status": "OnGoing"}) == (
+        "Parameter 'code': String does not match required pattern: ^[A-Z]{2}\\d+$"
+    )
+    assert _error_of(validate, {"status": "Done"}) == (
+        "Parameter 'status': Value must be one of: OnGoing, Completed"
+    )
+    assert _error_of(validate, {"status": "OnGoing", "tags": [1, 1]}) == (
+        "Parameter 'tags': Array items must be unique"
+    )
+    print("✅ 類型與約束錯誤訊息")
+
+    # 4. 舊格式 parameters 轉換
+    schema = schema_from_tool_info({
+        "name": "get_employee_info",
+        "parameters": {"employeeId": {"type": "string", "required": True}},
+    })
+    assert schema["required"] == ["employeeId"]
+    assert _error_of(compile_validator(schema), {}) == "Missing required parameter: employeeId"
+    print("✅ 舊格式參數轉換")
+
+    # 5. 驗證失敗時不送出請求
+    import dynamic_mcp_tools
+    calls = []
+    dynamic_mcp_tools.requests.post = lambda *args, **kwargs: calls.append(args)
+
+    manager = dynamic_mcp_tools.DynamicMCPToolManager(base_url="http://localhost:0")
+    tool = manager.generate_tool_function("tasks", {"name": "get-mil-list", "inputSchema": SCHEMA})
+    result = tool(status="OnGoing", limit=0, code=None)
+    assert "Number too small: minimum 1" in result, result
+    assert calls == []
+    print("✅ 不合法的呼叫在本地被拒絕")
+
+    print("🎉 所有測試通過")
+
+
+if __name__ == "__main__":
+    test_schema_validator()
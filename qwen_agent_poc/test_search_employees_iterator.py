@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+員工搜尋分頁迭代器測試
+以假的 MCP 客戶端模擬 hr/search-employees，驗證迭代器依 nextCursor 取得後續頁面
+"""
+
+import asyncio
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import mcp_tools
+from mcp_tools import iter_search_employees
+
+EMPLOYEES = [{"employeeNo": f"A{i:06d}", "name": f"員工{i}"} for i in range(1, 6)]
+
+
+class _FakeClient:
+    """依游標分頁返回員工，記錄每次呼叫的參數"""
+
+    def __init__(self):
+        self.calls = []
+
+    def call_tool(self, module, tool_name, parameters):
+        self.calls.append((module, tool_name, dict(parameters)))
+        limit = parameters["limit"]
+        cursor = parameters.get("cursor")
+        start = int(cursor) if cursor else (parameters.get("page", 1) - 1) * limit
+        rows = EMPLOYEES[start:start + limit]
+        has_more = start + limit < len(EMPLOYEES)
+        return {
+            "success": True,
+            "result": {
+                "data": rows,
+                "pagination": {
+                    "page": 1,
+                    "limit": limit,
+                    "total": len(EMPLOYEES),
+                    "hasMore": has_more,
+                    "nextCursor": str(start + limit) if has_more else None,
+                },
+            },
+        }
+
+
+def _employee_nos(rows):
+    return [row["employeeNo"] for row in rows]
+
+
+def test_search_employees_iterator():
+    """測試依 nextCursor 自動分頁"""
+    print("🧪 開始測試員工搜尋分頁迭代器...")
+    client = _FakeClient()
+    original = mcp_tools.mcp_client
+    mcp_tools.mcp_client = client
+    try:
+        # 1. 第一頁以 page 查詢，之後改用游標，不再送出 page
+        rows = list(iter_search_employees(department="研發部", page_size=2, prefetch=False))
+        assert _employee_nos(rows) == _employee_nos(EMPLOYEES), rows
+        assert [call[:2] for call in client.calls] == [("hr", "search-employees")] * 3
+        first, *rest = [call[2] for call in client.calls]
+        assert first == {"department": "研發部", "status": "active", "includeDetails": False,
+                         "limit": 2, "page": 1}, first
+        assert [params.get("cursor") for params in rest] == ["2", "4"], rest
+        assert all("page" not in params for params in rest), rest
+        print("✅ 依 nextCursor 取得後續頁面")
+
+        # 2. 預先抓取與 max_rows
+        client.calls.clear()
+        rows = list(iter_search_employees(page_size=2, max_rows=3))
+        assert _employee_nos(rows) == _employee_nos(EMPLOYEES[:3]), rows
+        assert len(client.calls) == 2, client.calls
+        print("✅ 預先抓取並限制總筆數")
+
+        # 3. async for
+        async def collect():
+            return [row async for row in iter_search_employees(page_size=2)]
+
+        rows = asyncio.run(collect())
+        assert _employee_nos(rows) == _employee_nos(EMPLOYEES), rows
+        print("✅ 非同步迭代")
+    finally:
+        mcp_tools.mcp_client = original
+
+    print("🎉 所有測試通過")
+
+
+if __name__ == "__main__":
+    test_search_employees_iterator()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+工具調用結構化日誌測試
+驗證欄位截斷、延遲格式化、等級停用時的快速返回與按工具取樣
+"""
+
+import logging
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from structured_log import ToolLogger, parse_sample_rates, summarize
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+class _Exploding:
+    """被轉成字串時拋出例外，用於確認沒有提前格式化"""
+
+    def __str__(self):
+        raise AssertionError("不應格式化")
+
+
+def _make_logger(level):
+    logger = logging.getLogger(f"test_structured_log.{level}")
+    logger.handlers.clear()
+    logger.propagate = False
+    logger.setLevel(level)
+    handler = _ListHandler()
+    logger.addHandler(handler)
+    return logger, handler
+
+
+def test_structured_log():
+    print("🧪 開始測試工具調用結構化日誌...")
+
+    # 1. 大型回應只輸出前段並標示省略數量
+    payload = {"success": True, "data": [{"id": i, "name": "王小明"} for i in range(100000)]}
+    text = summarize(payload, 200)
+    assert len(text) < 300, f"截斷後仍過長: {len(text)}"
+    assert "items)" in text, text
+    assert summarize("x" * 1000, 10).endswith("(1000 chars)")
+    print("✅ 欄位截斷")
+
+    # 2. 等級停用時不格式化也不取樣
+    logger, handler = _make_logger(logging.WARNING)
+    ToolLogger(logger, sample_rates={}).info("工具調用結果", tool="hr.get_employee_list", result=_Exploding())
+    assert handler.messages == []
+    print("✅ 等級停用時快速返回")
+
+    # 3. 啟用時輸出事件與欄位
+    logger, handler = _make_logger(logging.INFO)
+    tool_log = ToolLogger(logger, max_field_chars=50, sample_rates={})
+    tool_log.info("工具調用結果", tool="hr.get_employee_info", elapsed_ms=12.5, result=payload)
+    message = handler.messages[0]
+    assert message.startswith("工具調用結果 tool=hr.get_employee_info elapsed_ms=12.5 result={success: true"), message
+    print("✅ 結構化輸出")
+
+    # 4. 按工具取樣，警告與錯誤不取樣
+    rates = parse_sample_rates("hr.get_employee_list=0, *=1, invalid=abc")
+    assert rates == {"hr.get_employee_list": 0.0, "*": 1.0}
+    logger, handler = _make_logger(logging.INFO)
+    tool_log = ToolLogger(logger, sample_rates=rates)
+    for _ in range(10):
+        tool_log.info("工具調用結果", tool="hr.get_employee_list", result=payload)
+    tool_log.info("工具調用結果", tool="hr.get_employee_info", result={})
+    tool_log.error("工具調用失敗", tool="hr.get_employee_list", error="timeout")
+    assert len(handler.messages) == 2, handler.messages
+    assert tool_log.sampled_out == 10
+    print("✅ 按工具取樣")
+
+    print("🎉 所有測試通過")
+
+
+if __name__ == "__main__":
+    test_structured_log()
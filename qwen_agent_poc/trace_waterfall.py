@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+追蹤瀑布圖
+合併 Agent（traces.jsonl）與 MCP Server（mcp-server/src/logs/traces.jsonl）的 span，
+依 trace id 分組後，以縮排與時間軸列出每輪對話的各段耗時。
+
+使用方式：
+    python trace_waterfall.py                          # 最近 5 輪對話
+    python trace_waterfall.py --last 1 --width 80
+    python trace_waterfall.py --trace 0af7651916cd43dd8448eb211c80319c
+    python trace_waterfall.py traces.jsonl ../mcp-server/src/logs/traces.jsonl
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import defaultdict
+from typing import Dict, List
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_FILES = [
+    os.getenv("AGENT_TRACE_FILE", os.path.join(_HERE, "traces.jsonl")),
+    os.getenv("TRACE_FILE", os.path.join(_HERE, "..", "mcp-server", "src", "logs", "traces.jsonl")),
+]
+
+
+def load_spans(paths: List[str]) -> Dict[str, List[dict]]:
+    """讀取 JSONL 檔案並依 trace id 分組（略過不存在的檔案與無法解析的行）"""
+    traces: Dict[str, List[dict]] = defaultdict(list)
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    span = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if span.get("traceId") and span.get("spanId"):
+                    traces[span["traceId"]].append(span)
+    return traces
+
+
+def _ordered(spans: List[dict]) -> List[tuple]:
+    """依父子關係排出深度優先順序，返回 (深度, span)"""
+    by_id = {span["spanId"]: span for span in spans}
+    children: Dict[str, List[dict]] = defaultdict(list)
+    roots = []
+    for span in spans:
+        parent = span.get("parentSpanId")
+        if parent and parent in by_id:
+            children[parent].append(span)
+        else:
+            roots.append(span)
+
+    result = []
+
+    def visit(span, depth):
+        result.append((depth, span))
+        for child in sorted(children[span["spanId"]], key=lambda s: s["startTime"]):
+            visit(child, depth + 1)
+
+    for root in sorted(roots, key=lambda s: s["startTime"]):
+        visit(root, 0)
+    return result
+
+
+def render_waterfall(trace_id: str, spans: List[dict], width: int = 60) -> str:
+    """輸出單一追蹤的瀑布圖"""
+    start = min(span["startTime"] for span in spans)
+    end = max(span["startTime"] + span["durationMs"] for span in spans)
+    total = max(end - start, 0.001)
+
+    ordered = _ordered(spans)
+    label_width = max(len("  " * depth + span["name"]) for depth, span in ordered)
+    label_width = min(max(label_width, 20), 60)
+
+    lines = [f"Trace {trace_id}  總耗時 {total:.1f} ms  ({len(spans)} spans)"]
+    for depth, span in ordered:
+        offset = span["startTime"] - start
+        begin = int(offset / total * width)
+        length = max(1, int(round(span["durationMs"] / total * width)))
+        bar = " " * begin + ("█" if span.get("status") != "error" else "▓") * min(length, width - begin)
+        label = ("  " * depth + span["name"])[:label_width].ljust(label_width)
+        service = span.get("service", "")[:10].ljust(10)
+        lines.append(
+            f"{label} {service} {offset:9.1f} {span['durationMs']:9.1f} ms |{bar.ljust(width)}|"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="顯示每輪對話的追蹤瀑布圖")
+    parser.add_argument("files", nargs="*", help="JSONL 追蹤檔（預設為 Agent 與 MCP Server 的追蹤檔）")
+    parser.add_argument("--trace", help="只顯示指定的 trace id")
+    parser.add_argument("--last", type=int, default=5, help="顯示最近幾輪對話（預設 5）")
+    parser.add_argument("--width", type=int, default=60, help="時間軸寬度（字元）")
+    args = parser.parse_args()
+
+    traces = load_spans(args.files or DEFAULT_FILES)
+    if args.trace:
+        selected = [args.trace] if args.trace in traces else []
+    else:
+        selected = sorted(traces, key=lambda t: min(s["startTime"] for s in traces[t]))[-args.last:]
+
+    if not selected:
+        print("找不到追蹤資料（請確認已設定 TRACING_ENABLED=true）")
+        return 1
+
+    for trace_id in selected:
+        print(render_waterfall(trace_id, traces[trace_id], args.width))
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""
+輕量級請求追蹤
+在 SFDAQwenAgent.chat 與 UI 處理函數建立追蹤，MCPClient 以 W3C traceparent 標頭傳給 MCP Server，
+伺服器端（loggingMiddleware → ToolManager.callTool → DatabaseService.query）會延續同一個 trace id。
+結束的 span 以 JSONL 寫入 TRACING_CONFIG["file"]，可用 trace_waterfall.py 檢視每輪對話的瀑布圖。
+"""
+
+import contextvars
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from config import TRACING_CONFIG
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "qwen-agent"
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+_write_lock = threading.Lock()
+
+
+class Span:
+    """追蹤片段"""
+
+    def __init__(self, name: str, trace_id: str = None, parent_span_id: str = None,
+                 attributes: Dict[str, Any] = None):
+        self.trace_id = trace_id or secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent_span_id
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.start_time = time.time() * 1000
+        self._started = time.perf_counter()
+        self.status = "ok"
+        self.ended = False
+
+    def set_attribute(self, key: str, value: Any) -> "Span":
+        self.attributes[key] = value
+        return self
+
+    def traceparent(self) -> str:
+        """輸出 traceparent 標頭值"""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def end(self, status: str = None) -> None:
+        """結束 span 並寫入追蹤檔案"""
+        if self.ended:
+            return
+        self.ended = True
+        if status:
+            self.status = status
+
+        _export({
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_span_id,
+            "name": self.name,
+            "service": SERVICE_NAME,
+            "startTime": round(self.start_time, 3),
+            "durationMs": round((time.perf_counter() - self._started) * 1000, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        })
+
+
+def _export(record: Dict[str, Any]) -> None:
+    """追加寫入一筆 span（追蹤失敗不影響對話處理）"""
+    try:
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        path = TRACING_CONFIG["file"]
+        with _write_lock:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(line)
+    except Exception as e:
+        logger.warning(f"寫入追蹤檔案失敗: {e}")
+
+
+def get_current_span() -> Optional[Span]:
+    """取得目前的 span"""
+    return _current_span.get()
+
+
+def current_traceparent() -> Optional[str]:
+    """取得目前 span 的 traceparent 標頭值（沒有進行中的追蹤時返回 None）"""
+    span = _current_span.get()
+    return span.traceparent() if span else None
+
+
+@contextmanager
+def start_span(name: str, root: bool = False, **attributes) -> Iterator[Optional[Span]]:
+    """
+    建立 span 並設為目前的 span
+
+    Args:
+        name: span 名稱
+        root: 沒有上層 span 時是否建立新的追蹤（對話入口使用）
+        attributes: span 屬性
+
+    未啟用追蹤、或非入口且沒有上層 span 時 yield None
+    """
+    parent = _current_span.get()
+    if not TRACING_CONFIG["enabled"] or (parent is None and not root):
+        yield None
+        return
+
+    span = Span(
+        name,
+        trace_id=parent.trace_id if parent else None,
+        parent_span_id=parent.span_id if parent else None,
+        attributes=attributes,
+    )
+    token = _current_span.set(span)
+    try:
+        yield span
+    except Exception as e:
+        span.set_attribute("error", str(e))
+        span.status = "error"
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end()
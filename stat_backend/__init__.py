@@ -0,0 +1,10 @@
+"""
+SFDA 統計後端
+以 NumPy / SciPy 實作 mcp-server 統計工具使用的 sfda_stat /api/v1 端點，計算在行程池中執行。
+可作為正式後端，也可在本機作為負載測試與離線開發的替身：
+
+    pip install -r stat_backend/requirements.txt
+    python -m stat_backend
+"""
+
+__version__ = "1.0.0"
@@ -0,0 +1,10 @@
+"""
+啟動統計後端：python -m stat_backend
+"""
+import uvicorn
+
+from .app import create_app
+from .config import SERVER_CONFIG
+
+if __name__ == "__main__":
+    uvicorn.run(create_app(), host=SERVER_CONFIG["host"], port=SERVER_CONFIG["port"])
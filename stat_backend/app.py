@@ -0,0 +1,275 @@
+"""
+統計後端 API
+實作 mcp-server StatService 與統計工具呼叫的 sfda_stat /api/v1 端點：
+  POST /api/v1/inferential/{ttest, anova, chisquare, mann_whitney, wilcoxon, kruskal_wallis}
+  POST /api/v1/inferential/batch
+  POST /api/v1/charts/{simple, histogram, boxplot, scatter}
+  GET  /health
+
+請求以 pydantic 驗證後轉為 NumPy 陣列，交給 ComputePool 計算；
+輸入不合理（樣本太少、變異數為 0 等）回應 400，計算佇列已滿回應 503，detail 為錯誤說明。
+"""
+
+import asyncio
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+from typing import List, Literal, Optional, Union
+
+import numpy as np
+from fastapi import APIRouter, FastAPI, HTTPException, Request
+from pydantic import BaseModel, Field
+
+from . import batch, charts, inferential
+from .config import POOL_CONFIG
+from .pool import ComputePool, PoolBusyError
+
+Alternative = Literal["two-sided", "less", "greater"]
+Alpha = Field(0.05, gt=0, lt=1)
+
+
+class TTestRequest(BaseModel):
+    sample1: List[float] = Field(..., min_length=2)
+    sample2: Optional[List[float]] = None
+    paired: bool = False
+    alpha: float = Alpha
+    alternative: Alternative = "two-sided"
+    equal_var: bool = False
+
+
+class GroupsRequest(BaseModel):
+    groups: List[List[float]] = Field(..., min_length=2)
+    alpha: float = Alpha
+
+
+class ChiSquareRequest(BaseModel):
+    observed: List  # 一維或二維次數
+    expected: Optional[List] = None
+    alpha: float = Alpha
+    correction: bool = True
+
+
+class TwoSampleRequest(BaseModel):
+    sample1: List[float] = Field(..., min_length=1)
+    sample2: Optional[List[float]] = None
+    alpha: float = Alpha
+    alternative: Alternative = "two-sided"
+
+
+class BatchRequest(BaseModel):
+    columns: List[List[Optional[float]]] = Field(..., min_length=1)  # 每個欄位一列，null 為缺值
+    column_names: Optional[List[str]] = None
+    groups: List[Optional[Union[str, float]]] = Field(..., min_length=2)  # 每筆數據的組別，null 不納入
+    group_order: Optional[List[str]] = None
+    test: Literal["ttest", "mann_whitney", "anova", "kruskal_wallis"] = "ttest"
+    correction: Literal["holm", "bh", "bonferroni", "none"] = "holm"
+    alpha: float = Alpha
+    alternative: Alternative = "two-sided"
+    equal_var: bool = False
+
+
+class ImageOptions(BaseModel):
+    title: Optional[str] = None
+    generate_image: bool = False
+    image_format: str = "png"
+    figsize: List[float] = Field([10, 6], min_length=2, max_length=2)
+    dpi: int = Field(100, ge=50, le=300)
+
+
+class SimpleChartRequest(ImageOptions):
+    labels: List[str]
+    values: List[float]
+    chart_type: Literal["pie", "bar", "line"] = "bar"
+    x_axis_label: Optional[str] = None
+    y_axis_label: Optional[str] = None
+
+
+class HistogramRequest(ImageOptions):
+    values: List[float] = Field(..., min_length=1)
+    bins: int = Field(10, ge=1, le=1000)
+    x_axis_label: Optional[str] = None
+    y_axis_label: Optional[str] = None
+
+
+class BoxplotRequest(ImageOptions):
+    groups: List[List[float]] = Field(..., min_length=1)
+    group_labels: Optional[List[str]] = None
+    y_axis_label: Optional[str] = None
+
+
+class ScatterRequest(ImageOptions):
+    x: List[float] = Field(..., min_length=2)
+    y: List[float] = Field(..., min_length=2)
+    x_axis_label: Optional[str] = None
+    y_axis_label: Optional[str] = None
+    show_regression_line: bool = False
+
+
+def _array(values: Optional[List[float]]) -> Optional[np.ndarray]:
+    # 在主行程轉為 ndarray：傳給子行程時以連續記憶體序列化，比 list of float 快得多
+    return None if values is None else np.asarray(values, dtype=np.float64)
+
+
+def _group_label(value) -> Optional[str]:
+    # 組別可能是文字或數字；1.0 與 "1" 視為同一組
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _group_codes(groups: list, group_order: Optional[List[str]]):
+    """將組別向量轉為組別索引；未指定順序時依首次出現排列，不在順序中的組別為 -1"""
+    labels = [_group_label(value) for value in groups]
+    names = list(group_order) if group_order else list(dict.fromkeys(l for l in labels if l is not None))
+    index = {name: i for i, name in enumerate(names)}
+    codes = np.fromiter((index.get(label, -1) for label in labels), dtype=np.int64, count=len(labels))
+    return codes, names
+
+
+def _image_kwargs(req: ImageOptions) -> dict:
+    return {
+        "title": req.title,
+        "generate_image": req.generate_image,
+        "image_format": req.image_format,
+        "figsize": req.figsize,
+        "dpi": req.dpi,
+    }
+
+
+def create_app(pool: Optional[ComputePool] = None, warm_up: bool = True) -> FastAPI:
+    """
+    建立 API
+    Args:
+        pool: 計算行程池；未提供時依 POOL_CONFIG 建立
+        warm_up: 啟動時預先啟動子行程
+    """
+    pool = pool or ComputePool(**POOL_CONFIG)
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        if warm_up:
+            await asyncio.to_thread(pool.warm_up)
+        yield
+        pool.shutdown()
+
+    app = FastAPI(title="SFDA Stat Backend", version="1.0.0", lifespan=lifespan)
+    app.state.pool = pool
+    router = APIRouter(prefix="/api/v1")
+
+    async def compute(fn, *args, cells: int = 0, **kwargs) -> dict:
+        try:
+            return await pool.run(fn, *args, cells=cells, **kwargs)
+        except ValueError as error:
+            raise HTTPException(status_code=400, detail=str(error))
+        except PoolBusyError as error:
+            raise HTTPException(status_code=503, detail=str(error))
+        except BrokenProcessPool:
+            raise HTTPException(status_code=500, detail="統計計算行程異常結束，請重試")
+
+    @router.post("/inferential/ttest")
+    async def ttest(req: TTestRequest):
+        return await compute(
+            inferential.ttest, _array(req.sample1), _array(req.sample2),
+            paired=req.paired, alpha=req.alpha, alternative=req.alternative,
+            equal_var=req.equal_var,
+            cells=len(req.sample1) + len(req.sample2 or []),
+        )
+
+    @router.post("/inferential/anova")
+    async def anova(req: GroupsRequest):
+        return await compute(
+            inferential.anova, [_array(group) for group in req.groups], alpha=req.alpha,
+            cells=sum(map(len, req.groups)),
+        )
+
+    @router.post("/inferential/chisquare")
+    async def chisquare(req: ChiSquareRequest):
+        return await compute(
+            inferential.chisquare, req.observed, req.expected,
+            alpha=req.alpha, correction=req.correction,
+        )
+
+    @router.post("/inferential/mann_whitney")
+    async def mann_whitney(req: TwoSampleRequest):
+        if req.sample2 is None:
+            raise HTTPException(status_code=400, detail="Mann-Whitney U 檢定需要 sample2")
+        return await compute(
+            inferential.mann_whitney, _array(req.sample1), _array(req.sample2),
+            alpha=req.alpha, alternative=req.alternative,
+            cells=len(req.sample1) + len(req.sample2),
+        )
+
+    @router.post("/inferential/wilcoxon")
+    async def wilcoxon(req: TwoSampleRequest):
+        return await compute(
+            inferential.wilcoxon, _array(req.sample1), _array(req.sample2),
+            alpha=req.alpha, alternative=req.alternative,
+            cells=len(req.sample1) + len(req.sample2 or []),
+        )
+
+    @router.post("/inferential/kruskal_wallis")
+    async def kruskal_wallis(req: GroupsRequest):
+        return await compute(
+            inferential.kruskal_wallis, [_array(group) for group in req.groups],
+            alpha=req.alpha, cells=sum(map(len, req.groups)),
+        )
+
+    @router.post("/inferential/batch")
+    async def batch_test(req: BatchRequest):
+        if any(len(column) != len(req.groups) for column in req.columns):
+            raise HTTPException(status_code=400, detail="每個欄位的數據筆數必須與 groups 相同")
+        codes, names = _group_codes(req.groups, req.group_order)
+        # None 轉為 NaN，整個矩陣以一塊連續記憶體交給子行程
+        matrix = np.array(req.columns, dtype=np.float64)
+        return await compute(
+            batch.batch_test, matrix, codes, names, test=req.test,
+            correction=req.correction, alpha=req.alpha, alternative=req.alternative,
+            equal_var=req.equal_var, column_names=req.column_names,
+            cells=matrix.size,
+        )
+
+    # 繪圖即使數據量小也耗時，產生圖片時一律交給行程池
+    def chart_cells(req: ImageOptions, cells: int) -> int:
+        return max(cells, pool.inline_below) if req.generate_image else cells
+
+    @router.post("/charts/simple")
+    async def simple_chart(req: SimpleChartRequest):
+        return await compute(
+            charts.simple_chart, req.labels, _array(req.values), chart_type=req.chart_type,
+            x_axis_label=req.x_axis_label, y_axis_label=req.y_axis_label,
+            cells=chart_cells(req, len(req.values)), **_image_kwargs(req),
+        )
+
+    @router.post("/charts/histogram")
+    async def histogram(req: HistogramRequest):
+        return await compute(
+            charts.histogram, _array(req.values), bins=req.bins,
+            x_axis_label=req.x_axis_label, y_axis_label=req.y_axis_label,
+            cells=chart_cells(req, len(req.values)), **_image_kwargs(req),
+        )
+
+    @router.post("/charts/boxplot")
+    async def boxplot(req: BoxplotRequest):
+        return await compute(
+            charts.boxplot, [_array(group) for group in req.groups],
+            group_labels=req.group_labels, y_axis_label=req.y_axis_label,
+            cells=chart_cells(req, sum(map(len, req.groups))), **_image_kwargs(req),
+        )
+
+    @router.post("/charts/scatter")
+    async def scatter(req: ScatterRequest):
+        return await compute(
+            charts.scatter, _array(req.x), _array(req.y),
+            x_axis_label=req.x_axis_label, y_axis_label=req.y_axis_label,
+            show_regression_line=req.show_regression_line,
+            cells=chart_cells(req, len(req.x) + len(req.y)), **_image_kwargs(req),
+        )
+
+    app.include_router(router)
+
+    @app.get("/health")
+    async def health(request: Request):
+        return {"status": "healthy", "pool": request.app.state.pool.get_stats()}
+
+    return app
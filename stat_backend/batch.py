@@ -0,0 +1,246 @@
+"""
+批次統計檢定
+同一個分組向量下對多個欄位各做一次檢定（例如 40 個製程參數比較 A、B 兩線），
+所有欄位以矩陣一次計算：各組的個數、平均與離均差平方和以 one-hot 分組矩陣相乘取得，
+無母數檢定的等級以 rankdata(axis=0) 一次排好，不逐欄呼叫單一檢定。
+缺值（NaN）只排除該欄的該筆數據。
+
+最後對可計算的 p 值做多重比較校正（Holm、Benjamini-Hochberg 或 Bonferroni），
+以校正後 p 值判斷是否顯著。
+"""
+
+from typing import List, Optional, Sequence
+
+import numpy as np
+from scipy import stats
+
+from .inferential import (
+    ALTERNATIVES, interpret_cohens_d, interpret_eta_squared, interpret_r, json_float, t_pvalue,
+)
+
+BATCH_TESTS = ("ttest", "mann_whitney", "anova", "kruskal_wallis")
+CORRECTIONS = ("holm", "bh", "bonferroni", "none")
+TWO_GROUP_TESTS = ("ttest", "mann_whitney")
+
+
+def adjust_pvalues(p_values, method: str = "holm") -> np.ndarray:
+    """
+    多重比較校正；NaN（無法計算的檢定）不計入檢定個數，結果仍為 NaN
+    Args:
+        method: holm（控制 FWER）、bh（Benjamini-Hochberg，控制 FDR）、bonferroni 或 none
+    """
+    if method not in CORRECTIONS:
+        raise ValueError(f"correction 必須是 {', '.join(CORRECTIONS)} 之一")
+    p = np.asarray(p_values, dtype=np.float64)
+    adjusted = np.full(p.shape, np.nan)
+    valid = np.isfinite(p)
+    m = int(valid.sum())
+    if m == 0:
+        return adjusted
+
+    q = p[valid]
+    if method == "none":
+        result = q
+    elif method == "bonferroni":
+        result = q * m
+    else:
+        order = np.argsort(q, kind="mergesort")
+        ranked = q[order]
+        if method == "holm":
+            ranked = np.maximum.accumulate((m - np.arange(m)) * ranked)
+        else:
+            ranked = np.minimum.accumulate((ranked * m / np.arange(1, m + 1))[::-1])[::-1]
+        result = np.empty(m)
+        result[order] = ranked
+    adjusted[valid] = np.minimum(result, 1.0)
+    return adjusted
+
+
+def _group_sums(onehot: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """各組加總：(k, n) @ (n, m) -> (k, m)"""
+    return onehot @ values
+
+
+def _mann_whitney(ranks, onehot, counts, alternative):
+    n1, n2 = counts
+    n = n1 + n2
+    rank_sums = _group_sums(onehot, ranks)
+    u1 = rank_sums[0] - n1 * (n1 + 1) / 2
+    u2 = n1 * n2 - u1
+    mean = n1 * n2 / 2
+    # 含等值修正的變異數：以中位等級的平方和表示，不需逐欄統計等值個數
+    squares = np.sum(ranks * ranks, axis=0)
+    variance = n1 * n2 / (n * (n - 1)) * (squares - n * (n + 1) ** 2 / 4)
+    sd = np.sqrt(variance)
+    z = (u1 - mean) / sd
+
+    # 與 scipy.stats.mannwhitneyu(method="asymptotic") 相同：常態近似並做連續性修正
+    if alternative == "greater":
+        p_value = stats.norm.sf((u1 - mean - 0.5) / sd)
+    elif alternative == "less":
+        p_value = stats.norm.sf((u2 - mean - 0.5) / sd)
+    else:
+        p_value = np.minimum(1.0, 2 * stats.norm.sf((np.maximum(u1, u2) - mean - 0.5) / sd))
+
+    effect = np.abs(z) / np.sqrt(n)
+    valid = (n1 > 0) & (n2 > 0) & (variance > 0)
+    return u1, None, p_value, effect, rank_sums / counts, valid
+
+
+def _kruskal_wallis(ranks, onehot, counts):
+    n = counts.sum(axis=0)
+    k = (counts > 0).sum(axis=0)
+    rank_sums = _group_sums(onehot, ranks)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        terms = np.where(counts > 0, rank_sums ** 2 / counts, 0.0)
+    h = 12 / (n * (n + 1)) * terms.sum(axis=0) - 3 * (n + 1)
+    # Σ(t³ - t) / 12 = N(N+1)(2N+1)/6 - Σr²（r 為中位等級）
+    tie_term = 12 * (n * (n + 1) * (2 * n + 1) / 6 - np.sum(ranks * ranks, axis=0))
+    correction = 1 - tie_term / (n ** 3 - n)
+    h = h / correction
+    df = k - 1
+    p_value = stats.chi2.sf(h, df)
+    effect = np.maximum(0.0, (h - k + 1) / (n - k))
+    valid = (k >= 2) & (n > k) & (correction > 0)
+    return h, df, p_value, effect, rank_sums / counts, valid
+
+
+def batch_test(columns, codes, group_names: Sequence[str], test: str = "ttest",
+               correction: str = "holm", alpha: float = 0.05, alternative: str = "two-sided",
+               equal_var: bool = False, column_names: Optional[List[str]] = None) -> dict:
+    """
+    批次檢定
+    Args:
+        columns: (欄位數, 列數) 數值矩陣，缺值為 NaN
+        codes: 每一列的組別索引（對應 group_names），-1 表示不納入
+        group_names: 組別名稱；ttest / mann_whitney 需要恰好 2 組，第 1 組為 sample1
+    Returns:
+        每個欄位一列的結果表與摘要
+    """
+    if test not in BATCH_TESTS:
+        raise ValueError(f"test 必須是 {', '.join(BATCH_TESTS)} 之一")
+    if alternative not in ALTERNATIVES:
+        raise ValueError(f"alternative 必須是 {', '.join(ALTERNATIVES)} 之一")
+    k = len(group_names)
+    if test in TWO_GROUP_TESTS and k != 2:
+        raise ValueError(f"{test} 需要恰好 2 個組別，目前有 {k} 個：{', '.join(group_names)}")
+    if k < 2:
+        raise ValueError("至少需要 2 個組別")
+
+    matrix = np.asarray(columns, dtype=np.float64)
+    codes = np.asarray(codes)
+    if matrix.ndim != 2 or matrix.shape[1] != codes.size:
+        raise ValueError("每個欄位的數據筆數必須與 groups 相同")
+    names = column_names or [f"column_{i + 1}" for i in range(matrix.shape[0])]
+    if len(names) != matrix.shape[0]:
+        raise ValueError("column_names 與欄位數量不符")
+
+    # 列為觀測值、行為欄位；排除不在指定組別中的列
+    keep = codes >= 0
+    x = matrix[:, keep].T
+    codes = codes[keep]
+    present = np.isfinite(x)
+    onehot = (codes[None, :] == np.arange(k)[:, None]).astype(np.float64)
+    counts = _group_sums(onehot, present.astype(np.float64))
+    x0 = np.where(present, x, 0.0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if test in ("ttest", "anova"):
+            means = _group_sums(onehot, x0) / counts
+            deviations = np.where(present, x0 - means[codes], 0.0)
+            within = _group_sums(onehot, deviations * deviations)
+            variances = within / (counts - 1)
+            summaries = means
+
+            if test == "ttest":
+                n1, n2 = counts
+                diff = means[0] - means[1]
+                pooled = (within[0] + within[1]) / (n1 + n2 - 2)
+                if equal_var:
+                    df = n1 + n2 - 2
+                    se = np.sqrt(pooled * (1 / n1 + 1 / n2))
+                else:
+                    a, b = variances[0] / n1, variances[1] / n2
+                    se = np.sqrt(a + b)
+                    df = (a + b) ** 2 / (a * a / (n1 - 1) + b * b / (n2 - 1))
+                statistic = diff / se
+                p_value = t_pvalue(statistic, df, alternative)
+                effect = diff / np.sqrt(pooled)
+                valid = (n1 >= 2) & (n2 >= 2) & (se > 0)
+                interpret = interpret_cohens_d
+            else:
+                n = counts.sum(axis=0)
+                groups_present = (counts > 0).sum(axis=0)
+                grand = np.nansum(means * counts, axis=0) / n
+                between = np.nansum(counts * (means - grand) ** 2, axis=0)
+                within_total = within.sum(axis=0)
+                df_between = groups_present - 1
+                df_within = n - groups_present
+                statistic = (between / df_between) / (within_total / df_within)
+                p_value = stats.f.sf(statistic, df_between, df_within)
+                effect = between / (between + within_total)
+                df = np.stack([df_between, df_within], axis=1)
+                valid = (groups_present >= 2) & (df_within > 0) & (within_total > 0)
+                interpret = interpret_eta_squared
+        else:
+            ranks = stats.rankdata(np.where(present, x, np.nan), axis=0, nan_policy="omit")
+            ranks = np.where(present, ranks, 0.0)
+            if test == "mann_whitney":
+                statistic, df, p_value, effect, summaries, valid = _mann_whitney(ranks, onehot, counts, alternative)
+                interpret = interpret_r
+            else:
+                statistic, df, p_value, effect, summaries, valid = _kruskal_wallis(ranks, onehot, counts)
+                interpret = interpret_eta_squared
+
+    p_value = np.where(valid, p_value, np.nan)
+    adjusted = adjust_pvalues(p_value, correction)
+    significant = adjusted < alpha
+
+    rows = []
+    for i, name in enumerate(names):
+        row = {
+            "column": name,
+            "n": counts[:, i].astype(int).tolist(),
+            # t 檢定 / ANOVA 為各組平均，無母數檢定為各組平均等級
+            "group_summary": [json_float(value) for value in summaries[:, i]],
+            "statistic": None,
+            "df": None,
+            "p_value": None,
+            "p_adjusted": None,
+            "effect_size": None,
+            "effect_size_interpretation": None,
+            "reject_null": False,
+        }
+        if valid[i]:
+            row.update(
+                statistic=json_float(statistic[i]),
+                df=(
+                    None if df is None
+                    else [json_float(value) for value in df[i]] if np.ndim(df) == 2
+                    else json_float(df[i])
+                ),
+                p_value=json_float(p_value[i]),
+                p_adjusted=json_float(adjusted[i]),
+                effect_size=json_float(effect[i]),
+                effect_size_interpretation=interpret(float(effect[i])),
+                reject_null=bool(significant[i]),
+            )
+        else:
+            row["note"] = "有效數據不足或變異為 0，未納入校正"
+        rows.append(row)
+
+    tested = int(np.isfinite(p_value).sum())
+    return {
+        "success": True,
+        "test_type": test,
+        "correction": correction,
+        "alpha": alpha,
+        "alternative": alternative if test in TWO_GROUP_TESTS else None,
+        "equal_var": equal_var if test == "ttest" else None,
+        "groups": list(group_names),
+        "n_columns": len(names),
+        "n_tested": tested,
+        "n_significant": int(significant.sum()),
+        "summary_label": "平均等級" if test in ("mann_whitney", "kruskal_wallis") else "平均數",
+        "results": rows,
+    }
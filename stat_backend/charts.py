@@ -0,0 +1,238 @@
+"""
+圖表資料與圖片
+實作 /api/v1/charts/* 的計算：以 NumPy 算出圖表所需的彙總資料（分組次數、五數摘要、迴歸線等），
+generate_image 為 true 時再以 matplotlib（Agg）繪製並回傳 base64 圖片。
+未安裝 matplotlib 時仍回傳圖表資料，has_image 為 false 並在 reasoning 說明。
+
+圖片不含時間戳等中繼資料，相同輸入產生相同的位元組，可作為基準測試的固定輸出。
+"""
+
+import base64
+import io
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from .inferential import as_array, json_float
+
+IMAGE_FORMATS = ("png", "svg", "jpg", "jpeg")
+SIMPLE_CHART_TYPES = ("pie", "bar", "line")
+# 盒鬚圖每組最多回傳的離群值數量
+MAX_OUTLIERS = 100
+
+_CJK_FONTS = ["Noto Sans CJK TC", "Microsoft JhengHei", "PingFang TC", "Heiti TC", "Arial Unicode MS"]
+
+
+def _render(draw, figsize: Sequence[float], dpi: int, image_format: str):
+    """
+    以 draw(ax) 繪圖並轉為 base64
+    Returns:
+        (image_base64, 錯誤說明)；無法繪圖時 image_base64 為 None
+    """
+    if image_format not in IMAGE_FORMATS:
+        return None, f"不支援的圖片格式 {image_format}"
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        return None, "未安裝 matplotlib，僅回傳圖表數據"
+
+    with matplotlib.rc_context({
+        "font.sans-serif": _CJK_FONTS + matplotlib.rcParams["font.sans-serif"],
+        "axes.unicode_minus": False,
+        "svg.hashsalt": "sfda-stat",
+    }):
+        fig, ax = plt.subplots(figsize=tuple(figsize), dpi=dpi)
+        try:
+            draw(ax)
+            fig.tight_layout()
+            buffer = io.BytesIO()
+            fmt = "jpeg" if image_format == "jpg" else image_format
+            metadata = {"Date": None} if fmt == "svg" else ({"Software": None} if fmt == "png" else None)
+            fig.savefig(buffer, format=fmt, metadata=metadata)
+        finally:
+            plt.close(fig)
+    return base64.b64encode(buffer.getvalue()).decode("ascii"), None
+
+
+def _response(chart_type: str, title: Optional[str], chart_data: dict, reasoning: str,
+              generate_image: bool, draw, figsize, dpi, image_format) -> dict:
+    result = {
+        "success": True,
+        "chart_type": chart_type,
+        "title": title,
+        "chart_data": chart_data,
+        "reasoning": reasoning,
+        "has_image": False,
+        "image_base64": None,
+        "image_format": None,
+    }
+    if generate_image:
+        image, error = _render(draw, figsize, dpi, image_format)
+        if image is None:
+            result["reasoning"] = f"{reasoning}（{error}）"
+        else:
+            result.update(has_image=True, image_base64=image, image_format=image_format)
+    return result
+
+
+def simple_chart(labels: List[str], values, chart_type: str = "bar", title: Optional[str] = None,
+                 x_axis_label: Optional[str] = None, y_axis_label: Optional[str] = None,
+                 generate_image: bool = False, image_format: str = "png",
+                 figsize=(10, 6), dpi: int = 100) -> dict:
+    """圓餅圖、長條圖與折線圖"""
+    if chart_type not in SIMPLE_CHART_TYPES:
+        raise ValueError(f"chart_type 必須是 {', '.join(SIMPLE_CHART_TYPES)} 之一")
+    y = as_array(values, "values", 1)
+    if len(labels) != y.size:
+        raise ValueError("labels 與 values 的數量必須相同")
+    total = y.sum()
+    if chart_type == "pie" and ((y < 0).any() or total <= 0):
+        raise ValueError("圓餅圖的數值必須為非負且總和大於 0")
+
+    percentages = y / total * 100 if total != 0 else np.zeros_like(y)
+    chart_data = {
+        "points": [
+            {"label": label, "value": float(value), "percentage": json_float(percentage)}
+            for label, value, percentage in zip(labels, y, percentages)
+        ],
+        "total": float(total),
+        "max": float(y.max()),
+        "min": float(y.min()),
+    }
+
+    def draw(ax):
+        if chart_type == "pie":
+            ax.pie(y, labels=labels, autopct="%1.1f%%", startangle=90)
+            ax.axis("equal")
+        elif chart_type == "bar":
+            ax.bar(labels, y)
+        else:
+            ax.plot(labels, y, marker="o")
+        if chart_type != "pie":
+            ax.set_xlabel(x_axis_label or "")
+            ax.set_ylabel(y_axis_label or "")
+        ax.set_title(title or "")
+
+    names = {"pie": "圓餅圖", "bar": "長條圖", "line": "折線圖"}
+    reasoning = f"已建立包含 {y.size} 個數據點的{names[chart_type]}"
+    return _response(chart_type, title, chart_data, reasoning, generate_image, draw, figsize, dpi, image_format)
+
+
+def histogram(values, bins: int = 10, title: Optional[str] = None,
+              x_axis_label: Optional[str] = None, y_axis_label: Optional[str] = None,
+              generate_image: bool = False, image_format: str = "png",
+              figsize=(10, 6), dpi: int = 100) -> dict:
+    """直方圖：回傳分組邊界、次數與基本統計"""
+    x = as_array(values, "values", 1)
+    counts, edges = np.histogram(x, bins=bins)
+    std = x.std(ddof=1) if x.size > 1 else 0.0
+    chart_data = {
+        "bins": [
+            {"start": float(start), "end": float(end), "count": int(count)}
+            for start, end, count in zip(edges[:-1], edges[1:], counts)
+        ],
+        "statistics": {
+            "n": int(x.size),
+            "mean": float(x.mean()),
+            "std": float(std),
+            "min": float(x.min()),
+            "max": float(x.max()),
+        },
+    }
+
+    def draw(ax):
+        ax.hist(x, bins=edges, edgecolor="white")
+        ax.set_xlabel(x_axis_label or "")
+        ax.set_ylabel(y_axis_label or "")
+        ax.set_title(title or "")
+
+    reasoning = f"已建立 {x.size} 筆數據、{len(counts)} 個分組的直方圖"
+    return _response("histogram", title, chart_data, reasoning, generate_image, draw, figsize, dpi, image_format)
+
+
+def boxplot(groups: List, group_labels: Optional[List[str]] = None, title: Optional[str] = None,
+            y_axis_label: Optional[str] = None, generate_image: bool = False,
+            image_format: str = "png", figsize=(10, 6), dpi: int = 100) -> dict:
+    """盒鬚圖：每組的五數摘要、1.5 IQR 鬚線與離群值"""
+    if not groups:
+        raise ValueError("至少需要 1 組數據")
+    arrays = [as_array(group, f"groups[{i}]", 1) for i, group in enumerate(groups)]
+    labels = group_labels or [f"組別 {i + 1}" for i in range(len(arrays))]
+    if len(labels) != len(arrays):
+        raise ValueError("group_labels 與 groups 的數量必須相同")
+
+    summaries = []
+    for label, x in zip(labels, arrays):
+        low, q1, median, q3, high = np.percentile(x, [0, 25, 50, 75, 100])
+        iqr = q3 - q1
+        inside = x[(x >= q1 - 1.5 * iqr) & (x <= q3 + 1.5 * iqr)]
+        outliers = x[(x < q1 - 1.5 * iqr) | (x > q3 + 1.5 * iqr)]
+        summaries.append({
+            "label": label,
+            "n": int(x.size),
+            "min": float(low),
+            "q1": float(q1),
+            "median": float(median),
+            "q3": float(q3),
+            "max": float(high),
+            "mean": float(x.mean()),
+            "whisker_low": float(inside.min()),
+            "whisker_high": float(inside.max()),
+            "outlier_count": int(outliers.size),
+            "outliers": outliers[:MAX_OUTLIERS].tolist(),
+        })
+
+    def draw(ax):
+        ax.boxplot(arrays)
+        ax.set_xticks(range(1, len(labels) + 1), labels)
+        ax.set_ylabel(y_axis_label or "")
+        ax.set_title(title or "")
+
+    reasoning = f"已建立 {len(arrays)} 組數據的盒鬚圖"
+    return _response("boxplot", title, {"groups": summaries}, reasoning,
+                     generate_image, draw, figsize, dpi, image_format)
+
+
+def scatter(x, y, title: Optional[str] = None, x_axis_label: Optional[str] = None,
+            y_axis_label: Optional[str] = None, show_regression_line: bool = False,
+            generate_image: bool = False, image_format: str = "png",
+            figsize=(10, 6), dpi: int = 100) -> dict:
+    """散點圖：回傳相關係數與最小平方迴歸線"""
+    xs = as_array(x, "x", 2)
+    ys = as_array(y, "y", 2)
+    if xs.size != ys.size:
+        raise ValueError("x 與 y 的數量必須相同")
+
+    dx = xs - xs.mean()
+    dy = ys - ys.mean()
+    sxx, syy, sxy = float(dx @ dx), float(dy @ dy), float(dx @ dy)
+    slope = sxy / sxx if sxx > 0 else None
+    intercept = float(ys.mean() - slope * xs.mean()) if slope is not None else None
+    r = sxy / np.sqrt(sxx * syy) if sxx > 0 and syy > 0 else None
+    chart_data = {
+        "n": int(xs.size),
+        "correlation": json_float(r) if r is not None else None,
+        "regression": {
+            "slope": slope,
+            "intercept": intercept,
+            "r_squared": json_float(r * r) if r is not None else None,
+        },
+        "x_range": [float(xs.min()), float(xs.max())],
+        "y_range": [float(ys.min()), float(ys.max())],
+    }
+
+    def draw(ax):
+        ax.scatter(xs, ys, s=12, alpha=0.7)
+        if show_regression_line and slope is not None:
+            line_x = np.array(chart_data["x_range"])
+            ax.plot(line_x, slope * line_x + intercept, color="tab:red")
+        ax.set_xlabel(x_axis_label or "")
+        ax.set_ylabel(y_axis_label or "")
+        ax.set_title(title or "")
+
+    reasoning = f"已建立 {xs.size} 個數據點的散點圖"
+    if r is not None:
+        reasoning += f"，相關係數 r = {r:.3f}"
+    return _response("scatter", title, chart_data, reasoning, generate_image, draw, figsize, dpi, image_format)
@@ -0,0 +1,19 @@
+"""
+統計後端配置
+與 mcp-server 的 StatService 對接時預設監聽 8000 埠（http://localhost:8000/api/v1）
+"""
+import os
+
+SERVER_CONFIG = {
+    "host": os.getenv("STAT_BACKEND_HOST", "0.0.0.0"),
+    "port": int(os.getenv("STAT_BACKEND_PORT", "8000")),
+}
+
+POOL_CONFIG = {
+    # 計算行程數：-1 為自動（CPU 核心數 - 1，最多 4），0 為在事件迴圈中直接計算
+    "size": int(os.getenv("STAT_POOL_SIZE", "-1")),
+    # 等待中的計算超過此數量時回應 503
+    "max_pending": int(os.getenv("STAT_POOL_MAX_PENDING", "64")),
+    # 數值個數少於此值的請求直接計算，行程間傳輸的成本高於計算本身
+    "inline_below": int(os.getenv("STAT_POOL_INLINE_BELOW", "20000")),
+}
@@ -0,0 +1,465 @@
+"""
+推論統計計算
+實作 sfda_stat /api/v1/inferential/* 端點的計算部分：輸入為 NumPy 陣列，輸出為可直接序列化為 JSON 的 dict，
+欄位名稱與 mcp-server 的統計工具（src/tools/stat/perform-*.js）讀取的欄位一致。
+
+多組資料一律合併為一個陣列並以組別索引配合 np.bincount 計算，不逐組跑 Python 迴圈；
+分佈函數與小樣本的精確 p 值使用 SciPy。
+這些函數會在 ProcessPoolExecutor 的子行程中執行，必須是模組層級、沒有副作用的函數。
+"""
+
+import math
+from typing import List, Optional, Sequence
+
+import numpy as np
+from scipy import stats
+
+ALTERNATIVES = ("two-sided", "less", "greater")
+
+
+def json_float(value) -> Optional[float]:
+    """轉為 JSON 可表示的浮點數（NaN / inf 轉為 None）"""
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+
+def as_array(values, name: str, min_size: int = 1) -> np.ndarray:
+    """轉為一維 float64 陣列並檢查長度與數值"""
+    array = np.asarray(values, dtype=np.float64)
+    if array.ndim != 1:
+        raise ValueError(f"{name} 必須是一維數值陣列")
+    if array.size < min_size:
+        raise ValueError(f"{name} 至少需要 {min_size} 個數值")
+    if not np.isfinite(array).all():
+        raise ValueError(f"{name} 含有 NaN 或無限大")
+    return array
+
+
+def _stack_groups(groups: Sequence, min_size: int):
+    """
+    將各組合併為單一陣列
+    Returns:
+        (values, labels, sizes)：labels[i] 為 values[i] 所屬組別
+    """
+    if len(groups) < 2:
+        raise ValueError("至少需要 2 組數據")
+    arrays = [as_array(group, f"groups[{i}]", min_size) for i, group in enumerate(groups)]
+    sizes = np.array([array.size for array in arrays])
+    values = np.concatenate(arrays)
+    labels = np.repeat(np.arange(len(arrays)), sizes)
+    return values, labels, sizes
+
+
+def _tie_term(values: np.ndarray) -> float:
+    """等值修正項 Σ(t³ - t)，t 為每個相同值的個數"""
+    counts = np.unique(values, return_counts=True)[1].astype(np.float64)
+    return float(np.sum(counts ** 3 - counts))
+
+
+def t_pvalue(t, df, alternative: str = "two-sided"):
+    """t 分佈 p 值（t、df 可為陣列）"""
+    if alternative == "less":
+        return stats.t.cdf(t, df)
+    if alternative == "greater":
+        return stats.t.sf(t, df)
+    return 2 * stats.t.sf(np.abs(t), df)
+
+
+def interpret_cohens_d(d: float) -> str:
+    d = abs(d)
+    if d < 0.2:
+        return "微小效果"
+    if d < 0.5:
+        return "小效果"
+    if d < 0.8:
+        return "中等效果"
+    return "大效果"
+
+
+def interpret_r(r: float) -> str:
+    r = abs(r)
+    if r < 0.1:
+        return "微小效果"
+    if r < 0.3:
+        return "小效果"
+    if r < 0.5:
+        return "中等效果"
+    return "大效果"
+
+
+def interpret_eta_squared(eta: float) -> str:
+    if eta < 0.01:
+        return "微小效果"
+    if eta < 0.06:
+        return "小效果"
+    if eta < 0.14:
+        return "中等效果"
+    return "大效果"
+
+
+def interpret_cramers_v(v: float) -> str:
+    if v < 0.1:
+        return "微小效果"
+    if v < 0.3:
+        return "小效果"
+    if v < 0.5:
+        return "中等效果"
+    return "大效果"
+
+
+def _decision(p_value: float, alpha: float, subject: str) -> str:
+    reject = p_value < alpha
+    return (
+        f"在 α={alpha} 的顯著水準下，p 值 = {p_value:.4f} {'<' if reject else '≥'} α，"
+        f"{'拒絕' if reject else '不拒絕'}虛無假設：{subject}{'有' if reject else '沒有'}統計上的顯著差異。"
+    )
+
+
+def _check_alternative(alternative: str) -> None:
+    if alternative not in ALTERNATIVES:
+        raise ValueError(f"alternative 必須是 {', '.join(ALTERNATIVES)} 之一")
+
+
+def ttest(sample1, sample2=None, paired: bool = False, alpha: float = 0.05,
+          alternative: str = "two-sided", equal_var: bool = False) -> dict:
+    """
+    t 檢定：只有 sample1 為單樣本（與 0 比較），paired 為配對，否則為獨立雙樣本
+    （預設 Welch，equal_var=True 時使用合併變異數）。
+    信賴區間固定為雙尾 1 - alpha，單尾檢定時仍以有限區間呈現。
+    """
+    _check_alternative(alternative)
+    x = as_array(sample1, "sample1", 2)
+
+    if sample2 is None or paired:
+        if sample2 is None:
+            test_type, d = "one_sample", x
+        else:
+            y = as_array(sample2, "sample2", 2)
+            if y.size != x.size:
+                raise ValueError("配對 t 檢定的兩組樣本數必須相同")
+            test_type, d = "paired", x - y
+        n = d.size
+        diff = d.mean()
+        sd = d.std(ddof=1)
+        se = sd / math.sqrt(n)
+        df = n - 1
+        effect = diff / sd if sd > 0 else math.nan
+        sample_stats = {"n": n, "mean": json_float(diff), "std": json_float(sd)}
+    else:
+        test_type = "two_sample"
+        y = as_array(sample2, "sample2", 2)
+        n1, n2 = x.size, y.size
+        m1, m2 = x.mean(), y.mean()
+        v1, v2 = x.var(ddof=1), y.var(ddof=1)
+        diff = m1 - m2
+        pooled_var = ((n1 - 1) * v1 + (n2 - 1) * v2) / (n1 + n2 - 2)
+        if equal_var:
+            df = n1 + n2 - 2
+            se = math.sqrt(pooled_var * (1 / n1 + 1 / n2))
+        else:
+            a, b = v1 / n1, v2 / n2
+            se = math.sqrt(a + b)
+            denominator = a * a / (n1 - 1) + b * b / (n2 - 1)
+            df = (a + b) ** 2 / denominator if denominator > 0 else n1 + n2 - 2
+        effect = diff / math.sqrt(pooled_var) if pooled_var > 0 else math.nan
+        sample_stats = {
+            "n1": n1, "n2": n2,
+            "mean1": json_float(m1), "mean2": json_float(m2),
+            "std1": json_float(math.sqrt(v1)), "std2": json_float(math.sqrt(v2)),
+        }
+
+    if se == 0:
+        raise ValueError("樣本變異數為 0，無法計算 t 統計量")
+
+    t = diff / se
+    p_value = float(t_pvalue(t, df, alternative))
+    margin = stats.t.ppf(1 - alpha / 2, df) * se
+
+    return {
+        "success": True,
+        "test_type": test_type,
+        "statistic": json_float(t),
+        "p_value": p_value,
+        "degrees_of_freedom": json_float(df),
+        "mean_difference": json_float(diff),
+        "confidence_interval": [json_float(diff - margin), json_float(diff + margin)],
+        "confidence_level": 1 - alpha,
+        "effect_size": json_float(effect),
+        "effect_size_interpretation": (
+            interpret_cohens_d(effect) if math.isfinite(effect) else None
+        ),
+        "reject_null": p_value < alpha,
+        "alpha": alpha,
+        "alternative": alternative,
+        "equal_var": equal_var if test_type == "two_sample" else None,
+        "sample_stats": sample_stats,
+    }
+
+
+def anova(groups: List, alpha: float = 0.05) -> dict:
+    """單因子 ANOVA，附各組描述統計、Shapiro-Wilk 常態性與 Levene 變異數同質性檢定"""
+    values, labels, sizes = _stack_groups(groups, 2)
+    k, n = sizes.size, values.size
+    if n <= k:
+        raise ValueError("總樣本數必須大於組數")
+
+    means = np.bincount(labels, weights=values, minlength=k) / sizes
+    deviations = values - means[labels]
+    within_by_group = np.bincount(labels, weights=deviations * deviations, minlength=k)
+    ss_within = float(within_by_group.sum())
+    ss_between = float(np.dot(sizes, (means - values.mean()) ** 2))
+    ss_total = ss_between + ss_within
+
+    df_between, df_within = k - 1, n - k
+    ms_between = ss_between / df_between
+    ms_within = ss_within / df_within
+    if ms_within == 0:
+        raise ValueError("組內變異為 0，無法計算 F 統計量")
+    f_statistic = ms_between / ms_within
+    p_value = float(stats.f.sf(f_statistic, df_between, df_within))
+    eta_squared = ss_between / ss_total if ss_total > 0 else 0.0
+
+    offsets = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    stds = np.sqrt(within_by_group / (sizes - 1))
+    group_stats = [
+        {
+            "n": int(size),
+            "mean": json_float(mean),
+            "std": json_float(std),
+            "se": json_float(std / math.sqrt(size)),
+            "min": json_float(low),
+            "max": json_float(high),
+        }
+        for size, mean, std, low, high in zip(
+            sizes, means, stds,
+            np.minimum.reduceat(values, offsets), np.maximum.reduceat(values, offsets),
+        )
+    ]
+
+    result = {
+        "success": True,
+        "test_type": "one_way_anova",
+        "statistic": json_float(f_statistic),
+        "f_statistic": json_float(f_statistic),
+        "p_value": p_value,
+        "df_between": df_between,
+        "df_within": df_within,
+        "effect_size": json_float(eta_squared),
+        "effect_size_interpretation": interpret_eta_squared(eta_squared),
+        "reject_null": p_value < alpha,
+        "alpha": alpha,
+        "anova_table": {
+            "ss_between": json_float(ss_between),
+            "ss_within": json_float(ss_within),
+            "ss_total": json_float(ss_total),
+            "df_between": df_between,
+            "df_within": df_within,
+            "df_total": n - 1,
+            "ms_between": json_float(ms_between),
+            "ms_within": json_float(ms_within),
+            "f_statistic": json_float(f_statistic),
+            "p_value": p_value,
+        },
+        "group_stats": group_stats,
+    }
+
+    # Shapiro-Wilk 需要每組至少 3 筆；任何一組無法檢定時不回傳，由呼叫端提示自行確認
+    if sizes.min() >= 3:
+        tests = [stats.shapiro(values[labels == i]) for i in range(k)]
+        result["normality_tests"] = [
+            {"test": "shapiro", "statistic": json_float(test.statistic), "p_value": json_float(test.pvalue)}
+            for test in tests
+        ]
+        if any(test["p_value"] is None for test in result["normality_tests"]):
+            del result["normality_tests"]
+
+    levene = stats.levene(*(values[labels == i] for i in range(k)))
+    if math.isfinite(levene.pvalue):
+        result["homogeneity_test"] = {
+            "test": "levene",
+            "statistic": json_float(levene.statistic),
+            "p_value": float(levene.pvalue),
+        }
+    return result
+
+
+def chisquare(observed, expected=None, alpha: float = 0.05, correction: bool = True) -> dict:
+    """
+    卡方檢定：二維觀察值且未提供期望值時為獨立性檢定（2x2 預設 Yates 修正），
+    其餘為適合度檢定（一維未提供期望值時假設均勻分佈；期望值可為次數或比例）。
+    """
+    obs = np.asarray(observed, dtype=np.float64)
+    if obs.ndim not in (1, 2) or obs.size < 2:
+        raise ValueError("observed 必須是一維或二維的次數陣列")
+    if not np.isfinite(obs).all() or (obs < 0).any():
+        raise ValueError("observed 必須是非負的次數")
+    total = obs.sum()
+    if total <= 0:
+        raise ValueError("observed 的總次數必須大於 0")
+
+    if obs.ndim == 2 and expected is None:
+        if min(obs.shape) < 2:
+            raise ValueError("獨立性檢定的列聯表至少需要 2x2")
+        res = stats.chi2_contingency(obs, correction=correction)
+        statistic, p_value, df, exp = res.statistic, res.pvalue, int(res.dof), res.expected_freq
+        test_type = "independence"
+    else:
+        if expected is None:
+            exp = np.full(obs.shape, total / obs.size)
+        else:
+            exp = np.asarray(expected, dtype=np.float64)
+            if exp.shape != obs.shape:
+                raise ValueError("expected 的形狀必須與 observed 相同")
+            if (exp <= 0).any():
+                raise ValueError("expected 必須大於 0")
+            exp = exp * (total / exp.sum())
+        statistic = float(np.sum((obs - exp) ** 2 / exp))
+        df = (obs.shape[0] - 1) * (obs.shape[1] - 1) if obs.ndim == 2 else obs.size - 1
+        p_value = float(stats.chi2.sf(statistic, df))
+        test_type = "goodness_of_fit"
+
+    dimension = min(obs.shape) - 1 if obs.ndim == 2 else obs.size - 1
+    cramers_v = math.sqrt(statistic / (total * dimension)) if dimension > 0 else 0.0
+    low_expected = float(np.mean(exp < 5))
+
+    return {
+        "success": True,
+        "test_type": test_type,
+        "statistic": json_float(statistic),
+        "p_value": float(p_value),
+        "df": int(df),
+        "degrees_of_freedom": int(df),
+        "effect_size": json_float(cramers_v),
+        "effect_size_interpretation": interpret_cramers_v(cramers_v),
+        "reject_null": p_value < alpha,
+        "alpha": alpha,
+        "observed_freq": obs.tolist(),
+        "expected_freq": exp.tolist(),
+        "low_expected_ratio": low_expected,
+        "warnings": (
+            ["超過 20% 的期望次數小於 5，卡方近似可能不準確"] if low_expected > 0.2 else []
+        ),
+    }
+
+
+def mann_whitney(sample1, sample2, alpha: float = 0.05, alternative: str = "two-sided") -> dict:
+    """Mann-Whitney U 檢定；p 值由 SciPy 計算（小樣本無等值時為精確值），Z 分數含等值修正"""
+    _check_alternative(alternative)
+    x = as_array(sample1, "sample1", 1)
+    y = as_array(sample2, "sample2", 1)
+    n1, n2 = x.size, y.size
+    n = n1 + n2
+
+    combined = np.concatenate((x, y))
+    ranks = stats.rankdata(combined)
+    rank_sum1 = float(ranks[:n1].sum())
+    u1 = rank_sum1 - n1 * (n1 + 1) / 2
+
+    variance = n1 * n2 / 12 * ((n + 1) - _tie_term(combined) / (n * (n - 1)))
+    z = (u1 - n1 * n2 / 2) / math.sqrt(variance) if variance > 0 else 0.0
+    p_value = float(stats.mannwhitneyu(x, y, alternative=alternative).pvalue)
+    effect = abs(z) / math.sqrt(n)
+
+    return {
+        "success": True,
+        "test_type": "mann_whitney",
+        "u_statistic": json_float(u1),
+        "statistic": json_float(u1),
+        "rank_sum1": rank_sum1,
+        "rank_sum2": float(ranks[n1:].sum()),
+        "z_score": json_float(z),
+        "p_value": p_value,
+        "effect_size": json_float(effect),
+        "effect_size_interpretation": interpret_r(effect),
+        "reject_null": p_value < alpha,
+        "alpha": alpha,
+        "alternative": alternative,
+        "n1": n1,
+        "n2": n2,
+        "interpretation": _decision(p_value, alpha, "兩組的分佈位置"),
+    }
+
+
+def wilcoxon(sample1, sample2=None, alpha: float = 0.05, alternative: str = "two-sided") -> dict:
+    """Wilcoxon 符號等級檢定（捨棄差值為 0 的配對）；未提供 sample2 時檢定 sample1 的中位數是否為 0"""
+    _check_alternative(alternative)
+    x = as_array(sample1, "sample1", 1)
+    if sample2 is None:
+        d = x
+    else:
+        y = as_array(sample2, "sample2", 1)
+        if y.size != x.size:
+            raise ValueError("Wilcoxon 檢定的兩組樣本數必須相同")
+        d = x - y
+
+    nonzero = d[d != 0]
+    n = nonzero.size
+    if n == 0:
+        raise ValueError("所有配對差值皆為 0，無法進行 Wilcoxon 檢定")
+
+    magnitudes = np.abs(nonzero)
+    ranks = stats.rankdata(magnitudes)
+    w_plus = float(ranks[nonzero > 0].sum())
+    w_minus = float(ranks[nonzero < 0].sum())
+    variance = n * (n + 1) * (2 * n + 1) / 24 - _tie_term(magnitudes) / 48
+    z = (w_plus - n * (n + 1) / 4) / math.sqrt(variance) if variance > 0 else 0.0
+
+    res = stats.wilcoxon(nonzero, alternative=alternative)
+    p_value = float(res.pvalue)
+    effect = abs(z) / math.sqrt(n)
+
+    return {
+        "success": True,
+        "test_type": "wilcoxon",
+        "w_statistic": json_float(res.statistic),
+        "statistic": json_float(res.statistic),
+        "w_plus": w_plus,
+        "w_minus": w_minus,
+        "z_score": json_float(z),
+        "p_value": p_value,
+        "effect_size": json_float(effect),
+        "effect_size_interpretation": interpret_r(effect),
+        "reject_null": p_value < alpha,
+        "alpha": alpha,
+        "alternative": alternative,
+        "n_pairs": int(d.size),
+        "n_nonzero": int(n),
+        "interpretation": _decision(p_value, alpha, "配對前後"),
+    }
+
+
+def kruskal_wallis(groups: List, alpha: float = 0.05) -> dict:
+    """Kruskal-Wallis H 檢定（含等值修正），效果量為 η²_H = (H - k + 1) / (N - k)"""
+    values, labels, sizes = _stack_groups(groups, 1)
+    k, n = sizes.size, values.size
+    if n <= k:
+        raise ValueError("總樣本數必須大於組數")
+
+    ranks = stats.rankdata(values)
+    rank_sums = np.bincount(labels, weights=ranks, minlength=k)
+    h = 12 / (n * (n + 1)) * float(np.sum(rank_sums ** 2 / sizes)) - 3 * (n + 1)
+    correction = 1 - _tie_term(values) / (n ** 3 - n)
+    if correction <= 0:
+        raise ValueError("所有數值皆相同，無法進行 Kruskal-Wallis 檢定")
+    h /= correction
+
+    df = k - 1
+    p_value = float(stats.chi2.sf(h, df))
+    eta_squared = max(0.0, (h - k + 1) / (n - k))
+
+    return {
+        "success": True,
+        "test_type": "kruskal_wallis",
+        "h_statistic": json_float(h),
+        "statistic": json_float(h),
+        "p_value": p_value,
+        "degrees_of_freedom": df,
+        "n_groups": int(k),
+        "group_sizes": sizes.tolist(),
+        "mean_ranks": (rank_sums / sizes).tolist(),
+        "effect_size": json_float(eta_squared),
+        "effect_size_interpretation": interpret_eta_squared(eta_squared),
+        "reject_null": p_value < alpha,
+        "alpha": alpha,
+        "interpretation": _decision(p_value, alpha, "各組的分佈位置"),
+    }
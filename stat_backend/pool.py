@@ -0,0 +1,117 @@
+"""
+計算行程池
+統計計算與圖表繪製是 CPU 密集工作，交給 ProcessPoolExecutor 執行，FastAPI 事件迴圈只負責收發請求。
+小型請求直接在事件迴圈中計算（序列化到子行程的成本高於計算本身）；
+等待中的計算達到上限時立即拋出 PoolBusyError，由 API 回應 503，不無限排隊。
+子行程異常結束（BrokenProcessPool）時丟棄整個行程池，下一個請求重新建立。
+"""
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PoolBusyError(Exception):
+    """等待中的計算已達上限"""
+
+
+def resolve_pool_size(size: int) -> int:
+    if size >= 0:
+        return size
+    return max(1, min(4, (os.cpu_count() or 2) - 1))
+
+
+class ComputePool:
+    def __init__(self, size: int = -1, max_pending: int = 64, inline_below: int = 20000):
+        self.size = resolve_pool_size(size)
+        self.max_pending = max_pending
+        self.inline_below = inline_below
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.pending = 0
+        self.completed = 0
+        self.inline = 0
+        self.rejected = 0
+        self.restarts = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn：不繼承事件迴圈與 uvicorn 的執行緒狀態，macOS 與 Linux 行為一致
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.size,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def run(self, fn: Callable, *args, cells: int = 0, **kwargs) -> Any:
+        """
+        執行計算
+        Args:
+            fn: 模組層級函數（需可 pickle）
+            cells: 輸入的數值個數，用於判斷是否直接計算
+        """
+        if self.size == 0 or cells < self.inline_below:
+            self.inline += 1
+            return fn(*args, **kwargs)
+
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise PoolBusyError(f"統計計算佇列已滿（{self.max_pending}），請稍後再試")
+
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(
+                self._get_executor(), functools.partial(fn, *args, **kwargs)
+            )
+            self.completed += 1
+            return result
+        except BrokenProcessPool:
+            logger.error("計算行程異常結束，重建行程池")
+            self._discard()
+            raise
+        finally:
+            self.pending -= 1
+
+    def _discard(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self.restarts += 1
+
+    def warm_up(self) -> None:
+        """預先啟動所有子行程，避免第一批請求承擔 spawn 與載入 SciPy 的時間"""
+        if self.size == 0:
+            return
+        executor = self._get_executor()
+        futures = [executor.submit(_warm_up) for _ in range(self.size)]
+        for future in futures:
+            future.result()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "size": self.size,
+            "pending": self.pending,
+            "maxPending": self.max_pending,
+            "inlineBelow": self.inline_below,
+            "completed": self.completed,
+            "inline": self.inline,
+            "rejected": self.rejected,
+            "restarts": self.restarts,
+        }
+
+
+def _warm_up() -> int:
+    from . import charts, inferential  # noqa: F401  載入 NumPy / SciPy
+    return os.getpid()
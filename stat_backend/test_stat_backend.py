@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+統計後端測試
+以 SciPy 的對應函數為參考值驗證各檢定，並透過 TestClient 驗證 API 的欄位、錯誤回應與行程池
+執行方式（於專案根目錄）：python stat_backend/test_stat_backend.py
+"""
+
+import base64
+import math
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from scipy import stats
+
+from stat_backend import batch, charts, inferential
+from stat_backend.pool import ComputePool
+
+rng = np.random.default_rng(20240601)
+A = rng.normal(50, 10, 40)
+B = rng.normal(55, 12, 35)
+C = rng.normal(52, 9, 30)
+
+
+def close(actual, expected, tolerance=1e-9):
+    return math.isclose(actual, expected, rel_tol=tolerance, abs_tol=tolerance)
+
+
+def test_inferential():
+    print("🧪 開始測試推論統計計算...")
+
+    # 1. t 檢定：Welch、合併變異數、配對與單樣本
+    result = inferential.ttest(A, B)
+    reference = stats.ttest_ind(A, B, equal_var=False)
+    assert result["test_type"] == "two_sample"
+    assert close(result["statistic"], reference.statistic)
+    assert close(result["p_value"], reference.pvalue)
+    assert close(result["degrees_of_freedom"], reference.df)
+    low, high = reference.confidence_interval(0.95)
+    assert close(result["confidence_interval"][0], low)
+    assert close(result["confidence_interval"][1], high)
+
+    result = inferential.ttest(A, B, equal_var=True, alternative="less")
+    assert close(result["p_value"], stats.ttest_ind(A, B, alternative="less").pvalue)
+
+    result = inferential.ttest(A[:30], C, paired=True)
+    assert result["test_type"] == "paired"
+    assert close(result["p_value"], stats.ttest_rel(A[:30], C).pvalue)
+    assert close(result["effect_size"], (A[:30] - C).mean() / (A[:30] - C).std(ddof=1))
+
+    result = inferential.ttest(A - 50)
+    assert result["test_type"] == "one_sample"
+    assert close(result["p_value"], stats.ttest_1samp(A - 50, 0).pvalue)
+    print("✅ t 檢定")
+
+    # 2. ANOVA：F、p 值、ANOVA 表與各組描述統計
+    result = inferential.anova([A, B, C])
+    reference = stats.f_oneway(A, B, C)
+    assert close(result["f_statistic"], reference.statistic)
+    assert close(result["p_value"], reference.pvalue)
+    table = result["anova_table"]
+    assert close(table["ss_between"] + table["ss_within"], table["ss_total"])
+    assert table["df_total"] == len(A) + len(B) + len(C) - 1
+    assert close(result["group_stats"][1]["std"], B.std(ddof=1))
+    assert close(result["group_stats"][2]["min"], C.min())
+    assert len(result["normality_tests"]) == 3
+    assert close(result["homogeneity_test"]["p_value"], stats.levene(A, B, C).pvalue)
+    print("✅ ANOVA")
+
+    # 3. 卡方：獨立性（Yates 修正）、適合度（期望值為比例）
+    observed = [[20, 15], [30, 35]]
+    result = inferential.chisquare(observed)
+    reference = stats.chi2_contingency(observed)
+    assert result["test_type"] == "independence"
+    assert close(result["statistic"], reference.statistic)
+    assert result["df"] == 1
+
+    result = inferential.chisquare([18, 22, 20, 40], expected=[0.2, 0.2, 0.2, 0.4])
+    reference = stats.chisquare([18, 22, 20, 40], f_exp=[20, 20, 20, 40])
+    assert close(result["statistic"], reference.statistic)
+    assert close(result["p_value"], reference.pvalue)
+    assert result["expected_freq"] == [20, 20, 20, 40]
+    print("✅ 卡方檢定")
+
+    # 4. 無母數檢定（含等值）
+    x = np.round(A, 0)
+    y = np.round(B, 0)
+    result = inferential.mann_whitney(x, y)
+    reference = stats.mannwhitneyu(x, y)
+    assert close(result["u_statistic"], reference.statistic)
+    assert close(result["p_value"], reference.pvalue)
+    assert close(result["rank_sum1"] + result["rank_sum2"], (len(x) + len(y)) * (len(x) + len(y) + 1) / 2)
+    assert "虛無假設" in result["interpretation"]
+
+    before, after = np.round(A[:30], 0), np.round(C, 0)
+    result = inferential.wilcoxon(before, after)
+    reference = stats.wilcoxon(before, after)
+    assert close(result["w_statistic"], reference.statistic)
+    assert close(result["p_value"], reference.pvalue)
+    assert result["n_pairs"] == 30
+    approx = stats.wilcoxon(before, after, method="approx", correction=False)
+    assert close(abs(result["z_score"]), abs(approx.zstatistic), 1e-6)
+
+    result = inferential.kruskal_wallis([x, y, np.round(C, 0)])
+    reference = stats.kruskal(x, y, np.round(C, 0))
+    assert close(result["h_statistic"], reference.statistic)
+    assert close(result["p_value"], reference.pvalue)
+    assert result["n_groups"] == 3
+    print("✅ Mann-Whitney / Wilcoxon / Kruskal-Wallis")
+
+    # 5. 不合理的輸入拋出 ValueError（API 轉為 400）
+    for call in (
+        lambda: inferential.ttest([1.0, 1.0, 1.0]),
+        lambda: inferential.ttest([1.0, 2.0], [1.0], paired=True),
+        lambda: inferential.anova([[1.0, 2.0]]),
+        lambda: inferential.wilcoxon([1.0, 2.0], [1.0, 2.0]),
+        lambda: inferential.chisquare([[1, -1], [2, 3]]),
+    ):
+        try:
+            call()
+        except ValueError:
+            continue
+        raise AssertionError("應拋出 ValueError")
+    print("✅ 輸入檢查")
+
+
+def test_batch():
+    print("🧪 開始測試批次檢定...")
+
+    # 6 個欄位共用一個分組向量；第 1 欄有組間差異，第 3 欄含缺值，第 5 欄為常數
+    codes = np.tile([0, 1, 2], 40)
+    matrix = np.round(rng.normal(0, 1, (6, codes.size)), 1)
+    matrix[0] += (codes == 1) * 0.8
+    matrix[2, :7] = np.nan
+    matrix[4] = 3.0
+
+    def groups_of(column, group_codes, k):
+        return [column[(group_codes == g) & np.isfinite(column)] for g in range(k)]
+
+    # 1. 各欄位結果與逐欄呼叫 SciPy 一致；第 3 組不納入雙組檢定
+    two = np.where(codes == 2, -1, codes)
+    references = {
+        "ttest": (two, 2, lambda g: stats.ttest_ind(*g, equal_var=False)),
+        "mann_whitney": (two, 2, lambda g: stats.mannwhitneyu(*g, method="asymptotic")),
+        "anova": (codes, 3, lambda g: stats.f_oneway(*g)),
+        "kruskal_wallis": (codes, 3, lambda g: stats.kruskal(*g)),
+    }
+    for test, (group_codes, k, reference) in references.items():
+        result = batch.batch_test(matrix, group_codes, ["A", "B", "C"][:k], test=test)
+        assert result["n_columns"] == 6 and result["n_tested"] == 5
+        for i, row in enumerate(result["results"]):
+            if i == 4:
+                assert row["p_value"] is None and "note" in row
+                continue
+            expected = reference(groups_of(matrix[i], group_codes, k))
+            assert close(row["statistic"], expected.statistic), (test, i)
+            assert close(row["p_value"], expected.pvalue), (test, i)
+        assert result["results"][2]["n"][0] < 40
+    print("✅ 批次結果與逐欄檢定一致")
+
+    result = batch.batch_test(matrix, two, ["A", "B"], equal_var=True, alternative="less")
+    expected = stats.ttest_ind(*groups_of(matrix[0], two, 2), alternative="less")
+    assert close(result["results"][0]["p_value"], expected.pvalue)
+
+    # 2. 多重比較校正：NaN 不計入檢定個數
+    p = np.array([0.01, 0.04, 0.03, 0.005, np.nan])
+    holm = batch.adjust_pvalues(p, "holm")
+    assert np.allclose(holm[:4], [0.03, 0.06, 0.06, 0.02]) and np.isnan(holm[4])
+    assert np.allclose(batch.adjust_pvalues(p, "bh")[:4], [0.02, 0.04, 0.04, 0.02])
+    assert np.allclose(batch.adjust_pvalues(p, "bonferroni")[:4], [0.04, 0.16, 0.12, 0.02])
+
+    result = batch.batch_test(matrix, codes, ["A", "B", "C"], test="anova", correction="bh")
+    raw = [row["p_value"] for row in result["results"] if row["p_value"] is not None]
+    adjusted = [row["p_adjusted"] for row in result["results"] if row["p_adjusted"] is not None]
+    assert np.allclose(adjusted, batch.adjust_pvalues(raw, "bh"))
+    assert result["n_significant"] == sum(value < 0.05 for value in adjusted)
+
+    for call in (
+        lambda: batch.batch_test(matrix, codes, ["A", "B", "C"], test="ttest"),
+        lambda: batch.batch_test(matrix, codes[:10], ["A", "B", "C"], test="anova"),
+        lambda: batch.adjust_pvalues([0.1], "fdr"),
+    ):
+        try:
+            call()
+        except ValueError:
+            continue
+        raise AssertionError("應拋出 ValueError")
+    print("✅ 多重比較校正")
+
+
+def test_charts():
+    print("🧪 開始測試圖表數據...")
+
+    result = charts.histogram(A, bins=8)
+    assert sum(item["count"] for item in result["chart_data"]["bins"]) == len(A)
+    assert result["has_image"] is False
+
+    result = charts.boxplot([np.append(A, 500.0)], group_labels=["A"])
+    group = result["chart_data"]["groups"][0]
+    assert group["outliers"] == [500.0] and group["whisker_high"] < 500
+
+    result = charts.scatter(A, 2 * A + 1)
+    assert close(result["chart_data"]["regression"]["slope"], 2.0)
+    assert close(result["chart_data"]["correlation"], 1.0)
+
+    result = charts.simple_chart(["甲", "乙"], [1.0, 3.0], chart_type="pie")
+    assert [point["percentage"] for point in result["chart_data"]["points"]] == [25.0, 75.0]
+
+    # 相同輸入產生相同圖片（可作為基準測試的固定輸出）
+    try:
+        import matplotlib  # noqa: F401
+    except ImportError:
+        print("⚠️ 未安裝 matplotlib，略過圖片測試")
+    else:
+        first = charts.histogram(A, generate_image=True)
+        second = charts.histogram(A, generate_image=True)
+        assert first["has_image"] and first["image_base64"] == second["image_base64"]
+        assert base64.b64decode(first["image_base64"])[:4] == b"\x89PNG"
+    print("✅ 圖表數據")
+
+
+def test_api():
+    print("🧪 開始測試 API...")
+    try:
+        from fastapi.testclient import TestClient
+    except ImportError:
+        print("⚠️ 未安裝 fastapi 或 httpx，略過 API 測試")
+        return
+
+    from stat_backend.app import create_app
+
+    # inline_below=0：所有請求都交給子行程，驗證序列化與結果一致
+    pool = ComputePool(size=1, inline_below=0)
+    with TestClient(create_app(pool)) as client:
+        response = client.post("/api/v1/inferential/ttest", json={
+            "sample1": A.tolist(), "sample2": B.tolist(), "alpha": 0.05,
+        })
+        assert response.status_code == 200, response.text
+        body = response.json()
+        assert close(body["p_value"], stats.ttest_ind(A, B, equal_var=False).pvalue)
+        for key in ("statistic", "degrees_of_freedom", "confidence_interval", "effect_size", "reject_null"):
+            assert key in body, key
+
+        response = client.post("/api/v1/inferential/anova", json={"groups": [A.tolist(), B.tolist(), C.tolist()]})
+        assert response.status_code == 200 and "anova_table" in response.json()
+
+        response = client.post("/api/v1/inferential/kruskal_wallis", json={"groups": [[1, 2, 3], [4, 5, 6]]})
+        assert response.json()["n_groups"] == 2
+
+        response = client.post("/api/v1/charts/boxplot", json={"groups": [[1, 2, 3, 4]], "title": "盒鬚圖"})
+        assert response.json()["success"] is True
+
+        # 計算錯誤回應 400、缺少欄位回應 422，detail 為說明
+        response = client.post("/api/v1/inferential/ttest", json={"sample1": [1, 1, 1]})
+        assert response.status_code == 400 and "變異數" in response.json()["detail"]
+        response = client.post("/api/v1/inferential/mann_whitney", json={"sample1": [1, 2]})
+        assert response.status_code == 400
+        response = client.post("/api/v1/inferential/anova", json={})
+        assert response.status_code == 422
+
+        # 批次檢定：null 為缺值，組別可為數字，未列在 group_order 的組別不納入
+        response = client.post("/api/v1/inferential/batch", json={
+            "columns": [A[:30].tolist(), C.tolist()],
+            "column_names": ["A", "C"],
+            "groups": [1, 2, "x"] * 10,
+            "group_order": ["1", "2"],
+            "correction": "bh",
+        })
+        assert response.status_code == 200, response.text
+        body = response.json()
+        assert body["groups"] == ["1", "2"] and [row["n"] for row in body["results"]] == [[10, 10]] * 2
+        expected = stats.ttest_ind(A[:30][0::3], A[:30][1::3], equal_var=False)
+        assert close(body["results"][0]["p_value"], expected.pvalue)
+
+        response = client.post("/api/v1/inferential/batch", json={
+            "columns": [[1, None, 3, 4]], "groups": ["a", "b", "a", "b"], "test": "anova",
+        })
+        assert response.status_code == 200 and response.json()["results"][0]["n"] == [2, 1]
+        response = client.post("/api/v1/inferential/batch", json={"columns": [[1, 2]], "groups": ["a", "b", "a"]})
+        assert response.status_code == 400
+
+        stats_ = client.get("/health").json()["pool"]
+        assert stats_["size"] == 1 and stats_["completed"] >= 4 and stats_["pending"] == 0
+    print("✅ API")
+
+
+def test_pool_backpressure():
+    print("🧪 開始測試行程池佇列上限...")
+    import asyncio
+    from stat_backend.pool import PoolBusyError
+
+    async def scenario():
+        pool = ComputePool(size=1, max_pending=1, inline_below=0)
+        try:
+            first = asyncio.ensure_future(pool.run(inferential.anova, [A, B]))
+            await asyncio.sleep(0)
+            try:
+                await pool.run(inferential.anova, [A, B])
+            except PoolBusyError:
+                pass
+            else:
+                raise AssertionError("應拋出 PoolBusyError")
+            assert (await first)["success"]
+            assert pool.get_stats()["rejected"] == 1
+        finally:
+            pool.shutdown()
+
+    asyncio.run(scenario())
+    print("✅ 佇列上限")
+
+
+if __name__ == "__main__":
+    test_inferential()
+    test_batch()
+    test_charts()
+    test_api()
+    test_pool_backpressure()
+    print("\n🎉 所有測試通過！")